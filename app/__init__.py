@@ -22,10 +22,34 @@ def create_app():
     mail.init_app(app)
     CORS(app, supports_credentials=True)
     
+    from .auth import configure_auth
+    configure_auth(app)
+    
+    from .jobs import configure_jobs
+    configure_jobs(app)
+    
+    from .services.dashboard_service import configure_dashboard
+    configure_dashboard(app)
+    
+    from .services.leaderboard_service import configure_leaderboard
+    configure_leaderboard(app)
+    
+    from .services.accountability_service import configure_accountability
+    configure_accountability(app)
+    
+    from .services.adapters.runtime import configure_adapters
+    configure_adapters(app)
+    
+    from .pagination import configure_pagination
+    configure_pagination(app)
+    
     # MongoDB initialization
     from mongoengine import connect
     connect(host=app.config['MONGODB_SETTINGS']['host'])
     
+    from .indexes import configure_indexes
+    configure_indexes(app)
+    
     # Register blueprints
     from .routes.auth_routes import auth_bp
     from .routes.user_routes import user_bp
@@ -0,0 +1,244 @@
+"""
+Shared authentication layer for SmartEducation API
+Token decoding, per-request user resolution and the route decorators
+used by every blueprint.
+
+- Decoded JWT payloads are kept in a small LRU so repeat requests with the
+  same token skip signature verification. Entries are dropped once the
+  token's own `exp` has passed.
+- The authenticated User is loaded at most once per request and kept on
+  `g.current_user`; services call `load_user()` to reuse it.
+- An optional cross-request user cache (USER_CACHE_TTL_SECONDS > 0) keeps
+  raw user documents for a few seconds. It is invalidated whenever a User
+  is saved or deleted.
+"""
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import jwt
+from bson import ObjectId
+from flask import current_app, g, has_app_context, jsonify, request
+from mongoengine import signals
+
+from app.models import User
+
+
+class TokenCache:
+    """Thread-safe LRU of decoded JWT payloads with expiry-aware eviction"""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # token -> (payload, exp_timestamp)
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if exp is not None and exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def set(self, token, payload):
+        exp = payload.get('exp')
+        with self._lock:
+            self._entries[token] = (payload, exp)
+            self._entries.move_to_end(token)
+            if len(self._entries) > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        # Expired tokens go first, then least recently used
+        now = time.time()
+        expired = [t for t, (_, exp) in self._entries.items() if exp is not None and exp <= now]
+        for token in expired:
+            del self._entries[token]
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class UserCache:
+    """Short-TTL cache of raw user documents shared across requests"""
+
+    def __init__(self, ttl_seconds=0, max_size=4096):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id str -> (son, stored_at)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            son, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Fresh Document per caller so request-local mutations never leak
+        return User._from_son(son, created=False)
+
+    def set(self, user):
+        if not self.enabled or user is None or user.id is None:
+            return
+        with self._lock:
+            self._entries[str(user.id)] = (user.to_mongo(), time.time())
+            self._entries.move_to_end(str(user.id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+user_cache = UserCache()
+
+
+def configure_auth(app):
+    """Size the caches from app config (called from create_app)"""
+    token_cache.max_size = app.config.get('AUTH_TOKEN_CACHE_SIZE', token_cache.max_size)
+    user_cache.ttl_seconds = app.config.get('USER_CACHE_TTL_SECONDS', user_cache.ttl_seconds)
+
+
+def _invalidate_user(sender, document, **kwargs):
+    if document.id is not None:
+        user_cache.invalidate(document.id)
+
+
+signals.post_save.connect(_invalidate_user, sender=User)
+signals.post_delete.connect(_invalidate_user, sender=User)
+
+
+def decode_token(token):
+    """Return the verified JWT payload for token, or None if invalid/expired"""
+    if not token:
+        return None
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    try:
+        payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+    except Exception:
+        return None
+    token_cache.set(token, payload)
+    return payload
+
+
+def _bearer_token():
+    token = request.headers.get('Authorization')
+    if token and token.startswith('Bearer '):
+        token = token[7:]
+    return token
+
+
+def load_user(user_id):
+    """
+    Resolve a user id (or User) to a User document
+
+    Reuses g.current_user when it is the same user, then the cross-request
+    cache, and only then queries MongoDB.
+
+    Raises:
+        DoesNotExist: If no such user exists
+    """
+    if isinstance(user_id, User):
+        return user_id
+
+    in_request = has_app_context()
+    if in_request:
+        current = g.get('current_user')
+        if current is not None and str(current.id) == str(user_id):
+            return current
+
+    user = user_cache.get(user_id)
+    if user is None:
+        uid = ObjectId(user_id) if isinstance(user_id, str) and ObjectId.is_valid(user_id) else user_id
+        user = User.objects.get(id=uid)
+        user_cache.set(user)
+
+    if in_request and str(g.get('current_user_id')) == str(user.id):
+        g.current_user = user
+    return user
+
+
+def get_current_user():
+    """Return the authenticated User for this request (None if unavailable)"""
+    if g.get('current_user') is not None:
+        return g.current_user
+    user_id = g.get('current_user_id')
+    if not user_id:
+        return None
+    try:
+        return load_user(user_id)
+    except Exception:
+        return None
+
+
+def token_required(f):
+    """Decorator to require JWT token; passes user_id as a keyword argument"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = _bearer_token()
+        if not token:
+            return jsonify({'error': 'Token is missing'}), 401
+
+        payload = decode_token(token)
+        if not payload or not payload.get('user_id'):
+            return jsonify({'error': 'Invalid token'}), 401
+
+        g.current_user_id = payload['user_id']
+        g.session_id = payload.get('sid')
+        kwargs['user_id'] = payload['user_id']
+        return f(*args, **kwargs)
+    return decorated
+
+
+def user_required(f):
+    """Decorator to require JWT token; passes the User document as first argument"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = _bearer_token()
+        if not token:
+            return jsonify({'error': 'Token is missing'}), 401
+
+        payload = decode_token(token)
+        if not payload or not payload.get('user_id'):
+            return jsonify({'error': 'Token is invalid or expired'}), 401
+
+        g.current_user_id = payload['user_id']
+        g.session_id = payload.get('sid')
+        try:
+            current_user = load_user(payload['user_id'])
+        except Exception:
+            return jsonify({'error': 'User not found'}), 401
+
+        g.user = current_user
+        return f(current_user, *args, **kwargs)
+    return decorated
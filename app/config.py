@@ -53,6 +53,38 @@ class Config:
     
     # JWT Configuration
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    
+    # Auth caching (see app/auth.py)
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 1024))
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', 0))  # 0 disables cross-request user cache
+    FOCUS_CACHE_TTL_SECONDS = int(os.getenv('FOCUS_CACHE_TTL_SECONDS', 60))  # Dashboard focus snapshots; 0 disables
+    POD_CACHE_TTL_SECONDS = int(os.getenv('POD_CACHE_TTL_SECONDS', 30))  # Accountability pod views; 0 disables
+    
+    # Indexes (see app/indexes.py); scripts/ensure_indexes.py builds them on deploy
+    ENSURE_INDEXES_ON_STARTUP = os.getenv('ENSURE_INDEXES_ON_STARTUP', 'False') == 'True'
+    
+    # Background jobs (see app/jobs.py); without a broker jobs run in-process
+    CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL'))
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
+    JOBS_EAGER = os.getenv('JOBS_EAGER', 'False') == 'True'
+    
+    # Task completion: plan/DailyStat/item writes in one multi-document transaction (needs a replica set)
+    TASK_COMPLETION_TRANSACTIONS = os.getenv('TASK_COMPLETION_TRANSACTIONS', 'False') == 'True'
+    
+    # Leaderboards (see app/services/leaderboard_service.py); in-process rankings without Redis
+    LEADERBOARD_REDIS_URL = os.getenv('LEADERBOARD_REDIS_URL', os.getenv('REDIS_URL'))
+    LEADERBOARD_MEMORY_RELOAD_SECONDS = int(os.getenv('LEADERBOARD_MEMORY_RELOAD_SECONDS', 60))  # In-process boards pick up changed XP from MongoDB
+    
+    # Content adapters (see app/services/adapters/runtime.py); simulated YouTube metadata without an API key
+    YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+    YOUTUBE_API_URL = os.getenv('YOUTUBE_API_URL', 'https://www.googleapis.com/youtube/v3')
+    ADAPTER_CACHE_TTL_SECONDS = int(os.getenv('ADAPTER_CACHE_TTL_SECONDS', 3600))  # Metadata per content id; 0 disables
+    ADAPTER_CACHE_SIZE = int(os.getenv('ADAPTER_CACHE_SIZE', 10000))
+    ADAPTER_HTTP_POOL_SIZE = int(os.getenv('ADAPTER_HTTP_POOL_SIZE', 20))
+    ADAPTER_HTTP_TIMEOUT_SECONDS = float(os.getenv('ADAPTER_HTTP_TIMEOUT_SECONDS', 10))
+    
+    # List pagination (see app/pagination.py); per-user totals cached instead of count() per request
+    LIST_COUNT_CACHE_TTL_SECONDS = int(os.getenv('LIST_COUNT_CACHE_TTL_SECONDS', 60))  # 0 disables
 
     @classmethod
     def validate(cls):
@@ -0,0 +1,123 @@
+"""
+Index management for SmartEducation collections
+The compound indexes are declared in each model's meta['indexes'], next to
+the fields they cover. This module compares those declarations with what
+exists in MongoDB and builds anything missing with background builds, so
+a deploy can create indexes before traffic arrives instead of on the first
+query of every process.
+
+    python scripts/ensure_indexes.py [--dry-run]
+
+Set ENSURE_INDEXES_ON_STARTUP=True to run the same build in a daemon
+thread from create_app.
+"""
+import threading
+from mongoengine import Document
+from app import models, pod_models
+
+
+def indexed_models():
+    """All concrete Document classes that declare at least one index"""
+    found = []
+    for module in (models, pod_models):
+        for value in vars(module).values():
+            if (isinstance(value, type) and issubclass(value, Document) and value is not Document
+                    and value.__module__ == module.__name__
+                    and not value._meta.get('abstract') and value._meta.get('index_specs')):
+                found.append(value)
+    return found
+
+
+def _key(fields):
+    """Normalise an index key so declared and existing indexes compare equal"""
+    if any(direction == 'text' for _, direction in fields):
+        return (('_fts', 'text'), ('_ftsx', 1))
+    return tuple((name, int(direction)) for name, direction in fields)
+
+
+def _dedupe(model):
+    """Merge rows that would break a unique index about to be built"""
+    if model is models.DailyStat:
+        from app.services.stats_service import StatsService
+        return StatsService.merge_duplicate_days()
+    return 0
+
+
+def _raw_collection(model):
+    # Bypass _get_collection(), which would auto-create indexes as a side effect
+    return model._get_db()[model._get_collection_name()]
+
+
+def index_status(model):
+    """
+    Compare a model's declared indexes with the live collection
+
+    An index whose key exists without the declared uniqueness counts as
+    missing (ensure_indexes rebuilds it).
+
+    Returns:
+        (present, missing) lists of index specs
+    """
+    existing = {
+        (_key(info['key']), bool(info.get('unique')))
+        for info in _raw_collection(model).index_information().values()
+    }
+    present, missing = [], []
+    for spec in model._meta['index_specs']:
+        found = (_key(spec['fields']), bool(spec.get('unique'))) in existing
+        (present if found else missing).append(spec)
+    return present, missing
+
+
+def ensure_indexes(model_classes=None, dry_run=False):
+    """
+    Build every declared index that is missing
+
+    Same-key indexes with other options are dropped and rebuilt; rows that
+    would break a new unique index are merged first (_dedupe).
+
+    Args:
+        model_classes: Models to check (default: all indexed models)
+        dry_run: Only report what would be built
+
+    Returns:
+        List of {'collection', 'index', 'status'} rows
+    """
+    report = []
+    for model in model_classes or indexed_models():
+        collection = _raw_collection(model)
+        present, missing = index_status(model)
+        for spec in present:
+            report.append({'collection': collection.name, 'index': spec['fields'], 'status': 'exists'})
+        if missing and not dry_run and any(spec.get('unique') for spec in missing):
+            _dedupe(model)
+        for spec in missing:
+            opts = {k: v for k, v in spec.items() if k not in ('fields', 'cls')}
+            if not dry_run:
+                for name, info in collection.index_information().items():
+                    if name != '_id_' and _key(info['key']) == _key(spec['fields']):
+                        collection.drop_index(name)
+                collection.create_index(spec['fields'], background=True, **opts)
+            report.append({
+                'collection': collection.name,
+                'index': spec['fields'],
+                'status': 'missing' if dry_run else 'created'
+            })
+    return report
+
+
+def configure_indexes(app):
+    """Optionally build missing indexes in the background at startup"""
+    if not app.config.get('ENSURE_INDEXES_ON_STARTUP'):
+        return None
+
+    def build():
+        try:
+            created = [row for row in ensure_indexes() if row['status'] == 'created']
+            print(f"Index build finished: {len(created)} created")
+        except Exception as e:
+            print(f"Index build failed: {e}")
+
+    thread = threading.Thread(target=build, name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,165 @@
+"""
+Background Jobs
+Celery task queue for work that should not hold a request open:
+learning item metadata enrichment, OTP / login alert delivery, task
+completion counters, large flashcard imports, the hourly
+fleet-wide trigger sweep, the daily missed-session sweep, the nightly
+priority re-scoring and the Monday weekly XP season reset.
+
+When no broker is configured (or JOBS_EAGER is set) jobs run eagerly
+in-process, which is what tests and local runs use. Start a worker (with
+the beat scheduler for periodic jobs) with:
+
+    celery -A worker.celery worker --beat --loglevel=info
+"""
+from celery import Celery, Task
+from celery.schedules import crontab
+from flask import has_app_context
+
+celery = Celery('smarteducation')
+celery.conf.update(
+    task_always_eager=True,  # Until configure_jobs() sees a broker
+    task_eager_propagates=False,
+    task_ignore_result=True,
+    task_serializer='json',
+    accept_content=['json'],
+    beat_schedule={
+        'evaluate-triggers-hourly': {
+            'task': 'jobs.evaluate_all_triggers',
+            'schedule': crontab(minute=5)
+        },
+        'sweep-missed-sessions-daily': {
+            'task': 'jobs.sweep_missed_sessions',
+            'schedule': crontab(minute=30, hour=0)
+        },
+        'reset-weekly-season': {
+            'task': 'jobs.reset_weekly_season',
+            'schedule': crontab(minute=0, hour=0, day_of_week='monday')
+        },
+        'recalculate-priorities-nightly': {
+            'task': 'jobs.recalculate_priorities',
+            'schedule': crontab(minute=0, hour=3)
+        }
+    }
+)
+
+_flask_app = None
+
+
+class AppContextTask(Task):
+    """Runs each job inside the Flask app context (mail, OTP settings)"""
+    abstract = True
+
+    def __call__(self, *args, **kwargs):
+        if has_app_context() or _flask_app is None:
+            return super().__call__(*args, **kwargs)
+        with _flask_app.app_context():
+            return super().__call__(*args, **kwargs)
+
+
+def configure_jobs(app):
+    """Point the queue at the configured broker; eager mode without one"""
+    global _flask_app
+    _flask_app = app
+
+    broker_url = app.config.get('CELERY_BROKER_URL')
+    eager = app.config.get('JOBS_EAGER') or not broker_url
+    celery.conf.update(
+        broker_url=broker_url,
+        result_backend=app.config.get('CELERY_RESULT_BACKEND'),
+        task_always_eager=eager
+    )
+    app.extensions['celery'] = celery
+    return celery
+
+
+def enqueue(task, *args, **kwargs):
+    """
+    Queue a job for the worker
+
+    Falls back to running the job inline if the broker is unreachable,
+    so a Redis outage degrades to the old synchronous behaviour.
+    """
+    try:
+        return task.apply_async(args=args, kwargs=kwargs)
+    except Exception as e:
+        print(f"Job queue unavailable ({e}); running {task.name} inline")
+        return task.apply(args=args, kwargs=kwargs)
+
+
+@celery.task(base=AppContextTask, name='jobs.enrich_learning_item')
+def enrich_learning_item(item_id):
+    """Fetch adapter metadata and patch it onto a learning item"""
+    from app.services.inbox_service import InboxService
+    try:
+        InboxService.enrich_learning_item(item_id)
+    except Exception as e:
+        # Don't leave the item titled "Fetching details..." for good
+        print(f"Enrichment failed for {item_id}: {e}")
+        InboxService.fail_enrichment(item_id, e)
+
+
+@celery.task(base=AppContextTask, name='jobs.deliver_email_otp')
+def deliver_email_otp(email, otp_code, purpose):
+    from app.services.otp_service import OTPService
+    OTPService.send_email_otp(email, otp_code, purpose)
+
+
+@celery.task(base=AppContextTask, name='jobs.deliver_sms_otp')
+def deliver_sms_otp(mobile, otp_code, purpose):
+    from app.services.otp_service import OTPService
+    OTPService.send_sms_otp(mobile, otp_code, purpose)
+
+
+@celery.task(base=AppContextTask, name='jobs.deliver_login_alert')
+def deliver_login_alert(email, device_info, ip_address, timestamp):
+    from app.services.otp_service import OTPService
+    OTPService.send_email_login_alert(email, device_info, ip_address, timestamp)
+
+
+@celery.task(base=AppContextTask, name='jobs.record_task_completion')
+def record_task_completion(user_id, plan_id, minutes, completed_at, xp=0):
+    """Plan counter, DailyStat rollup and XP for a completed task"""
+    from app.services.task_generator_service import TaskGeneratorService
+    TaskGeneratorService.record_completion(user_id, plan_id, minutes, completed_at, xp)
+
+
+@celery.task(base=AppContextTask, name='jobs.import_flashcards')
+def import_flashcards(job_id):
+    """Stream an uploaded source into flashcards, reporting progress on the job"""
+    from app.services.recall_service import RecallService
+    RecallService.run_card_import(job_id)
+
+
+@celery.task(base=AppContextTask, name='jobs.evaluate_all_triggers')
+def evaluate_all_triggers(chunk_size=None):
+    """Hourly nudge / overload sweep over every active user"""
+    from app.services.trigger_service import TriggerService
+    result = TriggerService.evaluate_all(chunk_size=chunk_size)
+    print(f"Trigger sweep: {result['created']} notifications for {result['users']} users")
+    return result
+
+
+@celery.task(base=AppContextTask, name='jobs.recalculate_priorities')
+def recalculate_priorities(chunk_size=None):
+    """Nightly fleet-wide priority re-scoring"""
+    from app.services.priority_service import PriorityService
+    result = PriorityService.recalculate_all(chunk_size)
+    print(f"Priority recalculation: {result['updated']} of {result['scanned']} items updated")
+    return result
+
+
+@celery.task(base=AppContextTask, name='jobs.reset_weekly_season')
+def reset_weekly_season():
+    """Zero weekly_xp for everyone at the Monday 00:00 UTC boundary"""
+    from app.services.gamification_service import GamificationService
+    return GamificationService.reset_weekly_season()
+
+
+@celery.task(base=AppContextTask, name='jobs.sweep_missed_sessions')
+def sweep_missed_sessions(batch_size=None):
+    """Daily checkpointed commitment sweep (resumes if a previous run died)"""
+    from app.services.commitment_service import CommitmentService, SWEEP_BATCH_SIZE
+    summary = CommitmentService.sweep_missed_sessions(batch_size=batch_size or SWEEP_BATCH_SIZE)
+    print(f"Missed-session sweep: {summary['violations']} violations over {summary['scanned']} commitments")
+    return summary
@@ -1,12 +1,14 @@
 """
 Database models for SmartEducation (MongoDB)
 """
+import hashlib
 from datetime import datetime
 from mongoengine import (
     Document, StringField, BooleanField, DateTimeField, 
-    IntField, ReferenceField, FloatField, ListField, DictField
+    IntField, ReferenceField, FloatField, ListField, DictField, ObjectIdField, FileField
 )
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.serialization import ref_id
 
 # We will initialize connection in app.py
 
@@ -15,7 +17,7 @@ from app.pod_models import SharedContent, PodMessage
 
 class User(Document):
     """User model for authentication"""
-    meta = {'collection': 'users'}
+    meta = {'collection': 'users', 'indexes': ['xp_updated_at']}
     
     name = StringField(max_length=100, required=True)
     email = StringField(max_length=120, required=True, unique=True)
@@ -32,6 +34,7 @@ class User(Document):
     
     # Gamification
     xp_total = IntField(default=0)
+    xp_updated_at = DateTimeField() # Set by every award; leaderboard refreshes read changes since their last load
     level = IntField(default=1)
     badges = ListField(StringField(), default=list) # e.g. ["First Blood", "Night Owl"]
     
@@ -183,7 +186,13 @@ class User(Document):
 
 class OTP(Document):
     """OTP model for verification"""
-    meta = {'collection': 'otps'}
+    meta = {
+        'collection': 'otps',
+        'index_background': True,
+        'indexes': [
+            ('user_id', 'otp_type', 'purpose', 'is_used', '-created_at')
+        ]
+    }
     
     user_id = StringField() # Link to user ID or temp session ID
     email = StringField(max_length=120)
@@ -203,7 +212,13 @@ class OTP(Document):
 
 class Activity(Document):
     """Activity log for user actions"""
-    meta = {'collection': 'activities'}
+    meta = {
+        'collection': 'activities',
+        'index_background': True,
+        'indexes': [
+            ('user_id', '-timestamp')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     activity_type = StringField(max_length=50, required=True) # login, bookmark, profile_update, etc.
@@ -223,7 +238,16 @@ class Activity(Document):
 
 class Bookmark(Document):
     """Bookmark model for saved resources"""
-    meta = {'collection': 'bookmarks'}
+    meta = {
+        'collection': 'bookmarks',
+        'index_background': True,
+        'indexes': [
+            {'fields': ['$title', '$tags', '$topic', '$description'],
+             'default_language': 'english',
+             'weights': {'title': 10, 'tags': 5, 'topic': 5, 'description': 2}},
+            ('user_id', '-relevance_score', '-id')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     title = StringField(max_length=200, required=True)
@@ -249,6 +273,13 @@ class Bookmark(Document):
     platform = StringField(max_length=100) # e.g. "Udemy", "O'Reilly"
     meta_data = DictField() # Renamed from metadata to avoid collision with Document.metadata if safe, or just use content_metadata
 
+    # List endpoint projection (see app/serialization.py lean())
+    LEAN_VIEWS = {
+        'list': ('id', 'title', 'url', 'description', 'category', 'is_educational', 'relevance_score',
+                 'added_at', 'tags', 'source', 'resource_type', 'topic', 'is_uploaded',
+                 'status', 'progress', 'author', 'platform', 'meta_data')
+    }
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -277,8 +308,11 @@ class UserSession(Document):
     """Tracks user login sessions"""
     meta = {
         'collection': 'user_sessions',
+        'index_background': True,
         'indexes': [
-            {'fields': ['login_time'], 'expireAfterSeconds': 604800} # 7 days
+            {'fields': ['login_time'], 'expireAfterSeconds': 604800}, # 7 days
+            ('user_id', 'is_active', '-login_time'),
+            'session_id'
         ]
     }
     
@@ -295,7 +329,7 @@ class UserSession(Document):
         return {
             'id': str(self.id),
             'session_id': self.session_id,
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'device_info': self.device_info,
             'ip_address': self.ip_address,
             'login_time': self.login_time.isoformat() if self.login_time else None,
@@ -316,10 +350,17 @@ class Schedule(Document):
     is_completed = BooleanField(default=False)
     created_at = DateTimeField(default=datetime.utcnow)
 
+    # List endpoint projections (see app/serialization.py lean())
+    LEAN_VIEWS = {
+        'list': ('id', 'user_id', 'title', 'description', 'start_time', 'end_time',
+                 'repeat_pattern', 'is_completed'),
+        'calendar': ('id', 'title', 'description', 'start_time', 'end_time')
+    }
+
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'title': self.title,
             'description': self.description,
             'start_time': self.start_time.isoformat(),
@@ -363,13 +404,47 @@ class UserAchievement(Document):
         }
 
 
+class XPEvent(Document):
+    """Append-only XP ledger: one row per award (GamificationService)"""
+    meta = {
+        'collection': 'xp_events',
+        'index_background': True,
+        'indexes': [('user_id', '-created_at')]
+    }
+    
+    user_id = ReferenceField(User, required=True)
+    amount = IntField(required=True)
+    source = StringField(max_length=100, default='System')
+    created_at = DateTimeField(default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'amount': self.amount,
+            'source': self.source,
+            'created_at': self.created_at.isoformat()
+        }
+
+
 # ============================================================================
 # FEATURE 1: UNIFIED LEARNING INBOX MODELS
 # ============================================================================
 
 class LearningItem(Document):
     """Unified model for all learning content types in the inbox"""
-    meta = {'collection': 'learning_items'}
+    meta = {
+        'collection': 'learning_items',
+        'index_background': True,
+        'indexes': [
+            {'fields': ['$title', '$tags', '$description'],
+             'default_language': 'english',
+             'weights': {'title': 10, 'tags': 5, 'description': 2}},
+            # Keyset pagination orders end in _id (see app/pagination.py)
+            ('user_id', 'status', '-priority_score', '-added_at', '-id'),
+            ('user_id', '-priority_score', '-added_at', '-id'),
+            ('user_id', 'status', '-added_at', '-id'),
+            ('user_id', 'source_url')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     title = StringField(max_length=300, required=True)
@@ -412,10 +487,18 @@ class LearningItem(Document):
     tags = ListField(StringField(max_length=50))
     category = StringField(max_length=100)
     
+    # List endpoint projections (see app/serialization.py lean()); inbox and library share one
+    LEAN_VIEWS = {
+        'list': ('id', 'user_id', 'title', 'description', 'source_type', 'source_url', 'platform',
+                 'status', 'total_duration', 'completed_duration', 'metadata', 'added_at',
+                 'started_at', 'completed_at', 'paused_at', 'priority_score', 'target_completion_date',
+                 'progress_percentage', 'last_accessed_at', 'tags', 'category')
+    }
+    
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'title': self.title,
             'description': self.description,
             'source_type': self.source_type,
@@ -476,7 +559,7 @@ class ContentSource(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'platform_name': self.platform_name,
             'platform_type': self.platform_type,
             'is_connected': self.is_connected,
@@ -525,8 +608,8 @@ class LearningPlan(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'learning_item_id': str(self.learning_item_id.id),
-            'user_id': str(self.user_id.id),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
+            'user_id': ref_id(self, 'user_id'),
             'target_completion_date': self.target_completion_date.isoformat() if self.target_completion_date else None,
             'daily_availability_minutes': self.daily_availability_minutes,
             'total_estimated_duration': self.total_estimated_duration,
@@ -545,10 +628,18 @@ class DailyTask(Document):
     """Individual daily task generated from a learning plan"""
     meta = {
         'collection': 'daily_tasks',
+        'index_background': True,
         'indexes': [
             {'fields': ['$title'],
              'default_language': 'english',
-             'weights': {'title': 10}}
+             'weights': {'title': 10}},
+            ('user_id', 'status', 'scheduled_date'),
+            ('user_id', 'status', 'completed_at'),
+            ('user_id', 'completed_at'),
+            ('user_id', 'scheduled_date'),
+            ('learning_item_id', 'status', 'completed_at'),
+            ('learning_plan_id', 'status'),
+            ('commitment_id', 'status', 'scheduled_date')
         ]
     }
     
@@ -600,9 +691,9 @@ class DailyTask(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'learning_plan_id': str(self.learning_plan_id.id) if self.learning_plan_id else None,
-            'learning_item_id': str(self.learning_item_id.id),
-            'user_id': str(self.user_id.id),
+            'learning_plan_id': ref_id(self, 'learning_plan_id'),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
+            'user_id': ref_id(self, 'user_id'),
             'title': self.title,
             'description': self.description,
             'task_type': self.task_type,
@@ -636,19 +727,17 @@ class DailyTask(Document):
             return today == task_date
         return False
     
-    def mark_complete(self, actual_duration=None):
-        """Mark task as completed"""
-        self.status = 'completed'
-        self.completed_at = datetime.utcnow()
-        if actual_duration:
-            self.actual_duration_minutes = actual_duration
-        self.save()
-        
-        # Update learning plan stats
-        if self.learning_plan_id:
-            plan = self.learning_plan_id
-            plan.completed_tasks += 1
-            plan.save()
+    def mark_complete(self, actual_duration=None, award_xp=True):
+        """
+        Mark task as completed (atomic and idempotent; see
+        TaskGeneratorService.complete_task). The caller credits the item;
+        with award_xp=False it also pays the reward instead of xp_reward.
+        """
+        from app.services.task_generator_service import TaskGeneratorService
+        done = TaskGeneratorService.complete_task(self.id, actual_duration, credit_item=False, award_xp=award_xp)
+        self.status = done.status
+        self.completed_at = done.completed_at
+        self.actual_duration_minutes = done.actual_duration_minutes
 
 
 # ============================================================================
@@ -657,7 +746,14 @@ class DailyTask(Document):
 
 class Commitment(Document):
     """Locked commitment/promise for a learning item"""
-    meta = {'collection': 'commitments'}
+    meta = {
+        'collection': 'commitments',
+        'index_background': True,
+        'indexes': [
+            ('user_id', 'status', 'learning_item_id'),
+            'status'
+        ]
+    }
     
     learning_item_id = ReferenceField(LearningItem, required=True)
     user_id = ReferenceField(User, required=True)
@@ -694,8 +790,8 @@ class Commitment(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'learning_item_id': str(self.learning_item_id.id),
-            'user_id': str(self.user_id.id),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
+            'user_id': ref_id(self, 'user_id'),
             'target_completion_date': self.target_completion_date.isoformat() if self.target_completion_date else None,
             'daily_study_minutes': self.daily_study_minutes,
             'study_days_per_week': self.study_days_per_week,
@@ -719,7 +815,15 @@ class Commitment(Document):
 
 class CommitmentViolation(Document):
     """Tracks broken commitments and violations"""
-    meta = {'collection': 'commitment_violations'}
+    meta = {
+        'collection': 'commitment_violations',
+        'index_background': True,
+        'indexes': [
+            ('user_id', 'violation_date'),
+            ('commitment_id', 'violation_date'),
+            ('user_id', 'is_resolved')
+        ]
+    }
     
     commitment_id = ReferenceField(Commitment, required=True)
     user_id = ReferenceField(User, required=True)
@@ -749,8 +853,8 @@ class CommitmentViolation(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'commitment_id': str(self.commitment_id.id),
-            'user_id': str(self.user_id.id),
+            'commitment_id': ref_id(self, 'commitment_id'),
+            'user_id': ref_id(self, 'user_id'),
             'violation_type': self.violation_type,
             'violation_date': self.violation_date.isoformat() if self.violation_date else None,
             'severity_level': self.severity_level,
@@ -761,6 +865,19 @@ class CommitmentViolation(Document):
         }
 
 
+class SweepCheckpoint(Document):
+    """Progress marker for a resumable fleet sweep (e.g. the daily missed-session sweep)"""
+    meta = {'collection': 'sweep_checkpoints'}
+    
+    name = StringField(required=True, unique=True)  # e.g. missed_sessions:2026-01-31[:2of4]
+    last_id = ObjectIdField()  # Last document _id fully processed
+    processed = IntField(default=0)
+    violations = IntField(default=0)
+    completed = BooleanField(default=False)
+    started_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+
 # ============================================================================
 # FEATURE 11: CONTEXT-AWARE TRIGGER ENGINE
 # ============================================================================
@@ -784,7 +901,15 @@ class TriggerRule(Document):
     created_at = DateTimeField(default=datetime.utcnow)
 
 class Notification(Document):
-    meta = {'collection': 'notifications'}
+    meta = {
+        'collection': 'notifications',
+        'index_background': True,
+        'indexes': [
+            ('user_id', 'title', 'created_at'),  # TriggerService anti-spam
+            ('user_id', 'is_read', '-created_at'),
+            ('user_id', '-created_at')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     title = StringField(required=True)
@@ -797,6 +922,11 @@ class Notification(Document):
     # Metadata for linking (e.g. link to a task)
     action_link = StringField()
     
+    # List endpoint projection (see app/serialization.py lean())
+    LEAN_VIEWS = {
+        'list': ('id', 'title', 'message', ('type', 'notification_type'), 'is_read', 'created_at', 'action_link')
+    }
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -808,6 +938,29 @@ class Notification(Document):
             'action_link': self.action_link
         }
 
+class ReminderDelivery(Document):
+    """
+    Idempotency ledger for reminder emails (ReminderService)
+    key is '<kind>:<user id>:<YYYY-MM-DD>'; claiming it before sending makes
+    a re-run or an overlapping run skip users already reminded that day.
+    """
+    meta = {
+        'collection': 'reminder_deliveries',
+        'index_background': True,
+        'indexes': [
+            {'fields': ['key'], 'unique': True},
+            {'fields': ['created_at'], 'expireAfterSeconds': 60 * 60 * 24 * 30}
+        ]
+    }
+    
+    key = StringField(required=True)
+    user_id = ReferenceField(User, required=True)
+    status = StringField(default='sending')  # sending, sent
+    created_at = DateTimeField(default=datetime.utcnow)  # Claim time; a run may take over 'sending' claims past their lease
+    claim_id = StringField()  # Run that holds the claim
+    sent_at = DateTimeField()
+
+
 class AccountabilityPartner(Document):
     """Optional peer accountability system"""
     meta = {'collection': 'accountability_partners'}
@@ -829,7 +982,7 @@ class AccountabilityPartner(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'partner_email': self.partner_email,
             'partner_name': self.partner_name,
             'status': self.status,
@@ -844,7 +997,14 @@ class AccountabilityPartner(Document):
 
 class FocusSession(Document):
     """Tracks active focus mode sessions"""
-    meta = {'collection': 'focus_sessions'}
+    meta = {
+        'collection': 'focus_sessions',
+        'index_background': True,
+        'indexes': [
+            ('user_id', 'is_active'),
+            ('user_id', 'started_at')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     learning_item_id = ReferenceField(LearningItem, required=True)
@@ -873,9 +1033,9 @@ class FocusSession(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
-            'learning_item_id': str(self.learning_item_id.id),
-            'daily_task_id': str(self.daily_task_id.id) if self.daily_task_id else None,
+            'user_id': ref_id(self, 'user_id'),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
+            'daily_task_id': ref_id(self, 'daily_task_id'),
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'ended_at': self.ended_at.isoformat() if self.ended_at else None,
             'duration_minutes': self.duration_minutes,
@@ -917,10 +1077,14 @@ class Flashcard(Document):
     """Spaced Repetition Flashcard"""
     meta = {
         'collection': 'flashcards',
+        'index_background': True,
         'indexes': [
             {'fields': ['$front', '$back'],
              'default_language': 'english',
-             'weights': {'front': 10, 'back': 5}}
+             'weights': {'front': 10, 'back': 5}},
+            # _id breaks ties for the keyset-paginated due queue
+            ('user_id', 'next_review_date', '_id'),
+            ('user_id', 'content_hash')
         ]
     }
     
@@ -941,6 +1105,24 @@ class Flashcard(Document):
     last_reviewed_at = DateTimeField()
     next_review_date = DateTimeField(default=datetime.utcnow) # Due date
     
+    # Duplicate detection for bulk imports (see hash_content)
+    content_hash = StringField()
+    
+    # Due queue projection (see app/serialization.py lean())
+    LEAN_VIEWS = {
+        'list': ('id', 'front', 'back', ('next_review', 'next_review_date'), 'interval')
+    }
+    
+    @staticmethod
+    def hash_content(front, back):
+        """Case- and whitespace-insensitive fingerprint of a card's text"""
+        normalise = lambda text: ' '.join(text.lower().split())
+        return hashlib.sha1(f"{normalise(front)}\x1f{normalise(back)}".encode('utf-8')).hexdigest()
+    
+    def clean(self):
+        if not self.content_hash:
+            self.content_hash = Flashcard.hash_content(self.front, self.back)
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -951,13 +1133,60 @@ class Flashcard(Document):
         }
 
 
+class CardImportJob(Document):
+    """Background flashcard import from a large text or document upload"""
+    meta = {
+        'collection': 'card_import_jobs',
+        'indexes': [('user_id', '-created_at')]
+    }
+    
+    user_id = ReferenceField(User, required=True)
+    learning_item_id = ReferenceField(LearningItem, required=True)
+    filename = StringField()
+    source = FileField(collection_name='card_import_sources')  # GridFS; removed once the import finishes
+    
+    status = StringField(default='queued')  # queued, running, completed, failed
+    bytes_total = IntField(default=0)
+    bytes_read = IntField(default=0)
+    cards_created = IntField(default=0)
+    duplicates = IntField(default=0)
+    error = StringField()
+    
+    created_at = DateTimeField(default=datetime.utcnow)
+    finished_at = DateTimeField()
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'status': self.status,
+            'filename': self.filename,
+            'progress': round(100 * self.bytes_read / self.bytes_total, 1) if self.bytes_total else 0,
+            'cards_created': self.cards_created,
+            'duplicates': self.duplicates,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
 # ==============================================================================
 # FEATURE 13: LIVE CLASSES
 # ==============================================================================
 
 class LiveClass(Document):
     """Live online class sessions (Google Meet, Zoom, etc.)"""
-    meta = {'collection': 'live_classes'}
+    meta = {
+        'collection': 'live_classes',
+        'index_background': True,
+        'indexes': [
+            {'fields': ['$title', '$description'],
+             'default_language': 'english',
+             'weights': {'title': 10, 'description': 2}},
+            ('user_id', '-created_at', '-id'),
+            ('user_id', 'scheduled_at'),
+            ('user_id', '-joined_at')
+        ]
+    }
     
     user_id = ReferenceField(User, required=True)
     title = StringField(max_length=300)
@@ -996,10 +1225,17 @@ class LiveClass(Document):
     tags = ListField(StringField(max_length=50))
     category = StringField(max_length=100)
     
+    # List endpoint projection (see app/serialization.py lean())
+    LEAN_VIEWS = {
+        'list': ('id', 'user_id', 'title', 'description', 'platform', 'meeting_url', 'meeting_id',
+                 'scheduled_at', 'duration_minutes', 'is_recorded', 'recording_url', 'recording_status',
+                 'created_at', 'joined_at', 'ended_at', 'tags', 'category')
+    }
+    
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'title': self.title,
             'description': self.description,
             'platform': self.platform,
@@ -1017,18 +1253,54 @@ class LiveClass(Document):
             'category': self.category
         }
 
+class WeeklyReviewSnapshot(Document):
+    """
+    Frozen statistics for a finished ISO week (WeeklyReviewService)
+    Written once when a past week is first reviewed and never updated, so
+    only the current week is ever recomputed.
+    """
+    meta = {
+        'collection': 'weekly_review_snapshots',
+        'indexes': [{'fields': ['user_id', 'week_start'], 'unique': True}]
+    }
+    
+    user_id = ReferenceField('User', required=True)
+    week_start = DateTimeField(required=True)  # Monday 00:00 UTC
+    statistics = DictField()
+    created_at = DateTimeField(default=datetime.utcnow)
+
+
 class DailyStat(Document):
-    """Pre-aggregated stats for dashboard performance (Phase 29)"""
-    meta = {'collection': 'daily_stats', 'indexes': [('user_id', 'date')]}
+    """
+    Pre-aggregated stats for dashboard performance (Phase 29)
+    One document per user per UTC day. Focus sessions feed total_minutes /
+    sessions_count; completed DailyTasks feed task_minutes / tasks_completed
+    (keyed by completed_at), which burnout, truth metrics and the weekly
+    summary read instead of scanning DailyTask. The unique (user_id, date)
+    index keeps concurrent first upserts of a day from creating two
+    documents (the server retries the losing upsert as an update).
+    """
+    # app/indexes.py builds the unique index (merging legacy duplicates and
+    # dropping the old non-unique one first); auto-creating it here would fail
+    # on every first access against a database that still has the old index
+    meta = {
+        'collection': 'daily_stats',
+        'indexes': [{'fields': ['user_id', 'date'], 'unique': True}],
+        'auto_create_index': False
+    }
     
     user_id = ReferenceField('User', required=True)
     date = DateTimeField(required=True) # Midnight UTC
     total_minutes = IntField(default=0)
     sessions_count = IntField(default=0)
+    task_minutes = IntField(default=0)
+    tasks_completed = IntField(default=0)
     
     def to_dict(self):
         return {
             'date': self.date.isoformat(),
             'total_minutes': self.total_minutes,
-            'sessions_count': self.sessions_count
+            'sessions_count': self.sessions_count,
+            'task_minutes': self.task_minutes,
+            'tasks_completed': self.tasks_completed
         }
@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination for list endpoints
+skip() makes MongoDB walk and discard every earlier row, so deep pages
+cost as much as reading the whole list. keyset_page() instead filters on
+the sort key of the last row served: the cursor is an opaque token of
+that row's sort values plus _id (the tie-breaker), and each sort order
+is backed by a compound index ending in _id.
+
+    items = keyset_page(LearningItem.objects(user_id=uid), ('-priority_score', '-added_at', '-id'), 20, cursor)
+    items.next_cursor  # None on the last page
+
+Totals come from count_cache, a per-user TTL cache of count_documents()
+results, instead of a count() on every request. Saves and bulk inserts
+of the counted models invalidate through signals; deletes call
+count_cache.invalidate() at the call site, since a post_delete receiver
+would make QuerySet.delete() loop per document.
+
+configure_pagination(app) applies LIST_COUNT_CACHE_TTL_SECONDS (called
+from create_app).
+"""
+import base64
+import threading
+import time
+from collections import OrderedDict
+from bson import json_util
+from mongoengine import signals
+from app import serialization
+from app.models import LearningItem, Bookmark, LiveClass
+
+
+class Page(list):
+    """One page of rows; next_cursor is None on the last page"""
+
+    def __init__(self, rows=(), next_cursor=None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Sort values from a cursor token; ValueError if it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {token}")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor: {token}")
+    return values
+
+
+def keyset_page(queryset, order, limit, cursor=None, lean_view=None):
+    """
+    One page of queryset in `order`, starting after `cursor`
+
+    Args:
+        queryset: Filtered queryset (no ordering, skip or limit)
+        order: Sort field names ('-' for descending), ending with 'id'
+        limit: Page size
+        cursor: next_cursor of the previous page
+        lean_view: LEAN_VIEWS name to return LeanRecord rows (must include the sort fields)
+
+    Returns:
+        Page of Documents (or LeanRecords)
+    """
+    model = queryset._document
+    keys = [(name.lstrip('-'), -1 if name.startswith('-') else 1) for name in order]
+    db_keys = ['_id' if name == 'id' else model._fields[name].db_field for name, _ in keys]
+
+    queryset = queryset.order_by(*order)
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        # (a < x) or (a == x and b < y) or ... for the sort directions
+        clauses = []
+        for position, (db_key, (_, direction)) in enumerate(zip(db_keys, keys)):
+            clause = dict(zip(db_keys[:position], values[:position]))
+            clause[db_key] = {'$lt' if direction < 0 else '$gt': values[position]}
+            clauses.append(clause)
+        queryset = queryset.filter(__raw__={'$or': clauses})
+
+    queryset = queryset.limit(limit + 1)
+    rows = serialization.lean(queryset, lean_view) if lean_view else list(queryset)
+    if len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor([getattr(rows[-1], name) for name, _ in keys]))
+
+
+class CountCache:
+    """Thread-safe per-user LRU of list totals with TTL"""
+
+    def __init__(self, ttl_seconds=60, max_size=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user id str -> {list key: (total, stored_at)}
+        self._lock = threading.Lock()
+
+    def get_or_count(self, user_id, key, count):
+        """Cached total for (user, key), calling count() on a miss"""
+        user = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user, {}).get(key)
+            if entry is not None and time.time() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(user)
+                return entry[0]
+        total = count()
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._entries.setdefault(user, {})[key] = (total, time.time())
+                self._entries.move_to_end(user)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return total
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+def configure_pagination(app):
+    """Set the list total cache TTL from app config (called from create_app)"""
+    count_cache.ttl_seconds = app.config.get('LIST_COUNT_CACHE_TTL_SECONDS', count_cache.ttl_seconds)
+
+
+def _invalidate_counts(sender, document, **kwargs):
+    ref = document._data.get('user_id')
+    user_id = getattr(ref, 'id', ref)
+    if user_id is not None:
+        count_cache.invalidate(user_id)
+
+
+def _invalidate_counts_bulk(sender, documents, **kwargs):
+    for document in documents:
+        _invalidate_counts(sender, document)
+
+
+for _model in (LearningItem, Bookmark, LiveClass):
+    signals.post_save.connect(_invalidate_counts, sender=_model)
+    signals.post_bulk_insert.connect(_invalidate_counts_bulk, sender=_model)
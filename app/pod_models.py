@@ -5,6 +5,7 @@
 
 from datetime import datetime
 from mongoengine import Document, StringField, BooleanField, DateTimeField, ReferenceField, ListField
+from app.serialization import ref_id, ref_ids
 
 class SharedContent(Document):
     """Tracks content shared between accountability partners"""
@@ -33,11 +34,11 @@ class SharedContent(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
+            'user_id': ref_id(self, 'user_id'),
             'content_type': self.content_type,
             'content_id': self.content_id,
             'content_title': self.content_title,
-            'shared_with': [str(u.id) for u in self.shared_with] if self.shared_with else [],
+            'shared_with': ref_ids(self, 'shared_with'),
             'share_progress': self.share_progress,
             'share_tasks': self.share_tasks,
             'share_notes': self.share_notes,
@@ -59,8 +60,8 @@ class PodMessage(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'sender_id': str(self.sender_id.id),
-            'receiver_id': str(self.receiver_id.id),
+            'sender_id': ref_id(self, 'sender_id'),
+            'receiver_id': ref_id(self, 'receiver_id'),
             'message': self.message,
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat() if self.created_at else None
@@ -3,13 +3,13 @@ Advanced Pod Routes - Group Sharing, Activity Feed, Shared Goals
 """
 from flask import Blueprint, request, jsonify
 from app.services.advanced_pod_features import AdvancedPodFeatures
-from app.routes.user_routes import token_required
+from app.auth import user_required
 
 advanced_pod_bp = Blueprint('advanced_pod', __name__, url_prefix='/api/pod/advanced')
 
 
 @advanced_pod_bp.route('/share-with-group', methods=['POST'])
-@token_required
+@user_required
 def share_with_group(current_user):
     """Share content with entire pod at once"""
     data = request.json
@@ -28,7 +28,7 @@ def share_with_group(current_user):
 
 
 @advanced_pod_bp.route('/activity-feed', methods=['GET'])
-@token_required
+@user_required
 def get_activity_feed(current_user):
     """Get activity feed from pod partners"""
     limit = request.args.get('limit', 20, type=int)
@@ -41,7 +41,7 @@ def get_activity_feed(current_user):
 
 
 @advanced_pod_bp.route('/shared-goal', methods=['POST'])
-@token_required
+@user_required
 def create_shared_goal(current_user):
     """Create a shared goal with pod partners"""
     data = request.json
@@ -60,7 +60,7 @@ def create_shared_goal(current_user):
 
 
 @advanced_pod_bp.route('/leaderboard', methods=['GET'])
-@token_required
+@user_required
 def get_leaderboard(current_user):
     """Get pod leaderboard"""
     try:
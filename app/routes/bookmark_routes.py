@@ -2,14 +2,14 @@
 Bookmark API routes for SmartEducation
 """
 from flask import Blueprint, request, jsonify
-from app.routes.user_routes import token_required
+from app.auth import user_required
 from app.services.bookmark_service import BookmarkService
 from app.models import Bookmark
 
 bookmark_bp = Blueprint('bookmark', __name__, url_prefix='/api/bookmarks')
 
 @bookmark_bp.route('', methods=['POST'])
-@token_required
+@user_required
 def add_bookmark(current_user):
     """Add a new bookmark"""
     data = request.get_json()
@@ -32,25 +32,30 @@ def add_bookmark(current_user):
     return jsonify({'error': message}), 500
 
 @bookmark_bp.route('', methods=['GET'])
-@token_required
+@user_required
 def get_bookmarks(current_user):
-    """Get paginated bookmarks for current user"""
+    """Get paginated bookmarks for current user (page or cursor)"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    cursor = request.args.get('cursor')
     
-    bookmarks, total = BookmarkService.get_bookmarks(current_user.email, page, per_page)
+    try:
+        bookmarks, total = BookmarkService.get_bookmarks(current_user, page, per_page, lean=True, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'bookmarks': [b.to_dict() for b in bookmarks],
         'total': total,
         'page': page,
-        'per_page': per_page
+        'per_page': per_page,
+        'next_cursor': getattr(bookmarks, 'next_cursor', None)
     }), 200
 
 
 
 @bookmark_bp.route('/sync', methods=['POST'])
-@token_required
+@user_required
 def sync_library(current_user):
     """Simulate syncing from external sources"""
     # Import inside function to avoid circular imports if any, though likely safe at top
@@ -63,7 +68,7 @@ def sync_library(current_user):
     return jsonify({'error': message}), 400
 
 @bookmark_bp.route('/upload', methods=['POST'])
-@token_required
+@user_required
 def upload_book(current_user):
     """Handle manual book upload"""
     from app.services.library_service import LibraryService
@@ -115,7 +120,7 @@ def upload_book(current_user):
     return jsonify({'error': f"Upload failed. {', '.join(errors)}"}), 400
 
 @bookmark_bp.route('/<bookmark_id>/delete-otp', methods=['POST'])
-@token_required
+@user_required
 def request_delete_otp(current_user, bookmark_id):
     """Request OTP for bookmark deletion"""
     # Verify bookmark ownership
@@ -137,12 +142,13 @@ def request_delete_otp(current_user, bookmark_id):
     # send_email_otp takes (email, code, purpose).
     
     otp = OTPService.create_otp(current_user.id, 'deletion', f'delete_{bookmark_id}')
-    OTPService.send_email_otp(current_user.email, otp.otp_code, 'Resource Deletion')
+    from app.jobs import enqueue, deliver_email_otp
+    enqueue(deliver_email_otp, current_user.email, otp.otp_code, 'Resource Deletion')
     
     return jsonify({'message': 'OTP sent to your email'}), 200
 
 @bookmark_bp.route('/<bookmark_id>/confirm', methods=['DELETE'])
-@token_required
+@user_required
 def confirm_delete(current_user, bookmark_id):
     """Delete bookmark with OTP verification"""
     data = request.get_json()
@@ -162,7 +168,7 @@ def confirm_delete(current_user, bookmark_id):
     )
     
     if success:
-        bookmark.delete()
+        BookmarkService.delete_bookmark(bookmark)
         return jsonify({'message': 'Resource deleted successfully'}), 200
         
     return jsonify({'error': message}), 400
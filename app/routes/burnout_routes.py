@@ -4,36 +4,11 @@ API endpoints for burnout detection and adaptive scheduling
 """
 from flask import Blueprint, request, jsonify
 from app.services.burnout_service import BurnoutDetectionService
-from app.services.auth_service import AuthService
-from functools import wraps
+from app.auth import token_required
 
 burnout_bp = Blueprint('burnout', __name__, url_prefix='/api/burnout')
 
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_data = AuthService.verify_token(token)
-            if not user_data:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            kwargs['user_id'] = user_data['user_id']
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
-
-
 @burnout_bp.route('/score', methods=['GET'])
 @token_required
 def get_burnout_score(user_id):
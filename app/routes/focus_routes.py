@@ -118,7 +118,7 @@ def end_session():
             task = session.daily_task_id
             task.actual_duration_minutes += session.duration_minutes
             if data.get('mark_complete', False):
-                task.mark_complete(task.actual_duration_minutes)
+                task.mark_complete(task.actual_duration_minutes, award_xp=False)  # The focus bonus below replaces xp_reward
             task.save()
             
         # --- GAMIFICATION: AWARD XP ---
@@ -4,27 +4,12 @@ Gamification Routes (Feature 9)
 API for XP, Level, and Progress data.
 """
 from flask import Blueprint, jsonify, request
-from app.services.auth_service import AuthService
 from app.services.gamification_service import GamificationService
-from functools import wraps
+from app.services.leaderboard_service import LeaderboardService
+from app.auth import token_required
 
 gamification_bp = Blueprint('gamification', __name__, url_prefix='/api/gamification')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token missing'}), 401
-        try:
-            if token.startswith('Bearer '): token = token[7:]
-            user_id = AuthService.verify_token(token)
-            if not user_id: return jsonify({'error': 'Invalid token'}), 401
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except:
-            return jsonify({'error': 'Token error'}), 401
-    return decorated
 
 @gamification_bp.route('/progress', methods=['GET'])
 @token_required
@@ -46,3 +31,22 @@ def get_weekly_stats(user_id):
         return jsonify(data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@gamification_bp.route('/leaderboard', methods=['GET'])
+@token_required
+def get_leaderboard(user_id):
+    """
+    Global leaderboard
+    Query: season=all_time|weekly, limit (max 100), offset
+    """
+    try:
+        season = request.args.get('season', 'all_time')
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        return jsonify({
+            'season': season,
+            'entries': LeaderboardService.top(season, limit, offset),
+            'me': LeaderboardService.rank_of(user_id, season)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
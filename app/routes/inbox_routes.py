@@ -4,38 +4,11 @@ API endpoints for managing learning items
 """
 from flask import Blueprint, request, jsonify
 from app.services.inbox_service import InboxService
-from app.services.auth_service import AuthService
-from functools import wraps
+from app.auth import token_required
 
 inbox_bp = Blueprint('inbox', __name__, url_prefix='/api/inbox')
 
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            # Remove 'Bearer ' prefix if present
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_id = AuthService.verify_token(token)
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            # Add user_id to kwargs
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
-
-
 @inbox_bp.route('/items', methods=['POST'])
 @token_required
 def create_item(user_id):
@@ -68,19 +41,25 @@ def get_items(user_id):
         status_filter = request.args.get('status')  # active, paused, completed, dropped
         limit = request.args.get('limit', type=int)
         skip = request.args.get('skip', default=0, type=int)
+        cursor = request.args.get('cursor')
         
         items = InboxService.get_user_items(
             user_id=user_id,
             status_filter=status_filter,
             limit=limit,
-            skip=skip
+            skip=skip,
+            lean=True,
+            cursor=cursor
         )
         
         return jsonify({
             'items': [item.to_dict() for item in items],
-            'count': len(items)
+            'count': len(items),
+            'next_cursor': getattr(items, 'next_cursor', None)
         }), 200
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch items: {str(e)}'}), 500
 
@@ -262,19 +241,25 @@ def get_library(user_id):
         source_type = request.args.get('source_type')
         limit = request.args.get('limit', type=int)
         skip = request.args.get('skip', default=0, type=int)
+        cursor = request.args.get('cursor')
         
         items = InboxService.get_library_items(
             user_id=user_id,
             source_type_filter=source_type,
             limit=limit,
-            skip=skip
+            skip=skip,
+            lean=True,
+            cursor=cursor
         )
         
         return jsonify({
             'items': [item.to_dict() for item in items],
-            'count': len(items)
+            'count': len(items),
+            'next_cursor': getattr(items, 'next_cursor', None)
         }), 200
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch library: {str(e)}'}), 500
 
@@ -4,14 +4,14 @@ Learning Plan routes for Auto Course Breakdown (Feature 2)
 from flask import Blueprint, request, jsonify
 from app.models import LearningPlan, LearningItem, DailyTask
 from app.services.auth_service import AuthService
-from app.routes.user_routes import token_required
+from app.auth import user_required
 from datetime import datetime
 import math
 
 learning_bp = Blueprint('learning', __name__, url_prefix='/api/learning')
 
 @learning_bp.route('/plans', methods=['POST'])
-@token_required
+@user_required
 def create_learning_plan(current_user):
     """Create a new automatic learning plan for an item"""
     data = request.get_json()
@@ -60,7 +60,7 @@ def create_learning_plan(current_user):
         return jsonify({'error': str(e)}), 500
 
 @learning_bp.route('/plans/<plan_id>', methods=['GET'])
-@token_required
+@user_required
 def get_learning_plan(current_user, plan_id):
     """Get a specific learning plan"""
     try:
@@ -73,7 +73,7 @@ def get_learning_plan(current_user, plan_id):
         return jsonify({'error': str(e)}), 500
 
 @learning_bp.route('/plans/item/<item_id>', methods=['GET'])
-@token_required
+@user_required
 def get_plan_by_item(current_user, item_id):
     """Get learning plan for a specific item"""
     try:
@@ -91,7 +91,7 @@ def get_plan_by_item(current_user, item_id):
         return jsonify({'error': str(e)}), 500
 
 @learning_bp.route('/plans/<plan_id>/tasks', methods=['GET'])
-@token_required
+@user_required
 def get_plan_tasks(current_user, plan_id):
     """Get all daily tasks for a plan"""
     try:
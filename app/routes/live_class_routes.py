@@ -4,39 +4,12 @@ API endpoints for managing live online classes
 """
 from flask import Blueprint, request, jsonify
 from app.services.live_class_service import LiveClassService
-from app.services.auth_service import AuthService
-from functools import wraps
 from datetime import datetime
+from app.auth import token_required
 
 live_class_bp = Blueprint('live_class', __name__, url_prefix='/api/live-class')
 
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            # Remove 'Bearer ' prefix if present
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_id = AuthService.verify_token(token)
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            # Add user_id to kwargs
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
-
-
 @live_class_bp.route('/join', methods=['POST'])
 @token_required
 def join_class(user_id):
@@ -83,18 +56,24 @@ def get_classes(user_id):
     try:
         limit = request.args.get('limit', type=int)
         skip = request.args.get('skip', default=0, type=int)
+        cursor = request.args.get('cursor')
         
         classes = LiveClassService.get_user_classes(
             user_id=user_id,
             limit=limit,
-            skip=skip
+            skip=skip,
+            lean=True,
+            cursor=cursor
         )
         
         return jsonify({
             'classes': [c.to_dict() for c in classes],
-            'count': len(classes)
+            'count': len(classes),
+            'next_cursor': getattr(classes, 'next_cursor', None)
         }), 200
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to fetch classes: {str(e)}'}), 500
 
@@ -104,7 +83,7 @@ def get_classes(user_id):
 def get_upcoming(user_id):
     """Get upcoming scheduled classes"""
     try:
-        classes = LiveClassService.get_upcoming_classes(user_id)
+        classes = LiveClassService.get_upcoming_classes(user_id, lean=True)
         
         return jsonify({
             'classes': [c.to_dict() for c in classes],
@@ -121,7 +100,7 @@ def get_past(user_id):
     """Get past classes (recordings)"""
     try:
         limit = request.args.get('limit', default=10, type=int)
-        classes = LiveClassService.get_past_classes(user_id, limit=limit)
+        classes = LiveClassService.get_past_classes(user_id, limit=limit, lean=True)
         
         return jsonify({
             'classes': [c.to_dict() for c in classes],
@@ -3,13 +3,13 @@ Pod Sharing API Routes
 """
 from flask import Blueprint, request, jsonify
 from app.services.pod_sharing_service import PodSharingService
-from app.routes.user_routes import token_required
+from app.auth import user_required
 
 pod_bp = Blueprint('pod', __name__, url_prefix='/api/pod')
 
 
 @pod_bp.route('/share', methods=['POST'])
-@token_required
+@user_required
 def share_content(current_user):
     """Share content with pod partners"""
     data = request.json
@@ -29,7 +29,7 @@ def share_content(current_user):
 
 
 @pod_bp.route('/share/<share_id>', methods=['DELETE'])
-@token_required
+@user_required
 def unshare_content(current_user, share_id):
     """Remove a share"""
     try:
@@ -40,7 +40,7 @@ def unshare_content(current_user, share_id):
 
 
 @pod_bp.route('/my-shares', methods=['GET'])
-@token_required
+@user_required
 def get_my_shares(current_user):
     """Get all content I've shared"""
     shares = PodSharingService.get_my_shared_content(current_user.id)
@@ -48,7 +48,7 @@ def get_my_shares(current_user):
 
 
 @pod_bp.route('/shared-with-me', methods=['GET'])
-@token_required
+@user_required
 def get_shared_with_me(current_user):
     """Get all content shared with me"""
     shares = PodSharingService.get_shared_with_me(current_user.id)
@@ -56,7 +56,7 @@ def get_shared_with_me(current_user):
 
 
 @pod_bp.route('/message', methods=['POST'])
-@token_required
+@user_required
 def send_message(current_user):
     """Send a message to a pod partner"""
     data = request.json
@@ -73,7 +73,7 @@ def send_message(current_user):
 
 
 @pod_bp.route('/messages/<partner_id>', methods=['GET'])
-@token_required
+@user_required
 def get_messages(current_user, partner_id):
     """Get message thread with a partner"""
     try:
@@ -84,7 +84,7 @@ def get_messages(current_user, partner_id):
 
 
 @pod_bp.route('/messages/unread-count', methods=['GET'])
-@token_required
+@user_required
 def get_unread_count(current_user):
     """Get count of unread messages"""
     count = PodSharingService.get_unread_count(current_user.id)
@@ -4,36 +4,11 @@ API endpoints for quizzes, certificates, and portfolios
 """
 from flask import Blueprint, request, jsonify
 from app.services.proof_of_learning_service import ProofOfLearningService
-from app.services.auth_service import AuthService
-from functools import wraps
+from app.auth import token_required
 
 proof_bp = Blueprint('proof', __name__, url_prefix='/api/proof')
 
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_data = AuthService.verify_token(token)
-            if not user_data:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            kwargs['user_id'] = user_data['user_id']
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
-
-
 @proof_bp.route('/quiz/create', methods=['POST'])
 @token_required
 def create_quiz(user_id):
@@ -5,33 +5,10 @@ API endpoints for accessing strict reality metrics.
 """
 from flask import Blueprint, jsonify, request
 from app.services.reality_service import RealityService
-from app.services.auth_service import AuthService
-from functools import wraps
+from app.auth import token_required
 
 reality_bp = Blueprint('reality', __name__, url_prefix='/api/reality')
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_id = AuthService.verify_token(token)
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
 
 @reality_bp.route('/metrics', methods=['GET'])
 @token_required
@@ -3,35 +3,41 @@
 Recall Routes (Feature 12)
 API for Flashcards and Spaced Repetition.
 """
+import io
 from flask import Blueprint, jsonify, request
-from app.services.auth_service import AuthService
-from app.services.recall_service import RecallService
+from app.services.recall_service import RecallService, INLINE_IMPORT_BYTES
 from app.models import Flashcard, LearningItem
-from functools import wraps
+from app.auth import token_required
 
 recall_bp = Blueprint('recall', __name__, url_prefix='/api/recall')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token: return jsonify({'error': 'Token missing'}), 401
-        try:
-            if token.startswith('Bearer '): token = token[7:]
-            user_id = AuthService.verify_token(token)
-            if not user_id: return jsonify({'error': 'Invalid token'}), 401
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except: return jsonify({'error': 'Token error'}), 401
-    return decorated
 
 @recall_bp.route('/due', methods=['GET'])
 @token_required
 def get_due_cards(user_id):
-    """Get cards due for review"""
+    """
+    Get cards due for review, oldest first
+    Query: limit (default 50, max 200), cursor (from X-Next-Cursor)
+    """
     try:
-        cards = RecallService.get_due_cards(user_id)
-        return jsonify([c.to_dict() for c in cards]), 200
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        cards, next_cursor = RecallService.get_due_cards(user_id, limit, request.args.get('cursor'), lean=True)
+        response = jsonify([c.to_dict() for c in cards])
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@recall_bp.route('/due/forecast', methods=['GET'])
+@token_required
+def get_due_forecast(user_id):
+    """Due card counts per day for the next `days` days (default 14)"""
+    try:
+        days = min(max(request.args.get('days', 14, type=int), 1), 90)
+        return jsonify(RecallService.get_due_forecast(user_id, days)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -44,25 +50,70 @@ def submit_review(user_id):
         card_id = data.get('card_id')
         quality = data.get('quality') # 0-5
         
-        result = RecallService.process_review(card_id, int(quality))
+        result = RecallService.process_review(card_id, quality, user_id=user_id)
         return jsonify(result), 200
+    except Flashcard.DoesNotExist:
+        return jsonify({'error': 'Card not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@recall_bp.route('/review/batch', methods=['POST'])
+@token_required
+def submit_review_batch(user_id):
+    """
+    Submit a whole session's results at once
+    Body: {"reviews": [{"card_id": ..., "quality": 0-5}, ...]}
+    """
+    try:
+        data = request.get_json() or {}
+        result = RecallService.review_batch(user_id, data.get('reviews') or [])
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @recall_bp.route('/generate', methods=['POST'])
 @token_required
 def generate_cards(user_id):
-    """Generate cards from text"""
+    """
+    Generate cards from text
+    JSON {learning_item_id, text}, or multipart with learning_item_id and a
+    `file` (text, markdown or PDF). Sources over 64 KB are imported in the
+    background: the response is 202 with a job to poll.
+    """
     try:
-        data = request.get_json()
-        item_id = data.get('learning_item_id')
-        text = data.get('text')
-        
-        count = RecallService.generate_cards_from_text(user_id, item_id, text)
-        return jsonify({'message': f'{count} cards generated', 'count': count}), 201
+        upload = request.files.get('file')
+        if upload is None:
+            data = request.get_json() or {}
+            item_id = data.get('learning_item_id')
+            text = data.get('text') or ''
+            if len(text.encode('utf-8')) <= INLINE_IMPORT_BYTES:
+                count = RecallService.generate_cards_from_text(user_id, item_id, text)
+                return jsonify({'message': f'{count} cards generated', 'count': count}), 201
+            stream, filename = io.BytesIO(text.encode('utf-8')), 'text.txt'
+        else:
+            item_id = request.form.get('learning_item_id')
+            stream, filename = upload.stream, upload.filename
+
+        job = RecallService.start_card_import(user_id, item_id, stream, filename)
+        return jsonify({'message': 'Import started', 'job': job.to_dict()}), 202
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@recall_bp.route('/generate/<job_id>', methods=['GET'])
+@token_required
+def get_generate_job(user_id, job_id):
+    """Progress of a background card import"""
+    job = RecallService.get_import_job(user_id, job_id)
+    if not job:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify(job.to_dict()), 200
+
 @recall_bp.route('/create', methods=['POST'])
 @token_required
 def create_card(user_id):
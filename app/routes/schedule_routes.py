@@ -2,34 +2,14 @@
 Schedule/Calendar Routes for SmartEducation
 """
 from flask import Blueprint, request, jsonify
-from app.services.auth_service import AuthService
 from app.models import User
 from datetime import datetime
 from mongoengine import DoesNotExist
+from app.auth import token_required, load_user
+from app.serialization import lean
 
 schedule_bp = Blueprint('schedule', __name__, url_prefix='/api/schedule')
 
-def token_required(f):
-    """Decorator to require authentication token"""
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_id = AuthService.verify_token(token)
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            return f(user_id, *args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    decorated.__name__ = f.__name__
-    return decorated
 
 @schedule_bp.route('/events', methods=['GET'])
 @token_required
@@ -54,16 +34,16 @@ def get_events(user_id):
         
         # Get user object
         try:
-            user = User.objects.get(id=user_id)
+            user = load_user(user_id)
         except DoesNotExist:
             return jsonify({'error': 'User not found'}), 404
         
         # Query actual calendar events from database
-        schedules = Schedule.objects(
+        schedules = lean(Schedule.objects(
             user_id=user,
             start_time__gte=start_time,
             start_time__lte=end_time
-        ).order_by('start_time')
+        ).order_by('start_time'), 'calendar')
         
         # Convert to dict format
         events = []
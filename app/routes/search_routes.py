@@ -1,34 +1,34 @@
-
 """
 Search Routes (Feature 15)
 """
 from flask import Blueprint, jsonify, request
-from app.services.auth_service import AuthService
 from app.services.search_service import SearchService
-from functools import wraps
+from app.auth import token_required
 
 search_bp = Blueprint('search', __name__, url_prefix='/api')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token: return jsonify({'error': 'Token missing'}), 401
-        try:
-            if token.startswith('Bearer '): token = token[7:]
-            user_id = AuthService.verify_token(token)
-            if not user_id: return jsonify({'error': 'Invalid token'}), 401
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except: return jsonify({'error': 'Token error'}), 401
-    return decorated
 
 @search_bp.route('/search', methods=['GET'])
 @token_required
 def search(user_id):
+    """
+    Search across library, tasks, flashcards, bookmarks and live classes
+    Query params: q, limit, source (comma separated), cursor, typeahead (1/0)
+    """
     query = request.args.get('q', '')
+    source_param = request.args.get('source')
+    sources = [s.strip() for s in source_param.split(',') if s.strip()] if source_param else None
     try:
-        results = SearchService.universal_search(user_id, query)
+        results = SearchService.universal_search(
+            user_id,
+            query,
+            limit=request.args.get('limit', type=int),
+            sources=sources,
+            cursor=request.args.get('cursor'),
+            typeahead=request.args.get('typeahead', '0') in ('1', 'true', 'yes')
+        )
         return jsonify(results), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
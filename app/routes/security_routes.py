@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify, g
 from functools import wraps
 from app.services.security_service import SecurityService
 from app.services.auth_service import AuthService
-from app.models import User
+from app.auth import decode_token, load_user
 
 security_bp = Blueprint('security_bp', __name__, url_prefix='/api/security')
 
@@ -17,23 +17,19 @@ def login_required(f):
             token = token[7:]
             
         # Get full payload to extract session_id
-        payload = AuthService.get_token_payload(token)
+        payload = decode_token(token)
         if not payload:
             return jsonify({'error': 'Token is invalid or expired'}), 401
             
-        user_id = payload.get('user_id')
-        session_id = payload.get('sid')
+        g.current_user_id = payload.get('user_id')
+        g.session_id = payload.get('sid')
         
-        # Determine if ObjectId or string
-        from bson import ObjectId
-        uid = ObjectId(user_id) if isinstance(user_id, str) else user_id
-        
-        user = User.objects(id=uid).first()
-        if not user:
+        try:
+            user = load_user(g.current_user_id)
+        except Exception:
             return jsonify({'error': 'User not found'}), 401
             
         g.user = user
-        g.session_id = session_id
         return f(*args, **kwargs)
     return decorated
 
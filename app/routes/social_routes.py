@@ -4,26 +4,12 @@ Social Routes (Feature 13)
 API for Pods and Accountability.
 """
 from flask import Blueprint, jsonify, request
-from app.services.auth_service import AuthService
 from app.services.accountability_service import AccountabilityService
 from app.models import AccountabilityPartner
-from functools import wraps
+from app.auth import token_required
 
 social_bp = Blueprint('social', __name__, url_prefix='/api/social')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token: return jsonify({'error': 'Token missing'}), 401
-        try:
-            if token.startswith('Bearer '): token = token[7:]
-            user_id = AuthService.verify_token(token)
-            if not user_id: return jsonify({'error': 'Invalid token'}), 401
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except: return jsonify({'error': 'Token error'}), 401
-    return decorated
 
 @social_bp.route('/invite', methods=['POST'])
 @token_required
@@ -4,37 +4,12 @@ API endpoints for task generation and management
 """
 from flask import Blueprint, request, jsonify
 from app.services.task_generator_service import TaskGeneratorService
-from app.services.auth_service import AuthService
-from functools import wraps
 from datetime import datetime
+from app.auth import token_required
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
 
-def token_required(f):
-    """Decorator to require JWT token for protected routes"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            user_id = AuthService.verify_token(token)
-            if not user_id:
-                return jsonify({'error': 'Invalid token'}), 401
-            
-            kwargs['user_id'] = user_id
-            return f(*args, **kwargs)
-        except Exception as e:
-            return jsonify({'error': 'Token verification failed'}), 401
-    
-    return decorated
-
-
 @tasks_bp.route('/generate', methods=['POST'])
 @token_required
 def generate_plan(user_id):
@@ -90,7 +65,7 @@ def complete_task(user_id, task_id):
         data = request.get_json() or {}
         actual_duration = data.get('actual_duration_minutes')
         
-        task = TaskGeneratorService.complete_task(task_id, actual_duration)
+        task = TaskGeneratorService.complete_task(task_id, actual_duration, user_id=user_id)
         
         return jsonify({
             'message': 'Task completed successfully',
@@ -2,44 +2,17 @@
 User routes for SmartEducation API - Activities and Preferences
 """
 from flask import Blueprint, request, jsonify, current_app
-from functools import wraps
 from app.models import User, Schedule, UserSession
 from app.services.auth_service import AuthService
 from app.services.activity_service import ActivityService
-
-from bson import ObjectId
+from app.auth import user_required
+from app.serialization import lean
 
 user_bp = Blueprint('user', __name__, url_prefix='/api/user')
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        # Handle Bearer token format
-        if token.startswith('Bearer '):
-            token = token[7:]
-            
-        user_id = AuthService.verify_token(token)
-        if not user_id:
-            return jsonify({'error': 'Token is invalid or expired'}), 401
-            
-        try:
-            uid = ObjectId(user_id) if isinstance(user_id, str) else user_id
-            current_user = User.objects(id=uid).first()
-        except:
-             return jsonify({'error': 'Invalid User ID'}), 401
-
-        if not current_user:
-            return jsonify({'error': 'User not found'}), 401
-            
-        return f(current_user, *args, **kwargs)
-    return decorated
 
 @user_bp.route('/activities', methods=['GET'])
-@token_required
+@user_required
 def get_activities(current_user):
     """Get recent activities for the current user"""
     limit = request.args.get('limit', 20, type=int)
@@ -47,7 +20,7 @@ def get_activities(current_user):
     return jsonify([a.to_dict() for a in activities])
 
 @user_bp.route('/log-activity', methods=['POST'])
-@token_required
+@user_required
 def log_activity(current_user):
     """Manually log an activity from the frontend"""
     data = request.get_json()
@@ -66,7 +39,7 @@ def log_activity(current_user):
     return jsonify({'error': 'Failed to log activity'}), 500
 
 @user_bp.route('/session-status', methods=['GET'])
-@token_required
+@user_required
 def get_session_status(current_user):
     """Find the last significant activity to prompt for session resumption"""
     from app.models import Activity
@@ -85,13 +58,13 @@ def get_session_status(current_user):
     return jsonify({'has_previous_session': False})
 
 @user_bp.route('/profile', methods=['GET'])
-@token_required
+@user_required
 def get_profile(current_user):
     """Fetch full user profile"""
     return jsonify(current_user.to_dict())
 
 @user_bp.route('/profile', methods=['PUT'])
-@token_required
+@user_required
 def update_profile(current_user):
     """Update user profile fields"""
     data = request.get_json()
@@ -119,7 +92,7 @@ def update_profile(current_user):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/profile-picture', methods=['POST'])
-@token_required
+@user_required
 def update_profile_picture(current_user):
     """
     Handle profile picture upload.
@@ -175,7 +148,7 @@ def update_profile_picture(current_user):
     return jsonify({'error': 'Invalid file type'}), 400
 
 @user_bp.route('/onboarding', methods=['POST'])
-@token_required
+@user_required
 def save_onboarding(current_user):
     """Save onboarding survey preferences (IMPROVEMENT-001)"""
     data = request.get_json()
@@ -224,7 +197,7 @@ def save_onboarding(current_user):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/preferences', methods=['GET'])
-@token_required
+@user_required
 def get_preferences(current_user):
     """Fetch user preferences"""
     return jsonify({
@@ -242,7 +215,7 @@ def get_preferences(current_user):
     })
 
 @user_bp.route('/preferences', methods=['PUT'])
-@token_required
+@user_required
 def update_preferences(current_user):
     """Update user preferences"""
     data = request.get_json()
@@ -283,14 +256,14 @@ def update_preferences(current_user):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/schedules', methods=['GET'])
-@token_required
+@user_required
 def get_schedules(current_user):
     """Fetch all schedules for the current user"""
-    schedules = Schedule.objects(user_id=current_user.id).order_by('-start_time')
+    schedules = lean(Schedule.objects(user_id=current_user.id).order_by('-start_time'))
     return jsonify([s.to_dict() for s in schedules])
 
 @user_bp.route('/schedules', methods=['POST'])
-@token_required
+@user_required
 def add_schedule(current_user):
     """Add a new learning schedule/task"""
     from datetime import datetime
@@ -321,7 +294,7 @@ def add_schedule(current_user):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/schedules/<schedule_id>', methods=['PUT'])
-@token_required
+@user_required
 def update_schedule(current_user, schedule_id):
     """Update an existing schedule"""
     data = request.get_json()
@@ -340,7 +313,7 @@ def update_schedule(current_user, schedule_id):
         return jsonify({'error': str(e)}), 500
 
 @user_bp.route('/achievements', methods=['GET'])
-@token_required
+@user_required
 def get_achievements(current_user):
     """Fetch earned achievements and check for new ones"""
     from app.services.achievement_service import AchievementService
@@ -356,7 +329,7 @@ def get_achievements(current_user):
     return jsonify([a.to_dict() for a in earned])
 
 @user_bp.route('/achievements/available', methods=['GET'])
-@token_required
+@user_required
 def get_available_achievements(current_user):
     """Fetch all possible achievements"""
     from app.services.achievement_service import AchievementService
@@ -364,7 +337,7 @@ def get_available_achievements(current_user):
     return jsonify([a.to_dict() for a in all_ach])
 
 @user_bp.route('/schedules/<schedule_id>', methods=['DELETE'])
-@token_required
+@user_required
 def delete_schedule(current_user, schedule_id):
     """Delete a schedule"""
     schedule = Schedule.objects(id=schedule_id, user_id=current_user.id).first()
@@ -377,7 +350,7 @@ def delete_schedule(current_user, schedule_id):
 # Feature 3.1: Settings Expansion
 
 @user_bp.route('/export', methods=['GET'])
-@token_required
+@user_required
 def export_user_data(current_user):
     """Export user data as JSON"""
     # Collect data
@@ -399,7 +372,7 @@ def export_user_data(current_user):
     return jsonify(data)
 
 @user_bp.route('/sessions', methods=['GET'])
-@token_required
+@user_required
 def get_sessions(current_user):
     """Get active sessions for user"""
     from app.models import UserSession
@@ -419,7 +392,7 @@ def get_sessions(current_user):
     return jsonify(results)
 
 @user_bp.route('/sessions/<session_id>', methods=['DELETE'])
-@token_required
+@user_required
 def revoke_session(current_user, session_id):
     """Revoke a specific session"""
     from app.models import UserSession
@@ -0,0 +1,148 @@
+"""
+Serialization helpers for Document.to_dict()
+
+Reading self.user_id.id through a ReferenceField fetches the whole
+referenced document just to hand back its id: one query per reference per
+row, so list endpoints go N+1. to_dict() methods read the stored id instead
+(ref_id / ref_ids), which never dereferences.
+
+When a response genuinely needs fields of the referenced documents (an
+owner's name, say), prefetch() loads them for the whole result set with one
+$in query, projected to the fields the response uses.
+
+List endpoints can skip Documents altogether: a model declares LEAN_VIEWS,
+an allowlist of output keys per endpoint view, and lean() runs a queryset
+with only() + as_pymongo() for exactly those fields, wrapping each raw
+document in a __slots__ record whose to_dict() matches the Document's.
+No field validation, no Document construction, no unused fields.
+"""
+from mongoengine.fields import DateTimeField, FloatField, ListField, DictField, ReferenceField, ObjectIdField
+
+
+def _raw_id(value):
+    # Stored value is a DBRef/ObjectId, or the Document once dereferenced/assigned
+    return getattr(value, 'id', value)
+
+
+def ref_id(document, field):
+    """str id held by a ReferenceField, without dereferencing (None when unset)"""
+    value = document._data.get(field)
+    if value is None:
+        return None
+    return str(_raw_id(value))
+
+
+def ref_ids(document, field):
+    """str ids held by a ListField(ReferenceField), without dereferencing"""
+    return [str(_raw_id(value)) for value in document._data.get(field) or []]
+
+
+def prefetch(documents, field, model, only=None):
+    """
+    Load the documents referenced by `field` across `documents` in one query
+
+    Args:
+        documents: Loaded documents (a list; querysets are consumed)
+        field: ReferenceField name on those documents
+        model: Referenced Document class
+        only: Optional field names to project
+
+    Returns:
+        Dict of ObjectId -> referenced document (dangling references are absent)
+    """
+    ids = {_raw_id(doc._data.get(field)) for doc in documents if doc._data.get(field) is not None}
+    if not ids:
+        return {}
+    queryset = model.objects(id__in=list(ids))
+    if only:
+        queryset = queryset.only(*only)
+    return {doc.id: doc for doc in queryset}
+
+
+def prefetched(document, field, loaded):
+    """The prefetched document for document.<field>, or None"""
+    value = document._data.get(field)
+    return loaded.get(_raw_id(value)) if value is not None else None
+
+
+class LeanRecord:
+    """
+    Read-only row built from a projected raw document
+
+    Attributes are the model's field names (plus id) holding the stored
+    values; to_dict() applies the view's output keys and formatting.
+    Subclasses are generated per (model, view) by record_class().
+    """
+    __slots__ = ()
+    _columns = ()  # (output key, attribute, db key, formatter, default)
+
+    def __init__(self, son):
+        for _, attribute, db_key, _, default in self._columns:
+            value = son.get(db_key)
+            setattr(self, attribute, default() if value is None and default else value)
+
+    def to_dict(self):
+        return {
+            key: formatter(getattr(self, attribute)) if formatter else getattr(self, attribute)
+            for key, attribute, _, formatter, _ in self._columns
+        }
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _str_id(value):
+    return str(_raw_id(value)) if value is not None else None
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def _column(model, entry):
+    key, attribute = entry if isinstance(entry, tuple) else (entry, entry)
+    if attribute == 'id':
+        return key, 'id', '_id', _str_id, None
+    field = model._fields[attribute]
+    formatter = default = None
+    if isinstance(field, DateTimeField):
+        formatter = _iso
+    elif isinstance(field, (ReferenceField, ObjectIdField)):
+        formatter = _str_id
+    elif isinstance(field, FloatField):
+        formatter = _float
+    if isinstance(field, (ListField, DictField)):
+        default = list if isinstance(field, ListField) else dict
+    elif field.default is not None and not callable(field.default):
+        default = (lambda constant: lambda: constant)(field.default)
+    return key, attribute, field.db_field, formatter, default
+
+
+_record_classes = {}
+
+
+def record_class(model, view='list'):
+    """The LeanRecord subclass for model.LEAN_VIEWS[view] (built once)"""
+    cls = _record_classes.get((model, view))
+    if cls is None:
+        columns = tuple(_column(model, entry) for entry in model.LEAN_VIEWS[view])
+        cls = type(f'{model.__name__}Record', (LeanRecord,), {
+            '__slots__': tuple(dict.fromkeys(column[1] for column in columns)),
+            '_columns': columns
+        })
+        _record_classes[(model, view)] = cls
+    return cls
+
+
+def lean(queryset, view='list'):
+    """
+    Run a queryset projected to one of its model's LEAN_VIEWS
+
+    Returns:
+        List of LeanRecord rows (filters, ordering, skip and limit of the
+        queryset are kept)
+    """
+    cls = record_class(queryset._document, view)
+    fields = [attribute for attribute in cls.__slots__ if attribute != 'id']
+    return [cls(son) for son in queryset.only(*fields).as_pymongo()]
@@ -2,9 +2,69 @@
 """
 Accountability Service (Feature 13)
 Social Logic: Invites, Pods, Nudges.
+
+Pod views are cached per pod owner for POD_CACHE_TTL_SECONDS, and are
+dropped whenever one of the owner's partner links is saved or deleted.
 """
+import time
+import threading
+from collections import OrderedDict
+from bson import ObjectId
+from mongoengine import signals
 from app.models import User, AccountabilityPartner, DailyTask, Notification, Commitment
-from datetime import datetime
+from datetime import datetime, timedelta
+
+STREAK_LOOKBACK_DAYS = 90
+
+
+class PodCache:
+    """Thread-safe per-owner LRU of pod views with TTL"""
+
+    def __init__(self, ttl_seconds=30, max_size=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # owner id str -> (pod_data, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            pod_data, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return pod_data
+
+    def set(self, user_id, pod_data):
+        if self.ttl_seconds <= 0:
+            return
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (pod_data, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+pod_cache = PodCache()
+
+
+def configure_accountability(app):
+    """Size the pod cache from app config (called from create_app)"""
+    pod_cache.ttl_seconds = app.config.get('POD_CACHE_TTL_SECONDS', pod_cache.ttl_seconds)
+
 
 class AccountabilityService:
     
@@ -87,47 +147,97 @@ class AccountabilityService:
         return "Pod joined."
 
     @staticmethod
-    def get_pod(user_id):
-        # Get active partners
-        partners = AccountabilityPartner.objects(
-            user_id=user_id,
-            status='active'
+    def get_pod(user_id, now=None):
+        """
+        Active partners with level, XP, tasks completed today and current
+        streak. Served from the per-pod cache when fresh; otherwise built
+        with one partner $lookup and one DailyTask $group, whatever the
+        pod size.
+        """
+        cached = pod_cache.get(user_id)
+        if cached is not None:
+            return [dict(p) for p in cached]
+
+        pod_data = AccountabilityService._build_pod(user_id, now or datetime.utcnow())
+        pod_cache.set(user_id, pod_data)
+        return [dict(p) for p in pod_data]
+
+    @staticmethod
+    def _build_pod(user_id, now):
+        owner = user_id if isinstance(user_id, ObjectId) else ObjectId(str(getattr(user_id, 'id', user_id)))
+
+        # Get active partners, joined to their user documents in one query
+        partners = list(AccountabilityPartner.objects(
+            user_id=owner,
+            status='active',
+            partner_user_id__ne=None
+        ).aggregate([
+            {'$lookup': {'from': User._get_collection_name(), 'localField': 'partner_user_id',
+                         'foreignField': '_id', 'as': 'partner'}},
+            {'$unwind': '$partner'},
+            {'$project': {'partner._id': 1, 'partner.name': 1, 'partner.email': 1,
+                          'partner.level': 1, 'partner.xp_total': 1}}
+        ]))
+        if not partners:
+            return []
+
+        active_days = AccountabilityService._active_days(
+            [p['partner']['_id'] for p in partners], now
         )
-        
+        today = now.date().isoformat()
+
         pod_data = []
-        now = datetime.utcnow()
-        today_start = now.replace(hour=0, minute=0, second=0)
-        
         for p in partners:
-            if not p.partner_user_id: continue
-            
-            u = p.partner_user_id
-            # Calculate stats
-            tasks_today = DailyTask.objects(
-                user_id=u.id, 
-                status='completed',
-                completed_at__gte=today_start
-            ).count()
-            
-            # Simple streak lookup (assuming we store it on User or calculate)
-            # User model doesn't explicitly have streak field in previous version? 
-            # Checked models.py: User has `xp_total`, `level`. Commitment has `current_streak`.
-            # We'll sum active commitment streaks or use a generic one if implemented. 
-            # For MVP, let's use DailyTask data to estimate or just show XP Level.
-            streak = 0 # Placeholder
-            
+            u = p['partner']
+            days = active_days.get(u['_id'], {})
             pod_data.append({
-                'id': str(u.id),
-                'name': u.name,
-                'email': u.email,
-                'level': u.level,
-                'xp': u.xp_total,
-                'tasks_today': tasks_today,
+                'id': str(u['_id']),
+                'name': u.get('name'),
+                'email': u.get('email'),
+                'level': u.get('level', 1),
+                'xp': u.get('xp_total', 0),
+                'tasks_today': days.get(today, 0),
+                'streak': AccountabilityService._current_streak(days, now.date()),
                 'status': 'online' # Placeholder
             })
-            
         return pod_data
 
+    @staticmethod
+    def _active_days(partner_ids, now):
+        """{partner ObjectId: {'YYYY-MM-DD': completed task count}} over the streak window"""
+        window_start = (now - timedelta(days=STREAK_LOOKBACK_DAYS)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        rows = DailyTask.objects(
+            user_id__in=partner_ids,
+            status='completed',
+            completed_at__gte=window_start
+        ).aggregate([{'$group': {
+            '_id': {
+                'user': '$user_id',
+                'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$completed_at'}}
+            },
+            'count': {'$sum': 1}
+        }}])
+
+        active_days = {}
+        for row in rows:
+            active_days.setdefault(row['_id']['user'], {})[row['_id']['day']] = row['count']
+        return active_days
+
+    @staticmethod
+    def _current_streak(days, today):
+        """
+        Consecutive days with a completed task, ending today - or yesterday,
+        since today isn't over yet. Capped at the lookback window.
+        """
+        day = today if today.isoformat() in days else today - timedelta(days=1)
+        streak = 0
+        while day.isoformat() in days:
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
     @staticmethod
     def nudge_partner(sender_id, partner_id):
         sender = User.objects.get(id=sender_id)
@@ -140,3 +250,14 @@ class AccountabilityService:
             notification_type="warning"
         ).save()
         return True
+
+
+def _invalidate_pod(sender, document, **kwargs):
+    ref = document._data.get('user_id')
+    owner = getattr(ref, 'id', ref)
+    if owner is not None:
+        pod_cache.invalidate(owner)
+
+
+signals.post_save.connect(_invalidate_pod, sender=AccountabilityPartner)
+signals.post_delete.connect(_invalidate_pod, sender=AccountabilityPartner)
@@ -3,6 +3,7 @@ Achievement service for SmartEducation gamification
 """
 from app.models import User, Achievement, UserAchievement, Activity
 from app.services.activity_service import ActivityService
+from app.services.gamification_service import GamificationService
 import json
 
 class AchievementService:
@@ -27,16 +28,10 @@ class AchievementService:
         if not achievement:
             return False
             
-        # Award XP
-        user.xp_total += achievement.xp_reward
-        
-        # Check for Level Up
-        next_level_xp = user.level * 1000
-        if user.xp_total >= next_level_xp:
-            user.level += 1
-            ActivityService.log_activity(user.id, 'level_up', f'User reached level {user.level}')
-            
-        user.save()
+        # Award XP (atomic $inc + ledger; level follows the gamification curve)
+        result = GamificationService.award_xp(user.id, achievement.xp_reward, f"Achievement: {achievement_code}")
+        if result.get('leveled_up'):
+            ActivityService.log_activity(user.id, 'level_up', f"User reached level {result['new_level']}")
         
         # Record Achievement
         ua = UserAchievement(user_id=user, achievement_code=achievement_code)
@@ -1,6 +1,7 @@
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from .runtime import metadata_cache
 
 class BaseAdapter(ABC):
     """
@@ -14,6 +15,9 @@ class BaseAdapter(ABC):
         """Name of the platform (e.g., 'youtube', 'coursera')"""
         pass
         
+    # Hostnames this adapter serves, without 'www.' (AdapterFactory dispatch table)
+    hosts: Tuple[str, ...] = ()
+        
     @abstractmethod
     def validate_url(self, url: str) -> bool:
         """Check if the URL belongs to this platform"""
@@ -40,3 +44,15 @@ class BaseAdapter(ABC):
             - platform_metadata (raw dict)
         """
         pass
+
+    def canonical_id(self, url: str) -> Optional[str]:
+        """Cache key shared by every URL form of the same content"""
+        content_id = self.extract_id(url)
+        return f"{self.platform_name}:{content_id}" if content_id else None
+
+    def get_metadata(self, url: str) -> Dict[str, Any]:
+        """fetch_metadata through the shared cache (single flight per content id)"""
+        key = self.canonical_id(url)
+        if key is None:
+            return self.fetch_metadata(url)
+        return metadata_cache.get_or_fetch(key, lambda: self.fetch_metadata(url))
@@ -1,29 +1,45 @@
 
 from typing import Optional
+from urllib.parse import urlsplit
 from .base import BaseAdapter
 from .youtube import YouTubeAdapter
 
 class AdapterFactory:
     """
     Factory to get the correct adapter for a given URL or Source Type
+    
+    URLs are dispatched by hostname through a table built from each
+    adapter's `hosts`, so only the matching adapter's pattern is tried.
     """
     
     _adapters = [
         YouTubeAdapter()
     ]
+    _by_host = {host: adapter for adapter in _adapters for host in adapter.hosts}
+    _by_type = {adapter.platform_name: adapter for adapter in _adapters}
+    
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Lower-cased hostname without port or a leading www./m."""
+        if '://' not in url:
+            url = 'https://' + url
+        host = (urlsplit(url.strip()).hostname or '').lower()
+        for prefix in ('www.', 'm.'):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        return host
     
     @staticmethod
     def get_adapter(url: str) -> Optional[BaseAdapter]:
         """Auto-detect adapter from URL"""
-        for adapter in AdapterFactory._adapters:
-            if adapter.validate_url(url):
-                return adapter
+        if not url:
+            return None
+        adapter = AdapterFactory._by_host.get(AdapterFactory.host_of(url))
+        if adapter and adapter.validate_url(url):
+            return adapter
         return None
         
     @staticmethod
     def get_adapter_by_type(source_type: str) -> Optional[BaseAdapter]:
         """Get adapter by explicit type name"""
-        for adapter in AdapterFactory._adapters:
-            if adapter.platform_name == source_type:
-                return adapter
-        return None
+        return AdapterFactory._by_type.get(source_type)
@@ -0,0 +1,170 @@
+"""
+Adapter runtime
+Shared plumbing for content adapters so metadata lookups stay cheap once
+real platform APIs are involved:
+
+- http_session(): one pooled requests.Session (keep-alive, retries on
+  connect errors / 5xx) shared by every adapter in the process.
+- metadata_cache: TTL + LRU cache keyed by canonical content id (e.g.
+  'youtube:dQw4w9WgXcQ'), with single-flight fetches so concurrent
+  enrichments of the same video make one upstream call.
+
+configure_adapters(app) applies the ADAPTER_* settings (called from
+create_app).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT_SECONDS = 10
+
+
+class MetadataCache:
+    """Thread-safe TTL/LRU cache of adapter metadata with single-flight fetches"""
+
+    def __init__(self, ttl_seconds=3600, max_size=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # canonical id -> (metadata, stored_at)
+        self._inflight = {}  # canonical id -> _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        metadata, stored_at = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return metadata
+
+    def set(self, key, metadata):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (metadata, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Cached metadata for key, calling fetch() at most once across
+        concurrent callers on a miss. Failures are not cached.
+
+        Returns:
+            A copy of the metadata dict (callers may mutate it)
+        """
+        with self._lock:
+            cached = self._get_locked(key)
+            if cached is not None:
+                self.hits += 1
+                return copy.deepcopy(cached)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fetch()
+            self.set(key, flight.result)
+            return copy.deepcopy(flight.result)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+metadata_cache = MetadataCache()
+
+_session = None
+_session_lock = threading.Lock()
+_pool_size = 20
+timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+
+
+def http_session():
+    """The process-wide pooled HTTP session for adapter API calls"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                retries = Retry(total=2, connect=2, backoff_factor=0.2,
+                                status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+                pooled = HTTPAdapter(pool_connections=_pool_size, pool_maxsize=_pool_size, max_retries=retries)
+                session.mount('https://', pooled)
+                session.mount('http://', pooled)
+                _session = session
+    return _session
+
+
+def reset_http_session():
+    """Drop the shared session (e.g. after a pool size change)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def configure_adapters(app):
+    """Size the metadata cache and HTTP pool from app config (called from create_app)"""
+    global _pool_size, timeout_seconds
+    metadata_cache.ttl_seconds = app.config.get('ADAPTER_CACHE_TTL_SECONDS', metadata_cache.ttl_seconds)
+    metadata_cache.max_size = app.config.get('ADAPTER_CACHE_SIZE', metadata_cache.max_size)
+    timeout_seconds = app.config.get('ADAPTER_HTTP_TIMEOUT_SECONDS', timeout_seconds)
+    pool_size = app.config.get('ADAPTER_HTTP_POOL_SIZE', _pool_size)
+    if pool_size != _pool_size:
+        _pool_size = pool_size
+        reset_http_session()
@@ -1,37 +1,50 @@
-
 import re
-import requests
 from typing import Dict, Any, Optional
 from datetime import datetime
+from flask import current_app, has_app_context
 from .base import BaseAdapter
+from . import runtime
 from app.constants import YOUTUBE_THUMBNAIL_URL_TEMPLATE
 
+YOUTUBE_API_URL = 'https://www.googleapis.com/youtube/v3'
+
+# Compiled once; previously rebuilt on every validate/extract call
+YOUTUBE_URL_PATTERN = re.compile(
+    r'(https?://)?(www\.|m\.)?'
+    r'(youtube|youtu|youtube-nocookie)\.(com|be)/'
+    r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
+)
+ISO_DURATION_PATTERN = re.compile(r'P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+
+
+def iso_duration_minutes(value: str) -> int:
+    """'PT1H2M30S' -> 63 (partial minutes round up)"""
+    match = ISO_DURATION_PATTERN.fullmatch(value or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    total_seconds = ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+    return -(-total_seconds // 60)
+
+
 class YouTubeAdapter(BaseAdapter):
     """
     Adapter for YouTube Content.
     """
     
+    hosts = ('youtube.com', 'youtu.be', 'youtube-nocookie.com')
+    
     @property
     def platform_name(self) -> str:
         return 'youtube'
         
     def validate_url(self, url: str) -> bool:
         """Check if URL is a valid YouTube URL"""
-        youtube_regex = (
-            r'(https?://)?(www\.)?'
-            r'(youtube|youtu|youtube-nocookie)\.(com|be)/'
-            r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
-        )
-        return bool(re.match(youtube_regex, url))
+        return bool(YOUTUBE_URL_PATTERN.match(url))
         
     def extract_id(self, url: str) -> Optional[str]:
         """Extract Video ID"""
-        youtube_regex = (
-            r'(https?://)?(www\.)?'
-            r'(youtube|youtu|youtube-nocookie)\.(com|be)/'
-            r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
-        )
-        match = re.match(youtube_regex, url)
+        match = YOUTUBE_URL_PATTERN.match(url)
         if match:
             return match.group(6)
         return None
@@ -40,16 +53,19 @@ class YouTubeAdapter(BaseAdapter):
         """
         Fetch metadata from YouTube.
         
-        NOTE: For MVP/Test, if no API Key is present, we return 
+        Calls the YouTube Data API over the shared pooled session when
+        YOUTUBE_API_KEY is configured. Without a key (MVP/Test) we return
         simulated metadata to avoid blocking development.
         """
         video_id = self.extract_id(url)
         if not video_id:
             raise ValueError("Invalid YouTube URL")
-            
-        # In a real FAANG production system, we would call the YouTube Data API here.
-        # For this implementation, we check for an API key, else fallback to "Smart Mock".
         
+        config = current_app.config if has_app_context() else {}
+        api_key = config.get('YOUTUBE_API_KEY')
+        if api_key:
+            return self._fetch_from_api(video_id, api_key, config.get('YOUTUBE_API_URL') or YOUTUBE_API_URL)
+            
         # Simulated "Smart Mock" Response
         return {
             'title': f"YouTube Video ({video_id})",
@@ -64,3 +80,32 @@ class YouTubeAdapter(BaseAdapter):
                 'is_simulated': True
             }
         }
+    
+    def _fetch_from_api(self, video_id: str, api_key: str, api_url: str) -> Dict[str, Any]:
+        response = runtime.http_session().get(
+            f"{api_url.rstrip('/')}/videos",
+            params={'part': 'snippet,contentDetails,statistics', 'id': video_id, 'key': api_key},
+            timeout=runtime.timeout_seconds
+        )
+        response.raise_for_status()
+        items = response.json().get('items') or []
+        if not items:
+            raise ValueError(f"YouTube video not found: {video_id}")
+        
+        video = items[0]
+        snippet = video.get('snippet', {})
+        thumbnails = snippet.get('thumbnails', {})
+        thumbnail = (thumbnails.get('high') or thumbnails.get('default') or {}).get('url')
+        return {
+            'title': snippet.get('title') or f"YouTube Video ({video_id})",
+            'description': snippet.get('description', ''),
+            'duration_minutes': iso_duration_minutes(video.get('contentDetails', {}).get('duration')),
+            'thumbnail_url': thumbnail or YOUTUBE_THUMBNAIL_URL_TEMPLATE.format(video_id=video_id),
+            'author': snippet.get('channelTitle', ''),
+            'published_at': snippet.get('publishedAt'),
+            'platform_metadata': {
+                'video_id': video_id,
+                'view_count': int(video.get('statistics', {}).get('viewCount', 0)),
+                'is_simulated': False
+            }
+        }
@@ -4,6 +4,8 @@ Advanced Pod Sharing Features - Group Sharing & Activity Feed
 from app.models import User
 from app.pod_models import SharedContent, PodMessage
 from app.services.pod_sharing_service import PodSharingService
+from app.serialization import ref_id
+from bson import ObjectId
 from datetime import datetime, timedelta
 
 
@@ -78,33 +80,39 @@ class AdvancedPodFeatures:
         
         activities = []
         
+        # Partner names in one projected query instead of a fetch per row
+        partner_oids = [ObjectId(pid) for pid in partner_ids]
+        names = {str(u.id): u.name for u in User.objects(id__in=partner_oids).only('name')}
+        
         # Recent shares
         recent_shares = SharedContent.objects(
-            user_id__in=[User.objects.get(id=pid) for pid in partner_ids]
+            user_id__in=partner_oids
         ).order_by('-created_at').limit(limit)
         
         for share in recent_shares:
+            owner_id = ref_id(share, 'user_id')
             activities.append({
                 'type': 'share',
-                'user_name': share.user_id.name,
-                'user_id': str(share.user_id.id),
+                'user_name': names.get(owner_id),
+                'user_id': owner_id,
                 'content_title': share.content_title,
                 'content_type': share.content_type,
                 'timestamp': share.created_at.isoformat(),
-                'message': f"{share.user_id.name} shared {share.content_title}"
+                'message': f"{names.get(owner_id)} shared {share.content_title}"
             })
         
         # Recent messages
         recent_messages = PodMessage.objects(
-            sender_id__in=[User.objects.get(id=pid) for pid in partner_ids],
-            receiver_id=User.objects.get(id=user_id)
+            sender_id__in=partner_oids,
+            receiver_id=ObjectId(str(user_id))
         ).order_by('-created_at').limit(10)
         
         for msg in recent_messages:
+            sender_id = ref_id(msg, 'sender_id')
             activities.append({
                 'type': 'message',
-                'user_name': msg.sender_id.name,
-                'user_id': str(msg.sender_id.id),
+                'user_name': names.get(sender_id),
+                'user_id': sender_id,
                 'message': msg.message[:50] + '...' if len(msg.message) > 50 else msg.message,
                 'timestamp': msg.created_at.isoformat()
             })
@@ -171,26 +179,7 @@ class AdvancedPodFeatures:
     def get_pod_leaderboard(user_id):
         """
         Get leaderboard of pod partners based on XP
+        Served from the shared XP rankings (LeaderboardService)
         """
-        from app.services.accountability_service import AccountabilityService
-        
-        partners = AccountabilityService.get_pod(user_id)
-        
-        # Add current user
-        user = User.objects.get(id=user_id)
-        partners.append({
-            'id': str(user.id),
-            'name': user.name + ' (You)',
-            'level': user.level,
-            'xp': user.xp_total,
-            'tasks_today': 0  # Would calculate from DailyTask
-        })
-        
-        # Sort by XP
-        leaderboard = sorted(partners, key=lambda x: x['xp'], reverse=True)
-        
-        # Add rank
-        for i, partner in enumerate(leaderboard):
-            partner['rank'] = i + 1
-        
-        return leaderboard
+        from app.services.leaderboard_service import LeaderboardService
+        return LeaderboardService.pod_leaderboard(user_id)
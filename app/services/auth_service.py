@@ -7,6 +7,7 @@ from flask import current_app
 from mongoengine.queryset.visitor import Q
 from app.models import User, UserSession
 from app.services.otp_service import OTPService
+from app.jobs import enqueue, deliver_email_otp, deliver_sms_otp, deliver_login_alert
 
 class AuthService:
     """Service for authentication operations"""
@@ -43,9 +44,9 @@ class AuthService:
              raise ValueError("Failed to generate OTP")
         
         if otp_type == 'email':
-            OTPService.send_email_otp(contact, otp.otp_code, purpose)
+            enqueue(deliver_email_otp, contact, otp.otp_code, purpose)
         else:
-            OTPService.send_sms_otp(contact, otp.otp_code, purpose)
+            enqueue(deliver_sms_otp, contact, otp.otp_code, purpose)
             
         return temp_user_id
         
@@ -155,10 +156,10 @@ class AuthService:
         
         # Generate and send OTPs
         email_otp = OTPService.create_otp(str(user.id), 'email', 'registration')
-        OTPService.send_email_otp(email, email_otp.otp_code, 'registration')
+        enqueue(deliver_email_otp, email, email_otp.otp_code, 'registration')
             
         mobile_otp = OTPService.create_otp(str(user.id), 'mobile', 'registration')
-        OTPService.send_sms_otp(mobile, mobile_otp.otp_code, 'registration')
+        enqueue(deliver_sms_otp, mobile, mobile_otp.otp_code, 'registration')
             
         # Return user object (TempUser adapter not needed anymore as User is real)
         return user, "Please verify OTPs."
@@ -244,7 +245,7 @@ class AuthService:
         if getattr(user, 'is_2fa_enabled', False):
             # Send Login OTP
             otp = OTPService.create_otp(str(user.id), 'email', 'login_2fa')
-            OTPService.send_email_otp(user.email, otp.otp_code, 'login verification')
+            enqueue(deliver_email_otp, user.email, otp.otp_code, 'login verification')
             
             return {
                 'error_code': '2FA_REQUIRED',
@@ -254,8 +255,9 @@ class AuthService:
 
         # ENFORCEMENT 2: Login Alerts
         if getattr(user, 'login_alerts_enabled', False):
-            # Send alert asynchronously (or sync for now since simple)
-            OTPService.send_email_login_alert(
+            # Send alert asynchronously
+            enqueue(
+                deliver_login_alert,
                 user.email,
                 device_info or "Unknown Device",
                 ip_address or "Unknown IP",
@@ -317,12 +319,12 @@ class AuthService:
         
         if user.is_email_verified or user.is_verified: # Backward compat
              email_otp = OTPService.create_otp(str(user.id), 'email', 'reset')
-             OTPService.send_email_otp(user.email, email_otp.otp_code, 'password reset')
+             enqueue(deliver_email_otp, user.email, email_otp.otp_code, 'password reset')
              sent_any = True
              
         if user.is_mobile_verified or user.is_verified:
              mobile_otp = OTPService.create_otp(str(user.id), 'mobile', 'reset')
-             OTPService.send_sms_otp(user.mobile, mobile_otp.otp_code, 'password reset')
+             enqueue(deliver_sms_otp, user.mobile, mobile_otp.otp_code, 'password reset')
              sent_any = True
              
         if not sent_any:
@@ -376,9 +378,9 @@ class AuthService:
         
         # Send OTP
         if otp_type == 'email':
-            OTPService.send_email_otp(user.email, otp.otp_code, purpose)
+            enqueue(deliver_email_otp, user.email, otp.otp_code, purpose)
         else:
-            OTPService.send_sms_otp(user.mobile, otp.otp_code, purpose)
+            enqueue(deliver_sms_otp, user.mobile, otp.otp_code, purpose)
         
         return True, f"OTP resent to {otp_type}"
     
@@ -397,11 +399,9 @@ class AuthService:
     @staticmethod
     def verify_token(token):
         """Verify JWT token and return user_id"""
-        try:
-            payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            return payload['user_id']
-        except Exception:
-            return None
+        from app.auth import decode_token
+        payload = decode_token(token)
+        return payload.get('user_id') if payload else None
 
     @staticmethod
     def verify_2fa_and_login(user_id, otp_code, device_info=None, ip_address=None):
@@ -418,7 +418,8 @@ class AuthService:
              
         # ENFORCEMENT 2: Login Alerts (Triggered here for 2FA users)
         if getattr(user, 'login_alerts_enabled', False):
-            OTPService.send_email_login_alert(
+            enqueue(
+                deliver_login_alert,
                 user.email,
                 device_info or "Unknown Device",
                 ip_address or "Unknown IP",
@@ -451,10 +452,8 @@ class AuthService:
     @staticmethod
     def get_token_payload(token):
         """Verify token and return full payload"""
-        try:
-            return jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-        except Exception:
-            return None
+        from app.auth import decode_token
+        return decode_token(token)
 
 class TempUser:
     """Temporary user object for registration flow"""
@@ -3,12 +3,20 @@ Bookmark service for managing and filtering educational resources
 """
 import re
 import json
+from bson import ObjectId
 from app.models import Bookmark, User
+from app import serialization
+from app.pagination import keyset_page, count_cache
+from app.services.search_index import search_index_cache
+from app.services.gamification_service import GamificationService
 from datetime import datetime
 
 class BookmarkService:
     """Service for bookmark management and AI-driven filtering"""
 
+    # Keyset order; matches the (user_id, -relevance_score, -_id) index
+    ORDER = ('-relevance_score', '-id')
+
     @staticmethod
     def classify_url(url, title, description):
         """
@@ -98,22 +106,46 @@ class BookmarkService:
             bookmark.save()
 
             # 6. Reward user XP
-            user.xp_total += 10
-            user.save()
+            GamificationService.award_xp(user.id, 10, "Bookmark")
 
             return bookmark, "Bookmark added successfully"
         except Exception as e:
             return None, str(e)
 
     @staticmethod
-    def get_bookmarks(user_email, page=1, per_page=20):
-        """Fetch paginated bookmarks for a user by email"""
-        user = User.objects(email=user_email).first()
-        if not user:
-            return [], 0
-            
-        query = Bookmark.objects(user_id=user.id).order_by('-relevance_score', '-created_at')
-        total = query.count()
-        items = query.skip((page - 1) * per_page).limit(per_page)
-            
-        return list(items), total
+    def delete_bookmark(bookmark):
+        """Delete a bookmark and drop the owner's cached search index and totals"""
+        owner = serialization.ref_id(bookmark, 'user_id')
+        bookmark.delete()
+        search_index_cache.invalidate_user(owner)
+        count_cache.invalidate(owner)
+
+    @staticmethod
+    def get_bookmarks(user, page=1, per_page=20, lean=False, cursor=None):
+        """
+        Fetch bookmarks for a user, best first (LeanRecord rows when lean)
+
+        Page 1 and cursor requests are keyset pages (next_cursor continues
+        the listing); later page numbers fall back to skip. The total comes
+        from the per-user count cache.
+
+        Args:
+            user: User, user id, or (legacy) the user's email
+        """
+        if isinstance(user, str) and '@' in user:
+            user = User.objects(email=user).only('id').first()
+            if not user:
+                return [], 0
+        user_id = getattr(user, 'id', user)
+        if isinstance(user_id, str):
+            user_id = ObjectId(user_id)
+
+        query = Bookmark.objects(user_id=user_id)
+        total = count_cache.get_or_count(
+            user_id, 'bookmarks', lambda: Bookmark._get_collection().count_documents({'user_id': user_id})
+        )
+        if cursor or page <= 1:
+            return keyset_page(query, BookmarkService.ORDER, per_page, cursor, 'list' if lean else None), total
+
+        items = query.order_by(*BookmarkService.ORDER).skip((page - 1) * per_page).limit(per_page)
+        return (serialization.lean(items) if lean else list(items)), total
@@ -5,6 +5,7 @@ Automatically breaks down a Learning Item into Daily Tasks based on a Commitment
 """
 from datetime import datetime, timedelta
 from app.models import DailyTask, Commitment, LearningItem
+from app.services.search_index import search_index_cache
 
 class AutoBreakdownService:
     @staticmethod
@@ -24,6 +25,9 @@ class AutoBreakdownService:
             scheduled_date__gte=today,
             status='pending'
         ).delete()
+        from app.services.dashboard_service import focus_cache
+        focus_cache.invalidate(user.id)
+        search_index_cache.invalidate_user(user.id)
         
         # 2. Planning Parameters
         start_date = today
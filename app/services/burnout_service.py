@@ -4,7 +4,7 @@ Burnout Service (Feature 8)
 Detects overwork patterns to prevent user exhaustion.
 """
 from datetime import datetime, timedelta
-from app.models import DailyTask
+from app.services.stats_service import StatsService
 
 class BurnoutService:
     
@@ -22,60 +22,17 @@ class BurnoutService:
         today = datetime.utcnow().date()
         start_date = today - timedelta(days=21) # Look back 3 weeks max
         
-        # valid_tasks = DailyTask.objects(
-        #     user_id=user_id,
-        #     completed_at__gte=start_date
-        # )
+        # 1. Daily minutes from the DailyStat rollup (22 small docs)
+        rollup = StatsService.get_daily_rollup(user_id, start_date, today)
+        daily_minutes = [rollup[d]['task_minutes'] for d in sorted(rollup)]
         
-        # But for efficiency, let's aggregate manually or via pipeline if needed.
-        # Simple iteration for MVP is fine given user scale.
-        tasks = DailyTask.objects(
-             user_id=user_id,
-             completed_at__gte=start_date
-        )
-        
-        # 1. Aggregate Daily Minutes
-        daily_minutes = {}
-        # Pre-fill last 21 days with 0
-        for i in range(22):
-            d = (start_date + timedelta(days=i)).isoformat()
-            daily_minutes[d] = 0
-            
-        for t in tasks:
-            if t.completed_at:
-                d = t.completed_at.date().isoformat()
-                if d in daily_minutes:
-                    daily_minutes[d] += t.actual_duration_minutes
-                    
         # 2. Check for Consecutive High Intensity
-        consecutive_high = 0
-        max_consecutive_high = 0
-        
-        # Sort dates
-        sorted_dates = sorted(daily_minutes.keys())
-        # We only care about up to yesterday/today
-        
-        for d in sorted_dates:
-            mins = daily_minutes[d]
-            if mins >= BurnoutService.HIGH_INTENSITY_MINUTES:
-                consecutive_high += 1
-            else:
-                max_consecutive_high = max(max_consecutive_high, consecutive_high)
-                consecutive_high = 0
-        max_consecutive_high = max(max_consecutive_high, consecutive_high)
-        
-        # 3. Check for No Rest (Days with > 0 minutes)
-        consecutive_active = 0
-        max_consecutive_active = 0
+        max_consecutive_high = BurnoutService._longest_run(
+            daily_minutes, lambda mins: mins >= BurnoutService.HIGH_INTENSITY_MINUTES
+        )
         
-        for d in sorted_dates:
-            mins = daily_minutes[d]
-            if mins > 15: # Negligible work isn't work
-                consecutive_active += 1
-            else:
-                max_consecutive_active = max(max_consecutive_active, consecutive_active)
-                consecutive_active = 0
-        max_consecutive_active = max(max_consecutive_active, consecutive_active)
+        # 3. Check for No Rest (Negligible work isn't work)
+        max_consecutive_active = BurnoutService._longest_run(daily_minutes, lambda mins: mins > 15)
         
         # 4. Determine Risk
         risk_level = 'none'
@@ -101,3 +58,12 @@ class BurnoutService:
                 'active_streak': max_consecutive_active
             }
         }
+
+    @staticmethod
+    def _longest_run(values, predicate):
+        """Length of the longest run of consecutive values matching predicate"""
+        longest = current = 0
+        for value in values:
+            current = current + 1 if predicate(value) else 0
+            longest = max(longest, current)
+        return longest
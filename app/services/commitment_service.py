@@ -2,10 +2,22 @@
 Commitment Service for Feature 3: Hard Commitment Mode
 Handles commitment lifecycle, violation detection, and consequences
 """
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from app.models import Commitment, CommitmentViolation, LearningItem, User, AccountabilityPartner
+from app.models import (
+    Commitment, CommitmentViolation, LearningItem, User, AccountabilityPartner,
+    Notification, SweepCheckpoint
+)
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 
+SWEEP_BATCH_SIZE = 500
+SWEEP_FIELDS = {
+    'user_id': 1, 'last_check_in': 1, 'created_at': 1,
+    'has_accountability_partner': 1, 'accountability_partner_email': 1
+}
+
 
 class CommitmentService:
     """Service for managing commitments and enforcing discipline"""
@@ -17,6 +29,9 @@ class CommitmentService:
     SEVERITY_COURSE_RESTRICTION = 4
     SEVERITY_PARTNER_NOTIFICATION = 5
     
+    # How long a lockout consequence lasts (is_user_locked_out)
+    CONSEQUENCE_DURATION_HOURS = {'content_lockout_24h': 24, 'course_restriction': 48}
+    
     @staticmethod
     def create_commitment(user_id, learning_item_id, commitment_data):
         """
@@ -32,7 +47,7 @@ class CommitmentService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
             
@@ -167,10 +182,11 @@ class CommitmentService:
         return commitment
     
     @staticmethod
-    def detect_missed_sessions(user_id=None):
+    def detect_missed_sessions(user_id=None, now=None):
         """
-        Detect missed sessions for all active commitments
-        Run as a daily cron job
+        Detect missed sessions for active commitments
+        For the daily fleet-wide cron use sweep_missed_sessions(), which is
+        checkpointed and can run across processes.
         
         Args:
             user_id: Optional user ID to check specific user
@@ -182,84 +198,230 @@ class CommitmentService:
         if user_id:
             try:
                 if isinstance(user_id, str):
-                    user = User.objects.get(id=user_id)
+                    user = load_user(user_id)
                 else:
                     user = user_id
-                query['user_id'] = user
+                query['user_id'] = getattr(user, 'id', user)
             except DoesNotExist:
                 return []
         
-        commitments = Commitment.objects(**query)
+        now = now or datetime.utcnow()
         violations = []
-        
-        for commitment in commitments:
-            # Check if last check-in was yesterday or earlier
-            if commitment.last_check_in:
-                days_since_check_in = (datetime.utcnow() - commitment.last_check_in).days
-                
-                if days_since_check_in >= 1:
-                    # Missed session detected
-                    violation = CommitmentService._handle_missed_session(commitment, days_since_check_in)
-                    if violation:
-                        violations.append(violation)
-            else:
-                # Never checked in - first day grace period
-                days_since_creation = (datetime.utcnow() - commitment.created_at).days
-                if days_since_creation >= 2:
-                    violation = CommitmentService._handle_missed_session(commitment, days_since_creation)
-                    if violation:
-                        violations.append(violation)
-        
+        for batch in CommitmentService._iter_batches(query, SWEEP_BATCH_SIZE):
+            violations.extend(CommitmentService._process_batch(batch, now)['violations'])
         return violations
     
     @staticmethod
-    def _handle_missed_session(commitment, days_missed):
-        """Handle a missed session with appropriate consequences"""
-        # Get violation history
-        recent_violations = CommitmentViolation.objects(
-            commitment_id=commitment,
-            violation_date__gte=datetime.utcnow() - timedelta(days=7)
-        ).count()
+    def sweep_missed_sessions(batch_size=SWEEP_BATCH_SIZE, workers=1, db_host=None, now=None,
+                              user_range=None, checkpoint_name=None):
+        """
+        Daily missed-session sweep over every active commitment
+        
+        Streams commitments in _id order in fixed batches. Each batch costs
+        one violation-history aggregation, one streak-reset update_many and
+        one insert_many each for notifications and violations. Progress is
+        checkpointed after every batch, so a crashed run resumes where it
+        stopped and a finished run is not repeated the same day.
+        
+        Args:
+            batch_size: Commitments per batch
+            workers: Processes to split users across (requires db_host)
+            db_host: MongoDB URI for worker processes
+            user_range: (low, high) user_id bounds for one shard
+            checkpoint_name: Override the checkpoint key (shards)
+            
+        Returns:
+            Summary dict: scanned, violations, notifications, batches,
+            resumed_from and skipped (run already completed)
+        """
+        now = now or datetime.utcnow()
+        run = CommitmentService._sweep_run(now)
+        if workers > 1:
+            return CommitmentService._sweep_parallel(batch_size, workers, db_host, now)
+        
+        name = checkpoint_name or run
+        checkpoint = SweepCheckpoint.objects(name=name).first()
+        summary = {'scanned': 0, 'violations': 0, 'notifications': 0, 'batches': 0,
+                   'resumed_from': None, 'skipped': False}
+        if checkpoint and checkpoint.completed:
+            summary['skipped'] = True
+            return summary
         
-        # Determine severity based on violation history
+        query = {'status': 'active'}
+        if user_range:
+            bounds = {op: value for op, value in zip(('$gte', '$lt'), user_range) if value is not None}
+            if bounds:
+                query['user_id'] = bounds
+        if checkpoint and checkpoint.last_id:
+            query['_id'] = {'$gt': checkpoint.last_id}
+            summary['resumed_from'] = str(checkpoint.last_id)
+        
+        for batch in CommitmentService._iter_batches(query, batch_size):
+            result = CommitmentService._process_batch(batch, now, run)
+            summary['scanned'] += len(batch)
+            summary['violations'] += len(result['violations'])
+            summary['notifications'] += result['notifications']
+            summary['batches'] += 1
+            SweepCheckpoint.objects(name=name).update_one(
+                upsert=True,
+                set__last_id=batch[-1]['_id'],
+                inc__processed=len(batch),
+                inc__violations=len(result['violations']),
+                set__updated_at=datetime.utcnow()
+            )
+        
+        SweepCheckpoint.objects(name=name).update_one(
+            upsert=True, set__completed=True, set__updated_at=datetime.utcnow()
+        )
+        return summary
+    
+    @staticmethod
+    def _sweep_run(now):
+        return f"missed_sessions:{now.date().isoformat()}"
+    
+    @staticmethod
+    def _iter_batches(query, batch_size):
+        """Stream raw commitment docs in _id order, batch_size at a time"""
+        cursor = Commitment._get_collection().find(query, SWEEP_FIELDS).sort('_id', 1).batch_size(batch_size)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def _days_missed(doc, now):
+        """Days missed, or None when the commitment is not in violation"""
+        if doc.get('last_check_in'):
+            days_since_check_in = (now - doc['last_check_in']).days
+            return days_since_check_in if days_since_check_in >= 1 else None
+        # Never checked in - first day grace period
+        days_since_creation = (now - doc['created_at']).days if doc.get('created_at') else 0
+        return days_since_creation if days_since_creation >= 2 else None
+    
+    @staticmethod
+    def _consequence_for(recent_violations):
+        """(severity, consequence, is_grace) from the last 7 days' violation count"""
         if recent_violations == 0:
             # First violation - grace period
-            severity = CommitmentService.SEVERITY_WARNING
-            consequence = 'warning'
-            is_grace = True
-        elif recent_violations == 1:
+            return CommitmentService.SEVERITY_WARNING, 'warning', True
+        if recent_violations == 1:
             # Second violation - streak reset
-            severity = CommitmentService.SEVERITY_STREAK_RESET
-            consequence = 'streak_reset'
-            is_grace = False
-            commitment.current_streak = 0
-            commitment.save()
-        elif recent_violations == 2:
+            return CommitmentService.SEVERITY_STREAK_RESET, 'streak_reset', False
+        if recent_violations == 2:
             # Third violation - 24h content lockout
-            severity = CommitmentService.SEVERITY_CONTENT_LOCKOUT_24H
-            consequence = 'content_lockout_24h'
-            is_grace = False
-        elif recent_violations >= 3:
-            # Multiple violations - notify partner and restrict course
-            severity = CommitmentService.SEVERITY_PARTNER_NOTIFICATION
-            consequence = 'partner_notification'
-            is_grace = False
+            return CommitmentService.SEVERITY_CONTENT_LOCKOUT_24H, 'content_lockout_24h', False
+        # Multiple violations - notify partner
+        return CommitmentService.SEVERITY_PARTNER_NOTIFICATION, 'partner_notification', False
+    
+    @staticmethod
+    def _consequence_duration(consequence):
+        """Lockout hours for a consequence (0 when it locks nothing)"""
+        return CommitmentService.CONSEQUENCE_DURATION_HOURS.get(consequence, 0)
+    
+    @staticmethod
+    def _violation_history(commitment_ids, now, run):
+        """
+        {commitment _id: (violations in last 7 days, already handled by run)}
+        with one aggregation for the whole batch
+        """
+        rows = CommitmentViolation.objects(
+            commitment_id__in=commitment_ids,
+            violation_date__gte=now - timedelta(days=7)
+        ).aggregate([{'$group': {
+            '_id': '$commitment_id',
+            'count': {'$sum': 1},
+            'runs': {'$addToSet': '$violation_metadata.sweep_run'}
+        }}])
+        return {row['_id']: (row['count'], run is not None and run in row['runs']) for row in rows}
+    
+    @staticmethod
+    def _process_batch(batch, now, run=None):
+        """
+        Apply missed-session consequences for one batch of raw commitment docs
+        
+        Returns:
+            {'violations': [CommitmentViolation], 'notifications': int}
+        """
+        missed = [(doc, CommitmentService._days_missed(doc, now)) for doc in batch]
+        missed = [(doc, days) for doc, days in missed if days is not None]
+        if not missed:
+            return {'violations': [], 'notifications': 0}
+        
+        history = CommitmentService._violation_history([doc['_id'] for doc, _ in missed], now, run)
+        
+        violations, streak_resets, partner_alerts = [], [], []
+        for doc, days_missed in missed:
+            recent_violations, already_handled = history.get(doc['_id'], (0, False))
+            if already_handled:
+                continue  # Resumed batch: this run already recorded it
             
-            if commitment.has_accountability_partner:
-                CommitmentService._notify_accountability_partner(commitment)
-        else:
-            severity = CommitmentService.SEVERITY_WARNING
-            consequence = 'warning'
-            is_grace = False
-        
-        return CommitmentService._create_violation(
-            commitment,
-            'missed_session',
-            severity=severity,
-            consequence=consequence,
-            is_grace=is_grace,
-            metadata={'days_missed': days_missed}
-        )
+            severity, consequence, is_grace = CommitmentService._consequence_for(recent_violations)
+            if consequence == 'streak_reset':
+                streak_resets.append(doc['_id'])
+            elif consequence == 'partner_notification' and doc.get('has_accountability_partner'):
+                partner_alerts.append(doc)
+            
+            metadata = {'days_missed': days_missed}
+            if run:
+                metadata['sweep_run'] = run
+            violations.append(CommitmentViolation(
+                commitment_id=doc['_id'],
+                user_id=doc['user_id'],
+                violation_type='missed_session',
+                violation_date=now,
+                severity_level=severity,
+                consequence_applied=consequence,
+                consequence_duration_hours=CommitmentService._consequence_duration(consequence),
+                is_grace_period=is_grace,
+                violation_metadata=metadata
+            ))
+        
+        if streak_resets:
+            Commitment._get_collection().update_many(
+                {'_id': {'$in': streak_resets}}, {'$set': {'current_streak': 0}}
+            )
+        notifications = CommitmentService._notify_accountability_partners(partner_alerts)
+        # Violations last: they mark the batch as handled for a resumed run
+        if violations:
+            CommitmentViolation.objects.insert(violations, load_bulk=False)
+        return {'violations': violations, 'notifications': notifications}
+    
+    @staticmethod
+    def _sweep_parallel(batch_size, workers, db_host, now):
+        """Split users into contiguous user_id ranges and sweep each in its own process"""
+        if not db_host:
+            raise ValueError("db_host is required to sweep with worker processes")
+        
+        # Shard boundaries: the user_id at each 1/workers quantile of active commitments
+        collection = Commitment._get_collection()
+        total = collection.count_documents({'status': 'active'})
+        bounds = []
+        for k in range(1, workers):
+            doc = next(collection.find({'status': 'active'}, {'user_id': 1}).sort('user_id', 1)
+                       .skip(total * k // workers).limit(1), None)
+            if doc and (not bounds or doc['user_id'] > bounds[-1]):
+                bounds.append(doc['user_id'])
+        edges = [None] + bounds + [None]
+        
+        run = CommitmentService._sweep_run(now)
+        shards = [
+            (db_host, batch_size, now, (edges[i], edges[i + 1]), f"{run}:{i + 1}of{len(edges) - 1}")
+            for i in range(len(edges) - 1)
+        ]
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_sweep_shard, shards))
+        
+        summary = {'scanned': 0, 'violations': 0, 'notifications': 0, 'batches': 0,
+                   'resumed_from': None, 'skipped': all(r['skipped'] for r in results)}
+        for result in results:
+            for key in ('scanned', 'violations', 'notifications', 'batches'):
+                summary[key] += result[key]
+        summary['shards'] = results
+        return summary
     
     @staticmethod
     def _create_violation(commitment, violation_type, severity, consequence, is_grace=False, metadata=None):
@@ -270,33 +432,47 @@ class CommitmentService:
             violation_type=violation_type,
             severity_level=severity,
             consequence_applied=consequence,
+            consequence_duration_hours=CommitmentService._consequence_duration(consequence),
             is_grace_period=is_grace,
             violation_metadata=metadata or {}
         )
-        
-        # Set consequence duration
-        if consequence == 'content_lockout_24h':
-            violation.consequence_duration_hours = 24
-        elif consequence == 'course_restriction':
-            violation.consequence_duration_hours = 48
-        
         violation.save()
         return violation
     
     @staticmethod
-    def _notify_accountability_partner(commitment):
-        """Send notification to accountability partner"""
-        # Placeholder - would integrate with email service
-        if commitment.accountability_partner_email:
-            # TODO: Send email notification
-            pass
+    def _notify_accountability_partners(commitment_docs):
+        """
+        In-app notification to each commitment's accountability partner that
+        has an account (one user lookup, one insert_many). Returns the count sent.
+        """
+        emails = {doc['accountability_partner_email'] for doc in commitment_docs
+                  if doc.get('accountability_partner_email')}
+        if not emails:
+            return 0
+        partners = {
+            row['email']: row['_id']
+            for row in User._get_collection().find({'email': {'$in': list(emails)}}, {'email': 1})
+        }
+        notifications = [
+            Notification(
+                user_id=partners[doc['accountability_partner_email']],
+                title="Partner Needs Backup 🤝",
+                message="Someone you hold accountable has missed several study sessions this week. Send them a nudge.",
+                notification_type="warning",
+                action_link="/pods"
+            )
+            for doc in commitment_docs if doc.get('accountability_partner_email') in partners
+        ]
+        if notifications:
+            Notification.objects.insert(notifications, load_bulk=False)
+        return len(notifications)
     
     @staticmethod
     def get_active_commitments(user_id):
         """Get all active commitments for a user"""
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -309,7 +485,7 @@ class CommitmentService:
         """Get recent violations for a user"""
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -326,7 +502,7 @@ class CommitmentService:
         """Check if user is currently locked out from adding content"""
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -377,3 +553,13 @@ class CommitmentService:
         commitment.save()
         
         return commitment
+
+
+def _sweep_shard(args):
+    """Process-pool entry point: sweep one user_id range with its own connection"""
+    from mongoengine import connect
+    db_host, batch_size, now, user_range, checkpoint_name = args
+    connect(host=db_host)
+    return CommitmentService.sweep_missed_sessions(
+        batch_size=batch_size, now=now, user_range=user_range, checkpoint_name=checkpoint_name
+    )
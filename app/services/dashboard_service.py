@@ -0,0 +1,196 @@
+"""
+Dashboard Service (Feature 2 & 4 Integration)
+Builds the single "focus" recommendation for the command center.
+
+The recommendation is materialised per user as a focus snapshot and kept
+in an in-process LRU with TTL, so repeated dashboard polls cost one dict
+lookup. Snapshots are dropped when a DailyTask or LearningItem of the user
+is saved or bulk inserted, when priorities are recalculated, and at the
+UTC day boundary (overdue vs today depends on the date). Deletes
+invalidate at the call site (focus_cache.invalidate) rather than through
+post_delete, which would make QuerySet.delete() loop per document.
+"""
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from mongoengine import signals
+from app.models import DailyTask, LearningItem
+from app.services.priority_service import PriorityService
+
+
+class FocusSnapshotCache:
+    """Thread-safe per-user LRU of focus snapshots with TTL and hit/miss counters"""
+
+    def __init__(self, ttl_seconds=60, max_size=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id str -> (snapshot, day, stored_at)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    def get(self, user_id, day):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                snapshot, snapshot_day, stored_at = entry
+                if snapshot_day == day and time.time() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return snapshot
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, day, snapshot):
+        if not self.enabled:
+            return
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (snapshot, day, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'size': len(self._entries),
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+focus_cache = FocusSnapshotCache()
+
+
+def configure_dashboard(app):
+    """Size the focus cache from app config (called from create_app)"""
+    focus_cache.ttl_seconds = app.config.get('FOCUS_CACHE_TTL_SECONDS', focus_cache.ttl_seconds)
+
+
+class DashboardService:
+
+    @staticmethod
+    def get_focus(user_id, now=None):
+        """
+        Return the user's focus snapshot, served from cache when fresh
+
+        Returns:
+            (snapshot dict, cache_hit bool)
+        """
+        now = now or datetime.utcnow()
+        day = now.date()
+        snapshot = focus_cache.get(user_id, day)
+        if snapshot is not None:
+            return snapshot, True
+
+        snapshot = DashboardService.build_focus_snapshot(user_id, now)
+        focus_cache.set(user_id, day, snapshot)
+        return snapshot, False
+
+    @staticmethod
+    def build_focus_snapshot(user_id, now=None):
+        """
+        GET THE ONE SINGLE FOCUS TASK (Intelligence Engine)
+        Prioritizes:
+        1. Overdue Daily Tasks (from Commitments)
+        2. Today's Daily Tasks (from Commitments)
+        3. Highest Priority Inbox Item (if no daily tasks)
+        """
+        now = now or datetime.utcnow()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        task_fields = ('title', 'scheduled_date', 'estimated_duration_minutes')
+
+        # 1. Check for OVERDUE tasks (Highest Urgency)
+        overdue = DailyTask.objects(
+            user_id=user_id,
+            status='pending',
+            scheduled_date__lt=today
+        ).only(*task_fields).order_by('scheduled_date').first()
+
+        if overdue:
+            return {
+                'type': 'daily_task',
+                'title': overdue.title,
+                'subtitle': f"Overdue from {overdue.scheduled_date.strftime('%b %d')}",
+                'duration': overdue.estimated_duration_minutes,
+                'reason': 'Catch Up (High Priority)',
+                'id': str(overdue.id),
+                'action': 'start_session'
+            }
+
+        # 2. Check for TODAY'S tasks (Commitment)
+        todays_task = DailyTask.objects(
+            user_id=user_id,
+            status='pending',
+            scheduled_date__gte=today,
+            scheduled_date__lt=today + timedelta(days=1)
+        ).only(*task_fields).order_by('-priority_score').first()
+
+        if todays_task:
+            return {
+                'type': 'daily_task',
+                'title': todays_task.title,
+                'subtitle': 'Your Iron Commitment for Today',
+                'duration': todays_task.estimated_duration_minutes,
+                'reason': 'Daily Goal',
+                'id': str(todays_task.id),
+                'action': 'start_session'
+            }
+
+        # 3. Fallback: Top Inbox Item (Smart Priority)
+        item = PriorityService.get_top_priorities(user_id, limit=1).only(
+            'title', 'source_type', 'total_duration'
+        ).first()
+        if item:
+            return {
+                'type': 'learning_item',
+                'title': item.title,
+                'subtitle': f"{item.source_type.title()} • {item.total_duration} mins",
+                'duration': item.total_duration,
+                'reason': 'Smart Recommendation',
+                'id': str(item.id),
+                'action': 'view_item'
+            }
+
+        return {
+            'type': 'empty',
+            'title': 'All Caught Up!',
+            'subtitle': 'Relax or add new content.',
+            'action': 'add_content'
+        }
+
+
+def _invalidate_focus(sender, document, **kwargs):
+    ref = document._data.get('user_id')
+    user_id = getattr(ref, 'id', ref)
+    if user_id is not None:
+        focus_cache.invalidate(user_id)
+
+
+def _invalidate_focus_bulk(sender, documents, **kwargs):
+    for document in documents:
+        _invalidate_focus(sender, document)
+
+
+for _model in (DailyTask, LearningItem):
+    signals.post_save.connect(_invalidate_focus, sender=_model)
+    signals.post_bulk_insert.connect(_invalidate_focus_bulk, sender=_model)
@@ -4,6 +4,7 @@ Handles focus session management and distraction prevention
 """
 from datetime import datetime, timedelta
 from app.models import FocusSession, LearningItem, DailyTask, User
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 
 
@@ -25,7 +26,7 @@ class FocusModeService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
             
@@ -65,7 +66,7 @@ class FocusModeService:
         """Get user's active focus session"""
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -143,7 +144,7 @@ class FocusModeService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
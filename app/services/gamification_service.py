@@ -3,11 +3,28 @@
 Gamification Service (Feature 9)
 Manages the Dopamine Layer: XP, Levels, and Badges.
 Includes Phase 28 Architecture Improvements (Weekly Seasons).
+
+XP is awarded with atomic $inc updates on the user document (never a
+read-modify-write of the whole User), the level is recomputed from the
+returned total and raised with a conditional $set, and every award is
+appended to the XPEvent ledger and the new totals are pushed to the
+leaderboards. Awards stamp xp_updated_at so the in-process leaderboard
+can refresh from just the users whose XP changed. award_xp_batch() does the same for many
+awards with one bulk_write and one insert_many. Weekly seasons are reset
+for everyone with a single update_many at the Monday boundary
+(reset_weekly_season, run by Celery beat); a user whose first award of the
+week lands before that sweep restarts their own bucket atomically.
 """
-from app.models import User
+from app.models import User, XPEvent
+from app.auth import user_cache
+from app.services.leaderboard_service import LeaderboardService
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 import math
 from datetime import datetime, timedelta
 
+XP_FIELDS = {'xp_total': 1, 'weekly_xp': 1, 'level': 1}
+
 class GamificationService:
     
     BASE_XP = 500 # XP required for Level 2 (User starts at Lvl 1 with 0)
@@ -31,25 +48,79 @@ class GamificationService:
         return 500 * ((next_level - 1) ** 2)
     
     @staticmethod
-    def check_and_reset_weekly(user):
+    def season_start(now=None):
+        """Start of the current weekly season (Monday 00:00 UTC)"""
+        now = now or datetime.utcnow()
+        days_since_monday = now.weekday()
+        return (now - timedelta(days=days_since_monday)).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    @staticmethod
+    def reset_weekly_season(now=None):
         """
-        Check if we have crossed into a new week (Monday 00:00 UTC).
-        If so, reset weekly_xp and update reset timestamp.
+        Start a new season: zero weekly_xp for every user not yet reset
+        this week, in one update_many. Returns the number of users reset.
         """
-        now = datetime.utcnow()
-        last_reset = user.last_weekly_reset or user.created_at
-        
-        # Calculate start of current week (Monday)
-        days_since_monday = now.weekday()
-        start_of_week = (now - timedelta(days=days_since_monday)).replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # If last reset was before this week's start, RESET.
-        if last_reset < start_of_week:
-            print(f"Resetting User {user.name} for New Season")
-            user.weekly_xp = 0
-            user.last_weekly_reset = now
-            return True
-        return False
+        now = now or datetime.utcnow()
+        start_of_week = GamificationService.season_start(now)
+        result = User._get_collection().update_many(
+            GamificationService._stale_season(start_of_week),
+            {'$set': {'weekly_xp': 0, 'last_weekly_reset': now}}
+        )
+        user_cache.clear()
+        print(f"Weekly season reset: {result.modified_count} users")
+        return result.modified_count
+
+    @staticmethod
+    def _stale_season(start_of_week):
+        return {'$or': [
+            {'last_weekly_reset': {'$lt': start_of_week}},
+            {'last_weekly_reset': None}
+        ]}
+
+    @staticmethod
+    def _object_id(user_id):
+        user_id = getattr(user_id, 'id', user_id)
+        return user_id if isinstance(user_id, ObjectId) else ObjectId(str(user_id))
+
+    @staticmethod
+    def _apply_xp(user_id, amount, now):
+        """
+        $inc xp_total / weekly_xp and return the updated counters.
+        A user still in last week's season gets weekly_xp set instead, with
+        the stale-season filter keeping the reset atomic under concurrency.
+        """
+        users = User._get_collection()
+        start_of_week = GamificationService.season_start(now)
+        for _ in range(2):
+            doc = users.find_one_and_update(
+                {'_id': user_id, 'last_weekly_reset': {'$gte': start_of_week}},
+                {'$inc': {'xp_total': amount, 'weekly_xp': amount}, '$set': {'xp_updated_at': now}},
+                projection=XP_FIELDS,
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is not None:
+                return doc
+            doc = users.find_one_and_update(
+                dict(GamificationService._stale_season(start_of_week), _id=user_id),
+                {'$inc': {'xp_total': amount}, '$set': {'weekly_xp': amount, 'last_weekly_reset': now, 'xp_updated_at': now}},
+                projection=XP_FIELDS,
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is not None:
+                return doc
+        raise User.DoesNotExist(f"User {user_id} not found")
+
+    @staticmethod
+    def _raise_level(user_id, xp_total, current_level):
+        """Conditionally raise the stored level; True only for the writer that raised it"""
+        new_level = GamificationService.calculate_level(xp_total)
+        if new_level <= (current_level or 1):
+            return False
+        result = User._get_collection().update_one(
+            {'_id': user_id, 'level': {'$lt': new_level}},
+            {'$set': {'level': new_level}}
+        )
+        return result.modified_count > 0
 
     @staticmethod
     def award_xp(user_id, amount, source="System"):
@@ -58,48 +129,90 @@ class GamificationService:
         Updates both Lifetime XP and Weekly XP.
         """
         try:
-            user = User.objects.get(id=user_id)
-            
-            # Check for weekly reset BEFORE adding points
-            GamificationService.check_and_reset_weekly(user)
-
-            old_level = user.level
+            uid = GamificationService._object_id(user_id)
+            now = datetime.utcnow()
             
-            # Update Points
-            user.xp_total += amount
-            user.weekly_xp += amount # Phase 28: Add to weekly bucket
+            doc = GamificationService._apply_xp(uid, amount, now)
+            leveled_up = GamificationService._raise_level(uid, doc['xp_total'], doc.get('level'))
+            new_level = max(doc.get('level') or 1, GamificationService.calculate_level(doc['xp_total']))
             
-            # Check Level Up
-            new_level = GamificationService.calculate_level(user.xp_total)
-            
-            leveled_up = False
-            if new_level > old_level:
-                user.level = new_level
-                leveled_up = True
-                
-            user.save()
+            XPEvent(user_id=uid, amount=amount, source=source, created_at=now).save(force_insert=True)
+            user_cache.invalidate(uid)
+            LeaderboardService.record(uid, doc['xp_total'], doc['weekly_xp'], now)
             
             return {
                 'success': True,
                 'leveled_up': leveled_up,
                 'new_level': new_level,
                 'xp_gained': amount,
-                'total_xp': user.xp_total,
-                'weekly_xp': user.weekly_xp,
+                'total_xp': doc['xp_total'],
+                'weekly_xp': doc['weekly_xp'],
                 'level_title': GamificationService.get_level_title(new_level)
             }
         except Exception as e:
             print(f"Gamification Error: {e}")
             return {'success': False, 'error': str(e)}
 
+    @staticmethod
+    def award_xp_batch(awards, now=None):
+        """
+        Apply many awards at once: one bulk_write, one insert_many.
+
+        Args:
+            awards: Iterable of (user_id, amount, source)
+
+        Returns:
+            {'users': int, 'events': int, 'leveled_up': [user ObjectIds]}
+        """
+        now = now or datetime.utcnow()
+        start_of_week = GamificationService.season_start(now)
+        totals, events = {}, []
+        for user_id, amount, source in awards:
+            uid = GamificationService._object_id(user_id)
+            totals[uid] = totals.get(uid, 0) + amount
+            events.append(XPEvent(user_id=uid, amount=amount, source=source, created_at=now))
+        if not totals:
+            return {'users': 0, 'events': 0, 'leveled_up': []}
+
+        # Ordered: each user's season reset (if due) lands before their $inc
+        ops = []
+        for uid, amount in totals.items():
+            ops.append(UpdateOne(
+                dict(GamificationService._stale_season(start_of_week), _id=uid),
+                {'$set': {'weekly_xp': 0, 'last_weekly_reset': now}}
+            ))
+            ops.append(UpdateOne({'_id': uid}, {
+                '$inc': {'xp_total': amount, 'weekly_xp': amount},
+                '$set': {'xp_updated_at': now}
+            }))
+        users = User._get_collection()
+        users.bulk_write(ops, ordered=True)
+
+        leveled_up = []
+        for doc in users.find({'_id': {'$in': list(totals)}}, XP_FIELDS):
+            LeaderboardService.record(doc['_id'], doc['xp_total'], doc['weekly_xp'], now)
+            if GamificationService._raise_level(doc['_id'], doc['xp_total'], doc.get('level')):
+                leveled_up.append(doc['_id'])
+        XPEvent.objects.insert(events, load_bulk=False)
+        for uid in totals:
+            user_cache.invalidate(uid)
+        return {'users': len(totals), 'events': len(events), 'leveled_up': leveled_up}
+
+    @staticmethod
+    def get_xp_history(user_id, limit=50):
+        """Most recent XP ledger entries for a user"""
+        return XPEvent.objects(user_id=GamificationService._object_id(user_id)).order_by('-created_at')[:limit]
+
     @staticmethod
     def get_progress(user_id):
         """Get full progress stats for UI"""
         user = User.objects.get(id=user_id)
         
-        # Check reset on read (lazy evaluation)
-        if GamificationService.check_and_reset_weekly(user):
-            user.save()
+        # Not yet swept into this season: last week's XP doesn't count
+        weekly_xp = user.weekly_xp
+        last_reset = user.last_weekly_reset
+        if last_reset is None or last_reset < GamificationService.season_start():
+            weekly_xp = 0
 
         current_level = user.level
         next_level_xp = GamificationService.calculate_xp_for_next_level(current_level)
@@ -115,7 +228,7 @@ class GamificationService:
             'level': current_level,
             'title': GamificationService.get_level_title(current_level),
             'total_xp': user.xp_total,
-            'weekly_xp': user.weekly_xp, # Phase 28
+            'weekly_xp': weekly_xp, # Phase 28
             'current_level_xp': xp_in_level,
             'next_level_xp_target': xp_needed_for_level,
             'percent': min(100, max(0, progress_percent)),
@@ -3,7 +3,12 @@ Inbox Service for Unified Learning Inbox Feature
 Handles CRUD operations and business logic for learning items
 """
 from datetime import datetime
+from urllib.parse import urlparse, unquote
 from app.models import LearningItem, ContentSource, User
+from app.auth import load_user
+from app import serialization
+from app.pagination import keyset_page, count_cache
+from app.services.search_index import search_index_cache
 from mongoengine.errors import ValidationError, DoesNotExist
 
 
@@ -12,6 +17,13 @@ class InboxService:
     
     # Configuration
     MAX_ACTIVE_ITEMS = 3  # Maximum number of active learning items per user
+    PENDING_TITLE = 'Fetching details...'  # Placeholder until metadata enrichment runs
+    DEFAULT_TITLE = 'Untitled Content'
+    
+    # Keyset orders (_id breaks ties); each matches a LearningItem index
+    INBOX_ORDER = ('-priority_score', '-added_at', '-id')
+    LIBRARY_ORDER = ('-added_at', '-id')
+    DEFAULT_PAGE_SIZE = 50
     
     @staticmethod
     def create_learning_item(user_id, item_data):
@@ -31,7 +43,7 @@ class InboxService:
         # Get user object
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -52,6 +64,8 @@ class InboxService:
         
         # Validate required fields
         required_fields = ['title', 'source_type']
+        if item_data.get('source_url'):
+            required_fields.remove('title')  # May be auto-fetched below
         for field in required_fields:
             if field not in item_data or not item_data[field]:
                 raise ValueError(f"Missing required field: {field}")
@@ -62,41 +76,26 @@ class InboxService:
             raise ValueError(f"Invalid source_type. Must be one of: {', '.join(valid_source_types)}")
 
         # ---------------------------------------------------------
-        # Adapter Integration: Auto-Fetch Metadata
+        # Adapter Integration: Auto-Fetch Metadata (background job)
         # ---------------------------------------------------------
         from app.services.adapters.factory import AdapterFactory
         
-        # If we have a URL but missing details (title/duration), try to fetch them
+        # If we have a URL but missing details (title/duration), fetch them after saving
+        enrichment_fields = []
         if 'source_url' in item_data and item_data['source_url']:
-            adapter = AdapterFactory.get_adapter(item_data['source_url'])
-            if adapter:
-                try:
-                    metadata = adapter.fetch_metadata(item_data['source_url'])
-                    
-                    # Auto-fill missing fields
-                    if 'title' not in item_data or not item_data['title']:
-                        item_data['title'] = metadata.get('title', 'Untitled Content')
-                    
-                    if 'description' not in item_data:
-                        item_data['description'] = metadata.get('description', '')
-                        
-                    if 'total_duration' not in item_data or item_data['total_duration'] == 0:
-                        item_data['total_duration'] = metadata.get('duration_minutes', 0)
-                        
-                    # Merge metadata
-                    if 'metadata' not in item_data:
-                        item_data['metadata'] = {}
-                    item_data['metadata'].update(metadata.get('platform_metadata', {}))
-                    
-                    # Set thumbnail if available (storing in metadata for now)
-                    if 'thumbnail_url' in metadata:
-                        item_data['metadata']['thumbnail_url'] = metadata['thumbnail_url']
-                        
-                except Exception as e:
-                    # Don't fail the creation, just log/ignore and proceed with defaults
-                    print(f"Metadata fetch failed: {e}")
+            if AdapterFactory.get_adapter(item_data['source_url']):
+                if 'title' not in item_data or not item_data['title']:
+                    item_data['title'] = InboxService.PENDING_TITLE
+                    enrichment_fields.append('title')
+                if 'description' not in item_data:
+                    enrichment_fields.append('description')
+                if 'total_duration' not in item_data or item_data['total_duration'] == 0:
+                    enrichment_fields.append('total_duration')
+                item_data['metadata'] = dict(item_data.get('metadata') or {})
+                item_data['metadata']['enrichment'] = 'pending'
+                item_data['metadata']['enrichment_fields'] = enrichment_fields
 
-        # Final check for Title (in case adapter failed and user didn't provide one)
+        # Final check for Title (no adapter for the URL and user didn't provide one)
         if 'title' not in item_data or not item_data['title']:
              raise ValueError("Title is required (could not be auto-fetched)")
         
@@ -117,25 +116,120 @@ class InboxService:
         )
         
         learning_item.save()
+        
+        if learning_item.metadata.get('enrichment') == 'pending':
+            from app.jobs import enqueue, enrich_learning_item
+            enqueue(enrich_learning_item, str(learning_item.id))
+        
         return learning_item
     
     @staticmethod
-    def get_user_items(user_id, status_filter=None, limit=None, skip=0):
+    def enrich_learning_item(item_id):
+        """
+        Fetch adapter metadata for an item and fill in the fields the user
+        left blank. Runs as a background job after create_learning_item.
+        
+        Returns:
+            Updated LearningItem, or None if there is nothing to enrich
+        """
+        from app.services.adapters.factory import AdapterFactory
+        
+        item = LearningItem.objects(id=item_id).first()
+        if not item or not item.source_url:
+            return None
+        adapter = AdapterFactory.get_adapter(item.source_url)
+        if not adapter:
+            return InboxService.fail_enrichment(item, "No adapter for this URL")
+        
+        metadata = dict(item.metadata or {})
+        pending = metadata.pop('enrichment_fields', [])
+        try:
+            fetched = adapter.get_metadata(item.source_url)
+        except Exception as e:
+            print(f"Metadata fetch failed: {e}")
+            return InboxService.fail_enrichment(item, e)
+        
+        # Auto-fill missing fields
+        if 'title' in pending:
+            item.title = fetched.get('title', 'Untitled Content')
+        if 'description' in pending:
+            item.description = fetched.get('description', '')
+        if 'total_duration' in pending:
+            item.total_duration = fetched.get('duration_minutes', 0)
+        
+        # Merge metadata
+        metadata.update(fetched.get('platform_metadata', {}))
+        
+        # Set thumbnail if available (storing in metadata for now)
+        if 'thumbnail_url' in fetched:
+            metadata['thumbnail_url'] = fetched['thumbnail_url']
+        metadata['enrichment'] = 'complete'
+        item.metadata = metadata
+        item.save()
+        return item
+    
+    @staticmethod
+    def fail_enrichment(item, error):
+        """
+        Give up on enriching an item: record the error and replace the
+        pending placeholder title with one derived from the URL
+
+        Args:
+            item: LearningItem or its id
+            error: Exception or message to record
+
+        Returns:
+            Updated LearningItem, or None if it no longer exists
+        """
+        if not isinstance(item, LearningItem):
+            item = LearningItem.objects(id=item).first()
+            if not item:
+                return None
+        metadata = dict(item.metadata or {})
+        metadata.pop('enrichment_fields', None)
+        metadata['enrichment'] = 'failed'
+        metadata['enrichment_error'] = str(error)[:200]
+        if item.title == InboxService.PENDING_TITLE:
+            item.title = InboxService.title_from_url(item.source_url)
+        item.metadata = metadata
+        item.save()
+        return item
+    
+    @staticmethod
+    def title_from_url(url):
+        """Readable fallback title: the last path segment, else the host"""
+        parsed = urlparse(url or '')
+        segment = unquote(parsed.path.rstrip('/').rsplit('/', 1)[-1]).rsplit('.', 1)[0]
+        segment = segment.replace('-', ' ').replace('_', ' ').strip()
+        host = parsed.netloc.lower()
+        host = host[4:] if host.startswith('www.') else host
+        if segment and host:
+            return f"{segment[:1].upper()}{segment[1:]} ({host})"
+        return host or InboxService.DEFAULT_TITLE
+    
+    @staticmethod
+    def get_user_items(user_id, status_filter=None, limit=None, skip=0, lean=False, cursor=None):
         """
         Get learning items for a user with optional filtering
         
+        With a limit (and no skip) or a cursor the result is a keyset Page
+        whose next_cursor continues the listing; skip keeps the legacy
+        offset paging.
+        
         Args:
             user_id: User ID
             status_filter: Optional status to filter by (active, paused, completed, dropped)
             limit: Maximum number of items to return
             skip: Number of items to skip (for pagination)
+            lean: Return LeanRecord rows (list projection) instead of Documents
+            cursor: next_cursor of the previous page
             
         Returns:
             List of LearningItem objects
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -146,8 +240,12 @@ class InboxService:
         if status_filter:
             query = query.filter(status=status_filter)
         
+        if cursor or (limit and not skip):
+            return keyset_page(query, InboxService.INBOX_ORDER, limit or InboxService.DEFAULT_PAGE_SIZE,
+                               cursor, 'list' if lean else None)
+        
         # Sort by priority score (descending) and added date (newest first)
-        query = query.order_by('-priority_score', '-added_at')
+        query = query.order_by(*InboxService.INBOX_ORDER)
         
         if skip:
             query = query.skip(skip)
@@ -155,7 +253,7 @@ class InboxService:
         if limit:
             query = query.limit(limit)
         
-        return list(query)
+        return serialization.lean(query) if lean else list(query)
     
     @staticmethod
     def get_item_by_id(item_id, user_id=None):
@@ -281,6 +379,11 @@ class InboxService:
             raise ValueError("Learning item not found or access denied")
         
         item.delete()
+        from app.services.dashboard_service import focus_cache
+        owner = serialization.ref_id(item, 'user_id')
+        focus_cache.invalidate(owner)
+        search_index_cache.invalidate_user(owner)
+        count_cache.invalidate(owner)
         return True
     
     @staticmethod
@@ -296,7 +399,7 @@ class InboxService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -313,16 +416,26 @@ class InboxService:
                 'slots_available': 0
             }
         
-        total_items = LearningItem.objects(user_id=user).count()
-        active_items = LearningItem.objects(user_id=user, status='active').count()
-        paused_items = LearningItem.objects(user_id=user, status='paused').count()
-        completed_items = LearningItem.objects(user_id=user, status='completed').count()
-        dropped_items = LearningItem.objects(user_id=user, status='dropped').count()
-        
-        # Calculate total time invested
-        all_items = LearningItem.objects(user_id=user)
-        total_time_invested = sum(item.completed_duration for item in all_items)
-        
+        # Single round-trip: per-status counts and invested minutes in one $group
+        status_counts = {}
+        total_time_invested = 0
+        pipeline = [
+            {'$group': {
+                '_id': '$status',
+                'count': {'$sum': 1},
+                'minutes': {'$sum': {'$ifNull': ['$completed_duration', 0]}}
+            }}
+        ]
+        for row in LearningItem.objects(user_id=user).aggregate(pipeline):
+            status_counts[row['_id']] = row['count']
+            total_time_invested += row['minutes']
+
+        total_items = sum(status_counts.values())
+        active_items = status_counts.get('active', 0)
+        paused_items = status_counts.get('paused', 0)
+        completed_items = status_counts.get('completed', 0)
+        dropped_items = status_counts.get('dropped', 0)
+
         # Check if user can add new items
         can_add_new = active_items < InboxService.MAX_ACTIVE_ITEMS
         
@@ -379,7 +492,7 @@ class InboxService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -456,7 +569,7 @@ class InboxService:
         # Calculate additional metrics for blocked users
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -547,6 +660,8 @@ class InboxService:
         
         # Validate required fields
         required_fields = ['title', 'source_type']
+        if item_data.get('source_url'):
+            required_fields.remove('title')  # May be auto-fetched below
         for field in required_fields:
             if field not in item_data or not item_data[field]:
                 validation_result['is_valid'] = False
@@ -593,7 +708,7 @@ class InboxService:
         # 1. Verify User and Bookmark
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
                 
@@ -657,7 +772,7 @@ class InboxService:
         # Get user
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -723,22 +838,24 @@ class InboxService:
         return item
     
     @staticmethod
-    def get_library_items(user_id, source_type_filter=None, limit=None, skip=0):
+    def get_library_items(user_id, source_type_filter=None, limit=None, skip=0, lean=False, cursor=None):
         """
-        Get all library items for a user
+        Get all library items for a user (keyset Page as in get_user_items)
         
         Args:
             user_id: User ID
             source_type_filter: Optional filter by source type
             limit: Maximum number of items to return
             skip: Number of items to skip (for pagination)
+            lean: Return LeanRecord rows (list projection) instead of Documents
+            cursor: next_cursor of the previous page
             
         Returns:
             List of LearningItem objects with status='library'
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -749,8 +866,12 @@ class InboxService:
         if source_type_filter:
             query = query.filter(source_type=source_type_filter)
         
+        if cursor or (limit and not skip):
+            return keyset_page(query, InboxService.LIBRARY_ORDER, limit or InboxService.DEFAULT_PAGE_SIZE,
+                               cursor, 'list' if lean else None)
+        
         # Sort by added date (newest first)
-        query = query.order_by('-added_at')
+        query = query.order_by(*InboxService.LIBRARY_ORDER)
         
         if skip:
             query = query.skip(skip)
@@ -758,5 +879,5 @@ class InboxService:
         if limit:
             query = query.limit(limit)
         
-        return list(query)
+        return serialization.lean(query) if lean else list(query)
 
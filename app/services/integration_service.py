@@ -4,6 +4,7 @@ Handles connections to YouTube, cloud storage, and other platforms
 """
 from datetime import datetime
 from app.models import ContentSource, User
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 
 
@@ -24,7 +25,7 @@ class IntegrationService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -57,7 +58,7 @@ class IntegrationService:
         """Get all platform integrations for a user"""
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -0,0 +1,501 @@
+"""
+Leaderboard Service (Feature 9)
+Global, weekly-season and pod rankings by XP.
+
+Scores live in a ranked set per board: a Redis sorted set when
+LEADERBOARD_REDIS_URL (or REDIS_URL) is reachable, otherwise an in-process
+indexable skip list. Both give O(log n) rank-of-user and O(log n + N)
+top-N. Boards:
+
+    xp_total                  all-time XP
+    weekly:<YYYY-MM-DD>       weekly_xp for the season starting that Monday
+
+GamificationService pushes the new totals after every award. A fresh
+board is filled from MongoDB on first read. The in-process backend only
+sees awards made by its own process, so once a board is older than
+LEADERBOARD_MEMORY_RELOAD_SECONDS one caller starts a background refresh
+that reads only the users whose xp_updated_at moved since the last load
+(awards stamp it next to their $inc); everyone keeps serving the current
+board meanwhile. Scores only go up within a board, so racing writers and
+refreshes can't regress a rank. A new season is a new key, so no reset is
+needed.
+
+Redis stores negated scores so that ascending ZRANK/ZRANGE order ties by
+member id the same way the skip list does.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.models import User, DailyTask, AccountabilityPartner
+
+ALL_TIME = 'xp_total'
+WEEKLY = 'weekly'
+REDIS_KEY_PREFIX = 'leaderboard:'
+SEASON_TTL_SECONDS = 60 * 60 * 24 * 28  # Keep four weeks of past seasons in Redis
+REFRESH_OVERLAP_SECONDS = 5  # Re-read a little before the last load to cover in-flight awards
+
+
+class _Node:
+    __slots__ = ('key', 'forward', 'width')
+
+    def __init__(self, key, level):
+        self.key = key
+        self.forward = [None] * level
+        self.width = [0] * level
+
+
+class RankedSet:
+    """
+    Indexable skip list of members ordered by (-score, member)
+
+    width[i] is the number of level-0 steps that forward[i] skips, which
+    makes rank and rank-range lookups O(log n).
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._scores = {}
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def _insert(self, key):
+        update = [self._head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = rank[i + 1] if i + 1 < self._level else 0
+            while x.forward[i] is not None and x.forward[i].key < key:
+                rank[i] += x.width[i]
+                x = x.forward[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.width[i] = len(self._scores)
+            self._level = level
+
+        node = _Node(key, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.width[i] = update[i].width[i] - (rank[0] - rank[i])
+            update[i].width[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+
+    def _delete(self, key):
+        update = [self._head] * self.MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                x = x.forward[i]
+            update[i] = x
+        node = x.forward[0]
+        for i in range(self._level):
+            if update[i].forward[i] is node:
+                update[i].width[i] += node.width[i] - 1
+                update[i].forward[i] = node.forward[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+    def _node_at(self, index):
+        """Node at 0-based rank index (caller checks bounds)"""
+        traversed, x = 0, self._head
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and traversed + x.width[i] <= index + 1:
+                traversed += x.width[i]
+                x = x.forward[i]
+        return x
+
+    def set(self, member, score, only_greater=False):
+        """Add or move a member; with only_greater, never lower a score"""
+        with self._lock:
+            current = self._scores.get(member)
+            if current is not None:
+                if current == score or (only_greater and score < current):
+                    return
+                self._delete((-current, member))
+            self._scores[member] = score
+            self._insert((-score, member))
+
+    def remove(self, member):
+        with self._lock:
+            current = self._scores.pop(member, None)
+            if current is not None:
+                self._delete((-current, member))
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def rank(self, member):
+        """0-based rank, highest score first (None if absent)"""
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            key, rank, x = (-score, member), 0, self._head
+            for i in reversed(range(self._level)):
+                while x.forward[i] is not None and x.forward[i].key <= key:
+                    rank += x.width[i]
+                    x = x.forward[i]
+            return rank - 1
+
+    def range(self, start, stop):
+        """[(member, score)] for ranks start..stop inclusive"""
+        with self._lock:
+            stop = min(stop, len(self._scores) - 1)
+            if start > stop:
+                return []
+            x = self._node_at(start)
+            result = []
+            for _ in range(stop - start + 1):
+                result.append((x.key[1], -x.key[0]))
+                x = x.forward[0]
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+            self._head = _Node(None, self.MAX_LEVEL)
+            self._level = 1
+
+
+class MemoryBackend:
+    """Per-process boards, refreshed from MongoDB every reload_seconds"""
+
+    name = 'memory'
+
+    def __init__(self, reload_seconds=60):
+        self.reload_seconds = reload_seconds
+        self._boards = {}
+        self._loaded = {}  # board -> loaded_at
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _board(self, board):
+        with self._lock:
+            if board not in self._boards:
+                self._boards[board] = RankedSet()
+            return self._boards[board]
+
+    def is_loaded(self, board):
+        loaded_at = self._loaded.get(board)
+        return loaded_at is not None and time.time() - loaded_at < self.reload_seconds
+
+    def loaded_at(self, board):
+        return self._loaded.get(board)
+
+    def mark_loaded(self, board, at=None):
+        self._loaded[board] = at or time.time()
+
+    def claim_refresh(self, board):
+        """True for the one caller that should refresh a stale board"""
+        with self._lock:
+            if board in self._refreshing:
+                return False
+            self._refreshing.add(board)
+            return True
+
+    def release_refresh(self, board):
+        with self._lock:
+            self._refreshing.discard(board)
+
+    def set_scores(self, board, scores, only_greater=True):
+        ranked = self._board(board)
+        for member, score in scores.items():
+            ranked.set(member, score, only_greater=only_greater)
+
+    def scores(self, board, members):
+        ranked = self._board(board)
+        return [ranked.score(m) for m in members]
+
+    def rank(self, board, member):
+        return self._board(board).rank(member)
+
+    def range(self, board, start, stop):
+        return self._board(board).range(start, stop)
+
+    def count(self, board):
+        return len(self._board(board))
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
+            self._loaded.clear()
+            self._refreshing.clear()
+
+
+class RedisBackend:
+    """Shared boards in Redis sorted sets (scores stored negated)"""
+
+    name = 'redis'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, board):
+        return REDIS_KEY_PREFIX + board
+
+    def is_loaded(self, board):
+        return bool(self.client.exists(self._key(board) + ':loaded'))
+
+    def loaded_at(self, board):
+        return None  # Every award lands in Redis, so a loaded board never goes stale
+
+    def mark_loaded(self, board):
+        ttl = SEASON_TTL_SECONDS if board.startswith(WEEKLY) else None
+        self.client.set(self._key(board) + ':loaded', 1, ex=ttl)
+
+    def set_scores(self, board, scores, only_greater=True):
+        if not scores:
+            return
+        key = self._key(board)
+        pipe = self.client.pipeline(transaction=False)
+        # Negated scores: "only greater" is ZADD LT
+        pipe.zadd(key, {member: -score for member, score in scores.items()}, lt=only_greater)
+        if board.startswith(WEEKLY):
+            pipe.expire(key, SEASON_TTL_SECONDS)
+        pipe.execute()
+
+    def scores(self, board, members):
+        if not members:
+            return []
+        return [None if s is None else -s for s in self.client.zmscore(self._key(board), members)]
+
+    def rank(self, board, member):
+        return self.client.zrank(self._key(board), member)
+
+    def range(self, board, start, stop):
+        rows = self.client.zrange(self._key(board), start, stop, withscores=True)
+        return [(m.decode() if isinstance(m, bytes) else m, -s) for m, s in rows]
+
+    def count(self, board):
+        return self.client.zcard(self._key(board))
+
+
+backend = MemoryBackend()
+_first_load_lock = threading.Lock()
+
+
+def configure_leaderboard(app):
+    """Use Redis sorted sets when reachable, else the in-process skip list"""
+    global backend
+    if isinstance(backend, MemoryBackend):
+        backend.reload_seconds = app.config.get('LEADERBOARD_MEMORY_RELOAD_SECONDS', backend.reload_seconds)
+    url = app.config.get('LEADERBOARD_REDIS_URL')
+    if not url:
+        return backend
+    try:
+        import redis
+        client = redis.Redis.from_url(url, socket_timeout=2)
+        client.ping()
+        backend = RedisBackend(client)
+    except Exception as e:
+        print(f"Leaderboard Redis unavailable ({e}); using in-process rankings")
+    return backend
+
+
+class LeaderboardService:
+
+    @staticmethod
+    def season_board(now=None):
+        from app.services.gamification_service import GamificationService
+        return f"{WEEKLY}:{GamificationService.season_start(now).date().isoformat()}"
+
+    @staticmethod
+    def board_for(season, now=None):
+        """'weekly' -> the current season board, anything else -> all-time"""
+        return LeaderboardService.season_board(now) if season == WEEKLY else ALL_TIME
+
+    @staticmethod
+    def record(user_id, xp_total, weekly_xp, now=None):
+        """Push a user's new totals (called after every XP award)"""
+        member = str(user_id)
+        try:
+            backend.set_scores(ALL_TIME, {member: xp_total})
+            backend.set_scores(LeaderboardService.season_board(now), {member: weekly_xp})
+        except Exception as e:
+            print(f"Leaderboard Update Error: {e}")
+
+    @staticmethod
+    def rebuild(board, now=None):
+        """Fill a board from MongoDB; returns the number of users loaded"""
+        started = time.time()
+        loaded = LeaderboardService._load(board, {}, now)
+        backend.mark_loaded(board, started)
+        return loaded
+
+    @staticmethod
+    def refresh(board, since, now=None):
+        """
+        Apply the XP written since `since` (a time.time() value) by other
+        workers and jobs to an already loaded board
+
+        Returns:
+            Number of users re-read
+        """
+        started = time.time()
+        try:
+            changed_after = datetime.utcfromtimestamp(since) - timedelta(seconds=REFRESH_OVERLAP_SECONDS)
+            loaded = LeaderboardService._load(board, {'xp_updated_at': {'$gte': changed_after}}, now)
+            backend.mark_loaded(board, started)
+            return loaded
+        finally:
+            backend.release_refresh(board)
+
+    @staticmethod
+    def _load(board, query, now=None):
+        from app.services.gamification_service import GamificationService
+        weekly = board != ALL_TIME
+        if weekly:
+            query = dict(query, last_weekly_reset={'$gte': GamificationService.season_start(now)}, weekly_xp={'$gt': 0})
+        field = 'weekly_xp' if weekly else 'xp_total'
+
+        loaded, chunk = 0, {}
+        for doc in User._get_collection().find(query, {field: 1}):
+            chunk[str(doc['_id'])] = doc.get(field) or 0
+            if len(chunk) >= 10000:
+                backend.set_scores(board, chunk)
+                loaded += len(chunk)
+                chunk = {}
+        backend.set_scores(board, chunk)
+        return loaded + len(chunk)
+
+    @staticmethod
+    def _ensure_loaded(board):
+        """
+        Fill a missing board before answering; refresh a stale one in the
+        background while the current board keeps being served
+
+        Returns:
+            The refresh thread when this call started one, else None
+        """
+        if backend.is_loaded(board):
+            return None
+        since = backend.loaded_at(board)
+        if since is None:
+            with _first_load_lock:
+                if not backend.is_loaded(board):
+                    LeaderboardService.rebuild(board)
+            return None
+        if not backend.claim_refresh(board):
+            return None
+        thread = threading.Thread(target=LeaderboardService._refresh_quietly, args=(board, since),
+                                  name=f'leaderboard-refresh-{board}', daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _refresh_quietly(board, since):
+        try:
+            LeaderboardService.refresh(board, since)
+        except Exception as e:
+            print(f"Leaderboard Refresh Error: {e}")
+
+    @staticmethod
+    def top(season=ALL_TIME, limit=10, offset=0):
+        """Top-N entries with names and levels"""
+        board = LeaderboardService.board_for(season)
+        LeaderboardService._ensure_loaded(board)
+        rows = backend.range(board, offset, offset + limit - 1)
+        profiles = LeaderboardService._profiles([member for member, _ in rows])
+        return [
+            dict(profiles.get(member, {}), rank=offset + i + 1, user_id=member, score=int(score))
+            for i, (member, score) in enumerate(rows)
+        ]
+
+    @staticmethod
+    def rank_of(user_id, season=ALL_TIME):
+        """{'rank': 1-based or None, 'score', 'total'} for one user"""
+        board = LeaderboardService.board_for(season)
+        LeaderboardService._ensure_loaded(board)
+        member = str(user_id)
+        rank = backend.rank(board, member)
+        score = backend.scores(board, [member])[0]
+        return {
+            'rank': None if rank is None else rank + 1,
+            'score': int(score or 0),
+            'total': backend.count(board)
+        }
+
+    @staticmethod
+    def pod_leaderboard(user_id):
+        """
+        Rank the user's active pod (and the user) by all-time XP, with
+        today's completed task counts, in a fixed number of queries
+        """
+        LeaderboardService._ensure_loaded(ALL_TIME)
+        partners = AccountabilityPartner.objects(user_id=user_id, status='active').only(
+            'partner_user_id'
+        ).as_pymongo()
+        members = [str(p['partner_user_id']) for p in partners if p.get('partner_user_id')]
+        me = str(user_id)
+        members = list(dict.fromkeys(members + [me]))
+
+        scores = dict(zip(members, backend.scores(ALL_TIME, members)))
+        profiles = LeaderboardService._profiles(members, with_email=True)
+
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        tasks_today = {
+            str(row['_id']): row['count'] for row in DailyTask.objects(
+                user_id__in=[ObjectId(m) for m in profiles],
+                status='completed',
+                completed_at__gte=today
+            ).aggregate([{'$group': {'_id': '$user_id', 'count': {'$sum': 1}}}])
+        }
+
+        leaderboard = []
+        for member in members:
+            profile = profiles.get(member)
+            if profile is None:
+                continue
+            entry = {
+                'id': member,
+                'name': profile['name'] + (' (You)' if member == me else ''),
+                'level': profile['level'],
+                'xp': int(scores.get(member) or 0),
+                'tasks_today': tasks_today.get(member, 0)
+            }
+            if member != me:
+                entry['email'] = profile['email']
+                entry['status'] = 'online' # Placeholder
+            leaderboard.append(entry)
+
+        leaderboard.sort(key=lambda e: (-e['xp'], e['id']))
+        for i, entry in enumerate(leaderboard):
+            entry['rank'] = i + 1
+        return leaderboard
+
+    @staticmethod
+    def _profiles(members, with_email=False):
+        """{member: {'name', 'level'[, 'email']}} with one $in query"""
+        ids = [ObjectId(m) for m in members if ObjectId.is_valid(m)]
+        if not ids:
+            return {}
+        fields = {'name': 1, 'level': 1, 'email': 1} if with_email else {'name': 1, 'level': 1}
+        profiles = {}
+        for doc in User._get_collection().find({'_id': {'$in': ids}}, fields):
+            profile = {'name': doc.get('name', ''), 'level': doc.get('level', 1)}
+            if with_email:
+                profile['email'] = doc.get('email')
+            profiles[str(doc['_id'])] = profile
+        return profiles
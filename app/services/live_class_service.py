@@ -4,12 +4,19 @@ Handles live online class sessions (Google Meet, Zoom, etc.)
 """
 from datetime import datetime
 from app.models import LiveClass, User
+from app.auth import load_user
+from app import serialization
+from app.pagination import keyset_page
 from mongoengine.errors import DoesNotExist
 
 
 class LiveClassService:
     """Service layer for managing live class sessions"""
     
+    # Keyset order for class listings; matches the (user_id, -created_at, -_id) index
+    CLASS_ORDER = ('-created_at', '-id')
+    DEFAULT_PAGE_SIZE = 50
+    
     @staticmethod
     def create_class(user_id, meeting_url, title=None, platform='custom', **kwargs):
         """
@@ -28,7 +35,7 @@ class LiveClassService:
         # Get user
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -66,7 +73,7 @@ class LiveClassService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
                 
@@ -95,7 +102,7 @@ class LiveClassService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
                 
@@ -111,21 +118,26 @@ class LiveClassService:
         return live_class
     
     @staticmethod
-    def get_user_classes(user_id, limit=None, skip=0):
+    def get_user_classes(user_id, limit=None, skip=0, lean=False, cursor=None):
         """
         Get all live classes for a user
         
+        With a limit (and no skip) or a cursor the result is a keyset Page
+        whose next_cursor continues the listing.
+        
         Args:
             user_id: User ID
             limit: Maximum number of classes to return
             skip: Number of classes to skip (for pagination)
+            lean: Return LeanRecord rows (list projection) instead of Documents
+            cursor: next_cursor of the previous page
             
         Returns:
             List of LiveClass objects
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -133,8 +145,12 @@ class LiveClassService:
         
         query = LiveClass.objects(user_id=user)
         
+        if cursor or (limit and not skip):
+            return keyset_page(query, LiveClassService.CLASS_ORDER, limit or LiveClassService.DEFAULT_PAGE_SIZE,
+                               cursor, 'list' if lean else None)
+        
         # Sort by created date (newest first)
-        query = query.order_by('-created_at')
+        query = query.order_by(*LiveClassService.CLASS_ORDER)
         
         if skip:
             query = query.skip(skip)
@@ -142,22 +158,23 @@ class LiveClassService:
         if limit:
             query = query.limit(limit)
         
-        return list(query)
+        return serialization.lean(query) if lean else list(query)
     
     @staticmethod
-    def get_upcoming_classes(user_id):
+    def get_upcoming_classes(user_id, lean=False):
         """
         Get upcoming scheduled classes
         
         Args:
             user_id: User ID
+            lean: Return LeanRecord rows (list projection) instead of Documents
             
         Returns:
             List of LiveClass objects scheduled in the future
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -170,23 +187,24 @@ class LiveClassService:
             scheduled_at__gte=now
         ).order_by('scheduled_at')
         
-        return list(classes)
+        return serialization.lean(classes) if lean else list(classes)
     
     @staticmethod
-    def get_past_classes(user_id, limit=10):
+    def get_past_classes(user_id, limit=10, lean=False):
         """
         Get past classes (joined or ended)
         
         Args:
             user_id: User ID
             limit: Maximum number of classes to return
+            lean: Return LeanRecord rows (list projection) instead of Documents
             
         Returns:
             List of LiveClass objects
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
         except DoesNotExist:
@@ -197,4 +215,4 @@ class LiveClassService:
             joined_at__exists=True
         ).order_by('-joined_at').limit(limit)
         
-        return list(classes)
+        return serialization.lean(classes) if lean else list(classes)
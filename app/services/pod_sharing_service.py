@@ -3,6 +3,7 @@ Pod Sharing Service - Handles privacy-controlled content sharing
 """
 from app.models import User
 from app.pod_models import SharedContent, PodMessage
+from app.serialization import prefetch, prefetched
 from datetime import datetime
 from mongoengine import Q
 
@@ -73,14 +74,16 @@ class PodSharingService:
     def get_shared_with_me(user_id):
         """Get all content others have shared with me"""
         user = User.objects.get(id=user_id)
-        shares = SharedContent.objects(shared_with=user)
+        shares = list(SharedContent.objects(shared_with=user))
+        owners = prefetch(shares, 'user_id', User, only=('name', 'email'))
         
         result = []
         for share in shares:
             data = share.to_dict()
             # Add owner info
-            data['owner_name'] = share.user_id.name
-            data['owner_email'] = share.user_id.email
+            owner = prefetched(share, 'user_id', owners)
+            data['owner_name'] = owner.name if owner else None
+            data['owner_email'] = owner.email if owner else None
             result.append(data)
         
         return result
@@ -1,14 +1,32 @@
-
 """
 Priority Service (Intelligence Engine)
 Calculates dynamic priority scores for learning items based on Relevance, Urgency, and Effort.
+
+Recalculation works column-wise: one projected query, one scoring pass
+over the whole batch against a single clock reading, and one unordered
+bulk_write of the scores that changed.
 """
+from bisect import bisect_left
 from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
 from app.models import LearningItem, User
 
+# Upper bounds (inclusive) of each bucket and the score it maps to
+URGENCY_DAY_BOUNDS = [0, 7, 14, 30]
+URGENCY_LEVELS = [1.0, 0.9, 0.7, 0.5, 0.2]  # Overdue/today, this week, 2 weeks, month, later
+EFFORT_MINUTE_BOUNDS = [30, 60, 180]
+EFFORT_SCORES = [20, 15, 10, 5]  # Easy ... Heavy
+EFFORT_DEFAULT = 10  # Unknown duration
+
+SCORING_FIELDS = {'priority_score': 1, 'target_completion_date': 1, 'total_duration': 1}
+
 class PriorityService:
+
+    DEFAULT_CHUNK_SIZE = 1000
+
     @staticmethod
-    def calculate_score(item):
+    def calculate_score(item, now=None):
         """
         Calculate priority score (0-100)
         
@@ -17,60 +35,125 @@ class PriorityService:
         2. Urgency (40%): Proximity to target_completion_date
         3. Effort (20%): Shorter items get a slight boost (quick wins)
         """
+        return PriorityService.score_batch(
+            [item.priority_score], [item.target_completion_date], [item.total_duration], now
+        )[0]
+
+    @staticmethod
+    def score_batch(priorities, target_dates, durations, now=None):
+        """
+        Score parallel columns of item fields in one pass
+        
+        Args:
+            priorities: Current priority_score per item (doubles as relevance)
+            target_dates: target_completion_date per item (None allowed)
+            durations: total_duration in minutes per item
+            now: Reference time shared by the whole batch (default utcnow)
+            
+        Returns:
+            List of scores rounded to one decimal, in input order
+        """
+        now = now or datetime.utcnow()
         
         # 1. Relevance Score (0-1.0) -> Scaled to 40
         # If imported from bookmark, it relies on that score. Default 0.5 if missing.
-        relevance = item.priority_score if item.priority_score <= 1.0 else (item.priority_score / 100.0)
-        start_relevance = max(0.1, min(relevance, 1.0))
-        score_relevance = start_relevance * 40
+        relevance = [
+            max(0.1, min(p if p <= 1.0 else p / 100.0, 1.0)) * 40
+            for p in priorities
+        ]
         
         # 2. Urgency Score (0-1.0) -> Scaled to 40
-        score_urgency = 0
-        if item.target_completion_date:
-            days_left = (item.target_completion_date - datetime.utcnow()).days
-            if days_left <= 0:
-                urgency = 1.0  # Overdue or due today
-            elif days_left <= 7:
-                urgency = 0.9  # Due this week
-            elif days_left <= 14:
-                urgency = 0.7
-            elif days_left <= 30:
-                urgency = 0.5
-            else:
-                urgency = 0.2
-            score_urgency = urgency * 40
-            
-        # 3. Effort Score (0-1.0) -> Scaled to 20
+        urgency = [
+            URGENCY_LEVELS[bisect_left(URGENCY_DAY_BOUNDS, (t - now).days)] * 40 if t else 0
+            for t in target_dates
+        ]
+        
+        # 3. Effort Score -> up to 20
         # "Quick Wins" logic: shorter duration = higher score preference
-        score_effort = 10 # Default neutral
-        if item.total_duration > 0:
-            minutes = item.total_duration
-            if minutes <= 30:
-                score_effort = 20 # Easy
-            elif minutes <= 60:
-                score_effort = 15
-            elif minutes <= 180:
-                score_effort = 10 
-            else:
-                score_effort = 5 # Heavy
-                
-        final_score = score_relevance + score_urgency + score_effort
-        return round(final_score, 1)
+        effort = [
+            EFFORT_SCORES[bisect_left(EFFORT_MINUTE_BOUNDS, m)] if m > 0 else EFFORT_DEFAULT
+            for m in durations
+        ]
+        
+        return [round(r + u + e, 1) for r, u, e in zip(relevance, urgency, effort)]
+
+    @staticmethod
+    def _score_updates(docs, now):
+        """UpdateOne ops for the projected docs whose score changed"""
+        if not docs:
+            return []
+        scores = PriorityService.score_batch(
+            [d.get('priority_score', 0.0) for d in docs],
+            [d.get('target_completion_date') for d in docs],
+            [d.get('total_duration') or 0 for d in docs],
+            now
+        )
+        return [
+            UpdateOne({'_id': doc['_id']}, {'$set': {'priority_score': score}})
+            for doc, score in zip(docs, scores)
+            if score != doc.get('priority_score', 0.0)
+        ]
 
     @staticmethod
-    def recalculate_for_user(user_id):
+    def recalculate_for_user(user_id, now=None):
         """Recalculate priority scores for all active items of a user"""
-        items = LearningItem.objects(user_id=user_id, status__ne='dropped')
-        updated_count = 0
+        uid = ObjectId(str(getattr(user_id, 'id', user_id)))
+        collection = LearningItem._get_collection()
+        docs = list(collection.find(
+            {'user_id': uid, 'status': {'$ne': 'dropped'}}, SCORING_FIELDS
+        ))
+        
+        updates = PriorityService._score_updates(docs, now or datetime.utcnow())
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+            # Raw bulk writes skip document signals
+            from app.services.dashboard_service import focus_cache
+            focus_cache.invalidate(uid)
+        return len(updates)
+
+    @staticmethod
+    def recalculate_all(chunk_size=None, now=None):
+        """
+        Fleet-wide recalculation for the nightly job
         
-        for item in items:
-            new_score = PriorityService.calculate_score(item)
-            if new_score != item.priority_score:
-                item.priority_score = new_score
-                item.save()
-                updated_count += 1
-                
-        return updated_count
+        Streams every non-dropped item across all users and writes each
+        chunk back with one unordered bulk_write. Every chunk is scored
+        against the same clock so a run is consistent end to end.
+        
+        Returns:
+            Dictionary with scanned and updated counts
+        """
+        chunk_size = chunk_size or PriorityService.DEFAULT_CHUNK_SIZE
+        now = now or datetime.utcnow()
+        collection = LearningItem._get_collection()
+        cursor = collection.find(
+            {'status': {'$ne': 'dropped'}}, SCORING_FIELDS
+        ).batch_size(chunk_size)
+        
+        scanned = updated = 0
+        chunk = []
+        for doc in cursor:
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                updated += PriorityService._flush_chunk(collection, chunk, now)
+                scanned += len(chunk)
+                chunk = []
+        if chunk:
+            updated += PriorityService._flush_chunk(collection, chunk, now)
+            scanned += len(chunk)
+        
+        if updated:
+            from app.services.dashboard_service import focus_cache
+            focus_cache.clear()
+        
+        return {'scanned': scanned, 'updated': updated}
+
+    @staticmethod
+    def _flush_chunk(collection, docs, now):
+        updates = PriorityService._score_updates(docs, now)
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+        return len(updates)
 
     @staticmethod
     def get_top_priorities(user_id, limit=3):
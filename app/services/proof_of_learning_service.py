@@ -4,6 +4,7 @@ Handles quiz generation, verification, and certification
 """
 from datetime import datetime
 from app.models import LearningItem, User
+from app.serialization import ref_id
 from mongoengine import Document, ReferenceField, StringField, IntField, BooleanField, DateTimeField, ListField, DictField
 from mongoengine.errors import DoesNotExist
 
@@ -23,7 +24,7 @@ class Quiz(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'learning_item_id': str(self.learning_item_id.id),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
             'title': self.title,
             'questions': self.questions,
             'passing_score': self.passing_score,
@@ -46,8 +47,8 @@ class QuizAttempt(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'quiz_id': str(self.quiz_id.id),
-            'user_id': str(self.user_id.id),
+            'quiz_id': ref_id(self, 'quiz_id'),
+            'user_id': ref_id(self, 'user_id'),
             'score': self.score,
             'passed': self.passed,
             'attempted_at': self.attempted_at.isoformat() if self.attempted_at else None
@@ -68,8 +69,8 @@ class Certificate(Document):
     def to_dict(self):
         return {
             'id': str(self.id),
-            'user_id': str(self.user_id.id),
-            'learning_item_id': str(self.learning_item_id.id),
+            'user_id': ref_id(self, 'user_id'),
+            'learning_item_id': ref_id(self, 'learning_item_id'),
             'certificate_type': self.certificate_type,
             'issued_at': self.issued_at.isoformat() if self.issued_at else None,
             'verification_code': self.verification_code,
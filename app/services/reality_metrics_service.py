@@ -1,9 +1,14 @@
 """
 Reality Metrics Service for Feature 6: Reality-Driven Progress Visualization
 Calculates honest, reality-based progress metrics
+
+Per-item activity (days with completed tasks) for any number of items
+comes from one aggregation over DailyTask grouped by learning_item_id,
+so a user-wide analysis costs two queries regardless of task count.
 """
 from datetime import datetime, timedelta
-from app.models import LearningItem, DailyTask, User
+from app.models import LearningItem, DailyTask
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 import math
 
@@ -12,7 +17,7 @@ class RealityMetricsService:
     """Service for calculating honest progress metrics"""
     
     @staticmethod
-    def calculate_reality_metrics(learning_item_id):
+    def calculate_reality_metrics(learning_item_id, now=None):
         """
         Calculate comprehensive reality metrics for a learning item
         
@@ -24,17 +29,77 @@ class RealityMetricsService:
         except DoesNotExist:
             raise ValueError("Learning item not found")
         
-        # Calculate all metrics
-        actual_completion = RealityMetricsService._calculate_actual_completion(item)
-        days_wasted = RealityMetricsService._calculate_days_wasted(item)
-        expected_vs_actual = RealityMetricsService._calculate_expected_vs_actual(item)
-        projected_finish = RealityMetricsService._calculate_projected_finish(item)
-        efficiency_score = RealityMetricsService._calculate_efficiency_score(item)
+        activity = RealityMetricsService._activity_by_item([item.id])
+        return RealityMetricsService._build_metrics(item, activity.get(item.id), now or datetime.utcnow())
+    
+    @staticmethod
+    def calculate_user_metrics(user_id, status='active', now=None):
+        """
+        Reality metrics for all of a user's items with one DailyTask aggregation
         
+        Returns:
+            {item_id: metrics} in the calculate_reality_metrics format
+        """
+        user = RealityMetricsService._resolve_user(user_id)
+        if user is None:
+            return {}
+        items = list(LearningItem.objects(user_id=user, status=status))
+        activity = RealityMetricsService._activity_by_item([item.id for item in items])
+        now = now or datetime.utcnow()
         return {
-            'actual_completion_percentage': actual_completion,
-            'days_since_start': (datetime.utcnow() - item.added_at).days if item.added_at else 0,
-            'days_active': RealityMetricsService._calculate_active_days(item),
+            str(item.id): RealityMetricsService._build_metrics(item, activity.get(item.id), now)
+            for item in items
+        }
+    
+    @staticmethod
+    def _resolve_user(user_id):
+        try:
+            if isinstance(user_id, str):
+                return load_user(user_id)
+            return user_id
+        except DoesNotExist:
+            return None
+    
+    @staticmethod
+    def _activity_by_item(item_ids):
+        """
+        Distinct progress days per item, from one aggregation over DailyTask
+        
+        Returns:
+            {item_id: {'progress_days': days with any completed_at,
+                       'active_days': days with a task in completed status}}
+        """
+        if not item_ids:
+            return {}
+        rows = DailyTask._get_collection().aggregate([
+            {'$match': {'learning_item_id': {'$in': item_ids}, 'completed_at': {'$ne': None}}},
+            {'$group': {
+                '_id': {
+                    'item': '$learning_item_id',
+                    'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$completed_at'}}
+                },
+                'completed': {'$max': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}}
+            }},
+            {'$group': {
+                '_id': '$_id.item',
+                'progress_days': {'$sum': 1},
+                'active_days': {'$sum': '$completed'}
+            }}
+        ])
+        return {row['_id']: row for row in rows}
+    
+    @staticmethod
+    def _build_metrics(item, activity, now):
+        activity = activity or {}
+        days_wasted = RealityMetricsService._calculate_days_wasted(item, activity.get('progress_days', 0), now)
+        expected_vs_actual = RealityMetricsService._calculate_expected_vs_actual(item, now)
+        projected_finish = RealityMetricsService._calculate_projected_finish(item, now)
+        efficiency_score = RealityMetricsService._calculate_efficiency_score(item, now)
+        
+        return {
+            'actual_completion_percentage': RealityMetricsService._calculate_actual_completion(item),
+            'days_since_start': (now - item.added_at).days if item.added_at else 0,
+            'days_active': activity.get('active_days', 0),
             'days_wasted': days_wasted,
             'expected_progress': expected_vs_actual['expected'],
             'actual_progress': expected_vs_actual['actual'],
@@ -53,42 +118,19 @@ class RealityMetricsService:
         return round(item.progress_percentage, 2)
     
     @staticmethod
-    def _calculate_days_wasted(item):
+    def _calculate_days_wasted(item, progress_days, now):
         """
         Calculate days with zero progress (wasted days)
+        Wasted days = total days - days with a completed task
         """
         if not item.added_at:
             return 0
         
-        days_since_start = (datetime.utcnow() - item.added_at).days
-        
-        # Get all tasks for this item
-        tasks = DailyTask.objects(learning_item_id=item)
-        
-        # Count days with completed tasks
-        active_days = set()
-        for task in tasks:
-            if task.completed_at:
-                active_days.add(task.completed_at.date())
-        
-        # Wasted days = total days - active days
-        wasted = days_since_start - len(active_days)
-        return max(0, wasted)
+        days_since_start = (now - item.added_at).days
+        return max(0, days_since_start - progress_days)
     
     @staticmethod
-    def _calculate_active_days(item):
-        """Calculate number of days with actual progress"""
-        tasks = DailyTask.objects(learning_item_id=item, status='completed')
-        
-        active_days = set()
-        for task in tasks:
-            if task.completed_at:
-                active_days.add(task.completed_at.date())
-        
-        return len(active_days)
-    
-    @staticmethod
-    def _calculate_expected_vs_actual(item):
+    def _calculate_expected_vs_actual(item, now):
         """
         Calculate expected vs actual progress
         """
@@ -97,7 +139,7 @@ class RealityMetricsService:
         
         # Calculate expected progress based on time elapsed
         total_days = (item.target_completion_date - item.added_at).days
-        elapsed_days = (datetime.utcnow() - item.added_at).days
+        elapsed_days = (now - item.added_at).days
         
         if total_days <= 0:
             expected_progress = 100.0
@@ -114,13 +156,13 @@ class RealityMetricsService:
         }
     
     @staticmethod
-    def _calculate_projected_finish(item):
+    def _calculate_projected_finish(item, now):
         """
         Calculate projected finish date based on current pace
         """
         if item.progress_percentage >= 100:
             return {
-                'date': datetime.utcnow().isoformat(),
+                'date': now.isoformat(),
                 'days_remaining': 0,
                 'on_track': True
             }
@@ -133,7 +175,7 @@ class RealityMetricsService:
             }
         
         # Calculate current pace (% per day)
-        days_elapsed = (datetime.utcnow() - item.added_at).days
+        days_elapsed = (now - item.added_at).days
         if days_elapsed == 0:
             days_elapsed = 1
         
@@ -150,7 +192,7 @@ class RealityMetricsService:
         remaining_percentage = 100 - item.progress_percentage
         days_needed = remaining_percentage / pace_per_day
         
-        projected_date = datetime.utcnow() + timedelta(days=days_needed)
+        projected_date = now + timedelta(days=days_needed)
         
         # Check if on track
         on_track = True
@@ -164,7 +206,7 @@ class RealityMetricsService:
         }
     
     @staticmethod
-    def _calculate_efficiency_score(item):
+    def _calculate_efficiency_score(item, now):
         """
         Calculate efficiency score (0-100)
         Higher = more efficient learning
@@ -172,7 +214,7 @@ class RealityMetricsService:
         if not item.added_at:
             return 50.0
         
-        days_elapsed = (datetime.utcnow() - item.added_at).days
+        days_elapsed = (now - item.added_at).days
         if days_elapsed == 0:
             days_elapsed = 1
         
@@ -205,28 +247,29 @@ class RealityMetricsService:
                 return "⏰ Just getting started. Stay committed!"
     
     @staticmethod
-    def get_wasted_time_analysis(user_id, days=30):
+    def get_wasted_time_analysis(user_id, days=30, now=None):
         """
         Get wasted time analysis for all user's items
         
         Returns:
             Dictionary with wasted time breakdown
         """
-        try:
-            if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
-            else:
-                user = user_id
-        except DoesNotExist:
+        user = RealityMetricsService._resolve_user(user_id)
+        if user is None:
             return {}
         
-        items = LearningItem.objects(user_id=user, status='active')
+        items = list(LearningItem.objects(user_id=user, status='active').only(
+            'id', 'title', 'added_at', 'progress_percentage'
+        ))
+        activity = RealityMetricsService._activity_by_item([item.id for item in items])
+        now = now or datetime.utcnow()
         
         total_wasted_days = 0
         item_breakdown = []
         
         for item in items:
-            wasted = RealityMetricsService._calculate_days_wasted(item)
+            progress_days = activity.get(item.id, {}).get('progress_days', 0)
+            wasted = RealityMetricsService._calculate_days_wasted(item, progress_days, now)
             total_wasted_days += wasted
             
             if wasted > 0:
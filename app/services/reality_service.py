@@ -5,6 +5,7 @@ Validates if learning plans are mathematically feasible.
 """
 from datetime import datetime
 from app.models import LearningItem, User
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 
 class RealityService:
@@ -35,7 +36,7 @@ class RealityService:
         """
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
+                user = load_user(user_id)
             else:
                 user = user_id
                 
@@ -123,7 +124,8 @@ class RealityService:
         """
         Calculate the 'Truth' metrics: Days Wasted, Actual Velocity, and Real Finish Date.
         """
-        from app.models import DailyTask, Commitment, LearningItem
+        from app.models import Commitment
+        from app.services.stats_service import StatsService
         from datetime import timedelta
         
         today = datetime.utcnow().date()
@@ -134,44 +136,24 @@ class RealityService:
         days_invested = 0
         start_check_date = today - timedelta(days=30)
         
-        # Get all tasks completed in last 30 days
-        recent_tasks = DailyTask.objects(
-            user_id=user_id,
-            completed_at__gte=start_check_date
-        )
-        
-        # Group by date
-        daily_effort = {}
-        for i in range(31):
-            date_key = (start_check_date + timedelta(days=i)).isoformat()
-            daily_effort[date_key] = 0
-            
-        for task in recent_tasks:
-            if task.completed_at:
-                d_key = task.completed_at.date().isoformat()
-                if d_key in daily_effort:
-                    daily_effort[d_key] += task.actual_duration_minutes
+        # Per-day minutes from the DailyStat rollup (31 small docs)
+        rollup = StatsService.get_daily_rollup(user_id, start_check_date, today)
+        daily_effort = {day: stats['task_minutes'] for day, stats in rollup.items()}
                     
         # Count Zero Days (skipping future or today if not over yet? simpler logic for now)
         # Note: We only count days up to yesterday to be fair, or include today if 0.
         # Let's count up to TODAY (inclusive) but maybe today isn't wasted yet? 
         # Strict Mode: Today is wasted until you work.
-        for date_str, minutes in daily_effort.items():
+        for day, minutes in daily_effort.items():
             if minutes < 5:
-                # Check if this date is substantially in the past (not future)
-                if date_str <= today.isoformat():
-                     days_wasted += 1
+                days_wasted += 1
             else:
                 days_invested += 1
                 
         # 2. Calculate Velocity (Avg min/day over last 7 days)
         velocity_window = 7
-        velocity_minutes = 0
         v_start = today - timedelta(days=velocity_window)
-        
-        for task in recent_tasks:
-            if task.completed_at and task.completed_at.date() >= v_start:
-                velocity_minutes += task.actual_duration_minutes
+        velocity_minutes = sum(minutes for day, minutes in daily_effort.items() if day >= v_start)
                 
         actual_velocity = velocity_minutes / velocity_window # min/day
         
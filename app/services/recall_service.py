@@ -1,91 +1,430 @@
-
 """
 Recall Service (Feature 12)
 Manages Active Recall and Spaced Repetition (SRS) logic.
+
+SM-2 is applied column-wise: a review session is loaded with one $in
+query into parallel repetitions/interval/easiness lists, every answer is
+scheduled in a single pass over those lists, and the results are written
+back with one bulk_write. The due queue is keyset-paginated on
+(next_review_date, _id) over the (user_id, next_review_date, _id) index.
+
+Card generation streams its source line by line, dedupes on
+Flashcard.content_hash and inserts with insert_many in batches. Uploads
+over INLINE_IMPORT_BYTES are stored in GridFS and imported by the
+jobs.import_flashcards background job, which reports progress on a
+CardImportJob.
 """
-from app.models import Flashcard, LearningItem
+import codecs
+import io
+from itertools import islice
+from app.models import Flashcard, LearningItem, CardImportJob
+from app import serialization
+from app.services.search_index import search_index_cache
+from bson import ObjectId
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+MIN_EASINESS = 1.3
+MAX_BATCH_REVIEWS = 500
+DUE_PAGE_SIZE = 50
+CARD_INSERT_BATCH = 200
+INLINE_IMPORT_BYTES = 64 * 1024  # Larger sources go to the background import job
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def iter_card_blocks(lines):
+    """
+    Yield (front, back) from blank-line separated blocks, one block at a time
+
+    The first line of a block is the front and the rest is the back; blocks
+    with only one line, or a front/back of 5 characters or fewer, are skipped.
+    """
+    block = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip():
+            block.append(line)
+            continue
+        card = _block_to_card(block)
+        block = []
+        if card:
+            yield card
+    card = _block_to_card(block)
+    if card:
+        yield card
+
+
+def _block_to_card(block):
+    if len(block) < 2:
+        return None
+    front = block[0].strip()
+    back = "\n".join(block[1:]).strip()
+    if len(front) > 5 and len(back) > 5:
+        return front, back
+    return None
+
+
+def source_lines(stream, filename=None):
+    """
+    Yield (line, bytes_consumed) from a binary stream without loading it whole
+
+    Text is decoded as UTF-8 incrementally. PDFs are read page by page when
+    pypdf is installed.
+    """
+    if (filename or '').lower().endswith('.pdf'):
+        yield from _pdf_lines(stream)
+        return
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    consumed, pending = 0, ''
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        consumed += len(chunk)
+        pending += decoder.decode(chunk or b'', final=not chunk)
+        *complete, pending = pending.split('\n')
+        for line in complete:
+            yield line, consumed
+        if not chunk:
+            break
+    if pending:
+        yield pending, consumed
+
+
+def _pdf_lines(stream):
+    if pypdf is None:
+        raise ValueError("PDF import requires the pypdf package")
+    reader = pypdf.PdfReader(stream)
+    total = getattr(stream, 'length', 0) or 0
+    pages = len(reader.pages)
+    for number, page in enumerate(reader.pages, start=1):
+        consumed = total * number // pages if pages else total
+        for line in (page.extract_text() or '').splitlines():
+            yield line, consumed
+        yield '', consumed  # A page break ends the block
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def sm2_schedule(repetitions, intervals, easiness, qualities):
+    """
+    SuperMemo-2 over parallel lists (one entry per card)
+
+    quality: 0 (blackout) to 5 (perfect response). A failed recall (< 3)
+    resets repetitions and interval and leaves EF unchanged.
+
+    Returns:
+        (repetitions, intervals, easiness) as new lists
+    """
+    passed = [q >= 3 for q in qualities]
+    reps = [r + 1 if ok else 0 for r, ok in zip(repetitions, passed)]
+    new_intervals = [
+        (1 if r == 1 else 6 if r == 2 else int(i * ef)) if ok else 1
+        for r, i, ef, ok in zip(reps, intervals, easiness, passed)
+    ]
+    # EF' = EF + (0.1 - (5-q) * (0.08 + (5-q)*0.02))
+    new_easiness = [
+        max(MIN_EASINESS, ef + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))) if ok else ef
+        for ef, q, ok in zip(easiness, qualities, passed)
+    ]
+    return reps, new_intervals, new_easiness
+
+
+def _object_id(value, kind='card'):
+    try:
+        return value if isinstance(value, ObjectId) else ObjectId(str(value))
+    except Exception:
+        raise ValueError(f"Invalid {kind} id: {value}")
+
+
+def _quality(value):
+    try:
+        quality = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid quality: {value}")
+    if not 0 <= quality <= 5:
+        raise ValueError(f"Quality must be between 0 and 5, got {quality}")
+    return quality
+
 
 class RecallService:
     
     @staticmethod
-    def process_review(card_id, quality):
+    def process_review(card_id, quality, user_id=None):
         """
-        Process a review using SuperMemo-2 Algorithm.
+        Process a single review using SuperMemo-2 Algorithm.
         quality: 0 (blackout) to 5 (perfect response).
         """
-        card = Flashcard.objects.get(id=card_id)
-        
-        # SM-2 Algorithm
-        if quality < 3:
-            # Failed recall
-            card.repetitions = 0
-            card.interval = 1
-        else:
-            # Successful recall
-            card.repetitions += 1
-            if card.repetitions == 1:
-                card.interval = 1
-            elif card.repetitions == 2:
-                card.interval = 6
-            else:
-                card.interval = int(card.interval * card.easiness_factor)
-            
-            # Update EF
-            # EF' = EF + (0.1 - (5-q) * (0.08 + (5-q)*0.02))
-            # q = quality
-            q = quality
-            new_ef = card.easiness_factor + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
-            if new_ef < 1.3:
-                new_ef = 1.3
-            card.easiness_factor = new_ef
-            
-        # Update dates
-        card.last_reviewed_at = datetime.utcnow()
-        card.next_review_date = datetime.utcnow() + timedelta(days=card.interval)
-        card.save()
-        
+        if user_id is None:
+            card = Flashcard.objects.only('user_id').get(id=card_id)
+            user_id = card.user_id.id
+        result = RecallService.review_batch(user_id, [{'card_id': card_id, 'quality': quality}])
+        if not result['cards']:
+            raise Flashcard.DoesNotExist(f"Flashcard {card_id} not found")
+        card = result['cards'][0]
         return {
-            'next_review': card.next_review_date.isoformat(),
-            'interval': card.interval,
-            'message': 'Scheduled for review in ' + str(card.interval) + ' days.'
+            'next_review': card['next_review'],
+            'interval': card['interval'],
+            'message': 'Scheduled for review in ' + str(card['interval']) + ' days.'
+        }
+
+    @staticmethod
+    def review_batch(user_id, reviews, now=None):
+        """
+        Apply a whole session's answers and persist them in one bulk_write
+
+        Args:
+            reviews: [{'card_id': ..., 'quality': 0-5}, ...] in answer order.
+                A card answered more than once (relearning) is scheduled
+                once per answer, in order.
+
+        Returns:
+            {'reviewed', 'cards': [{'id', 'next_review', 'interval'}], 'missing': [ids]}
+        """
+        if len(reviews) > MAX_BATCH_REVIEWS:
+            raise ValueError(f"At most {MAX_BATCH_REVIEWS} reviews per batch")
+        now = now or datetime.utcnow()
+        answers = [(_object_id(r.get('card_id')), _quality(r.get('quality'))) for r in reviews]
+        if not answers:
+            return {'reviewed': 0, 'cards': [], 'missing': []}
+
+        # Cards in first-answer order; passes[k] holds each card's k-th answer
+        order, passes = {}, []
+        for card_id, quality in answers:
+            seen = order.setdefault(card_id, [])
+            if len(passes) <= len(seen):
+                passes.append({})
+            passes[len(seen)][card_id] = quality
+            seen.append(quality)
+
+        state = {
+            doc['_id']: doc for doc in Flashcard._get_collection().find(
+                {'_id': {'$in': list(order)}, 'user_id': _object_id(user_id, 'user')},
+                {'repetitions': 1, 'interval': 1, 'easiness_factor': 1}
+            )
+        }
+        ids = [card_id for card_id in order if card_id in state]
+        reps = [state[i].get('repetitions', 0) for i in ids]
+        intervals = [state[i].get('interval', 0) for i in ids]
+        easiness = [state[i].get('easiness_factor', 2.5) for i in ids]
+
+        for answered in passes:
+            rows = [n for n, card_id in enumerate(ids) if card_id in answered]
+            r, i, e = sm2_schedule([reps[n] for n in rows], [intervals[n] for n in rows],
+                                   [easiness[n] for n in rows], [answered[ids[n]] for n in rows])
+            for k, n in enumerate(rows):
+                reps[n], intervals[n], easiness[n] = r[k], i[k], e[k]
+
+        due = [now + timedelta(days=days) for days in intervals]
+        if ids:
+            Flashcard._get_collection().bulk_write([
+                UpdateOne({'_id': card_id}, {'$set': {
+                    'repetitions': reps[n],
+                    'interval': intervals[n],
+                    'easiness_factor': easiness[n],
+                    'last_reviewed_at': now,
+                    'next_review_date': due[n]
+                }})
+                for n, card_id in enumerate(ids)
+            ], ordered=False)
+
+        return {
+            'reviewed': sum(len(order[i]) for i in ids),
+            'cards': [
+                {'id': str(card_id), 'next_review': due[n].isoformat(), 'interval': intervals[n]}
+                for n, card_id in enumerate(ids)
+            ],
+            'missing': [str(card_id) for card_id in order if card_id not in state]
         }
 
     @staticmethod
     def generate_cards_from_text(user_id, item_id, text):
         """
-        Simple MVP generator: Splits text by double newlines.
+        Simple MVP generator: blocks are separated by blank lines.
         First line is Front, Rest is Back.
         """
-        chunks = text.split('\n\n')
-        cards_created = 0
-        
-        for chunk in chunks:
-            chunk = chunk.strip()
-            if not chunk: continue
-            
-            lines = chunk.split('\n')
-            if len(lines) < 2: continue # Need at least Front and Back
-            
-            front = lines[0].strip()
-            back = "\n".join(lines[1:]).strip()
-            
-            if len(front) > 5 and len(back) > 5:
-                Flashcard(
-                    user_id=user_id,
-                    learning_item_id=item_id,
-                    front=front,
-                    back=back
-                ).save()
-                cards_created += 1
-                
-        return cards_created
+        lines = ((line, 0) for line in io.StringIO(text))
+        return RecallService.import_cards(user_id, item_id, lines)['created']
+
+    @staticmethod
+    def import_cards(user_id, item_id, lines, job=None):
+        """
+        Parse, dedupe and insert cards from a stream of lines
+
+        Cards are inserted CARD_INSERT_BATCH at a time with insert_many,
+        skipping any whose content hash the user already has (or that
+        repeat earlier in the same source).
+
+        Args:
+            lines: iterable of (line, bytes_consumed_so_far)
+            job: CardImportJob to report progress on after each batch
+
+        Returns:
+            {'created', 'duplicates'}
+        """
+        user_oid, item_oid = _object_id(user_id, 'user'), _object_id(item_id, 'learning item')
+        collection = Flashcard._get_collection()
+        RecallService._backfill_hashes(user_oid)
+        totals = {'created': 0, 'duplicates': 0}
+        position = [0]
+
+        def tracked():
+            for line, consumed in lines:
+                position[0] = consumed
+                yield line
+
+        for batch in _batched(iter_card_blocks(tracked()), CARD_INSERT_BATCH):
+            fresh = {}
+            for front, back in batch:
+                fresh.setdefault(Flashcard.hash_content(front, back), (front, back))
+            existing = {
+                doc['content_hash'] for doc in collection.find(
+                    {'user_id': user_oid, 'content_hash': {'$in': list(fresh)}}, {'content_hash': 1}
+                )
+            }
+            now = datetime.utcnow()
+            docs = [
+                {'user_id': user_oid, 'learning_item_id': item_oid, 'front': front, 'back': back,
+                 'content_hash': digest, 'easiness_factor': 2.5, 'interval': 0, 'repetitions': 0,
+                 'created_at': now, 'next_review_date': now}
+                for digest, (front, back) in fresh.items() if digest not in existing
+            ]
+            if docs:
+                collection.insert_many(docs, ordered=False)
+                # Raw inserts skip the Flashcard signals that drop the search index
+                search_index_cache.invalidate_user(user_oid)
+            totals['created'] += len(docs)
+            totals['duplicates'] += len(batch) - len(docs)
+            if job is not None:
+                CardImportJob.objects(id=job.id).update(
+                    set__bytes_read=position[0],
+                    set__cards_created=totals['created'],
+                    set__duplicates=totals['duplicates']
+                )
+        return totals
 
     @staticmethod
-    def get_due_cards(user_id):
-        """Get cards due before or on today"""
-        now = datetime.utcnow()
-        return Flashcard.objects(
-            user_id=user_id,
-            next_review_date__lte=now
-        ).order_by('next_review_date')
+    def _backfill_hashes(user_oid):
+        """Fingerprint cards created before content_hash existed (one-off per user)"""
+        collection = Flashcard._get_collection()
+        ops = [
+            UpdateOne({'_id': doc['_id']},
+                      {'$set': {'content_hash': Flashcard.hash_content(doc.get('front', ''), doc.get('back', ''))}})
+            for doc in collection.find({'user_id': user_oid, 'content_hash': {'$exists': False}}, {'front': 1, 'back': 1})
+        ]
+        if ops:
+            collection.bulk_write(ops, ordered=False)
+
+    @staticmethod
+    def start_card_import(user_id, item_id, stream, filename=None):
+        """
+        Store an upload in GridFS and queue it for the import job
+
+        Returns:
+            CardImportJob (already finished when jobs run eagerly)
+        """
+        from app.jobs import enqueue, import_flashcards
+
+        if not LearningItem.objects(id=item_id, user_id=user_id).only('id').first():
+            raise ValueError("Learning item not found")
+        job = CardImportJob(user_id=user_id, learning_item_id=item_id, filename=filename)
+        job.source.put(stream, filename=filename)
+        job.bytes_total = job.source.length or 0
+        job.save()
+        enqueue(import_flashcards, str(job.id))
+        return job.reload()
+
+    @staticmethod
+    def run_card_import(job_id):
+        """Worker side of start_card_import: stream the stored source into cards"""
+        job = CardImportJob.objects(id=job_id).first()
+        if not job or job.status not in ('queued', 'running'):
+            return None
+        job.update(set__status='running')
+        try:
+            totals = RecallService.import_cards(
+                job.user_id.id, job.learning_item_id.id, source_lines(job.source, job.filename), job
+            )
+            job.update(set__status='completed', set__bytes_read=job.bytes_total,
+                       set__cards_created=totals['created'], set__duplicates=totals['duplicates'],
+                       set__finished_at=datetime.utcnow())
+        except Exception as e:
+            print(f"Card import {job_id} failed: {e}")
+            job.update(set__status='failed', set__error=str(e), set__finished_at=datetime.utcnow())
+        finally:
+            job.source.delete()
+            job.update(unset__source=True)
+        return job.reload()
+
+    @staticmethod
+    def get_import_job(user_id, job_id):
+        return CardImportJob.objects(id=job_id, user_id=user_id).first()
+
+    @staticmethod
+    def get_due_cards(user_id, limit=DUE_PAGE_SIZE, cursor=None, now=None, lean=False):
+        """
+        One page of cards due on or before now, oldest first
+
+        Args:
+            cursor: next_cursor from the previous page
+            lean: Return LeanRecord rows (list projection) instead of Documents
+
+        Returns:
+            (cards, next_cursor); next_cursor is None on the last page
+        """
+        now = now or datetime.utcnow()
+        query = {'user_id': _object_id(user_id, 'user'), 'next_review_date': {'$lte': now}}
+        if cursor:
+            try:
+                due_at, last_id = cursor.split('_', 1)
+                due_at, last_id = datetime.fromisoformat(due_at), ObjectId(last_id)
+            except Exception:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            query['$or'] = [
+                {'next_review_date': {'$gt': due_at, '$lte': now}},
+                {'next_review_date': due_at, '_id': {'$gt': last_id}}
+            ]
+
+        page = Flashcard.objects(__raw__=query).order_by('next_review_date', 'id').limit(limit + 1)
+        cards = serialization.lean(page) if lean else list(page)
+        next_cursor = None
+        if len(cards) > limit:
+            cards = cards[:limit]
+            last = cards[-1]
+            next_cursor = f"{last.next_review_date.isoformat()}_{last.id}"
+        return cards, next_cursor
+
+    @staticmethod
+    def get_due_forecast(user_id, days=14, now=None):
+        """
+        Cards coming due per day for the next `days` days; overdue cards
+        count towards today
+
+        Returns:
+            {'YYYY-MM-DD': count, ...} zero-filled, today first
+        """
+        now = now or datetime.utcnow()
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon = today + timedelta(days=days)
+        rows = Flashcard._get_collection().aggregate([
+            {'$match': {'user_id': _object_id(user_id, 'user'), 'next_review_date': {'$lt': horizon}}},
+            {'$project': {'day': {'$dateToString': {'format': '%Y-%m-%d', 'date': {
+                '$cond': [{'$lt': ['$next_review_date', today]}, today, '$next_review_date']
+            }}}}},
+            {'$group': {'_id': '$day', 'count': {'$sum': 1}}}
+        ])
+        forecast = {(today + timedelta(days=n)).strftime('%Y-%m-%d'): 0 for n in range(days)}
+        for row in rows:
+            if row['_id'] in forecast:
+                forecast[row['_id']] = row['count']
+        return forecast
@@ -0,0 +1,236 @@
+"""
+Reminder Service
+Daily reminder emails for users with daily_reminders enabled.
+
+Recipients are streamed with a projection (_id, name, email) in batches.
+Each batch is claimed in the ReminderDelivery ledger with one unordered
+insert_many on a unique per-user-per-day key, so users already reminded
+today are skipped. The batch is then sent over a single SMTP session
+(mail.connect()) by a bounded thread pool. Failed sends release their
+claim so the next run retries them; a claim still 'sending' after
+SENDING_LEASE_MINUTES (its worker crashed) is taken over by the next run.
+
+    python scripts/send_reminders.py [--workers 8] [--batch-size 100]
+
+For local testing point MAIL_SERVER/MAIL_PORT at a debugging SMTP server
+(MAIL_USE_TLS=False); scripts/benchmark_reminders.py starts one in-process.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import current_app
+from flask_mail import Message
+from pymongo.errors import BulkWriteError
+from app.models import User, ReminderDelivery
+from app.services.otp_service import mail
+
+REMINDER_TEMPLATES = [
+    "Rise and shine! The world is built by those who show up. Time to learn.",
+    "Consistency is key. 15 minutes today is better than 0 minutes.",
+    "Your future self will thank you for the focus you put in today.",
+    "Small steps every day add up to big results. Let's get started.",
+    "The best time to plant a tree was 20 years ago. The second best time is now."
+]
+
+
+class DeliveryMetrics:
+    """Thread-safe counters and per-message send latency for one dispatch run"""
+
+    def __init__(self):
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.sessions = 0
+        self._latencies_ms = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, outcome, latency_ms=None):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if latency_ms is not None:
+                self._latencies_ms.append(latency_ms)
+
+    def add(self, outcome, count):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + count)
+
+    def summary(self):
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            latencies = sorted(self._latencies_ms)
+
+            def percentile(p):
+                if not latencies:
+                    return 0.0
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+            return {
+                'sent': self.sent,
+                'skipped': self.skipped,
+                'failed': self.failed,
+                'smtp_sessions': self.sessions,
+                'elapsed_seconds': round(elapsed, 2),
+                'per_second': round(self.sent / elapsed, 1) if elapsed > 0 else 0.0,
+                'latency_ms': {'p50': percentile(0.50), 'p95': percentile(0.95), 'max': percentile(1.0)}
+            }
+
+
+class ReminderService:
+
+    DEFAULT_WORKERS = 8
+    DEFAULT_BATCH_SIZE = 100  # Messages per SMTP session
+    SENDING_LEASE_MINUTES = 30  # A batch takes seconds; older 'sending' claims belong to a dead worker
+    KIND = 'daily_reminder'
+
+    @staticmethod
+    def dispatch_daily_reminders(workers=None, batch_size=None, now=None):
+        """
+        Send today's reminder to every opted-in user not yet reminded today
+
+        Must be called inside an app context.
+
+        Returns:
+            DeliveryMetrics.summary() dict
+        """
+        workers = workers or ReminderService.DEFAULT_WORKERS
+        batch_size = batch_size or ReminderService.DEFAULT_BATCH_SIZE
+        day = (now or datetime.utcnow()).date().isoformat()
+        app = current_app._get_current_object()
+        metrics = DeliveryMetrics()
+
+        # At most two batches queued per worker, so memory stays bounded
+        in_flight = threading.BoundedSemaphore(workers * 2)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reminders') as pool:
+            for batch in ReminderService._stream_recipients(batch_size):
+                claimed = ReminderService._claim(batch, day)
+                metrics.add('skipped', len(batch) - len(claimed))
+                if not claimed:
+                    continue
+                in_flight.acquire()
+                future = pool.submit(ReminderService._deliver_batch, app, claimed, day, metrics)
+                future.add_done_callback(lambda _: in_flight.release())
+        return metrics.summary()
+
+    @staticmethod
+    def _stream_recipients(batch_size):
+        """Projected raw user docs, batch_size at a time"""
+        cursor = User._get_collection().find(
+            {'daily_reminders': True}, {'name': 1, 'email': 1}
+        ).batch_size(batch_size)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _key(user_id, day):
+        return f"{ReminderService.KIND}:{user_id}:{day}"
+
+    @staticmethod
+    def _claim(users, day):
+        """
+        Insert idempotency keys for a batch; returns the users this run now owns
+
+        Keys already present are skipped unless they are 'sending' claims
+        older than SENDING_LEASE_MINUTES, which are taken over in one
+        conditional update_many (stamped with this claim's id).
+        """
+        now = datetime.utcnow()
+        claim_id = str(ObjectId())
+        deliveries = ReminderDelivery._get_collection()
+        docs = [
+            {'key': ReminderService._key(u['_id'], day), 'user_id': u['_id'], 'status': 'sending',
+             'created_at': now, 'claim_id': claim_id}
+            for u in users
+        ]
+        try:
+            deliveries.insert_many(docs, ordered=False)
+            return users
+        except BulkWriteError as e:
+            taken = {err['index'] for err in e.details.get('writeErrors', []) if err.get('code') == 11000}
+            if len(taken) != len(e.details.get('writeErrors', [])):
+                raise
+
+        taken_keys = [docs[i]['key'] for i in taken]
+        expired = now - timedelta(minutes=ReminderService.SENDING_LEASE_MINUTES)
+        stale = deliveries.update_many(
+            {'key': {'$in': taken_keys}, 'status': 'sending', 'created_at': {'$lt': expired}},
+            {'$set': {'created_at': now, 'claim_id': claim_id}}
+        )
+        if stale.modified_count:
+            reclaimed = {doc['key'] for doc in deliveries.find(
+                {'key': {'$in': taken_keys}, 'claim_id': claim_id}, {'key': 1}
+            )}
+            taken = {i for i in taken if docs[i]['key'] not in reclaimed}
+        return [u for i, u in enumerate(users) if i not in taken]
+
+    @staticmethod
+    def _deliver_batch(app, users, day, metrics):
+        """Send one batch over a single SMTP session, then settle the claims"""
+        sent, failed = [], []
+        with app.app_context():
+            try:
+                with mail.connect() as conn:
+                    metrics.add('sessions', 1)
+                    for user in users:
+                        started = time.perf_counter()
+                        try:
+                            conn.send(ReminderService._build_message(user))
+                            sent.append(user['_id'])
+                            metrics.record('sent', (time.perf_counter() - started) * 1000)
+                        except Exception as e:
+                            print(f"❌ Failed to send to {user.get('email')}: {e}")
+                            failed.append(user['_id'])
+                            metrics.record('failed')
+            except Exception as e:
+                # Session dropped: whatever was not sent (or already counted) failed
+                print(f"❌ SMTP session failed: {e}")
+                done = set(sent) | set(failed)
+                lost = [u['_id'] for u in users if u['_id'] not in done]
+                metrics.add('failed', len(lost))
+                failed += lost
+
+        deliveries = ReminderDelivery._get_collection()
+        if sent:
+            deliveries.update_many(
+                {'key': {'$in': [ReminderService._key(uid, day) for uid in sent]}},
+                {'$set': {'status': 'sent', 'sent_at': datetime.utcnow()}}
+            )
+        if failed:
+            # Release so the next run retries these users
+            deliveries.delete_many({'key': {'$in': [ReminderService._key(uid, day) for uid in failed]}})
+
+    @staticmethod
+    def _build_message(user):
+        first_name = (user.get('name') or 'there').split(' ')[0]
+        return Message(
+            subject="🚀 Daily Learning Motivation",
+            recipients=[user['email']],
+            html=f"""
+            <div style="font-family: Arial; padding: 20px; max-width: 600px; margin: 0 auto; border: 1px solid #eee; border-radius: 10px;">
+                <h2 style="color: #667eea;">Good Morning, {first_name}!</h2>
+                <p style="font-size: 16px; color: #555;">"{random.choice(REMINDER_TEMPLATES)}"</p>
+
+                <div style="margin: 30px 0; text-align: center;">
+                    <a href="http://localhost:5000/dashboard"
+                       style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                              color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; font-weight: bold;">
+                        Open Dashboard
+                    </a>
+                </div>
+
+                <p style="font-size: 12px; color: #999;">
+                    You are receiving this because you enabled Daily Reminders.
+                    <a href="http://localhost:5000/preferences">Unsubscribe</a>
+                </p>
+            </div>
+            """
+        )
@@ -5,6 +5,7 @@ Aggregates performance data for weekly summaries.
 """
 from datetime import datetime, timedelta
 from app.models import DailyTask
+from app.services.stats_service import StatsService
 import calendar
 
 class WeeklyReviewService:
@@ -17,20 +18,21 @@ class WeeklyReviewService:
         today = datetime.utcnow().date()
         week_start = today - timedelta(days=7)
         
-        tasks_completed = DailyTask.objects(
-            user_id=user_id,
-            completed_at__gte=week_start
-        )
+        # Per-day totals from the DailyStat rollup (8 small docs)
+        rollup = StatsService.get_daily_rollup(user_id, week_start, today)
         
         total_minutes = 0
-        completed_count = len(tasks_completed)
+        completed_count = 0
         
         # Find Most Productive Day
         daily_dist = {}
-        for t in tasks_completed:
-            total_minutes += t.actual_duration_minutes
-            day_name = t.completed_at.strftime('%A')
-            daily_dist[day_name] = daily_dist.get(day_name, 0) + t.actual_duration_minutes
+        for day, stats in rollup.items():
+            if not stats['tasks_completed']:
+                continue
+            total_minutes += stats['task_minutes']
+            completed_count += stats['tasks_completed']
+            day_name = day.strftime('%A')
+            daily_dist[day_name] = daily_dist.get(day_name, 0) + stats['task_minutes']
             
         if daily_dist:
             most_productive_day = max(daily_dist, key=daily_dist.get)
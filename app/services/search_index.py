@@ -0,0 +1,134 @@
+"""
+In-process search index (Feature 15)
+Per-user inverted index with prefix lookups for typeahead, and the
+fallback engine when MongoDB text indexes are unavailable.
+"""
+import re
+import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with'
+])
+PREFIX_MATCH_WEIGHT = 0.75  # Partial-word matches rank below whole-word matches
+
+
+def tokenize(text):
+    """Lowercase word tokens with stop words removed"""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text if t)
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """Term -> {doc_id: weight} postings plus a sorted vocabulary for prefixes"""
+
+    def __init__(self, field_weights):
+        self.field_weights = field_weights
+        self._postings = defaultdict(dict)
+        self._docs = {}
+        self._vocab = None
+
+    def add(self, doc_id, doc):
+        """Index a raw document (dict) under doc_id"""
+        self._docs[doc_id] = doc
+        for field, weight in self.field_weights.items():
+            for term in tokenize(doc.get(field)):
+                postings = self._postings[term]
+                postings[doc_id] = postings.get(doc_id, 0) + weight
+        self._vocab = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, doc_id):
+        return self._docs.get(doc_id)
+
+    def _expand_prefix(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        start = bisect_left(self._vocab, prefix)
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def search(self, query, prefix=False):
+        """
+        Score documents matching every query term
+
+        Args:
+            query: Raw query string
+            prefix: Treat the last term as a prefix (typeahead)
+
+        Returns:
+            List of (score, doc_id) sorted by score desc, doc_id asc
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for position, term in enumerate(terms):
+            term_scores = dict(self._postings.get(term, {}))
+            if prefix and position == len(terms) - 1:
+                for candidate in self._expand_prefix(term):
+                    if candidate == term:
+                        continue
+                    for doc_id, weight in self._postings[candidate].items():
+                        term_scores[doc_id] = max(
+                            term_scores.get(doc_id, 0), weight * PREFIX_MATCH_WEIGHT
+                        )
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                return []
+
+        return sorted(((s, d) for d, s in scores.items()), key=lambda r: (-r[0], r[1]))
+
+
+class SearchIndexCache:
+    """LRU of per-user indexes with TTL; invalidated when a source document changes"""
+
+    def __init__(self, ttl_seconds=120, max_entries=512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (user_id, source) -> (index, built_at)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, user_id, source, builder):
+        key = (str(user_id), source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        index = builder()
+        with self._lock:
+            self._entries[key] = (index, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate_user(self, user_id):
+        user_key = str(user_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_key]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+search_index_cache = SearchIndexCache()
@@ -1,73 +1,251 @@
-
 """
 Search Service (Feature 15)
 Universal Text Search across collections.
+
+Full-word queries run as a `$text` aggregation per collection, ranked by
+text score. Typeahead queries, and any collection without a text index,
+are answered from the per-user in-process index in search_index.py.
+Each source pages independently with an opaque (score, _id) cursor.
+
+Saves and bulk inserts invalidate a user's index through signals. Deletes
+invalidate explicitly at the call site: a post_delete receiver would turn
+every QuerySet.delete() on these models into a per-document loop.
 """
-from app.models import LearningItem, DailyTask, Flashcard
-from mongoengine.queryset.visitor import Q
+import base64
+import json
+from bson import ObjectId
+from mongoengine import signals
+from pymongo.errors import OperationFailure
+from app.models import LearningItem, DailyTask, Flashcard, Bookmark, LiveClass
+from app.services.search_index import InvertedIndex, search_index_cache
+
+
+def _library_result(doc):
+    source_type = doc.get('source_type')
+    return {
+        'title': doc.get('title'),
+        'subtitle': source_type.capitalize() if source_type else 'Resource',
+        'link': '/inbox',
+        'icon': 'fa-book'
+    }
+
+
+def _task_result(doc):
+    return {
+        'title': doc.get('title'),
+        'subtitle': f"{doc.get('status', 'pending')} • {doc.get('estimated_duration_minutes') or 0}m",
+        'link': '/dashboard',
+        'icon': 'fa-check-square'
+    }
+
+
+def _flashcard_result(doc):
+    return {
+        'title': doc.get('front'),
+        'subtitle': 'Flashcard',
+        'link': '/flashcards',
+        'icon': 'fa-clone'
+    }
+
+
+def _bookmark_result(doc):
+    return {
+        'title': doc.get('title'),
+        'subtitle': doc.get('topic') or doc.get('platform') or 'Bookmark',
+        'link': '/bookmarks',
+        'icon': 'fa-bookmark'
+    }
+
+
+def _live_class_result(doc):
+    scheduled = doc.get('scheduled_at')
+    return {
+        'title': doc.get('title') or 'Live Class',
+        'subtitle': scheduled.strftime('%b %d, %H:%M') if scheduled else 'Live Class',
+        'link': '/schedule',
+        'icon': 'fa-video'
+    }
+
+
+# Result group -> model, weighted text fields, display-only fields, formatter.
+# Weights mirror the text index declarations in app/models.py.
+SEARCH_SOURCES = {
+    'library': {
+        'model': LearningItem,
+        'weights': {'title': 10, 'tags': 5, 'description': 2},
+        'display': ['source_type'],
+        'format': _library_result
+    },
+    'tasks': {
+        'model': DailyTask,
+        'weights': {'title': 10},
+        'display': ['status', 'estimated_duration_minutes'],
+        'format': _task_result
+    },
+    'flashcards': {
+        'model': Flashcard,
+        'weights': {'front': 10, 'back': 5},
+        'display': [],
+        'format': _flashcard_result
+    },
+    'bookmarks': {
+        'model': Bookmark,
+        'weights': {'title': 10, 'tags': 5, 'topic': 5, 'description': 2},
+        'display': ['platform'],
+        'format': _bookmark_result
+    },
+    'live_classes': {
+        'model': LiveClass,
+        'weights': {'title': 10, 'description': 2},
+        'display': ['scheduled_at'],
+        'format': _live_class_result
+    }
+}
+
 
 class SearchService:
-    
+
+    DEFAULT_LIMIT = 5
+    MAX_LIMIT = 50
+
     @staticmethod
-    def universal_search(user_id, query):
+    def encode_cursor(score, doc_id):
+        raw = json.dumps([score, str(doc_id)]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            score, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return float(score), ObjectId(doc_id)
+        except Exception:
+            raise ValueError("Invalid search cursor")
+
+    @staticmethod
+    def universal_search(user_id, query, limit=None, sources=None, cursor=None, typeahead=False):
         """
         Perform text search across multiple collections.
         Returns grouped results.
+
+        Args:
+            user_id: User ID
+            query: Search string
+            limit: Results per source (default 5, max 50)
+            sources: Optional list of result groups to search
+            cursor: Opaque cursor from a previous page (requires a single source)
+            typeahead: Treat the last word as a prefix
+
+        Returns:
+            Dictionary of result groups plus 'next_cursors' per group
         """
-        results = {
-            'tasks': [],
-            'library': [],
-            'flashcards': []
-        }
-        
+        limit = min(max(int(limit or SearchService.DEFAULT_LIMIT), 1), SearchService.MAX_LIMIT)
+        sources = sources or list(SEARCH_SOURCES)
+        unknown = [s for s in sources if s not in SEARCH_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown search source: {', '.join(unknown)}")
+        if cursor and len(sources) != 1:
+            raise ValueError("A cursor can only be used with a single source")
+
+        results = {name: [] for name in SEARCH_SOURCES}
+        results['next_cursors'] = {name: None for name in SEARCH_SOURCES}
+
+        query = (query or '').strip()
         if not query: return results
-        
-        # 1. Search Learning Items (Library)
-        # Using search_text if index exists, else partial regex for MVP fallback resilience
-        # Since we added indexes, search_text should work IF indexes are built.
-        # MongoEngine builds indexes on app start usually.
-        # Fallback: regex for safety during dev/hot-reload
-        
-        # LIBRARY
-        items = LearningItem.objects.filter(
-            Q(user_id=user_id) & (Q(title__icontains=query) | Q(description__icontains=query))
-        ).limit(5)
-        
-        for item in items:
-            results['library'].append({
-                'id': str(item.id),
-                'title': item.title,
-                'subtitle': item.content_type.capitalize() if item.content_type else 'Resource',
-                'link': '/bookmarks',  # Ideally deep link
-                'icon': 'fa-book'
-            })
-            
-        # TASKS
-        tasks = DailyTask.objects.filter(
-            Q(user_id=user_id) & Q(title__icontains=query)
-        ).limit(5)
-        
-        for t in tasks:
-            results['tasks'].append({
-                'id': str(t.id),
-                'title': t.title,
-                'subtitle': f"{t.status} • {t.duration_minutes}m",
-                'link': '/dashboard',
-                'icon': 'fa-check-square'
-            })
-            
-        # FLASHCARDS
-        cards = Flashcard.objects.filter(
-            Q(user_id=user_id) & (Q(front__icontains=query) | Q(back__icontains=query))
-        ).limit(5)
-        
-        for c in cards:
-            results['flashcards'].append({
-                'id': str(c.id),
-                'title': c.front,
-                'subtitle': 'Flashcard',
-                'link': '/flashcards',
-                'icon': 'fa-clone'
-            })
-            
+
+        after = SearchService.decode_cursor(cursor) if cursor else None
+        uid = ObjectId(str(user_id))
+
+        for name in sources:
+            rows = None
+            if not typeahead:
+                rows = SearchService._text_search(name, uid, query, limit + 1, after)
+            if rows is None:
+                rows = SearchService._index_search(name, uid, query, limit + 1, after, prefix=typeahead)
+
+            formatter = SEARCH_SOURCES[name]['format']
+            for score, doc in rows[:limit]:
+                entry = {'id': str(doc['_id']), 'score': round(score, 3)}
+                entry.update(formatter(doc))
+                results[name].append(entry)
+
+            if len(rows) > limit:
+                last_score, last_doc = rows[limit - 1]
+                results['next_cursors'][name] = SearchService.encode_cursor(last_score, last_doc['_id'])
+
         return results
+
+    @staticmethod
+    def _projection(name):
+        source = SEARCH_SOURCES[name]
+        fields = list(source['weights']) + source['display']
+        return {field: 1 for field in fields}
+
+    @staticmethod
+    def _text_search(name, uid, query, limit, after):
+        """$text aggregation ranked by textScore; None when no text index exists"""
+        model = SEARCH_SOURCES[name]['model']
+        pipeline = [
+            {'$match': {'$text': {'$search': query}, 'user_id': uid}},
+            {'$addFields': {'_score': {'$meta': 'textScore'}}}
+        ]
+        if after:
+            score, last_id = after
+            pipeline.append({'$match': {'$or': [
+                {'_score': {'$lt': score}},
+                {'_score': score, '_id': {'$gt': last_id}}
+            ]}})
+        projection = SearchService._projection(name)
+        projection['_score'] = 1
+        pipeline += [
+            {'$sort': {'_score': -1, '_id': 1}},
+            {'$limit': limit},
+            {'$project': projection}
+        ]
+        try:
+            docs = list(model._get_collection().aggregate(pipeline))
+        except (OperationFailure, NotImplementedError):
+            return None
+        return [(doc.pop('_score'), doc) for doc in docs]
+
+    @staticmethod
+    def _index_search(name, uid, query, limit, after, prefix=False):
+        """Answer from the cached per-user inverted index"""
+        index = search_index_cache.get_or_build(
+            uid, name, lambda: SearchService._build_index(name, uid)
+        )
+        rows = []
+        for score, doc_id in index.search(query, prefix=prefix):
+            if after and (score > after[0] or (score == after[0] and doc_id <= after[1])):
+                continue
+            rows.append((score, index.get(doc_id)))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    @staticmethod
+    def _build_index(name, uid):
+        source = SEARCH_SOURCES[name]
+        index = InvertedIndex(source['weights'])
+        cursor = source['model']._get_collection().find(
+            {'user_id': uid}, SearchService._projection(name)
+        )
+        for doc in cursor:
+            index.add(doc['_id'], doc)
+        return index
+
+
+def _invalidate_search_index(sender, document, **kwargs):
+    ref = document._data.get('user_id')
+    user_id = getattr(ref, 'id', ref)
+    if user_id is not None:
+        search_index_cache.invalidate_user(user_id)
+
+
+def _invalidate_search_index_bulk(sender, documents, **kwargs):
+    for document in documents:
+        _invalidate_search_index(sender, document)
+
+
+for _source in SEARCH_SOURCES.values():
+    signals.post_save.connect(_invalidate_search_index, sender=_source['model'])
+    signals.post_bulk_insert.connect(_invalidate_search_index_bulk, sender=_source['model'])
@@ -2,10 +2,20 @@
 """
 Stats Service (Phase 29)
 Manages pre-aggregated statistics for high-performance dashboards.
+
+DailyStat is the per-user, per-day rollup layer: focus sessions increment
+it on end, task completion (TaskGeneratorService.complete_task) increments
+the task counters, and the burnout, truth-metric and weekly-summary reads
+fetch one small document per day from it. rebuild_task_rollups() backfills the task counters from
+DailyTask history (scripts/backfill_daily_stats.py). merge_duplicate_days()
+folds days written twice before the unique (user_id, date) index existed;
+ensure_indexes runs it before building that index.
 """
-from app.models import DailyStat, User
+from app.models import DailyStat, DailyTask, User
 from datetime import datetime, timedelta
 
+ROLLUP_FIELDS = ('total_minutes', 'sessions_count', 'task_minutes', 'tasks_completed')
+
 class StatsService:
     
     @staticmethod
@@ -67,3 +77,88 @@ class StatsService:
         except Exception as e:
             print(f"Stats Fetch Error: {e}")
             return []
+
+    @staticmethod
+    def get_daily_rollup(user_id, start_date, end_date):
+        """
+        Read the DailyStat rollup for an inclusive date range.
+
+        Args:
+            start_date, end_date: datetime.date bounds (UTC days)
+
+        Returns:
+            {date: {field: value}} for every day in the range, zero-filled
+        """
+        start = datetime(start_date.year, start_date.month, start_date.day)
+        end = datetime(end_date.year, end_date.month, end_date.day)
+
+        days = {}
+        current = start_date
+        while current <= end_date:
+            days[current] = dict.fromkeys(ROLLUP_FIELDS, 0)
+            current += timedelta(days=1)
+
+        rows = DailyStat.objects(
+            user_id=user_id,
+            date__gte=start,
+            date__lte=end
+        ).only('date', *ROLLUP_FIELDS).as_pymongo()
+
+        for row in rows:
+            day = days.get(row['date'].date())
+            if day is not None:
+                day.update((field, row.get(field, 0)) for field in ROLLUP_FIELDS)
+        return days
+
+    @staticmethod
+    def merge_duplicate_days():
+        """
+        Fold duplicate (user_id, date) rollups into one document each
+
+        Returns:
+            Number of duplicate documents removed
+        """
+        collection = DailyStat._get_collection()
+        group = {'_id': {'user_id': '$user_id', 'date': '$date'}, 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}
+        group.update({field: {'$sum': f'${field}'} for field in ROLLUP_FIELDS})
+        removed = 0
+        for dup in collection.aggregate([{'$group': group}, {'$match': {'count': {'$gt': 1}}}]):
+            keep, extra = dup['ids'][0], dup['ids'][1:]
+            collection.update_one({'_id': keep}, {'$set': {field: dup[field] for field in ROLLUP_FIELDS}})
+            removed += collection.delete_many({'_id': {'$in': extra}}).deleted_count
+        return removed
+
+    @staticmethod
+    def rebuild_task_rollups(user_id=None, since=None):
+        """
+        Recompute task_minutes / tasks_completed from completed DailyTasks.
+
+        Args:
+            user_id: Limit to one user (default: everyone)
+            since: Only rebuild days on or after this datetime
+
+        Returns:
+            Number of (user, day) rollups written
+        """
+        filters = {'status': 'completed', 'completed_at__ne': None}
+        if user_id:
+            filters['user_id'] = user_id
+        if since:
+            filters['completed_at__gte'] = since
+
+        totals = {}
+        rows = DailyTask.objects(**filters).only(
+            'user_id', 'completed_at', 'actual_duration_minutes'
+        ).as_pymongo()
+        for row in rows:
+            day = row['completed_at'].replace(hour=0, minute=0, second=0, microsecond=0)
+            minutes, count = totals.get((row['user_id'], day), (0, 0))
+            totals[(row['user_id'], day)] = (minutes + (row.get('actual_duration_minutes') or 0), count + 1)
+
+        for (owner, day), (minutes, count) in totals.items():
+            DailyStat.objects(user_id=owner, date=day).update_one(
+                upsert=True,
+                set__task_minutes=minutes,
+                set__tasks_completed=count
+            )
+        return len(totals)
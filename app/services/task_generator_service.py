@@ -3,8 +3,13 @@ Task Generator Service for Feature 2: Auto Course Breakdown
 Handles intelligent task generation and scheduling
 """
 from datetime import datetime, timedelta
-from app.models import LearningItem, LearningPlan, DailyTask, User
+from flask import current_app, has_app_context
+from pymongo import ReturnDocument, InsertOne, UpdateOne, DeleteMany
+from app.models import LearningItem, LearningPlan, DailyTask, User, DailyStat
+from app.services.search_index import search_index_cache
 from mongoengine.errors import DoesNotExist
+from bson import ObjectId
+from bson.errors import InvalidId
 import math
 
 
@@ -17,6 +22,14 @@ class TaskGeneratorService:
     MAX_TASK_DURATION = 120  # Maximum 2 hours per task
     OPTIMAL_TASK_DURATION = 45  # Optimal 45 minutes per task
     
+    # Open task fields a reschedule may rewrite; status, progress and timestamps are kept
+    OPEN_STATUSES = ('pending', 'in_progress')
+    REFLOW_FIELDS = (
+        'title', 'description', 'task_type', 'scheduled_date', 'estimated_duration_minutes',
+        'content_reference', 'depends_on_task_ids', 'is_prerequisite_for',
+        'difficulty_level', 'priority_score'
+    )
+    
     @staticmethod
     def generate_learning_plan(learning_item_id, user_id, plan_config):
         """
@@ -59,8 +72,9 @@ class TaskGeneratorService:
         base_duration = item.total_duration
         buffered_duration = base_duration * (1 + buffer_pct / 100)
         
-        # Create learning plan
+        # Create learning plan (id allocated up front so tasks can reference it)
         plan = LearningPlan(
+            id=ObjectId(),
             learning_item_id=item,
             user_id=user,
             target_completion_date=target_date,
@@ -73,22 +87,37 @@ class TaskGeneratorService:
                 'buffer_added': int(buffered_duration - base_duration)
             }
         )
-        plan.save()
         
-        # Generate tasks
-        tasks = TaskGeneratorService._generate_tasks(plan, item)
+        # Lay out tasks in memory, then write the plan and all tasks
+        tasks = TaskGeneratorService._build_tasks(plan, item)
         plan.total_tasks = len(tasks)
-        plan.save()
+        plan.save(force_insert=True)
+        TaskGeneratorService._insert_tasks(tasks)
         
         return plan
     
     @staticmethod
     def _generate_tasks(plan, item):
-        """Generate individual daily tasks for a plan"""
+        """Generate individual daily tasks for a plan and persist them in one insert"""
+        tasks = TaskGeneratorService._build_tasks(plan, item)
+        TaskGeneratorService._insert_tasks(tasks)
+        return tasks
+    
+    @staticmethod
+    def _build_tasks(plan, item, start_date=None):
+        """
+        Lay out a plan's daily tasks in memory
+        
+        ObjectIds are allocated client-side so the sequential dependency
+        chain can be wired before anything is written.
+        
+        Returns:
+            List of unsaved DailyTask objects in schedule order
+        """
         tasks = []
         
         # Calculate available study days
-        start_date = datetime.utcnow()
+        start_date = start_date or datetime.utcnow()
         end_date = plan.target_completion_date
         study_days = TaskGeneratorService._calculate_study_days(
             start_date, end_date, plan.skip_weekends
@@ -105,32 +134,38 @@ class TaskGeneratorService:
         tasks_breakdown = TaskGeneratorService._calculate_task_breakdown(
             total_duration, daily_minutes, len(study_days)
         )
+        total_task_count = sum(len(v) for v in tasks_breakdown.values())
+        user_ref = plan._data.get('user_id')
         
         # Generate tasks
         task_index = 0
         for day_index, study_date in enumerate(study_days):
             day_tasks = tasks_breakdown.get(day_index, [])
+            if not day_tasks:
+                continue
+            priority = TaskGeneratorService._calculate_priority(day_index, len(study_days))
             
-            for task_duration in day_tasks:
+            for position, task_duration in enumerate(day_tasks, start=1):
                 task_index += 1
                 
                 # Determine task type and difficulty
-                progress_pct = (task_index / sum(len(v) for v in tasks_breakdown.values())) * 100
+                progress_pct = (task_index / total_task_count) * 100
                 difficulty = TaskGeneratorService._estimate_difficulty(progress_pct)
                 task_type = TaskGeneratorService._determine_task_type(task_index, progress_pct)
                 
                 # Create task
                 task = DailyTask(
+                    id=ObjectId(),
                     learning_plan_id=plan,
                     learning_item_id=item,
-                    user_id=plan.user_id,
-                    title=f"{item.title} - Day {day_index + 1}, Task {len(day_tasks)}",
+                    user_id=user_ref,
+                    title=f"{item.title} - Day {day_index + 1}, Task {position}",
                     description=f"Study session {task_index}",
                     task_type=task_type,
                     scheduled_date=study_date,
                     estimated_duration_minutes=task_duration,
                     difficulty_level=difficulty,
-                    priority_score=TaskGeneratorService._calculate_priority(day_index, len(study_days)),
+                    priority_score=priority,
                     content_reference={
                         'task_number': task_index,
                         'day_number': day_index + 1,
@@ -139,14 +174,28 @@ class TaskGeneratorService:
                 )
                 
                 # Add dependencies (sequential learning)
-                if task_index > 1:
+                if tasks:
                     task.depends_on_task_ids = [str(tasks[-1].id)]
+                    tasks[-1].is_prerequisite_for = [str(task.id)]
                 
-                task.save()
                 tasks.append(task)
         
         return tasks
     
+    @staticmethod
+    def _insert_tasks(tasks):
+        """Validate and write tasks with a single insert_many"""
+        if not tasks:
+            return
+        # QuerySet.insert() skips validation; check every task before writing any
+        for task in tasks:
+            task.validate()
+        DailyTask.objects.insert(tasks, load_bulk=False)
+        for task in tasks:
+            # Mark as persisted so a later save() issues an update, not an insert
+            task._created = False
+            task._clear_changed_fields()
+    
     @staticmethod
     def _calculate_study_days(start_date, end_date, skip_weekends):
         """Calculate available study days between start and end date"""
@@ -239,12 +288,10 @@ class TaskGeneratorService:
     @staticmethod
     def get_today_tasks(user_id):
         """Get all tasks scheduled for today"""
+        # Filter on the id; loading the User first would cost an extra query
         try:
-            if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
-            else:
-                user = user_id
-        except DoesNotExist:
+            user = ObjectId(str(getattr(user_id, 'id', user_id)))
+        except InvalidId:
             return []
         
         today = datetime.utcnow().date()
@@ -259,29 +306,153 @@ class TaskGeneratorService:
         return list(tasks)
     
     @staticmethod
-    def complete_task(task_id, actual_duration=None):
-        """Mark a task as completed"""
-        try:
-            task = DailyTask.objects.get(id=task_id)
-            task.mark_complete(actual_duration)
-            
-            # Update learning item progress
-            item = task.learning_item_id
-            if actual_duration:
-                item.completed_duration += actual_duration
-            else:
-                item.completed_duration += task.estimated_duration_minutes
-            item.update_progress()
+    def complete_task(task_id, actual_duration=None, user_id=None, credit_item=True, award_xp=True, now=None):
+        """
+        Mark a task as completed
+        
+        The request path is two round-trips: an atomic pending -> completed
+        find_one_and_update on the task (a repeated submit never counts
+        twice), then one pipeline update that adds the minutes to the
+        learning item and recomputes its progress. The plan counter, the
+        DailyStat rollup (read by burnout/truth/weekly) and the task's XP
+        reward go out together as one record_task_completion job.
+        
+        With TASK_COMPLETION_TRANSACTIONS=True (replica set required) the
+        task, item, plan and DailyStat writes are applied inline in one
+        multi-document transaction instead.
+        
+        Args:
+            user_id: Restrict to this user's tasks
+            credit_item: False when the caller credits the item itself
+                (focus sessions add their own minutes)
+            award_xp: False when the caller pays its own reward instead of
+                the task's xp_reward (focus sessions award a finishing bonus)
             
-            return task
-        except DoesNotExist:
+        Returns:
+            The completed DailyTask
+        """
+        try:
+            query = {'_id': ObjectId(str(task_id))}
+            if user_id:
+                query['user_id'] = ObjectId(str(user_id))
+        except (InvalidId, TypeError):
             raise ValueError("Task not found")
+        
+        now = now or datetime.utcnow()
+        update = {'$set': {'status': 'completed', 'completed_at': now}}
+        if actual_duration:
+            update['$set']['actual_duration_minutes'] = int(actual_duration)
+        pending = dict(query, status={'$ne': 'completed'})
+        tasks = DailyTask._get_collection()
+        
+        if TaskGeneratorService._use_transactions():
+            doc = TaskGeneratorService._complete_in_transaction(pending, update, actual_duration, credit_item, award_xp)
+        else:
+            doc = tasks.find_one_and_update(pending, update, return_document=ReturnDocument.AFTER)
+            if doc is not None:
+                if credit_item:
+                    TaskGeneratorService._credit_item(doc, actual_duration)
+                from app.jobs import enqueue, record_task_completion
+                enqueue(
+                    record_task_completion, str(doc['user_id']),
+                    str(doc['learning_plan_id']) if doc.get('learning_plan_id') else None,
+                    doc.get('actual_duration_minutes') or 0, now.isoformat(), (doc.get('xp_reward') or 0) if award_xp else 0
+                )
+        
+        if doc is not None:
+            # Raw writes skip the post_save signal that refreshes the focus card
+            from app.services.dashboard_service import focus_cache
+            focus_cache.invalidate(doc['user_id'])
+        else:
+            # Missing, or already completed (idempotent: nothing is counted again)
+            doc = tasks.find_one(query)
+            if doc is None:
+                raise ValueError("Task not found")
+        return DailyTask._from_son(doc)
     
     @staticmethod
-    def reschedule_plan(plan_id, new_target_date=None, new_daily_minutes=None):
+    def _use_transactions():
+        return has_app_context() and bool(current_app.config.get('TASK_COMPLETION_TRANSACTIONS'))
+    
+    @staticmethod
+    def _complete_in_transaction(pending, update, actual_duration, credit_item, award_xp=True):
+        tasks = DailyTask._get_collection()
+        
+        def apply(session):
+            doc = tasks.find_one_and_update(pending, update, return_document=ReturnDocument.AFTER, session=session)
+            if doc is not None:
+                if credit_item:
+                    TaskGeneratorService._credit_item(doc, actual_duration, session=session)
+                TaskGeneratorService._apply_counters(
+                    doc['user_id'], doc.get('learning_plan_id'),
+                    doc.get('actual_duration_minutes') or 0, doc['completed_at'], session=session
+                )
+            return doc
+        
+        with tasks.database.client.start_session() as session:
+            doc = session.with_transaction(apply)
+        if doc is not None and award_xp and doc.get('xp_reward'):
+            from app.services.gamification_service import GamificationService
+            GamificationService.award_xp(doc['user_id'], doc['xp_reward'], "Task")
+        return doc
+    
+    @staticmethod
+    def _credit_item(task_doc, actual_duration, session=None):
+        """Add the task's minutes to its item and recompute progress in one update"""
+        minutes = int(actual_duration) if actual_duration else (task_doc.get('estimated_duration_minutes') or 0)
+        LearningItem._get_collection().update_one(
+            {'_id': task_doc['learning_item_id']},
+            [
+                {'$set': {'completed_duration': {'$add': [{'$ifNull': ['$completed_duration', 0]}, minutes]}}},
+                {'$set': {'progress_percentage': {'$cond': [
+                    {'$gt': ['$total_duration', 0]},
+                    {'$multiply': [{'$divide': ['$completed_duration', '$total_duration']}, 100]},
+                    0.0
+                ]}}}
+            ],
+            session=session
+        )
+    
+    @staticmethod
+    def _apply_counters(user_oid, plan_oid, minutes, completed_at, session=None):
+        if plan_oid:
+            LearningPlan._get_collection().update_one(
+                {'_id': plan_oid}, {'$inc': {'completed_tasks': 1}}, session=session
+            )
+        DailyStat._get_collection().update_one(
+            {'user_id': user_oid, 'date': completed_at.replace(hour=0, minute=0, second=0, microsecond=0)},
+            {'$inc': {'task_minutes': minutes, 'tasks_completed': 1},
+             '$setOnInsert': {'total_minutes': 0, 'sessions_count': 0}},
+            upsert=True, session=session
+        )
+    
+    @staticmethod
+    def record_completion(user_id, plan_id, minutes, completed_at, xp=0):
+        """
+        Fan-out for a completed task: plan counter, DailyStat rollup and XP
+        (the record_task_completion job)
+        """
+        if isinstance(completed_at, str):
+            completed_at = datetime.fromisoformat(completed_at)
+        user_oid = ObjectId(str(user_id))
+        TaskGeneratorService._apply_counters(
+            user_oid, ObjectId(str(plan_id)) if plan_id else None, minutes, completed_at
+        )
+        if xp:
+            from app.services.gamification_service import GamificationService
+            GamificationService.award_xp(user_oid, xp, "Task")
+    
+    @staticmethod
+    def reschedule_plan(plan_id, new_target_date=None, new_daily_minutes=None, now=None):
         """
         Reschedule a learning plan (adaptive rescheduling)
         
+        The remaining work is laid out again in memory and diffed against
+        the plan's open tasks in schedule order: the k-th open task keeps
+        its id and receives the k-th slot of the new layout, so ids held by
+        clients stay valid. Only changed fields are $set; surplus tasks are
+        deleted and missing ones inserted, all in one bulk_write.
+        
         Args:
             plan_id: Learning plan ID
             new_target_date: New target completion date (optional)
@@ -295,12 +466,6 @@ class TaskGeneratorService:
         except DoesNotExist:
             raise ValueError("Learning plan not found")
         
-        # Delete incomplete tasks
-        DailyTask.objects(
-            learning_plan_id=plan,
-            status__in=['pending', 'in_progress']
-        ).delete()
-        
         # Update plan configuration
         if new_target_date:
             plan.target_completion_date = new_target_date
@@ -312,12 +477,77 @@ class TaskGeneratorService:
         remaining_duration = item.total_duration - item.completed_duration
         plan.total_estimated_duration = int(remaining_duration * (1 + plan.buffer_percentage / 100))
         
-        plan.last_adjusted_at = datetime.utcnow()
-        plan.save()
+        # Lay out the remaining work before touching anything stored
+        now = now or datetime.utcnow()
+        layout = TaskGeneratorService._build_tasks(plan, item, start_date=now)
+        
+        tasks = DailyTask._get_collection()
+        existing = list(tasks.find(
+            {'learning_plan_id': plan.id, 'status': {'$in': list(TaskGeneratorService.OPEN_STATUSES)}},
+            {field: 1 for field in TaskGeneratorService.REFLOW_FIELDS}
+        ).sort([('content_reference.task_number', 1), ('_id', 1)]))
         
-        # Regenerate tasks for remaining work
-        new_tasks = TaskGeneratorService._generate_tasks(plan, item)
-        plan.total_tasks = plan.completed_tasks + len(new_tasks)
+        ops, summary = TaskGeneratorService._reflow_ops(existing, layout)
+        if ops:
+            tasks.bulk_write(ops, ordered=False)
+            # Raw bulk writes skip document signals
+            from app.services.dashboard_service import focus_cache
+            user_ref = plan._data.get('user_id')
+            owner = getattr(user_ref, 'id', user_ref)
+            focus_cache.invalidate(owner)
+            search_index_cache.invalidate_user(owner)  # Task titles and ids changed
+        
+        plan.total_tasks = plan.completed_tasks + len(layout)
+        plan.last_adjusted_at = now
+        plan.plan_metadata = dict(plan.plan_metadata or {}, last_reschedule=summary)
         plan.save()
         
         return plan
+    
+    @staticmethod
+    def _reflow_ops(existing, layout):
+        """
+        Minimal write set turning the stored open tasks into the new layout
+        
+        Args:
+            existing: Raw open task docs (REFLOW_FIELDS projection) in schedule order
+            layout: Unsaved DailyTask objects from _build_tasks, in schedule order
+            
+        Returns:
+            (list of pymongo write ops, summary dict of updated/inserted/deleted/unchanged)
+        """
+        # Matched slots keep the stored id; rewire the sequential chain to match
+        for doc, task in zip(existing, layout):
+            task.id = doc['_id']
+        for position, task in enumerate(layout):
+            task.depends_on_task_ids = [str(layout[position - 1].id)] if position else []
+            task.is_prerequisite_for = [str(layout[position + 1].id)] if position + 1 < len(layout) else []
+        
+        def normalized(value):
+            return None if value in (None, [], {}) else value
+        
+        ops = []
+        summary = {'updated': 0, 'inserted': 0, 'deleted': 0, 'unchanged': 0}
+        for doc, task in zip(existing, layout):
+            # Reflow fields are plain BSON types, so _data compares directly (no to_mongo per task)
+            changed = {
+                field: task._data.get(field) for field in TaskGeneratorService.REFLOW_FIELDS
+                if normalized(task._data.get(field)) != normalized(doc.get(field))
+            }
+            if changed:
+                ops.append(UpdateOne({'_id': doc['_id']}, {'$set': changed}))
+                summary['updated'] += 1
+            else:
+                summary['unchanged'] += 1
+        
+        for task in layout[len(existing):]:
+            task.validate()
+            ops.append(InsertOne(task.to_mongo().to_dict()))
+            summary['inserted'] += 1
+        
+        surplus = [doc['_id'] for doc in existing[len(layout):]]
+        if surplus:
+            ops.append(DeleteMany({'_id': {'$in': surplus}}))
+            summary['deleted'] = len(surplus)
+        
+        return ops, summary
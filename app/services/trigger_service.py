@@ -2,75 +2,168 @@
 """
 Trigger Service (Feature 11)
 Context-Aware Logic for Proactive Nudges.
+
+Conditions are evaluated for a batch of users at once: one grouped
+aggregation per condition, one $in query against recent notifications
+for anti-spam, and one insert_many. evaluate_all() sweeps the whole
+fleet (hourly Celery beat job / scripts/evaluate_triggers.py), so the
+dashboard request path never runs the checks itself.
 """
-from app.models import User, Notification, DailyTask, Commitment
+from app.models import Notification, DailyTask, Commitment, User
+from app.auth import load_user
 from datetime import datetime, timedelta
 
+# title, message, notification type, action link, log label
+EVENING_NUDGE = (
+    "Streak Risk ⚠️",
+    "The day is almost over. Complete 1 small task to keep your momentum.",
+    "warning", None, "Evening Nudge Triggered"
+)
+MORNING_PLAN = (
+    "Plan Your Victory 🌅",
+    "No tasks scheduled for today yet. Define your goals now.",
+    "info", "/schedule", "Morning Plan Triggered"
+)
+OVERLOAD = (
+    "Overload Detected 🛑",
+    "You have {pending} pending tasks. Prioritize or Reschedule.",
+    "error", "/schedule", "Overload Triggered"
+)
+
 class TriggerService:
     
+    OVERLOAD_PENDING_THRESHOLD = 15
+    ANTI_SPAM_HOURS = 12
+    DEFAULT_CHUNK_SIZE = 1000
+    
     @staticmethod
     def evaluate_context(user_id):
         """
         Analyze user context and trigger notifications.
-        Should be called periodically or on dashboard load.
+        Single-user form of evaluate_users(), used by the force-check route.
         """
-        check_log = []
-        user = User.objects.get(id=user_id)
-        now = datetime.utcnow()
-        # Adjust for TZ? Assuming UTC or keeping simple for MVP (System time).
-        # In a real app, user.timezone is critical.
-        
-        # 1. Evening Nudge (Warning)
-        # If after 8PM (20:00) and no tasks completed
-        if now.hour >= 20: 
-            completed_today = DailyTask.objects(
-                user_id=user_id,
-                status='completed',
-                completed_at__gte=now.replace(hour=0, minute=0)
-            ).count()
-            
-            if completed_today == 0:
-                TriggerService.create_notification(
-                    user_id,
-                    "Streak Risk ⚠️",
-                    "The day is almost over. Complete 1 small task to keep your momentum.",
-                    "warning"
-                )
-                check_log.append("Evening Nudge Triggered")
-
-        # 2. Morning Planner (Info)
-        # If Morning (6am-10am) and no tasks for today
+        user = load_user(user_id)
+        candidates = TriggerService._collect_candidates([user.id], datetime.utcnow())
+        TriggerService._deliver(candidates)
+        return [trigger[4] for _, trigger, _ in candidates]
+
+    @staticmethod
+    def evaluate_all(now=None, chunk_size=None):
+        """
+        Evaluate every active user in chunks.
+
+        Returns:
+            {'users': int, 'triggered': int, 'created': int}
+        """
+        now = now or datetime.utcnow()
+        chunk_size = chunk_size or TriggerService.DEFAULT_CHUNK_SIZE
+        totals = {'users': 0, 'triggered': 0, 'created': 0}
+
+        chunk = []
+        # $ne, not is_active=True: legacy user documents have no is_active field
+        for user_id in User.objects(is_active__ne=False).scalar('id'):
+            chunk.append(user_id)
+            if len(chunk) >= chunk_size:
+                TriggerService._add_totals(totals, chunk, now)
+                chunk = []
+        if chunk:
+            TriggerService._add_totals(totals, chunk, now)
+        return totals
+
+    @staticmethod
+    def _add_totals(totals, user_ids, now):
+        result = TriggerService.evaluate_users(user_ids, now)
+        totals['users'] += len(user_ids)
+        totals['triggered'] += result['triggered']
+        totals['created'] += result['created']
+
+    @staticmethod
+    def evaluate_users(user_ids, now=None):
+        """
+        Evaluate trigger conditions for a batch of user ObjectIds.
+
+        Returns:
+            {'triggered': conditions met, 'created': notifications inserted}
+        """
+        candidates = TriggerService._collect_candidates(list(user_ids), now or datetime.utcnow())
+        return {'triggered': len(candidates), 'created': TriggerService._deliver(candidates)}
+
+    @staticmethod
+    def _collect_candidates(user_ids, now):
+        """
+        Work out which users meet each condition.
+        Adjust for TZ? Assuming UTC for MVP; in a real app user.timezone is critical.
+
+        Returns:
+            List of (user_id, trigger tuple, message format kwargs)
+        """
+        candidates = []
+        if not user_ids:
+            return candidates
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # 1. Evening Nudge (Warning): after 8PM (20:00) and no tasks completed
+        if now.hour >= 20:
+            active = TriggerService._group_counts(
+                user_ids, status='completed', completed_at__gte=today
+            )
+            candidates.extend((uid, EVENING_NUDGE, {}) for uid in user_ids if uid not in active)
+
+        # 2. Morning Planner (Info): morning (6am-10am) and no tasks for today
         if 6 <= now.hour <= 10:
-            tasks_today = DailyTask.objects(
-                user_id=user_id,
-                scheduled_date__gte=now.replace(hour=0, minute=0),
-                scheduled_date__lt=now.replace(hour=23, minute=59)
-            ).count()
-            
-            if tasks_today == 0:
-                TriggerService.create_notification(
-                    user_id,
-                    "Plan Your Victory 🌅",
-                    "No tasks scheduled for today yet. Define your goals now.",
-                    "info",
-                    link="/schedule"
-                )
-                check_log.append("Morning Plan Triggered")
-        
-        # 3. Burnout Warning (Health)
-        # If Burnout Level is High (Check BurnoutService logic or replicate simple check)
-        # Simple check: > 10 tasks pending?
-        pending_count = DailyTask.objects(user_id=user_id, status='pending').count()
-        if pending_count > 15:
-             TriggerService.create_notification(
-                user_id,
-                "Overload Detected 🛑",
-                f"You have {pending_count} pending tasks. Prioritize or Reschedule.",
-                "error",
-                link="/schedule"
+            planned = TriggerService._group_counts(
+                user_ids, scheduled_date__gte=today, scheduled_date__lt=today + timedelta(days=1)
             )
+            candidates.extend((uid, MORNING_PLAN, {}) for uid in user_ids if uid not in planned)
+
+        # 3. Burnout Warning (Health): too many pending tasks
+        pending = TriggerService._group_counts(user_ids, status='pending')
+        candidates.extend(
+            (uid, OVERLOAD, {'pending': count}) for uid, count in pending.items()
+            if count > TriggerService.OVERLOAD_PENDING_THRESHOLD
+        )
+        return candidates
+
+    @staticmethod
+    def _group_counts(user_ids, **filters):
+        """{user ObjectId: matching DailyTask count} via one grouped aggregation"""
+        pipeline = [{'$group': {'_id': '$user_id', 'count': {'$sum': 1}}}]
+        rows = DailyTask.objects(user_id__in=user_ids, **filters).aggregate(pipeline)
+        return {row['_id']: row['count'] for row in rows}
+
+    @staticmethod
+    def _deliver(candidates):
+        """
+        Insert notifications for candidates not already notified recently
+        (Anti-Spam: same title in the last 12 hours). Returns the count inserted.
+        """
+        if not candidates:
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(hours=TriggerService.ANTI_SPAM_HOURS)
+        recent = Notification.objects(
+            user_id__in=list({uid for uid, _, _ in candidates}),
+            title__in=list({trigger[0] for _, trigger, _ in candidates}),
+            created_at__gte=cutoff
+        ).only('user_id', 'title').as_pymongo()
+        sent = {(row['user_id'], row['title']) for row in recent}
+
+        notifications = []
+        for uid, (title, message, n_type, link, _), fields in candidates:
+            if (uid, title) in sent:
+                continue
+            sent.add((uid, title))
+            notifications.append(Notification(
+                user_id=uid,
+                title=title,
+                message=message.format(**fields),
+                notification_type=n_type,
+                action_link=link
+            ))
 
-        return check_log
+        if notifications:
+            Notification.objects.insert(notifications, load_bulk=False)
+        return len(notifications)
 
     @staticmethod
     def create_notification(user_id, title, message, type='info', link=None):
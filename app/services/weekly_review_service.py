@@ -1,17 +1,42 @@
 """
 Weekly Review Service for Feature 8: Weekly Review Assistant
 Generates weekly learning reviews and insights
+
+Weeks are ISO weeks (Monday 00:00 UTC). All weeks in a window are
+computed together: one faceted aggregation over DailyTask plus one
+$group each over FocusSession and CommitmentViolation, bucketed by ISO
+week. Finished weeks are stored once as WeeklyReviewSnapshot documents
+and read back from there, so only the current week is ever recomputed.
 """
 from datetime import datetime, timedelta
-from app.models import LearningItem, DailyTask, FocusSession, CommitmentViolation, User
+from pymongo.errors import BulkWriteError
+from app.models import (
+    LearningItem, DailyTask, FocusSession, CommitmentViolation, User, WeeklyReviewSnapshot
+)
+from app.auth import load_user
 from mongoengine.errors import DoesNotExist
 
+MAX_HISTORY_WEEKS = 52
+ISO_WEEK_FORMAT = '%G-W%V'
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def week_start_for(week_offset=0, now=None):
+    """Monday 00:00 UTC of the week `week_offset` weeks back (sign ignored)"""
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=today.weekday() + 7 * abs(week_offset))
+
+
+def week_key(moment):
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
 
 class WeeklyReviewService:
     """Service for generating weekly learning reviews"""
     
     @staticmethod
-    def generate_weekly_review(user_id, week_offset=0):
+    def generate_weekly_review(user_id, week_offset=0, now=None):
         """
         Generate comprehensive weekly review
         
@@ -22,21 +47,23 @@ class WeeklyReviewService:
         Returns:
             Dictionary with weekly review data
         """
+        user = WeeklyReviewService._resolve_user(user_id)
+        week_start = week_start_for(week_offset, now)
+        stats = WeeklyReviewService._load_weeks(user, [week_start], now)[week_start]
+        return WeeklyReviewService._build_review(user, week_start, stats)
+    
+    @staticmethod
+    def _resolve_user(user_id):
         try:
             if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
-            else:
-                user = user_id
+                return load_user(user_id)
+            return user_id
         except DoesNotExist:
             raise ValueError("User not found")
-        
-        # Calculate week boundaries
-        today = datetime.utcnow()
-        week_start = today - timedelta(days=today.weekday() + (7 * abs(week_offset)))
+    
+    @staticmethod
+    def _build_review(user, week_start, stats):
         week_end = week_start + timedelta(days=7)
-        
-        # Collect all metrics
-        stats = WeeklyReviewService._collect_weekly_stats(user, week_start, week_end)
         insights = WeeklyReviewService._generate_insights(user, stats, week_start, week_end)
         action_items = WeeklyReviewService._generate_action_items(stats, insights)
         
@@ -50,72 +77,129 @@ class WeeklyReviewService:
         }
     
     @staticmethod
-    def _collect_weekly_stats(user, week_start, week_end):
-        """Collect all statistics for the week"""
-        
-        # Tasks completed
-        completed_tasks = DailyTask.objects(
-            user_id=user,
-            status='completed',
-            completed_at__gte=week_start,
-            completed_at__lt=week_end
-        )
-        
-        # Focus sessions
-        focus_sessions = FocusSession.objects(
-            user_id=user,
-            started_at__gte=week_start,
-            started_at__lt=week_end
-        )
-        
-        # Commitment violations
-        violations = CommitmentViolation.objects(
-            user_id=user,
-            violation_date__gte=week_start,
-            violation_date__lt=week_end
-        )
-        
-        # Learning items progress
-        active_items = LearningItem.objects(user_id=user, status='active')
-        
-        # Calculate metrics
-        total_tasks = completed_tasks.count()
-        total_focus_time = sum(s.duration_minutes for s in focus_sessions)
-        total_violations = violations.count()
-        
-        # Calculate average daily tasks
-        days_in_week = 7
-        avg_daily_tasks = total_tasks / days_in_week
-        
-        # Calculate completion rate
-        scheduled_tasks = DailyTask.objects(
-            user_id=user,
-            scheduled_date__gte=week_start.date(),
-            scheduled_date__lt=week_end.date()
-        ).count()
-        
-        completion_rate = (total_tasks / scheduled_tasks * 100) if scheduled_tasks > 0 else 0
-        
-        # Most productive day
-        daily_breakdown = {}
-        for task in completed_tasks:
-            day = task.completed_at.strftime('%A')
-            daily_breakdown[day] = daily_breakdown.get(day, 0) + 1
-        
-        most_productive_day = max(daily_breakdown.items(), key=lambda x: x[1])[0] if daily_breakdown else 'None'
+    def _load_weeks(user, week_starts, now=None):
+        """
+        Statistics for each requested week: snapshots for finished weeks,
+        computed for the rest. Newly computed finished weeks are frozen.
         
-        return {
-            'tasks_completed': total_tasks,
-            'tasks_scheduled': scheduled_tasks,
-            'completion_rate': round(completion_rate, 2),
-            'focus_time_minutes': total_focus_time,
-            'focus_sessions': focus_sessions.count(),
-            'commitment_violations': total_violations,
-            'active_learning_items': active_items.count(),
-            'avg_daily_tasks': round(avg_daily_tasks, 2),
-            'most_productive_day': most_productive_day,
-            'daily_breakdown': daily_breakdown
+        Returns:
+            {week_start: stats}
+        """
+        current_start = week_start_for(0, now)
+        stats = {
+            snap['week_start']: snap['statistics']
+            for snap in WeeklyReviewSnapshot._get_collection().find(
+                {'user_id': user.id, 'week_start': {'$in': [w for w in week_starts if w < current_start]}},
+                {'week_start': 1, 'statistics': 1}
+            )
         }
+        missing = [w for w in week_starts if w not in stats]
+        if not missing:
+            return stats
+        
+        computed = WeeklyReviewService._collect_weekly_stats(user, missing)
+        stats.update(computed)
+        
+        finished = [w for w in missing if w < current_start]
+        if finished:
+            created_at = datetime.utcnow()
+            try:
+                WeeklyReviewSnapshot._get_collection().insert_many([
+                    {'user_id': user.id, 'week_start': w, 'statistics': computed[w], 'created_at': created_at}
+                    for w in finished
+                ], ordered=False)
+            except BulkWriteError as e:
+                # A concurrent request froze the same week first; keep its snapshot
+                if any(err.get('code') != 11000 for err in e.details.get('writeErrors', [])):
+                    raise
+        return stats
+    
+    @staticmethod
+    def _collect_weekly_stats(user, week_starts):
+        """
+        Compute statistics for several weeks at once
+        
+        Returns:
+            {week_start: stats}
+        """
+        window_start = min(week_starts)
+        window_end = max(week_starts) + timedelta(days=7)
+        
+        task_facets = next(DailyTask._get_collection().aggregate([
+            {'$match': {'user_id': user.id, '$or': [
+                {'status': 'completed', 'completed_at': {'$gte': window_start, '$lt': window_end}},
+                {'scheduled_date': {'$gte': window_start, '$lt': window_end}}
+            ]}},
+            {'$facet': {
+                'completed': [
+                    {'$match': {'status': 'completed', 'completed_at': {'$gte': window_start, '$lt': window_end}}},
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$completed_at'}},
+                        'count': {'$sum': 1}
+                    }}
+                ],
+                'scheduled': [
+                    {'$match': {'scheduled_date': {'$gte': window_start, '$lt': window_end}}},
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': ISO_WEEK_FORMAT, 'date': '$scheduled_date'}},
+                        'count': {'$sum': 1}
+                    }}
+                ]
+            }}
+        ]), {'completed': [], 'scheduled': []})
+        
+        focus_rows = FocusSession._get_collection().aggregate([
+            {'$match': {'user_id': user.id, 'started_at': {'$gte': window_start, '$lt': window_end}}},
+            {'$group': {
+                '_id': {'$dateToString': {'format': ISO_WEEK_FORMAT, 'date': '$started_at'}},
+                'minutes': {'$sum': '$duration_minutes'},
+                'sessions': {'$sum': 1}
+            }}
+        ])
+        violation_rows = CommitmentViolation._get_collection().aggregate([
+            {'$match': {'user_id': user.id, 'violation_date': {'$gte': window_start, '$lt': window_end}}},
+            {'$group': {
+                '_id': {'$dateToString': {'format': ISO_WEEK_FORMAT, 'date': '$violation_date'}},
+                'count': {'$sum': 1}
+            }}
+        ])
+        
+        scheduled = {row['_id']: row['count'] for row in task_facets['scheduled']}
+        focus = {row['_id']: row for row in focus_rows}
+        violations = {row['_id']: row['count'] for row in violation_rows}
+        daily = {}
+        for row in task_facets['completed']:
+            day = datetime.strptime(row['_id'], '%Y-%m-%d')
+            breakdown = daily.setdefault(week_key(day), {})
+            name = DAY_NAMES[day.weekday()]
+            breakdown[name] = breakdown.get(name, 0) + row['count']
+        
+        # Current count, as before; frozen with the snapshot for past weeks
+        active_items = LearningItem._get_collection().count_documents({'user_id': user.id, 'status': 'active'})
+        
+        result = {}
+        for week_start in week_starts:
+            key = week_key(week_start)
+            daily_breakdown = daily.get(key, {})
+            total_tasks = sum(daily_breakdown.values())
+            scheduled_tasks = scheduled.get(key, 0)
+            focus_row = focus.get(key, {})
+            completion_rate = (total_tasks / scheduled_tasks * 100) if scheduled_tasks > 0 else 0
+            most_productive_day = max(daily_breakdown.items(), key=lambda x: x[1])[0] if daily_breakdown else 'None'
+            
+            result[week_start] = {
+                'tasks_completed': total_tasks,
+                'tasks_scheduled': scheduled_tasks,
+                'completion_rate': round(completion_rate, 2),
+                'focus_time_minutes': focus_row.get('minutes', 0),
+                'focus_sessions': focus_row.get('sessions', 0),
+                'commitment_violations': violations.get(key, 0),
+                'active_learning_items': active_items,
+                'avg_daily_tasks': round(total_tasks / 7, 2),
+                'most_productive_day': most_productive_day,
+                'daily_breakdown': daily_breakdown
+            }
+        return result
     
     @staticmethod
     def _generate_insights(user, stats, week_start, week_end):
@@ -279,24 +363,19 @@ class WeeklyReviewService:
             return 'F'
     
     @staticmethod
-    def get_review_history(user_id, weeks=4):
-        """Get review history for comparison"""
-        try:
-            if isinstance(user_id, str):
-                user = User.objects.get(id=user_id)
-            else:
-                user = user_id
-        except DoesNotExist:
-            raise ValueError("User not found")
-        
-        history = []
-        for week_offset in range(weeks):
-            review = WeeklyReviewService.generate_weekly_review(user_id, -week_offset)
-            history.append({
-                'week': f"Week of {review['week_start']}",
-                'grade': review['overall_grade'],
-                'completion_rate': review['statistics']['completion_rate'],
-                'focus_time': review['statistics']['focus_time_minutes']
-            })
-        
-        return history
+    def get_review_history(user_id, weeks=4, now=None):
+        """Get review history for comparison (newest week first)"""
+        user = WeeklyReviewService._resolve_user(user_id)
+        weeks = max(1, min(weeks, MAX_HISTORY_WEEKS))
+        week_starts = [week_start_for(offset, now) for offset in range(weeks)]
+        stats = WeeklyReviewService._load_weeks(user, week_starts, now)
+        
+        return [
+            {
+                'week': f"Week of {week_start.date().isoformat()}",
+                'grade': WeeklyReviewService._calculate_weekly_grade(stats[week_start]),
+                'completion_rate': stats[week_start]['completion_rate'],
+                'focus_time': stats[week_start]['focus_time_minutes']
+            }
+            for week_start in week_starts
+        ]
@@ -0,0 +1,39 @@
+"""
+Script to backfill the DailyStat task rollups from completed DailyTasks
+Run once after deploying the rollup fields, or to repair drift:
+    python scripts/backfill_daily_stats.py [--days 60] [--user <id>]
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.stats_service import StatsService
+from datetime import datetime, timedelta
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild DailyStat task_minutes / tasks_completed')
+    parser.add_argument('--days', type=int, default=None, help='Only rebuild the last N days')
+    parser.add_argument('--user', default=None, help='Only rebuild one user id')
+    args = parser.parse_args()
+
+    since = None
+    if args.days:
+        since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+
+    with app.app_context():
+        start = time.perf_counter()
+        written = StatsService.rebuild_task_rollups(user_id=args.user, since=since)
+        elapsed = time.perf_counter() - start
+        print(f"[{datetime.now()}] Wrote {written} daily rollups in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
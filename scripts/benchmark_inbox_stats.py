@@ -0,0 +1,114 @@
+"""
+Benchmark for InboxService.get_inbox_stats
+Compares the legacy per-status count() + Python sum path against the
+single $group aggregation for a user with a large inbox.
+
+Usage: python scripts/benchmark_inbox_stats.py [--items 10000] [--runs 20] [--mongomock]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+from app.config import Config
+from app.models import User, LearningItem
+from app.services.inbox_service import InboxService
+
+STATUSES = ['library', 'active', 'paused', 'completed', 'archived']
+
+
+def legacy_stats(user):
+    """Pre-aggregation implementation: five count() calls plus full hydration"""
+    total_items = LearningItem.objects(user_id=user).count()
+    active_items = LearningItem.objects(user_id=user, status='active').count()
+    paused_items = LearningItem.objects(user_id=user, status='paused').count()
+    completed_items = LearningItem.objects(user_id=user, status='completed').count()
+    dropped_items = LearningItem.objects(user_id=user, status='dropped').count()
+    total_time_invested = sum(item.completed_duration for item in LearningItem.objects(user_id=user))
+    return {
+        'total_items': total_items,
+        'active_items': active_items,
+        'paused_items': paused_items,
+        'completed_items': completed_items,
+        'dropped_items': dropped_items,
+        'total_time_invested_minutes': total_time_invested
+    }
+
+
+def seed_user(item_count):
+    """Create a throwaway user with item_count learning items"""
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(
+        name='Benchmark User',
+        email=f'bench_{suffix}@example.com',
+        mobile=f'9{suffix}',
+        password_hash='hash'
+    ).save()
+
+    docs = [
+        LearningItem(
+            user_id=user,
+            title=f'Item {i}',
+            source_type='course',
+            status=STATUSES[i % len(STATUSES)],
+            total_duration=120,
+            completed_duration=i % 120
+        ).to_mongo()
+        for i in range(item_count)
+    ]
+    LearningItem._get_collection().insert_many(docs, ordered=False)
+    return user
+
+
+def time_calls(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inbox stats paths')
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--mongomock', action='store_true', help='Run against an in-memory mongomock client')
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        connect('benchmark', mongo_client_class=mongomock.MongoClient)
+    else:
+        connect(host=Config.MONGODB_SETTINGS['host'])
+
+    print(f"Seeding {args.items} learning items...")
+    user = seed_user(args.items)
+
+    try:
+        legacy = legacy_stats(user)
+        current = InboxService.get_inbox_stats(user)
+        for key, value in legacy.items():
+            assert current[key] == value, f"Mismatch on {key}: {current[key]} != {value}"
+
+        legacy_median, legacy_max = time_calls(lambda: legacy_stats(user), args.runs)
+        agg_median, agg_max = time_calls(lambda: InboxService.get_inbox_stats(user), args.runs)
+
+        print(f"\n📊 get_inbox_stats over {args.items} items ({args.runs} runs)")
+        print(f"   - Legacy count()+sum:  median {legacy_median:8.2f} ms   max {legacy_max:8.2f} ms")
+        print(f"   - $group aggregation:  median {agg_median:8.2f} ms   max {agg_max:8.2f} ms")
+        if agg_median > 0:
+            print(f"   - Speedup: {legacy_median / agg_median:.1f}x")
+    finally:
+        LearningItem.objects(user_id=user).delete()
+        user.delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
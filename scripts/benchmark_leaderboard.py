@@ -0,0 +1,83 @@
+"""
+Benchmark for the leaderboard engine at fleet scale
+Loads N users (default 1M) into a board, then times score updates,
+rank-of-user and top-N / deep-page reads. The baseline is the old
+approach of sorting everyone in Python per request.
+
+Usage: python scripts/benchmark_leaderboard.py [--users 1000000] [--queries 10000] [--redis redis://localhost:6379/0]
+"""
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.leaderboard_service import MemoryBackend, RedisBackend
+
+BOARD = 'benchmark'
+
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f}s  {elapsed / count * 1e6:10.1f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark leaderboard rank/top-N at scale')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--redis', default=None, help='Benchmark Redis sorted sets instead of the skip list')
+    args = parser.parse_args()
+
+    if args.redis:
+        import redis
+        client = redis.Redis.from_url(args.redis)
+        client.delete('leaderboard:' + BOARD)
+        board = RedisBackend(client)
+    else:
+        board = MemoryBackend()
+
+    rng = random.Random(42)
+    members = [f"{i:024x}" for i in range(args.users)]
+    scores = {m: rng.randrange(1_000_000) for m in members}
+    sample = [rng.choice(members) for _ in range(args.queries)]
+
+    print(f"Backend: {'redis' if args.redis else 'memory skip list'}, {args.users:,} users")
+
+    def load():
+        chunk = {}
+        for member, score in scores.items():
+            chunk[member] = score
+            if len(chunk) >= 10000:
+                board.set_scores(BOARD, chunk)
+                chunk = {}
+        board.set_scores(BOARD, chunk)
+    timed('load', load, args.users)
+
+    def updates():
+        for member in sample:
+            scores[member] += rng.randrange(1, 500)
+            board.set_scores(BOARD, {member: scores[member]})
+    timed('award (score update)', updates, args.queries)
+
+    timed('rank of user', lambda: [board.rank(BOARD, m) for m in sample], args.queries)
+    timed('top 10', lambda: [board.range(BOARD, 0, 9) for _ in range(args.queries)], args.queries)
+    mid = args.users // 2
+    timed('page of 20 at median rank', lambda: [board.range(BOARD, mid, mid + 19) for _ in range(1000)], 1000)
+
+    # Baseline: what a per-request Python sort costs at this size
+    runs = 3
+    def sort_baseline():
+        for member in sample[:runs]:
+            ordered = sorted(scores.items(), key=lambda kv: -kv[1])
+            next(i for i, (m, _) in enumerate(ordered) if m == member)
+    timed('baseline sort + scan', sort_baseline, runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for the lean read path (app/serialization.py lean())
+Serializes a 5k-row list response two ways: full Documents + to_dict()
+versus only() + as_pymongo() into __slots__ records, and reports median
+latency and peak traced memory for inbox items, bookmarks and
+notifications.
+
+Usage: python scripts/benchmark_lean_reads.py [--rows 5000] [--runs 5] [--mongomock]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+from app.config import Config
+from app.models import User, LearningItem, Bookmark, Notification
+from app.serialization import lean
+
+
+def seed(user, rows):
+    now = datetime.utcnow()
+    LearningItem._get_collection().insert_many([{
+        'user_id': user.id, 'title': f'Course {i}', 'description': 'x' * 400, 'source_type': 'course',
+        'status': 'active', 'total_duration': 600, 'completed_duration': i % 600, 'priority_score': i % 100,
+        'metadata': {'chapters': list(range(20))}, 'added_at': now - timedelta(minutes=i), 'tags': ['a', 'b']
+    } for i in range(rows)])
+    Bookmark._get_collection().insert_many([{
+        'user_id': user.id, 'title': f'Bookmark {i}', 'url': f'https://example.com/{i}', 'description': 'y' * 300,
+        'relevance_score': i % 10, 'added_at': now, 'tags': ['ref'], 'meta_data': {'html': 'z' * 500}
+    } for i in range(rows)])
+    Notification._get_collection().insert_many([{
+        'user_id': user.id, 'title': f'Nudge {i}', 'message': 'Time to study', 'notification_type': 'info',
+        'is_read': False, 'created_at': now - timedelta(minutes=i)
+    } for i in range(rows)])
+
+
+def measure(fn, runs):
+    """Median milliseconds and peak traced KiB of fn()"""
+    samples, peaks = [], []
+    for _ in range(runs):
+        tracemalloc.start()
+        start = time.perf_counter()
+        payload = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        del payload
+    return statistics.median(samples), statistics.median(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark lean list serialization')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--mongomock', action='store_true', help='Run against an in-memory mongomock client')
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        connect('benchmark', mongo_client_class=mongomock.MongoClient)
+    else:
+        connect(host=Config.MONGODB_SETTINGS['host'])
+
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(
+        name='Benchmark User',
+        email=f'bench_{suffix}@example.com',
+        mobile=f'9{suffix}',
+        password_hash='hash'
+    ).save()
+    seed(user, args.rows)
+
+    queries = {
+        'inbox items': lambda: LearningItem.objects(user_id=user.id).order_by('-priority_score', '-added_at'),
+        'bookmarks': lambda: Bookmark.objects(user_id=user.id).order_by('-relevance_score'),
+        'notifications': lambda: Notification.objects(user_id=user.id, is_read=False).order_by('-created_at')
+    }
+
+    try:
+        print(f"\n📊 {args.rows}-row list responses ({args.runs} runs, median)")
+        for label, query in queries.items():
+            doc_ms, doc_kib = measure(lambda: [d.to_dict() for d in query()], args.runs)
+            lean_ms, lean_kib = measure(lambda: [r.to_dict() for r in lean(query())], args.runs)
+            print(f"   - {label}")
+            print(f"       Documents + to_dict: {doc_ms:8.1f} ms, peak {doc_kib:9.0f} KiB")
+            print(f"       lean records:        {lean_ms:8.1f} ms, peak {lean_kib:9.0f} KiB")
+            print(f"       Speedup {doc_ms / lean_ms:.1f}x, memory {doc_kib / lean_kib:.1f}x less")
+    finally:
+        for model in (LearningItem, Bookmark, Notification):
+            model._get_collection().delete_many({'user_id': user.id})
+        user.delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark for TaskGeneratorService plan generation
+Compares the legacy per-task save() loop against the batched path
+(client-side ObjectIds, in-memory dependency chain, one insert_many)
+for 30, 180 and 365 day plans.
+
+Usage: python scripts/benchmark_plan_generation.py [--days 30 180 365] [--runs 5] [--mongomock]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+from app.config import Config
+from app.models import User, LearningItem, LearningPlan, DailyTask
+from app.services.task_generator_service import TaskGeneratorService
+
+DAILY_MINUTES = 90
+
+
+def legacy_generate_tasks(plan, item):
+    """Pre-batching implementation: one save() per task, total recomputed per task"""
+    tasks = []
+    study_days = TaskGeneratorService._calculate_study_days(
+        datetime.utcnow(), plan.target_completion_date, plan.skip_weekends
+    )
+    tasks_breakdown = TaskGeneratorService._calculate_task_breakdown(
+        plan.total_estimated_duration, plan.daily_availability_minutes, len(study_days)
+    )
+
+    task_index = 0
+    for day_index, study_date in enumerate(study_days):
+        if day_index not in tasks_breakdown:
+            continue
+        for task_duration in tasks_breakdown[day_index]:
+            task_index += 1
+            progress_pct = (task_index / sum(len(v) for v in tasks_breakdown.values())) * 100
+            task = DailyTask(
+                learning_plan_id=plan,
+                learning_item_id=item,
+                user_id=plan.user_id,
+                title=f"{item.title} - Day {day_index + 1}",
+                description=f"Study session {task_index}",
+                task_type=TaskGeneratorService._determine_task_type(task_index, progress_pct),
+                scheduled_date=study_date,
+                estimated_duration_minutes=task_duration,
+                difficulty_level=TaskGeneratorService._estimate_difficulty(progress_pct),
+                priority_score=TaskGeneratorService._calculate_priority(day_index, len(study_days))
+            )
+            if tasks:
+                task.depends_on_task_ids = [str(tasks[-1].id)]
+            task.save()
+            tasks.append(task)
+    return tasks
+
+
+def make_plan(user, item, days):
+    """Saved plan sized so every study day is filled"""
+    study_days = days * 5 // 7
+    return LearningPlan(
+        learning_item_id=item,
+        user_id=user,
+        target_completion_date=datetime.utcnow() + timedelta(days=days),
+        daily_availability_minutes=DAILY_MINUTES,
+        total_estimated_duration=study_days * DAILY_MINUTES,
+        skip_weekends=True
+    ).save()
+
+
+def time_generation(fn, user, item, days, runs):
+    samples = []
+    task_count = 0
+    for _ in range(runs):
+        plan = make_plan(user, item, days)
+        start = time.perf_counter()
+        task_count = len(fn(plan, item))
+        samples.append((time.perf_counter() - start) * 1000)
+        DailyTask.objects(learning_plan_id=plan).delete()
+        plan.delete()
+    return task_count, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark plan task generation')
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 180, 365])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--mongomock', action='store_true', help='Run against an in-memory mongomock client')
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        connect('benchmark', mongo_client_class=mongomock.MongoClient)
+    else:
+        connect(host=Config.MONGODB_SETTINGS['host'])
+
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(
+        name='Benchmark User',
+        email=f'bench_{suffix}@example.com',
+        mobile=f'9{suffix}',
+        password_hash='hash'
+    ).save()
+    item = LearningItem(user_id=user, title='Benchmark Course', source_type='course').save()
+
+    try:
+        print(f"\n📊 Plan generation ({args.runs} runs, {DAILY_MINUTES} min/day)")
+        for days in args.days:
+            legacy_count, legacy_median = time_generation(legacy_generate_tasks, user, item, days, args.runs)
+            batch_count, batch_median = time_generation(
+                TaskGeneratorService._generate_tasks, user, item, days, args.runs
+            )
+            assert legacy_count == batch_count, f"Task count mismatch: {legacy_count} != {batch_count}"
+
+            print(f"   - {days:3d}-day plan ({batch_count} tasks)")
+            print(f"       Legacy save() loop: median {legacy_median:8.2f} ms")
+            print(f"       Batched insert:     median {batch_median:8.2f} ms")
+            if batch_median > 0:
+                print(f"       Speedup: {legacy_median / batch_median:.1f}x")
+    finally:
+        item.delete()
+        user.delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
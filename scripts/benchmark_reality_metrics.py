@@ -0,0 +1,114 @@
+"""
+Benchmark for RealityMetricsService user-wide metrics
+Compares the legacy per-item DailyTask scans against the single
+aggregation grouped by learning_item_id, for one user with many items
+and many tasks per item.
+
+Usage: python scripts/benchmark_reality_metrics.py [--items 50] [--tasks 500] [--runs 10] [--mongomock]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+from app.config import Config
+from app.models import User, LearningItem, DailyTask
+from app.services.reality_metrics_service import RealityMetricsService
+
+
+def legacy_wasted_days(user, now):
+    """Pre-aggregation implementation: every task of every item loaded per item"""
+    result = {}
+    for item in LearningItem.objects(user_id=user, status='active'):
+        days_since_start = (now - item.added_at).days
+        active_days = {task.completed_at.date() for task in DailyTask.objects(learning_item_id=item) if task.completed_at}
+        completed_days = {
+            task.completed_at.date()
+            for task in DailyTask.objects(learning_item_id=item, status='completed') if task.completed_at
+        }
+        result[str(item.id)] = (max(0, days_since_start - len(active_days)), len(completed_days))
+    return result
+
+
+def seed_user(item_count, task_count, now):
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(name='Benchmark User', email=f'reality_{suffix}@example.com',
+                mobile=f'8{suffix}', password_hash='hash').save()
+    items = [
+        LearningItem(user_id=user, title=f'Item {i}', source_type='course', status='active',
+                     total_duration=6000, completed_duration=i * 50, progress_percentage=i * 50 / 60,
+                     added_at=now - timedelta(days=120)).to_mongo()
+        for i in range(item_count)
+    ]
+    item_ids = LearningItem._get_collection().insert_many(items).inserted_ids
+    tasks = []
+    for n, item_id in enumerate(item_ids):
+        for t in range(task_count):
+            done = (t + n) % 3 != 0
+            tasks.append(DailyTask(
+                user_id=user.id, learning_item_id=item_id, title=f'Task {t}', estimated_duration_minutes=30,
+                scheduled_date=now - timedelta(days=t % 120),
+                status='completed' if done else 'pending',
+                completed_at=now - timedelta(days=(t * 7 + n) % 120, hours=t % 5) if done else None
+            ).to_mongo())
+    DailyTask._get_collection().insert_many(tasks, ordered=False)
+    return user
+
+
+def time_calls(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reality metrics paths')
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=500, help='Tasks per item')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--mongomock', action='store_true', help='Run against an in-memory mongomock client')
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        connect('benchmark', mongo_client_class=mongomock.MongoClient)
+    else:
+        connect(host=Config.MONGODB_SETTINGS['host'])
+
+    now = datetime.utcnow()
+    print(f"Seeding {args.items} items x {args.tasks} tasks...")
+    user = seed_user(args.items, args.tasks, now)
+
+    try:
+        legacy = legacy_wasted_days(user, now)
+        current = RealityMetricsService.calculate_user_metrics(user, now=now)
+        for item_id, (wasted, active) in legacy.items():
+            got = (current[item_id]['days_wasted'], current[item_id]['days_active'])
+            assert got == (wasted, active), f"Mismatch on {item_id}: {got} != {(wasted, active)}"
+
+        legacy_median, legacy_max = time_calls(lambda: legacy_wasted_days(user, now), args.runs)
+        agg_median, agg_max = time_calls(lambda: RealityMetricsService.calculate_user_metrics(user, now=now), args.runs)
+
+        print(f"\n📊 reality metrics for {args.items} items x {args.tasks} tasks ({args.runs} runs)")
+        print(f"   - Legacy per-item scans: median {legacy_median:8.2f} ms   max {legacy_max:8.2f} ms")
+        print(f"   - $group aggregation:    median {agg_median:8.2f} ms   max {agg_max:8.2f} ms")
+        if agg_median > 0:
+            print(f"   - Speedup: {legacy_median / agg_median:.1f}x")
+    finally:
+        DailyTask.objects(user_id=user).delete()
+        LearningItem.objects(user_id=user).delete()
+        user.delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark for the daily reminder pipeline
+Seeds N opted-in users and sends their reminders
+to an in-process debugging SMTP server, so the whole path runs: projected
+user streaming, idempotency claims, pooled SMTP sessions and metrics.
+--latency-ms adds a per-message delay at the server to model a real relay.
+A second dispatch is run to show that every user is then skipped.
+
+mongomock checks unique indexes with a scan per insert, so use --mongo-uri
+(a scratch database on a real mongod) for fleet-sized runs.
+
+Usage: python scripts/benchmark_reminders.py [--users 2000] [--workers 8] [--batch-size 100] [--latency-ms 0]
+                                             [--mongo-uri mongodb://localhost:27017]
+"""
+import sys
+import os
+import time
+import argparse
+import socketserver
+import threading
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, ReminderDelivery
+from app.services.otp_service import mail
+from app.services.reminder_service import ReminderService
+
+DB_NAME = 'reminder_benchmark'
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept and discard messages"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.strip().split(b' ', 1)[0].upper()
+            if verb == b'EHLO':
+                self.reply('250-sink')
+                self.reply('250 8BITMIME')
+            elif verb == b'DATA':
+                self.reply('354 end with <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                if self.server.latency:
+                    time.sleep(self.server.latency)
+                self.server.count()
+                self.reply('250 queued')
+            elif verb == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), SinkHandler)
+        self.latency = latency
+        self.messages = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.messages += 1
+
+
+def seed_users(count):
+    User._get_collection().insert_many([
+        {'name': f'Bench User {i}', 'email': f'bench{i}@example.com', 'mobile': f'9{i:09d}',
+         'password_hash': 'hash', 'daily_reminders': True}
+        for i in range(count)
+    ])
+
+
+def report(label, result):
+    latency = result['latency_ms']
+    print(f"{label:<10} sent {result['sent']:>7}  skipped {result['skipped']:>7}  failed {result['failed']:>4}  "
+          f"sessions {result['smtp_sessions']:>5}  {result['elapsed_seconds']:7.2f}s  {result['per_second']:>8} msg/s  "
+          f"p50 {latency['p50']}ms p95 {latency['p95']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reminder delivery against a local SMTP sink')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=ReminderService.DEFAULT_WORKERS)
+    parser.add_argument('--batch-size', type=int, default=ReminderService.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated per-message relay latency')
+    parser.add_argument('--mongo-uri', default=None, help='Use a real mongod instead of mongomock')
+    args = parser.parse_args()
+
+    sink = SinkServer(args.latency_ms / 1000)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=sink.server_address[1], MAIL_USE_TLS=False,
+                      MAIL_DEFAULT_SENDER='reminders@example.com')
+    mail.init_app(app)
+
+    if args.mongo_uri:
+        connect(DB_NAME, host=args.mongo_uri)
+        User._get_db().client.drop_database(DB_NAME)
+    else:
+        connect(DB_NAME, mongo_client_class=mongomock.MongoClient)
+    try:
+        ReminderDelivery.ensure_indexes()
+        print(f"Seeding {args.users} users...")
+        seed_users(args.users)
+        with app.app_context():
+            report('first run', ReminderService.dispatch_daily_reminders(args.workers, args.batch_size))
+            report('re-run', ReminderService.dispatch_daily_reminders(args.workers, args.batch_size))
+        print(f"SMTP sink received {sink.messages} messages")
+    finally:
+        sink.shutdown()
+        if args.mongo_uri:
+            User._get_db().client.drop_database(DB_NAME)
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for TaskGeneratorService.reschedule_plan
+Compares the legacy delete-and-regenerate reschedule against the diff-based
+reflow (in-memory layout, minimal bulk_write, task ids kept) for plans with
+100, 1k and 5k remaining tasks, for two edits:
+
+- same:    reschedule with unchanged settings (reflow writes nothing)
+- minutes: daily minutes 90 -> 60 (every task re-timed, tail inserted)
+
+Needs a real MongoDB (mongomock's bulk_write rejects UpdateOne).
+
+Usage: python scripts/benchmark_reschedule.py [--tasks 100 1000 5000] [--runs 3] [--mongo-uri URI]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+from app.config import Config
+from app.models import User, LearningItem, LearningPlan, DailyTask
+from app.services.task_generator_service import TaskGeneratorService
+
+TASK_MINUTES = TaskGeneratorService.OPTIMAL_TASK_DURATION
+DAILY_MINUTES = 2 * TASK_MINUTES
+
+
+def legacy_reschedule(plan_id, new_daily_minutes, now):
+    """Pre-reflow implementation: drop every open task, then regenerate all of them"""
+    plan = LearningPlan.objects.get(id=plan_id)
+    DailyTask.objects(learning_plan_id=plan, status__in=['pending', 'in_progress']).delete()
+    if new_daily_minutes:
+        plan.daily_availability_minutes = new_daily_minutes
+    item = plan.learning_item_id
+    tasks = TaskGeneratorService._build_tasks(plan, item, start_date=now)
+    TaskGeneratorService._insert_tasks(tasks)
+    plan.total_tasks = plan.completed_tasks + len(tasks)
+    plan.save()
+    return len(tasks)
+
+
+def reflow_reschedule(plan_id, new_daily_minutes, now):
+    plan = TaskGeneratorService.reschedule_plan(plan_id, new_daily_minutes=new_daily_minutes, now=now)
+    return plan.plan_metadata['last_reschedule']
+
+
+def make_plan(user, task_count, now):
+    """Plan with task_count open tasks (two per weekday), already laid out"""
+    item = LearningItem(
+        user_id=user, title='Benchmark Course', source_type='course', total_duration=task_count * TASK_MINUTES
+    ).save()
+    calendar_days = (task_count // 2) * 7 // 5 + 14
+    plan = LearningPlan(
+        learning_item_id=item,
+        user_id=user,
+        target_completion_date=now + timedelta(days=calendar_days * 2),  # Room for the 60 min/day edit
+        daily_availability_minutes=DAILY_MINUTES,
+        total_estimated_duration=task_count * TASK_MINUTES,
+        buffer_percentage=0,
+        skip_weekends=True
+    ).save()
+    tasks = TaskGeneratorService._build_tasks(plan, item, start_date=now)
+    TaskGeneratorService._insert_tasks(tasks)
+    plan.update(set__total_tasks=len(tasks))
+    return plan, item
+
+
+def time_reschedule(fn, user, task_count, new_daily_minutes, runs, now):
+    samples = []
+    result = None
+    for _ in range(runs):
+        plan, item = make_plan(user, task_count, now)
+        start = time.perf_counter()
+        result = fn(plan.id, new_daily_minutes, now)
+        samples.append((time.perf_counter() - start) * 1000)
+        DailyTask.objects(learning_plan_id=plan).delete()
+        plan.delete()
+        item.delete()
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark plan rescheduling')
+    parser.add_argument('--tasks', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--mongo-uri', default=Config.MONGODB_SETTINGS['host'])
+    args = parser.parse_args()
+
+    connect(host=args.mongo_uri)
+    now = datetime.utcnow()
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(
+        name='Benchmark User',
+        email=f'bench_{suffix}@example.com',
+        mobile=f'9{suffix}',
+        password_hash='hash'
+    ).save()
+
+    try:
+        print(f"\n📊 Reschedule latency ({args.runs} runs, median)")
+        for task_count in args.tasks:
+            print(f"   - {task_count} remaining tasks")
+            for label, new_minutes in (('same', None), ('minutes', 60)):
+                _, legacy_median = time_reschedule(legacy_reschedule, user, task_count, new_minutes, args.runs, now)
+                summary, reflow_median = time_reschedule(
+                    reflow_reschedule, user, task_count, new_minutes, args.runs, now
+                )
+                print(f"       [{label}] legacy {legacy_median:9.2f} ms | reflow {reflow_median:9.2f} ms"
+                      f" | {summary['updated']} updated, {summary['inserted']} inserted,"
+                      f" {summary['deleted']} deleted, {summary['unchanged']} kept as-is")
+    finally:
+        user.delete()
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Build the indexes declared in the model meta blocks
+Run once per deploy (before switching traffic): python scripts/ensure_indexes.py [--dry-run]
+"""
+import sys
+import os
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect
+from app.config import Config
+from app.indexes import ensure_indexes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create missing MongoDB indexes')
+    parser.add_argument('--dry-run', action='store_true', help='Only list missing indexes')
+    args = parser.parse_args()
+
+    connect(host=Config.MONGODB_SETTINGS['host'])
+    report = ensure_indexes(dry_run=args.dry_run)
+
+    for row in report:
+        fields = ', '.join(f"{name} {direction}" for name, direction in row['index'])
+        marker = {'exists': '  ', 'missing': '❌', 'created': '✅'}[row['status']]
+        print(f"{marker} {row['collection']:<24} ({fields}) {row['status']}")
+
+    pending = sum(1 for row in report if row['status'] != 'exists')
+    label = 'missing' if args.dry_run else 'created'
+    print(f"\n{pending} of {len(report)} indexes {label}")
+
+
+if __name__ == '__main__':
+    main()
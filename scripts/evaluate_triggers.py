@@ -0,0 +1,34 @@
+"""
+Script to run the notification trigger sweep for every active user
+Run this via cron or Task Scheduler when no Celery beat is running: 5 * * * * python scripts/evaluate_triggers.py
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.trigger_service import TriggerService
+from datetime import datetime
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate nudge / overload triggers for all users')
+    parser.add_argument('--chunk-size', type=int, default=TriggerService.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with app.app_context():
+        start = time.perf_counter()
+        result = TriggerService.evaluate_all(chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"[{datetime.now()}] {result['users']} users, {result['triggered']} triggered, "
+              f"{result['created']} notifications created in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
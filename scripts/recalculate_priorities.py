@@ -0,0 +1,36 @@
+"""
+Script to re-score learning item priorities for every user
+Celery beat runs the same re-scoring (jobs.recalculate_priorities) at 03:00 UTC.
+Without a beat scheduler, run this via cron or Task Scheduler instead:
+0 3 * * * python scripts/recalculate_priorities.py
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.priority_service import PriorityService
+from datetime import datetime
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recalculate priority scores for all users')
+    parser.add_argument('--chunk-size', type=int, default=PriorityService.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with app.app_context():
+        start = time.perf_counter()
+        result = PriorityService.recalculate_all(chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"[{datetime.now()}] Scanned {result['scanned']} items, "
+              f"updated {result['updated']} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Script to run the daily missed-session sweep over every active commitment
+Run this via cron or Task Scheduler: 30 0 * * * python scripts/sweep_missed_sessions.py --workers 4
+Safe to re-run: a crashed sweep resumes from its checkpoint, a finished one is skipped.
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.services.commitment_service import CommitmentService, SWEEP_BATCH_SIZE
+from datetime import datetime
+
+app = create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect missed commitment sessions for all users')
+    parser.add_argument('--batch-size', type=int, default=SWEEP_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=1, help='Processes to split users across')
+    args = parser.parse_args()
+
+    with app.app_context():
+        start = time.perf_counter()
+        summary = CommitmentService.sweep_missed_sessions(
+            batch_size=args.batch_size,
+            workers=args.workers,
+            db_host=app.config['MONGODB_SETTINGS']['host']
+        )
+        elapsed = time.perf_counter() - start
+        if summary['skipped']:
+            print(f"[{datetime.now()}] Sweep already completed today")
+            return
+        resumed = f" (resumed after {summary['resumed_from']})" if summary['resumed_from'] else ''
+        print(f"[{datetime.now()}] Scanned {summary['scanned']} commitments in {summary['batches']} batches{resumed}: "
+              f"{summary['violations']} violations, {summary['notifications']} partner notifications in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
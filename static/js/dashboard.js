@@ -200,12 +200,13 @@ class DashboardManager {
 
         // 2. Active Recall
         try {
-            const res = await fetch('/api/recall/due', { headers: { 'Authorization': `Bearer ${this.token}` } });
+            // The due list is paged; the forecast counts overdue cards towards today
+            const res = await fetch('/api/recall/due/forecast?days=1', { headers: { 'Authorization': `Bearer ${this.token}` } });
             if (res.ok) {
-                const cards = await res.json();
-                if (cards.length > 0) {
+                const [dueToday = 0] = Object.values(await res.json());
+                if (dueToday > 0) {
                     document.getElementById('arenaRecall').style.display = 'flex';
-                    document.getElementById('recallCount').textContent = `${cards.length} Cards Due`;
+                    document.getElementById('recallCount').textContent = `${dueToday} Cards Due`;
                 }
             }
         } catch (e) { console.error(e); }
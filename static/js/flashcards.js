@@ -7,6 +7,8 @@
 class FlashcardManager {
     constructor() {
         this.queue = [];
+        this.nextCursor = null;
+        this.fetchingMore = false;
         this.currentCard = null;
         this.token = localStorage.getItem('token');
 
@@ -24,11 +26,12 @@ class FlashcardManager {
 
     async fetchQueue() {
         try {
-            const res = await fetch('/api/recall/due', {
+            const res = await fetch('/api/recall/due?limit=100', {
                 headers: { 'Authorization': `Bearer ${this.token}` }
             });
             if (res.ok) {
                 this.queue = await res.json();
+                this.nextCursor = res.headers.get('X-Next-Cursor');
                 this.updateQueueCount();
                 this.loadNextCard();
             } else {
@@ -39,12 +42,35 @@ class FlashcardManager {
         }
     }
 
+    // The due list is paged: fetch the next page before the queue runs dry
+    async fetchMore() {
+        if (!this.nextCursor || this.fetchingMore) return;
+        this.fetchingMore = true;
+        try {
+            const url = `/api/recall/due?limit=100&cursor=${encodeURIComponent(this.nextCursor)}`;
+            const res = await fetch(url, { headers: { 'Authorization': `Bearer ${this.token}` } });
+            if (res.ok) {
+                this.queue.push(...await res.json());
+                this.nextCursor = res.headers.get('X-Next-Cursor');
+                this.updateQueueCount();
+            }
+        } catch (e) {
+            console.error(e);
+        } finally {
+            this.fetchingMore = false;
+        }
+    }
+
     updateQueueCount() {
         const el = document.getElementById('queueCount');
-        if (el) el.innerText = `${this.queue.length} cards due`;
+        if (el) el.innerText = `${this.queue.length}${this.nextCursor ? '+' : ''} cards due`;
     }
 
-    loadNextCard() {
+    async loadNextCard() {
+        if (this.queue.length <= 5) {
+            const more = this.fetchMore();
+            if (this.queue.length === 0) await more;
+        }
         if (this.queue.length === 0) {
             this.renderEmptyState();
             return;
@@ -0,0 +1,67 @@
+"""
+Shared mongomock helpers for the unit tests
+
+mongomock 4.3's bulk_write rejects the `sort` argument pymongo>=4.9 passes
+from UpdateOne, so services that write through bulk_write cannot run
+against it directly. replay_bulk_write() patches it to apply each op with
+the matching single-op method instead, and records the batches so tests
+can still assert how many round-trips a service made.
+"""
+from unittest.mock import patch
+import mongomock
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+
+
+def bulk_write_supported():
+    """True when mongomock's own bulk_write accepts pymongo's UpdateOne"""
+    try:
+        mongomock.MongoClient().db.probe.bulk_write([UpdateOne({'_id': 1}, {'$set': {'x': 1}})])
+        return True
+    except TypeError:
+        return False
+
+
+def _apply(collection, op):
+    if isinstance(op, InsertOne):
+        collection.insert_one(op._doc)
+    elif isinstance(op, UpdateOne):
+        collection.update_one(op._filter, op._doc, upsert=bool(op._upsert))
+    elif isinstance(op, UpdateMany):
+        collection.update_many(op._filter, op._doc, upsert=bool(op._upsert))
+    elif isinstance(op, ReplaceOne):
+        collection.replace_one(op._filter, op._doc, upsert=bool(op._upsert))
+    elif isinstance(op, DeleteOne):
+        collection.delete_one(op._filter)
+    elif isinstance(op, DeleteMany):
+        collection.delete_many(op._filter)
+    else:
+        raise TypeError(f"Unsupported bulk op: {op!r}")
+
+
+def replay_bulk_write(test):
+    """
+    Patch mongomock's Collection.bulk_write for the rest of `test`
+
+    Batches are recorded, then handed to mongomock's own bulk_write when
+    it works with this pymongo, or else applied op by op in order with
+    insert_one/update_one/delete_many etc. (ordered=False batches too,
+    which only matters on error).
+
+    Returns:
+        List of (collection name, [ops]) appended on every bulk_write call
+    """
+    batches = []
+    native = mongomock.collection.Collection.bulk_write if bulk_write_supported() else None
+
+    def bulk_write(collection, requests, ordered=True, **kwargs):
+        requests = list(requests)
+        batches.append((collection.name, requests))
+        if native:
+            return native(collection, requests, ordered=ordered, **kwargs)
+        for op in requests:
+            _apply(collection, op)
+
+    patcher = patch.object(mongomock.collection.Collection, 'bulk_write', bulk_write)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return batches
@@ -0,0 +1,113 @@
+"""
+Unit tests for AccountabilityService pod views
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem, DailyTask, AccountabilityPartner
+from app.services.accountability_service import AccountabilityService, pod_cache
+
+
+class TestPodView(unittest.TestCase):
+    """Test cases for AccountabilityService.get_pod"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask, AccountabilityPartner):
+            model.drop_collection()
+        pod_cache.clear()
+        pod_cache.ttl_seconds = 30
+
+        self.owner = User(name='Owner', email='owner@example.com',
+                          mobile='5550030000', password_hash='hash').save()
+        self.partners = [
+            User(name=f'Partner {i}', email=f'partner{i}@example.com', mobile=f'555003001{i}',
+                 password_hash='hash', xp_total=100 * i).save()
+            for i in range(3)
+        ]
+        for partner in self.partners:
+            self._link(partner)
+        self.item = LearningItem(
+            user_id=self.owner, title='Linear Algebra', source_type='course', total_duration=300
+        ).save()
+        self.now = datetime.utcnow().replace(hour=18, minute=0, second=0, microsecond=0)
+
+    def _link(self, partner):
+        AccountabilityPartner(
+            user_id=self.owner, partner_email=partner.email,
+            partner_user_id=partner, status='active'
+        ).save()
+
+    def _complete(self, user, days_ago, count=1):
+        for _ in range(count):
+            when = self.now - timedelta(days=days_ago)
+            DailyTask(
+                learning_item_id=self.item, user_id=user, title='Task', scheduled_date=when,
+                estimated_duration_minutes=30, status='completed', completed_at=when
+            ).save()
+
+    def test_tasks_today_and_streaks(self):
+        self._complete(self.partners[0], 0, count=2)
+        self._complete(self.partners[0], 1)
+        self._complete(self.partners[0], 2)
+        self._complete(self.partners[1], 1)  # Nothing yet today: streak runs to yesterday
+        self._complete(self.partners[2], 3)  # Broken streak
+
+        pod = {p['name']: p for p in AccountabilityService.get_pod(self.owner.id, now=self.now)}
+        self.assertEqual(pod['Partner 0']['tasks_today'], 2)
+        self.assertEqual(pod['Partner 0']['streak'], 3)
+        self.assertEqual(pod['Partner 1']['streak'], 1)
+        self.assertEqual(pod['Partner 2']['streak'], 0)
+        self.assertEqual(pod['Partner 2']['xp'], 200)
+
+    def _queries_for_pod(self):
+        """Client-issued queries (mongomock's own nested finds, e.g. for $lookup, not counted)"""
+        pod_cache.clear()
+        calls, depth = [], [0]
+        for name in ('find', 'aggregate', 'count_documents'):
+            def counted(collection, *args, _original=getattr(mongomock.collection.Collection, name), **kwargs):
+                if depth[0] == 0:
+                    calls.append(collection.name)
+                depth[0] += 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    depth[0] -= 1
+            patcher = patch.object(mongomock.collection.Collection, name, counted)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        AccountabilityService.get_pod(self.owner.id, now=self.now)
+        patch.stopall()
+        return calls
+
+    def test_query_count_is_constant(self):
+        small = self._queries_for_pod()
+        for i in range(5):
+            self._link(User(name=f'Extra {i}', email=f'extra{i}@example.com', mobile=f'555003010{i}',
+                            password_hash='hash').save())
+        self.assertEqual(self._queries_for_pod(), small)
+        self.assertEqual(small, ['accountability_partners', 'daily_tasks'])
+
+    def test_cached_until_partner_links_change(self):
+        first = AccountabilityService.get_pod(self.owner.id, now=self.now)
+        first[0]['name'] = 'mutated by caller'
+        self.assertEqual(len(AccountabilityService.get_pod(self.owner.id, now=self.now)), 3)
+        self.assertNotIn('mutated by caller', [p['name'] for p in AccountabilityService.get_pod(self.owner.id)])
+
+        newcomer = User(name='Newcomer', email='new@example.com',
+                        mobile='5550030099', password_hash='hash').save()
+        self._link(newcomer)
+        self.assertEqual(len(AccountabilityService.get_pod(self.owner.id)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Unit tests for the content adapter runtime (dispatch, cache, single flight, pooling)
+Runs YouTubeAdapter against a local stub of the YouTube Data API.
+"""
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from flask import Flask
+from app.services.adapters import runtime
+from app.services.adapters.factory import AdapterFactory
+from app.services.adapters.runtime import MetadataCache, metadata_cache, configure_adapters
+from app.services.adapters.youtube import YouTubeAdapter, iso_duration_minutes
+
+
+class StubYouTubeAPI(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so pooled connections are reused
+
+    def do_GET(self):
+        video_id = parse_qs(urlsplit(self.path).query).get('id', [''])[0]
+        self.server.requests.append((video_id, self.client_address[1]))
+        time.sleep(self.server.delay)
+        items = [] if video_id.startswith('missing') else [{
+            'snippet': {'title': f'Video {video_id}', 'channelTitle': 'Stub Channel',
+                        'publishedAt': '2026-01-01T00:00:00Z', 'thumbnails': {}},
+            'contentDetails': {'duration': 'PT1H2M30S'},
+            'statistics': {'viewCount': '42'}
+        }]
+        body = json.dumps({'items': items}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAdapterRuntime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubYouTubeAPI)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.app = Flask(__name__)
+        cls.app.config.update(
+            YOUTUBE_API_KEY='test-key',
+            YOUTUBE_API_URL=f'http://127.0.0.1:{cls.server.server_address[1]}',
+            ADAPTER_HTTP_POOL_SIZE=4
+        )
+        configure_adapters(cls.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        runtime.reset_http_session()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.delay = 0
+        metadata_cache.clear()
+        self.adapter = AdapterFactory.get_adapter('https://youtu.be/abcdefghijk')
+
+    def test_dispatch_by_host(self):
+        self.assertIsInstance(self.adapter, YouTubeAdapter)
+        for url in ('youtube.com/watch?v=abcdefghijk', 'https://m.youtube.com/watch?v=abcdefghijk',
+                    'https://www.youtube-nocookie.com/embed/abcdefghijk'):
+            self.assertIs(AdapterFactory.get_adapter(url), self.adapter, url)
+        self.assertIsNone(AdapterFactory.get_adapter('https://example.com/watch?v=abcdefghijk'))
+        self.assertIsNone(AdapterFactory.get_adapter('https://youtube.com/'))
+        self.assertIs(AdapterFactory.get_adapter_by_type('youtube'), self.adapter)
+
+    def test_fetch_is_cached_by_canonical_id(self):
+        with self.app.app_context():
+            first = self.adapter.get_metadata('https://www.youtube.com/watch?v=abcdefghijk&t=30')
+            first['title'] = 'mutated by caller'
+            second = self.adapter.get_metadata('https://youtu.be/abcdefghijk')
+
+        self.assertEqual(second['title'], 'Video abcdefghijk')
+        self.assertEqual(second['duration_minutes'], 63)
+        self.assertEqual(second['platform_metadata']['view_count'], 42)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_concurrent_fetches_are_coalesced(self):
+        self.server.delay = 0.2
+        results, errors = [], []
+
+        def enrich():
+            with self.app.app_context():
+                try:
+                    results.append(self.adapter.get_metadata('https://youtu.be/concurrent1'))
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=enrich) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(metadata_cache.stats()['coalesced'], 7)
+
+    def test_failures_are_not_cached_and_connections_are_reused(self):
+        with self.app.app_context():
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    self.adapter.get_metadata('https://youtu.be/missing0001')
+            self.adapter.get_metadata('https://youtu.be/pooled00001')
+
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len({port for _, port in self.server.requests}), 1)
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def test_lru_and_ttl_eviction(self):
+        cache = MetadataCache(ttl_seconds=60, max_size=2)
+        cache.set('a', {'n': 1})
+        cache.set('b', {'n': 2})
+        cache.get('a')
+        cache.set('c', {'n': 3})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'n': 1})
+
+        cache.ttl_seconds = 0.01
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_iso_durations(self):
+        self.assertEqual(iso_duration_minutes('PT15M'), 15)
+        self.assertEqual(iso_duration_minutes('PT45S'), 1)
+        self.assertEqual(iso_duration_minutes('P1DT1H'), 1500)
+        self.assertEqual(iso_duration_minutes('garbage'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
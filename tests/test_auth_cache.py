@@ -0,0 +1,124 @@
+"""
+Unit tests for the shared auth layer (app/auth.py)
+Token LRU eviction, per-request user reuse and user cache invalidation
+"""
+import time
+import unittest
+from unittest.mock import patch
+
+import jwt
+import mongomock
+from flask import Flask, g
+from mongoengine import connect, disconnect
+
+from app.models import User
+from app.auth import TokenCache, decode_token, load_user, token_cache, user_cache, token_required, user_required
+
+
+class TestTokenCache(unittest.TestCase):
+    """Test cases for the decoded-token LRU"""
+
+    def test_expired_entries_are_not_returned(self):
+        cache = TokenCache(max_size=4)
+        cache.set('stale', {'user_id': 'a', 'exp': time.time() - 1})
+        cache.set('fresh', {'user_id': 'b', 'exp': time.time() + 60})
+
+        self.assertIsNone(cache.get('stale'))
+        self.assertEqual(cache.get('fresh')['user_id'], 'b')
+
+    def test_eviction_prefers_expired_then_lru(self):
+        cache = TokenCache(max_size=2)
+        cache.set('old', {'user_id': 'a', 'exp': time.time() + 60})
+        cache.set('expired', {'user_id': 'b', 'exp': time.time() - 1})
+        cache.get('old')
+        cache.set('new', {'user_id': 'c', 'exp': time.time() + 60})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('old'))
+        self.assertIsNotNone(cache.get('new'))
+
+        cache.set('newest', {'user_id': 'd', 'exp': time.time() + 60})
+        self.assertIsNone(cache.get('old'))
+
+
+class TestAuthLayer(unittest.TestCase):
+    """Test cases for request-scoped user resolution"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+        cls.app = Flask(__name__)
+        cls.app.config['JWT_SECRET_KEY'] = 'test-secret'
+
+        @cls.app.route('/by-id')
+        @token_required
+        def by_id(user_id):
+            first = load_user(user_id)
+            second = load_user(user_id)
+            return {'same': first is second, 'name': second.name}
+
+        @cls.app.route('/by-user')
+        @user_required
+        def by_user(current_user):
+            return {'same': load_user(str(current_user.id)) is current_user}
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        User.drop_collection()
+        token_cache.clear()
+        user_cache.clear()
+        self.user = User(
+            name='Auth User',
+            email='auth@example.com',
+            mobile='1112223333',
+            password_hash='hash'
+        ).save()
+        self.token = jwt.encode(
+            {'user_id': str(self.user.id), 'exp': int(time.time()) + 3600},
+            'test-secret', algorithm='HS256'
+        )
+
+    def tearDown(self):
+        user_cache.ttl_seconds = 0
+
+    def test_token_decoded_once(self):
+        with self.app.app_context():
+            with patch('app.auth.jwt.decode', wraps=jwt.decode) as decode:
+                decode_token(self.token)
+                decode_token(self.token)
+                self.assertEqual(decode.call_count, 1)
+
+    def test_invalid_token_rejected(self):
+        client = self.app.test_client()
+        response = client.get('/by-id', headers={'Authorization': 'Bearer not-a-token'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_loaded_once_per_request(self):
+        client = self.app.test_client()
+        headers = {'Authorization': f'Bearer {self.token}'}
+
+        response = client.get('/by-id', headers=headers)
+        self.assertTrue(response.get_json()['same'])
+
+        response = client.get('/by-user', headers=headers)
+        self.assertTrue(response.get_json()['same'])
+
+    def test_user_cache_invalidated_on_save(self):
+        user_cache.ttl_seconds = 30
+        with self.app.app_context():
+            load_user(str(self.user.id))
+            self.assertIsNotNone(user_cache.get(self.user.id))
+
+            self.user.name = 'Renamed'
+            self.user.save()
+            self.assertIsNone(user_cache.get(self.user.id))
+
+        with self.app.app_context():
+            self.assertEqual(load_user(str(self.user.id)).name, 'Renamed')
+
+
+if __name__ == '__main__':
+    unittest.main()
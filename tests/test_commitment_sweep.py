@@ -0,0 +1,126 @@
+"""
+Unit tests for the checkpointed missed-session sweep
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import (
+    User, LearningItem, Commitment, CommitmentViolation, Notification, SweepCheckpoint
+)
+from app.services.commitment_service import CommitmentService
+
+
+class TestMissedSessionSweep(unittest.TestCase):
+    """Test cases for CommitmentService.sweep_missed_sessions"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, Commitment, CommitmentViolation, Notification, SweepCheckpoint):
+            model.drop_collection()
+        self.now = datetime(2026, 3, 10, 6, 0)
+        self.user = User(name='Sweeper', email='sweep@example.com',
+                         mobile='5550040000', password_hash='hash').save()
+        self.partner = User(name='Partner', email='partner@example.com',
+                            mobile='5550040001', password_hash='hash').save()
+        self.item = LearningItem(
+            user_id=self.user, title='Compilers', source_type='course', total_duration=900
+        ).save()
+
+    def _commitment(self, last_check_in_days_ago=2, **fields):
+        return Commitment(
+            user_id=self.user, learning_item_id=self.item, daily_study_minutes=30,
+            target_completion_date=self.now + timedelta(days=30),
+            created_at=self.now - timedelta(days=10),
+            last_check_in=self.now - timedelta(days=last_check_in_days_ago),
+            current_streak=4, **fields
+        ).save()
+
+    def _past_violations(self, commitment, count):
+        for i in range(count):
+            CommitmentViolation(
+                commitment_id=commitment, user_id=self.user, violation_type='missed_session',
+                violation_date=self.now - timedelta(days=i + 1)
+            ).save()
+
+    def test_escalation_matches_violation_history(self):
+        fresh = self._commitment()
+        second = self._commitment()
+        self._past_violations(second, 1)
+        repeat = self._commitment(has_accountability_partner=True,
+                                  accountability_partner_email=self.partner.email)
+        self._past_violations(repeat, 3)
+        self._commitment(last_check_in_days_ago=0)  # Checked in today
+
+        summary = CommitmentService.sweep_missed_sessions(batch_size=2, now=self.now)
+        self.assertEqual((summary['scanned'], summary['violations'], summary['batches']), (4, 3, 2))
+        self.assertEqual(summary['notifications'], 1)
+
+        latest = {v.commitment_id.id: v for v in CommitmentViolation.objects(violation_date=self.now)}
+        self.assertTrue(latest[fresh.id].is_grace_period)
+        self.assertEqual(latest[second.id].consequence_applied, 'streak_reset')
+        self.assertEqual(latest[repeat.id].consequence_applied, 'partner_notification')
+        self.assertEqual(Commitment.objects.get(id=second.id).current_streak, 0)
+        self.assertEqual(Notification.objects(user_id=self.partner).count(), 1)
+
+    def test_third_miss_locks_user_out(self):
+        self.now = datetime.utcnow()  # is_user_locked_out reads the real clock
+        locked = self._commitment()
+        self._past_violations(locked, 2)
+        self.assertFalse(CommitmentService.is_user_locked_out(self.user))
+
+        CommitmentService.sweep_missed_sessions(now=self.now)
+
+        violation = CommitmentViolation.objects.get(commitment_id=locked, violation_date=self.now)
+        self.assertEqual((violation.consequence_applied, violation.consequence_duration_hours),
+                         ('content_lockout_24h', 24))
+        self.assertTrue(CommitmentService.is_user_locked_out(self.user))
+
+    def test_completed_run_is_not_repeated(self):
+        self._commitment()
+        CommitmentService.sweep_missed_sessions(now=self.now)
+        again = CommitmentService.sweep_missed_sessions(now=self.now)
+
+        self.assertTrue(again['skipped'])
+        self.assertEqual(CommitmentViolation.objects.count(), 1)
+
+    def test_crashed_run_resumes_without_duplicates(self):
+        for _ in range(5):
+            self._commitment()
+
+        original = CommitmentService._process_batch
+        calls = []
+
+        def crash_on_second_batch(batch, now, run=None):
+            calls.append(len(batch))
+            result = original(batch, now, run)
+            if len(calls) == 2:
+                raise RuntimeError('worker died')  # After writes, before the checkpoint
+            return result
+
+        with patch.object(CommitmentService, '_process_batch', side_effect=crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                CommitmentService.sweep_missed_sessions(batch_size=2, now=self.now)
+
+        resumed = CommitmentService.sweep_missed_sessions(batch_size=2, now=self.now)
+        self.assertIsNotNone(resumed['resumed_from'])
+        self.assertEqual(resumed['scanned'], 3)
+        self.assertEqual(CommitmentViolation.objects.count(), 5)
+
+    def test_detect_for_single_user(self):
+        self._commitment()
+        violations = CommitmentService.detect_missed_sessions(str(self.user.id), now=self.now)
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(violations[0].violation_metadata['days_missed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
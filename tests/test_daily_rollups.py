@@ -0,0 +1,136 @@
+"""
+Unit tests for the DailyStat rollup layer and its readers
+(burnout, truth metrics, weekly summary)
+"""
+import unittest
+from datetime import datetime, timedelta
+from mongoengine import connect, disconnect
+from pymongo.errors import DuplicateKeyError
+import mongomock
+from app.models import User, LearningItem, DailyTask, DailyStat
+from app.indexes import ensure_indexes, index_status
+from app.services.stats_service import StatsService
+from app.services.burnout_service import BurnoutService
+from app.services.reality_service import RealityService
+from app.services.review_service import WeeklyReviewService
+
+
+class TestDailyRollups(unittest.TestCase):
+    """Test cases for DailyStat task rollups"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask, DailyStat):
+            model.drop_collection()
+        self.user = User(
+            name='Rollup User', email='rollup@example.com',
+            mobile='5550006666', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='SICP', source_type='book',
+            status='active', total_duration=600
+        ).save()
+        self.today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def _completed(self, days_ago, minutes):
+        """A task completed days_ago, written directly (no rollup)"""
+        when = self.today - timedelta(days=days_ago)
+        return DailyTask(
+            learning_item_id=self.item, user_id=self.user, title='Task',
+            scheduled_date=when, estimated_duration_minutes=30, status='completed', completed_at=when,
+            actual_duration_minutes=minutes
+        ).save()
+
+    def test_mark_complete_increments_rollup_once(self):
+        task = DailyTask(
+            learning_item_id=self.item, user_id=self.user, title='Task',
+            scheduled_date=self.today, estimated_duration_minutes=30
+        ).save()
+        task.mark_complete(45)
+        task.mark_complete(45)
+
+        rollup = StatsService.get_daily_rollup(self.user.id, self.today.date(), self.today.date())
+        self.assertEqual(rollup[self.today.date()]['task_minutes'], 45)
+        self.assertEqual(rollup[self.today.date()]['tasks_completed'], 1)
+
+    def test_rebuild_matches_task_history(self):
+        self._completed(0, 30)
+        self._completed(0, 20)
+        self._completed(3, 50)
+
+        self.assertEqual(StatsService.rebuild_task_rollups(), 2)
+        # Idempotent: a second run sets the same totals
+        StatsService.rebuild_task_rollups(user_id=self.user.id)
+
+        start = self.today.date() - timedelta(days=3)
+        rollup = StatsService.get_daily_rollup(self.user.id, start, self.today.date())
+        self.assertEqual(len(rollup), 4)
+        self.assertEqual(rollup[self.today.date()]['task_minutes'], 50)
+        self.assertEqual(rollup[self.today.date()]['tasks_completed'], 2)
+        self.assertEqual(rollup[start]['task_minutes'], 50)
+        self.assertEqual(rollup[start + timedelta(days=1)]['task_minutes'], 0)
+
+    def test_legacy_duplicate_days_merged_into_unique_index(self):
+        day = self.today.replace(hour=0)
+        collection = DailyStat._get_collection()
+        collection.drop_indexes()
+        collection.create_index([('user_id', 1), ('date', 1)])  # The old non-unique index
+        collection.insert_many([
+            {'user_id': self.user.id, 'date': day, 'total_minutes': 30, 'sessions_count': 1},
+            {'user_id': self.user.id, 'date': day, 'total_minutes': 20, 'sessions_count': 1, 'tasks_completed': 2},
+        ])
+        self.assertEqual(index_status(DailyStat)[0], [])
+
+        report = ensure_indexes([DailyStat])
+        self.assertEqual([row['status'] for row in report], ['created'])
+        self.assertEqual(collection.count_documents({}), 1)
+        rollup = StatsService.get_daily_rollup(self.user.id, day.date(), day.date())[day.date()]
+        self.assertEqual((rollup['total_minutes'], rollup['sessions_count'], rollup['tasks_completed']), (50, 2, 2))
+
+        with self.assertRaises(DuplicateKeyError):
+            collection.insert_one({'user_id': self.user.id, 'date': day})
+        StatsService.update_daily_stats(self.user.id, 10)  # Today's upsert lands on the merged day
+        self.assertEqual(DailyStat.objects(user_id=self.user).count(), 1)
+        self.assertEqual(DailyStat.objects.get(user_id=self.user).total_minutes, 60)
+
+    def test_boots_against_old_non_unique_index(self):
+        collection = DailyStat._get_collection()
+        collection.drop_indexes()
+        collection.create_index([('user_id', 1), ('date', 1)])  # The old non-unique index
+        DailyStat._collection = None  # A fresh process: the first access sets the collection up again
+
+        StatsService.update_daily_stats(self.user.id, 15)
+        self.assertEqual(DailyStat.objects(user_id=self.user).count(), 1)
+        self.assertEqual(len(index_status(DailyStat)[1]), 1)  # Left for ensure_indexes to upgrade
+        self.assertEqual([row['status'] for row in ensure_indexes([DailyStat])], ['created'])
+
+    def test_readers_use_rollup(self):
+        for days_ago in range(5):
+            self._completed(days_ago, 250)
+        StatsService.rebuild_task_rollups()
+        # Once rolled up, the readers no longer touch DailyTask
+        DailyTask.objects(user_id=self.user).update(set__actual_duration_minutes=0)
+
+        risk = BurnoutService.check_burnout_risk(str(self.user.id))
+        self.assertEqual(risk['level'], 'high')
+        self.assertEqual(risk['details']['high_intensity_streak'], 5)
+
+        truth = RealityService.calculate_truth_metrics(str(self.user.id))
+        self.assertEqual(truth['days_invested'], 5)
+        self.assertEqual(truth['days_wasted'], 26)
+        self.assertEqual(truth['actual_velocity'], round(5 * 250 / 7, 1))
+
+        summary = WeeklyReviewService.get_weekly_summary(str(self.user.id))
+        self.assertEqual(summary['tasks_completed'], 5)
+        self.assertEqual(summary['total_hours'], round(1250 / 60, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
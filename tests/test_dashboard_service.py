@@ -0,0 +1,108 @@
+"""
+Unit tests for DashboardService focus snapshots and their cache
+"""
+import unittest
+from datetime import datetime, timedelta
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem, DailyTask
+from app.services.dashboard_service import DashboardService, focus_cache
+from app.services.inbox_service import InboxService
+
+
+class TestFocusSnapshot(unittest.TestCase):
+    """Test cases for DashboardService.get_focus"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask):
+            model.drop_collection()
+        focus_cache.clear()
+        focus_cache.ttl_seconds = 60
+
+        self.user = User(
+            name='Focus User', email='focus@example.com',
+            mobile='5550005555', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='Rust Book', source_type='course',
+            status='active', total_duration=90, priority_score=70
+        ).save()
+        self.uid = str(self.user.id)
+
+    def _task(self, title, scheduled_date):
+        return DailyTask(
+            learning_item_id=self.item, user_id=self.user, title=title,
+            scheduled_date=scheduled_date, estimated_duration_minutes=30
+        ).save()
+
+    def test_repeat_polls_hit_cache(self):
+        first, hit = DashboardService.get_focus(self.uid)
+        self.assertFalse(hit)
+        self.assertEqual(first['type'], 'learning_item')
+
+        second, hit = DashboardService.get_focus(self.uid)
+        self.assertTrue(hit)
+        self.assertEqual(second, first)
+
+    def test_overdue_task_wins(self):
+        self._task('Today task', datetime.utcnow())
+        self._task('Missed task', datetime.utcnow() - timedelta(days=2))
+
+        snapshot, _ = DashboardService.get_focus(self.uid)
+        self.assertEqual(snapshot['title'], 'Missed task')
+        self.assertEqual(snapshot['reason'], 'Catch Up (High Priority)')
+
+    def test_task_status_change_invalidates(self):
+        task = self._task('Today task', datetime.utcnow())
+        snapshot, _ = DashboardService.get_focus(self.uid)
+        self.assertEqual(snapshot['id'], str(task.id))
+
+        task.status = 'completed'
+        task.save()
+
+        snapshot, hit = DashboardService.get_focus(self.uid)
+        self.assertFalse(hit)
+        self.assertEqual(snapshot['type'], 'learning_item')
+
+    def test_item_status_change_invalidates(self):
+        DashboardService.get_focus(self.uid)
+        self.item.status = 'paused'
+        self.item.save()
+
+        snapshot, hit = DashboardService.get_focus(self.uid)
+        self.assertFalse(hit)
+        self.assertEqual(snapshot['type'], 'empty')
+
+    def test_item_delete_invalidates(self):
+        DashboardService.get_focus(self.uid)
+        InboxService.delete_item(self.item.id, self.user.id)
+
+        snapshot, hit = DashboardService.get_focus(self.uid)
+        self.assertFalse(hit)
+        self.assertEqual(snapshot['type'], 'empty')
+
+    def test_snapshot_expires_at_day_boundary(self):
+        now = datetime.utcnow()
+        DashboardService.get_focus(self.uid, now=now)
+        _, hit = DashboardService.get_focus(self.uid, now=now + timedelta(days=1))
+        self.assertFalse(hit)
+
+    def test_stats_count_hits_and_misses(self):
+        DashboardService.get_focus(self.uid)
+        DashboardService.get_focus(self.uid)
+        stats = focus_cache.stats()
+        self.assertGreaterEqual(stats['hits'], 1)
+        self.assertGreaterEqual(stats['misses'], 1)
+        self.assertEqual(stats['size'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,16 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.services.gamification_service import GamificationService
+from app.models import User, XPEvent
+from datetime import timedelta
+from threading import Thread
+from mongoengine import connect, disconnect
+import mongomock
 import unittest
+from mongomock_helpers import replay_bulk_write
+
+
+
 
 class TestGamification(unittest.TestCase):
     
@@ -28,5 +37,74 @@ class TestGamification(unittest.TestCase):
         # Formula: 500 * (3-1)^2 = 500 * 4 = 2000. Correct.
         self.assertEqual(GamificationService.calculate_xp_for_next_level(2), 2000)
 
+class TestXPAwards(unittest.TestCase):
+    """award_xp / award_xp_batch / reset_weekly_season against mongomock"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        User.drop_collection()
+        XPEvent.drop_collection()
+        self.user = User(
+            name='XP User', email='xp@example.com',
+            mobile='5550007777', password_hash='hash'
+        ).save()
+
+    def test_award_increments_and_logs(self):
+        result = GamificationService.award_xp(str(self.user.id), 600, "Focus Session")
+        self.assertTrue(result['success'])
+        self.assertTrue(result['leveled_up'])
+        self.assertEqual(result['new_level'], 2)
+
+        self.user.reload()
+        self.assertEqual((self.user.xp_total, self.user.weekly_xp, self.user.level), (600, 600, 2))
+        self.assertEqual([e.source for e in GamificationService.get_xp_history(self.user.id)], ["Focus Session"])
+
+    def test_concurrent_awards_are_not_lost(self):
+        threads = [Thread(target=GamificationService.award_xp, args=(self.user.id, 10)) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.user.reload()
+        self.assertEqual(self.user.xp_total, 200)
+        self.assertEqual(XPEvent.objects(user_id=self.user).count(), 20)
+
+    def test_stale_season_restarts_weekly_bucket(self):
+        last_week = GamificationService.season_start() - timedelta(days=3)
+        User.objects(id=self.user.id).update(set__weekly_xp=900, set__xp_total=900, set__last_weekly_reset=last_week)
+
+        result = GamificationService.award_xp(self.user.id, 50)
+        self.assertEqual(result['weekly_xp'], 50)
+        self.assertEqual(result['total_xp'], 950)
+
+    def test_reset_weekly_season_bulk(self):
+        last_week = GamificationService.season_start() - timedelta(days=3)
+        User.objects(id=self.user.id).update(set__weekly_xp=900, set__last_weekly_reset=last_week)
+
+        self.assertEqual(GamificationService.reset_weekly_season(), 1)
+        self.assertEqual(GamificationService.reset_weekly_season(), 0)
+        self.user.reload()
+        self.assertEqual(self.user.weekly_xp, 0)
+
+    def test_batch_award(self):
+        writes = replay_bulk_write(self)
+        result = GamificationService.award_xp_batch([
+            (self.user.id, 300, "Task"), (self.user.id, 300, "Task")
+        ])
+        self.assertEqual(result['events'], 2)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(result['leveled_up'], [self.user.id])
+        self.user.reload()
+        self.assertEqual(self.user.xp_total, 600)
+
+
 if __name__ == '__main__':
     unittest.main()
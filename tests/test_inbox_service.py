@@ -228,6 +228,26 @@ class TestInboxService(unittest.TestCase):
         self.assertTrue(stats['can_add_new_item'])  # Only 2 active, can add 1 more
         self.assertEqual(stats['slots_available'], 1)
     
+    def test_get_inbox_stats_single_aggregation(self):
+        """Test stats counts and invested minutes come from one aggregation"""
+        for status, minutes in [('active', 30), ('paused', 15), ('library', 5), ('archived', 50)]:
+            LearningItem(
+                user_id=self.test_user,
+                title=f'{status} item',
+                source_type='course',
+                status=status,
+                completed_duration=minutes
+            ).save()
+
+        stats = InboxService.get_inbox_stats(str(self.test_user.id))
+
+        self.assertEqual(stats['total_items'], 4)
+        self.assertEqual(stats['active_items'], 1)
+        self.assertEqual(stats['paused_items'], 1)
+        self.assertEqual(stats['completed_items'], 0)
+        self.assertEqual(stats['total_time_invested_minutes'], 100)
+        self.assertEqual(stats['slots_available'], InboxService.MAX_ACTIVE_ITEMS - 1)
+
     def test_bulk_update_status(self):
         """Test bulk status update"""
         # Create 3 items
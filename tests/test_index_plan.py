@@ -0,0 +1,177 @@
+"""
+Index plan tests
+- ensure_indexes() bookkeeping runs on mongomock.
+- The explain() check needs a real mongod (MONGODB_TEST_URI or localhost)
+  and is skipped when none is reachable. It seeds a scratch database,
+  builds the declared indexes, and fails if any service query shape
+  plans a COLLSCAN.
+"""
+import os
+import unittest
+from datetime import datetime, timedelta
+from bson import ObjectId
+from mongoengine import connect, disconnect
+import mongomock
+import pymongo
+from app.models import (
+    LearningItem, DailyTask, Notification, Commitment, CommitmentViolation, FocusSession,
+    Flashcard, OTP, UserSession, Activity, Bookmark, LiveClass, DailyStat
+)
+from app.indexes import ensure_indexes, index_status, indexed_models
+
+TEST_URI = os.getenv('MONGODB_TEST_URI', 'mongodb://localhost:27017')
+TEST_DB = 'smarteducation_index_test'
+
+
+def _mongod_available():
+    try:
+        client = pymongo.MongoClient(TEST_URI, serverSelectionTimeoutMS=500)
+        client.admin.command('ping')
+        client.close()
+        return True
+    except Exception:
+        return False
+
+
+def _query_shapes(ctx):
+    """(label, queryset) for every query shape the services issue"""
+    now = datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    week_ago = now - timedelta(days=7)
+    user, item = ctx['user'], ctx['item']
+    return [
+        # DailyTask
+        ('dashboard overdue', DailyTask.objects(user_id=user, status='pending', scheduled_date__lt=today).order_by('scheduled_date')),
+        ('dashboard today', DailyTask.objects(user_id=user, status='pending', scheduled_date__gte=today, scheduled_date__lt=tomorrow).order_by('-priority_score')),
+        ('today tasks', DailyTask.objects(user_id=user, scheduled_date__gte=today, scheduled_date__lt=tomorrow, status__in=['pending', 'in_progress']).order_by('priority_score', 'scheduled_date')),
+        ('completed today', DailyTask.objects(user_id=user, status='completed', completed_at__gte=today)),
+        ('scheduled today', DailyTask.objects(user_id=user, scheduled_date__gte=today, scheduled_date__lt=tomorrow)),
+        ('pending count', DailyTask.objects(user_id=user, status='pending')),
+        ('completed since', DailyTask.objects(user_id=user, completed_at__gte=week_ago)),
+        ('weekly completed', DailyTask.objects(user_id=user, status='completed', completed_at__gte=week_ago, completed_at__lt=now)),
+        ('item timeline', DailyTask.objects(learning_item_id=item, status='completed', completed_at__gte=week_ago).order_by('completed_at')),
+        ('item tasks', DailyTask.objects(learning_item_id=item)),
+        ('plan open tasks', DailyTask.objects(learning_plan_id=ctx['plan'], status__in=['pending', 'in_progress'])),
+        ('commitment pending', DailyTask.objects(commitment_id=ctx['commitment'], scheduled_date__gte=today, status='pending')),
+        # LearningItem
+        ('active count', LearningItem.objects(user_id=user, status='active')),
+        ('inbox list', LearningItem.objects(user_id=user).order_by('-priority_score', '-added_at', '-id')),
+        ('inbox list by status', LearningItem.objects(user_id=user, status='paused').order_by('-priority_score', '-added_at', '-id')),
+        ('library', LearningItem.objects(user_id=user, status='library').order_by('-added_at', '-id')),
+        ('bookmark duplicate', LearningItem.objects(user_id=user, source_url='https://x', status__ne='dropped')),
+        ('top priorities', LearningItem.objects(user_id=user, status='active').order_by('-priority_score')),
+        ('priority recalc', LearningItem.objects(user_id=user, status__ne='dropped')),
+        # Notification
+        ('notification anti-spam', Notification.objects(user_id=user, title='Streak Risk', created_at__gte=week_ago)),
+        ('notifications', Notification.objects(user_id=user).order_by('-created_at')),
+        ('unread notifications', Notification.objects(user_id=user, is_read=False).order_by('-created_at')),
+        # Commitments
+        ('existing commitment', Commitment.objects(user_id=user, learning_item_id=item, status='active')),
+        ('active commitments', Commitment.objects(user_id=user, status='active')),
+        ('commitment sweep', Commitment.objects(status='active')),
+        ('weekly violations', CommitmentViolation.objects(user_id=user, violation_date__gte=week_ago, violation_date__lt=now)),
+        ('recent violations', CommitmentViolation.objects(commitment_id=ctx['commitment'], violation_date__gte=week_ago)),
+        ('lockouts', CommitmentViolation.objects(user_id=user, consequence_applied__in=['content_lockout_24h'], is_resolved=False)),
+        # Other per-user collections
+        ('active focus', FocusSession.objects(user_id=user, is_active=True)),
+        ('focus window', FocusSession.objects(user_id=user, started_at__gte=week_ago, started_at__lt=now)),
+        ('focus history', FocusSession.objects(user_id=user).order_by('-started_at')),
+        ('due flashcards', Flashcard.objects(user_id=user, next_review_date__lte=now).order_by('next_review_date')),
+        ('otp lookup', OTP.objects(user_id=str(user), otp_type='email', purpose='login', is_used=False).order_by('-created_at')),
+        ('active sessions', UserSession.objects(user_id=user, is_active=True).order_by('-login_time')),
+        ('session by id', UserSession.objects(session_id='abc', user_id=user)),
+        ('activity log', Activity.objects(user_id=user).order_by('-timestamp')),
+        ('bookmarks', Bookmark.objects(user_id=user).order_by('-relevance_score', '-id')),
+        ('live classes', LiveClass.objects(user_id=user).order_by('-created_at', '-id')),
+        ('upcoming classes', LiveClass.objects(user_id=user, scheduled_at__gte=now).order_by('scheduled_at')),
+        ('joined classes', LiveClass.objects(user_id=user, joined_at__exists=True).order_by('-joined_at')),
+        ('daily stats', DailyStat.objects(user_id=user, date__gte=week_ago, date__lte=now)),
+    ]
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+class TestEnsureIndexes(unittest.TestCase):
+    """ensure_indexes() bookkeeping (mongomock)"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        Notification._get_db().drop_collection(Notification._get_collection_name())
+
+    def test_dry_run_then_build(self):
+        report = ensure_indexes([Notification], dry_run=True)
+        self.assertEqual({row['status'] for row in report}, {'missing'})
+        self.assertEqual(len(report), len(Notification._meta['index_specs']))
+
+        ensure_indexes([Notification])
+        present, missing = index_status(Notification)
+        self.assertEqual(missing, [])
+        self.assertEqual(len(present), len(Notification._meta['index_specs']))
+
+    def test_hot_models_are_indexed(self):
+        models = indexed_models()
+        for model in (LearningItem, DailyTask, Notification, Commitment):
+            self.assertIn(model, models)
+
+
+@unittest.skipUnless(_mongod_available(), 'explain() checks need a running mongod')
+class TestQueryPlans(unittest.TestCase):
+    """Every service query shape must be index-backed"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect(TEST_DB, host=TEST_URI)
+        client = pymongo.MongoClient(TEST_URI)
+        client.drop_database(TEST_DB)
+        db = client[TEST_DB]
+
+        now = datetime.utcnow()
+        cls.ctx = {name: ObjectId() for name in ('user', 'item', 'plan', 'commitment')}
+        seed = {
+            'daily_tasks': {'user_id': cls.ctx['user'], 'learning_item_id': cls.ctx['item'],
+                            'learning_plan_id': cls.ctx['plan'], 'commitment_id': cls.ctx['commitment'],
+                            'status': 'pending', 'scheduled_date': now, 'title': 'Task'},
+            'learning_items': {'user_id': cls.ctx['user'], 'status': 'active', 'title': 'Item',
+                               'priority_score': 50.0, 'added_at': now},
+            'notifications': {'user_id': cls.ctx['user'], 'title': 'Streak Risk', 'created_at': now},
+            'commitments': {'user_id': cls.ctx['user'], 'learning_item_id': cls.ctx['item'], 'status': 'active'},
+        }
+        for collection, doc in seed.items():
+            db[collection].insert_many([dict(doc, n=i) for i in range(50)])
+        client.close()
+
+        ensure_indexes()
+
+    @classmethod
+    def tearDownClass(cls):
+        pymongo.MongoClient(TEST_URI).drop_database(TEST_DB)
+        disconnect()
+
+    def test_no_collection_scans(self):
+        offenders = []
+        for label, queryset in _query_shapes(self.ctx):
+            plan = queryset.explain()['queryPlanner']['winningPlan']
+            if 'COLLSCAN' in set(_stages(plan)):
+                offenders.append(label)
+        self.assertEqual(offenders, [], f"COLLSCAN in: {', '.join(offenders)}")
+
+
+if __name__ == '__main__':
+    unittest.main()
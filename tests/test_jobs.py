@@ -0,0 +1,106 @@
+"""
+Unit tests for the background job queue
+Runs in eager mode (no broker), as tests and local runs do
+"""
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem
+from app.jobs import configure_jobs, enqueue, celery, deliver_email_otp
+from app.services.inbox_service import InboxService
+
+YOUTUBE_URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+class TestJobs(unittest.TestCase):
+    """Test cases for app.jobs and the jobs it runs"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+        cls.app = Flask(__name__)
+        cls.app.config.update(CELERY_BROKER_URL=None, OTP_EXPIRY_MINUTES=10)
+        configure_jobs(cls.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        User.drop_collection()
+        LearningItem.drop_collection()
+        self.user = User(
+            name='Job User', email='jobs@example.com',
+            mobile='5550003333', password_hash='hash'
+        ).save()
+
+    def test_eager_without_broker(self):
+        self.assertTrue(celery.conf.task_always_eager)
+        self.assertIs(self.app.extensions['celery'], celery)
+
+    def test_item_enriched_after_create(self):
+        item = InboxService.create_learning_item(self.user.id, {
+            'source_type': 'video', 'source_url': YOUTUBE_URL, 'total_duration': 40
+        })
+
+        item.reload()
+        self.assertEqual(item.title, 'YouTube Video (dQw4w9WgXcQ)')
+        self.assertEqual(item.description, 'Imported from YouTube')
+        self.assertEqual(item.total_duration, 40)  # User-supplied value kept
+        self.assertEqual(item.metadata['enrichment'], 'complete')
+        self.assertIn('thumbnail_url', item.metadata)
+        self.assertNotIn('enrichment_fields', item.metadata)
+
+    def test_fetch_failure_keeps_item(self):
+        with patch('app.services.adapters.youtube.YouTubeAdapter.fetch_metadata',
+                   side_effect=RuntimeError('timeout')):
+            item = InboxService.create_learning_item(self.user.id, {
+                'title': 'My video', 'source_type': 'video', 'source_url': YOUTUBE_URL
+            })
+
+        item.reload()
+        self.assertEqual(item.title, 'My video')
+        self.assertEqual(item.metadata['enrichment'], 'failed')
+
+    def test_failed_enrichment_replaces_pending_title(self):
+        with patch('app.services.adapters.youtube.YouTubeAdapter.fetch_metadata',
+                   side_effect=RuntimeError('timeout')):
+            item = InboxService.create_learning_item(self.user.id, {
+                'source_type': 'video', 'source_url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+            })
+
+        item.reload()
+        self.assertEqual(item.title, 'Watch (youtube.com)')
+        self.assertEqual(item.metadata['enrichment'], 'failed')
+        self.assertIn('timeout', item.metadata['enrichment_error'])
+        self.assertNotIn('enrichment_fields', item.metadata)
+
+    def test_crashed_enrichment_job_falls_back(self):
+        with patch.object(InboxService, 'enrich_learning_item', side_effect=RuntimeError('db down')):
+            item = InboxService.create_learning_item(self.user.id, {
+                'source_type': 'video', 'source_url': YOUTUBE_URL
+            })
+
+        item.reload()
+        self.assertNotEqual(item.title, InboxService.PENDING_TITLE)
+        self.assertEqual(item.metadata['enrichment'], 'failed')
+        self.assertEqual(InboxService.title_from_url('https://example.com/guides/intro-to-sql.html'),
+                         'Intro to sql (example.com)')
+        self.assertEqual(InboxService.title_from_url(''), InboxService.DEFAULT_TITLE)
+
+    def test_nightly_priority_job_scheduled(self):
+        tasks = {entry['task'] for entry in celery.conf.beat_schedule.values()}
+        self.assertIn('jobs.recalculate_priorities', tasks)
+
+    def test_enqueue_runs_inline_when_broker_unreachable(self):
+        with patch.object(deliver_email_otp, 'apply_async', side_effect=ConnectionError('down')), \
+             patch('app.services.otp_service.OTPService.send_email_otp') as send:
+            enqueue(deliver_email_otp, 'a@example.com', '123456', 'login')
+
+        send.assert_called_once_with('a@example.com', '123456', 'login')
+
+
+if __name__ == '__main__':
+    unittest.main()
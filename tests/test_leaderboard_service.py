@@ -0,0 +1,121 @@
+"""
+Unit tests for the leaderboard engine (in-process backend)
+"""
+import random
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, AccountabilityPartner, XPEvent
+from app.services import leaderboard_service
+from app.services.leaderboard_service import RankedSet, LeaderboardService, ALL_TIME
+from app.services.gamification_service import GamificationService
+
+
+class TestRankedSet(unittest.TestCase):
+    """The skip list must agree with a sorted list after any update sequence"""
+
+    def test_matches_sorted_reference(self):
+        rng = random.Random(7)
+        ranked, reference = RankedSet(), {}
+        for _ in range(3000):
+            member = f"u{rng.randrange(300)}"
+            if rng.random() < 0.1:
+                ranked.remove(member)
+                reference.pop(member, None)
+            else:
+                score = rng.randrange(50)
+                ranked.set(member, score)
+                reference[member] = score
+
+        expected = sorted(reference.items(), key=lambda kv: (-kv[1], kv[0]))
+        self.assertEqual(len(ranked), len(expected))
+        self.assertEqual(ranked.range(0, len(expected) - 1), expected)
+        self.assertEqual(ranked.range(10, 14), expected[10:15])
+        for index, (member, _) in enumerate(expected):
+            self.assertEqual(ranked.rank(member), index)
+        self.assertIsNone(ranked.rank('missing'))
+
+    def test_only_greater_keeps_higher_score(self):
+        ranked = RankedSet()
+        ranked.set('a', 10, only_greater=True)
+        ranked.set('a', 5, only_greater=True)
+        self.assertEqual(ranked.score('a'), 10)
+
+
+class TestLeaderboardService(unittest.TestCase):
+    """Global and pod leaderboards against mongomock"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, AccountabilityPartner, XPEvent):
+            model.drop_collection()
+        leaderboard_service.backend.clear()
+        self.users = [
+            User(name=f'Player {i}', email=f'lb{i}@example.com', mobile=f'555002000{i}',
+                 password_hash='hash', xp_total=100 * i).save()
+            for i in range(4)
+        ]
+
+    def test_top_loads_from_mongo_then_tracks_awards(self):
+        top = LeaderboardService.top(limit=2)
+        self.assertEqual([e['name'] for e in top], ['Player 3', 'Player 2'])
+        self.assertEqual(top[0]['rank'], 1)
+
+        GamificationService.award_xp(self.users[0].id, 1000)
+        me = LeaderboardService.rank_of(self.users[0].id)
+        self.assertEqual(me, {'rank': 1, 'score': 1000, 'total': 4})
+
+    def test_memory_boards_refresh_awards_from_other_processes(self):
+        LeaderboardService.top()
+        # Another worker's award: straight to MongoDB, never pushed to this process
+        User.objects(id=self.users[0].id).update(inc__xp_total=1000, set__xp_updated_at=datetime.utcnow())
+        self.assertEqual(LeaderboardService.rank_of(self.users[0].id)['rank'], 4)
+
+        leaderboard_service.backend.reload_seconds = 0
+        try:
+            with patch.object(LeaderboardService, 'refresh', wraps=LeaderboardService.refresh) as refresh:
+                leaderboard_service.backend.claim_refresh(ALL_TIME)  # A refresh already running
+                self.assertIsNone(LeaderboardService._ensure_loaded(ALL_TIME))
+                leaderboard_service.backend.release_refresh(ALL_TIME)
+
+                thread = LeaderboardService._ensure_loaded(ALL_TIME)
+                thread.join(5)
+                self.assertEqual(refresh.call_count, 1)
+        finally:
+            leaderboard_service.backend.reload_seconds = 60
+        # Refreshes re-read only the users whose XP changed
+        self.assertEqual(LeaderboardService.refresh(ALL_TIME, time.time()), 1)
+        self.assertEqual(LeaderboardService.rank_of(self.users[0].id)['rank'], 1)
+
+    def test_weekly_season_board(self):
+        GamificationService.award_xp(self.users[1].id, 50)
+        GamificationService.award_xp(self.users[2].id, 20)
+
+        top = LeaderboardService.top('weekly')
+        self.assertEqual([(e['name'], e['score']) for e in top], [('Player 1', 50), ('Player 2', 20)])
+
+    def test_pod_leaderboard(self):
+        me, partner = self.users[1], self.users[3]
+        AccountabilityPartner(
+            user_id=me, partner_email=partner.email, partner_user_id=partner, status='active'
+        ).save()
+
+        board = LeaderboardService.pod_leaderboard(str(me.id))
+        self.assertEqual([e['name'] for e in board], ['Player 3', 'Player 1 (You)'])
+        self.assertEqual([e['rank'] for e in board], [1, 2])
+        self.assertEqual(board[0]['xp'], 300)
+        self.assertEqual(board[0]['email'], partner.email)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for keyset pagination (app/pagination.py)
+Cursor pages cover every row exactly once even when sort keys tie,
+legacy skip/page callers keep working, and list totals come from the
+count cache
+"""
+import unittest
+from datetime import datetime, timedelta
+
+import mongomock
+from mongoengine import connect, disconnect, signals
+
+from app.models import User, LearningItem, Bookmark, LiveClass, DailyTask, Flashcard
+from app.pagination import count_cache, decode_cursor, encode_cursor, keyset_page
+from app.services.bookmark_service import BookmarkService
+from app.services.inbox_service import InboxService
+from app.services.live_class_service import LiveClassService
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Test cases for cursor pages on the list services"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, Bookmark, LiveClass):
+            model.drop_collection()
+        count_cache.clear()
+        self.user = User(name='Reader', email='reader@example.com', mobile='5550007777', password_hash='hash').save()
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def walk(self, fetch):
+        """Follow next_cursor until the last page; returns the ids served"""
+        ids, cursor = [], None
+        while True:
+            page = fetch(cursor)
+            ids.extend(str(row.id) for row in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                return ids
+
+    def test_inbox_pages_cover_ties_once(self):
+        # Two priority scores, three timestamps: most rows tie on both sort keys
+        for i in range(11):
+            LearningItem(user_id=self.user, title=f'Item {i}', source_type='course', status='library',
+                         priority_score=float(i % 2), added_at=self.now - timedelta(minutes=i % 3)).save()
+        expected = [str(item.id) for item in LearningItem.objects.order_by('-priority_score', '-added_at', '-id')]
+
+        ids = self.walk(lambda cursor: InboxService.get_user_items(self.user.id, limit=4, cursor=cursor))
+        self.assertEqual(ids, expected)
+        library = self.walk(lambda cursor: InboxService.get_library_items(self.user.id, limit=3, cursor=cursor, lean=True))
+        self.assertEqual(sorted(library), sorted(expected))
+        self.assertEqual(len(set(library)), 11)
+
+    def test_live_class_pages_match_skip(self):
+        for i in range(7):
+            LiveClass(user_id=self.user, title=f'Class {i}', meeting_url='https://meet.example.com/x',
+                      created_at=self.now).save()
+
+        ids = self.walk(lambda cursor: LiveClassService.get_user_classes(self.user.id, limit=2, cursor=cursor))
+        skipped = [str(c.id) for skip in range(0, 7, 2)
+                   for c in LiveClassService.get_user_classes(self.user.id, limit=2, skip=skip)]
+        self.assertEqual(skipped[:2], ids[:2])
+        self.assertEqual(skipped[2:], ids[2:])
+
+    def test_legacy_callers_get_lists(self):
+        LearningItem(user_id=self.user, title='Only', source_type='course').save()
+
+        items = InboxService.get_user_items(self.user.id)
+        self.assertEqual([i.title for i in items], ['Only'])
+        self.assertEqual(len(InboxService.get_user_items(self.user.id, limit=5, skip=1)), 0)
+        self.assertIsNone(InboxService.get_user_items(self.user.id, limit=5).next_cursor)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            InboxService.get_user_items(self.user.id, limit=5, cursor='not-a-cursor')
+        with self.assertRaises(ValueError):
+            keyset_page(Bookmark.objects, ('-relevance_score', '-id'), 5, encode_cursor([1.0]))
+        self.assertEqual(decode_cursor(encode_cursor([self.now, 'x']), 2), [self.now, 'x'])
+
+    def test_bookmark_total_cached_until_write(self):
+        for i in range(5):
+            Bookmark(user_id=self.user, title=f'Doc {i}', url=f'https://example.com/{i}',
+                     relevance_score=0.5).save()
+
+        first, total = BookmarkService.get_bookmarks(self.user, per_page=2)
+        self.assertEqual((len(first), total), (2, 5))
+        second, _ = BookmarkService.get_bookmarks(self.user.id, per_page=2, cursor=first.next_cursor)
+        legacy, _ = BookmarkService.get_bookmarks('reader@example.com', page=2, per_page=2)
+        self.assertEqual([b.id for b in second], [b.id for b in legacy])
+
+        # Raw inserts bypass signals: the cached total is served
+        Bookmark._get_collection().insert_one({'user_id': self.user.id, 'title': 'Raw', 'url': 'https://x'})
+        self.assertEqual(BookmarkService.get_bookmarks(self.user, per_page=2)[1], 5)
+        Bookmark(user_id=self.user, title='Saved', url='https://example.com/saved').save()
+        self.assertEqual(BookmarkService.get_bookmarks(self.user, per_page=2)[1], 7)
+        BookmarkService.delete_bookmark(Bookmark.objects(title='Saved').first())
+        self.assertEqual(BookmarkService.get_bookmarks(self.user, per_page=2)[1], 6)
+
+    def test_bulk_deletes_stay_single_round_trip(self):
+        # Any post_delete receiver makes QuerySet.delete() fetch and delete row by row
+        for model in (LearningItem, DailyTask, Flashcard, Bookmark, LiveClass):
+            self.assertFalse(signals.post_delete.has_receivers_for(model), model.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for PriorityService batch recalculation
+"""
+import unittest
+from datetime import datetime, timedelta
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem
+from app.services.priority_service import PriorityService
+from mongomock_helpers import replay_bulk_write
+
+
+
+
+
+
+class TestPriorityService(unittest.TestCase):
+    """Test cases for score_batch, recalculate_for_user and recalculate_all"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        User.drop_collection()
+        LearningItem.drop_collection()
+        self.now = datetime(2026, 1, 5, 12, 0)
+        self.users = [
+            User(name=f'User {i}', email=f'prio{i}@example.com',
+                 mobile=f'555000444{i}', password_hash='hash').save()
+            for i in range(2)
+        ]
+
+    def _item(self, user, **fields):
+        fields.setdefault('title', 'Item')
+        fields.setdefault('source_type', 'course')
+        return LearningItem(user_id=user, **fields).save()
+
+    def test_batch_matches_bucket_rules(self):
+        scores = PriorityService.score_batch(
+            [0.9, 0.3, 0.8, 0.0],
+            [self.now + timedelta(days=1), self.now + timedelta(days=60), None, self.now - timedelta(days=2)],
+            [120, 300, 15, 0],
+            self.now
+        )
+        # relevance*40 + urgency*40 + effort
+        self.assertEqual(scores, [82.0, 25.0, 52.0, 54.0])
+
+    def test_updates_only_for_changed_scores(self):
+        docs = [
+            {'_id': 1, 'priority_score': 0.5, 'total_duration': 30},
+            {'_id': 2, 'priority_score': 33.3, 'total_duration': 30},  # Already settled
+        ]
+        updates = PriorityService._score_updates(docs, self.now)
+
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0]._filter, {'_id': 1})
+        self.assertEqual(updates[0]._doc, {'$set': {'priority_score': 40.0}})
+
+    def test_recalculate_for_user_writes_changed_scores_only(self):
+        writes = replay_bulk_write(self)
+        user = self.users[0]
+        due = self._item(user, priority_score=0.9, total_duration=120,
+                         target_completion_date=self.now + timedelta(days=1))
+        settled = self._item(user, priority_score=33.3, total_duration=30)  # Rescores to itself
+        other = self._item(self.users[1], priority_score=0.5)
+
+        updated = PriorityService.recalculate_for_user(user.id, now=self.now)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual([len(ops) for _, ops in writes], [1])
+        self.assertEqual(due.reload().priority_score, 82.0)
+        self.assertEqual(settled.reload().priority_score, 33.3)
+        self.assertEqual(other.reload().priority_score, 0.5)
+
+    def test_recalculate_all_spans_users_and_chunks(self):
+        writes = replay_bulk_write(self)
+        for i in range(7):
+            self._item(self.users[i % 2], priority_score=0.5, total_duration=30)
+
+        result = PriorityService.recalculate_all(chunk_size=3, now=self.now)
+
+        self.assertEqual(result, {'scanned': 7, 'updated': 7})
+        self.assertEqual([len(ops) for _, ops in writes], [3, 3, 1])
+        self.assertEqual(set(LearningItem.objects.distinct('priority_score')), {40.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for aggregated reality metrics
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem, DailyTask
+from app.services.reality_metrics_service import RealityMetricsService
+
+
+class TestRealityMetrics(unittest.TestCase):
+    """Test cases for RealityMetricsService"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask):
+            model.drop_collection()
+        self.now = datetime(2026, 3, 20, 12, 0)
+        self.user = User(name='Realist', email='reality@example.com',
+                         mobile='5550080000', password_hash='hash').save()
+        self.busy = self._item('Busy', progress=40.0)
+        self.idle = self._item('Idle', progress=0.0)
+
+    def _item(self, title, progress):
+        return LearningItem(
+            user_id=self.user, title=title, source_type='course', status='active',
+            total_duration=600, progress_percentage=progress, added_at=self.now - timedelta(days=20),
+            target_completion_date=self.now + timedelta(days=20)
+        ).save()
+
+    def _task(self, item, days_ago, status='completed', hour=9):
+        DailyTask(
+            user_id=self.user, learning_item_id=item, title='Lesson', estimated_duration_minutes=30,
+            scheduled_date=self.now - timedelta(days=days_ago), status=status,
+            completed_at=(self.now - timedelta(days=days_ago)).replace(hour=hour)
+        ).save()
+
+    def test_user_metrics_match_per_item_rules(self):
+        self._task(self.busy, 1)
+        self._task(self.busy, 1, hour=18)  # Same day counts once
+        self._task(self.busy, 3)
+        self._task(self.busy, 5, status='skipped')  # Progress day, but not an active day
+
+        metrics = RealityMetricsService.calculate_user_metrics(self.user, now=self.now)
+        busy, idle = metrics[str(self.busy.id)], metrics[str(self.idle.id)]
+
+        self.assertEqual((busy['days_active'], busy['days_wasted']), (2, 17))
+        self.assertEqual((idle['days_active'], idle['days_wasted']), (0, 20))
+        self.assertEqual(busy['efficiency_score'], 20.0)
+        self.assertEqual(busy['days_until_projected_finish'], 30)
+        self.assertFalse(busy['on_track'])
+        self.assertEqual(RealityMetricsService.calculate_reality_metrics(self.busy.id, now=self.now), busy)
+
+    def test_wasted_time_analysis_uses_one_aggregation(self):
+        for days_ago in range(10):
+            self._task(self.busy, days_ago)
+
+        calls, depth = [], [0]
+        for name in ('find', 'aggregate'):
+            def counted(collection, *args, _name=name, _original=getattr(mongomock.collection.Collection, name), **kwargs):
+                if depth[0] == 0:
+                    calls.append((_name, collection.name))
+                depth[0] += 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    depth[0] -= 1
+            patcher = patch.object(mongomock.collection.Collection, name, counted)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        analysis = RealityMetricsService.get_wasted_time_analysis(self.user, now=self.now)
+        patch.stopall()
+
+        self.assertEqual(calls, [('find', 'learning_items'), ('aggregate', 'daily_tasks')])
+        self.assertEqual(analysis['total_wasted_days'], 10 + 20)
+        self.assertEqual([row['title'] for row in analysis['breakdown']], ['Idle', 'Busy'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+"""
+Unit tests for the batch SM-2 recall engine
+"""
+import io
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+import mongomock.gridfs
+from app.models import User, LearningItem, Flashcard, CardImportJob
+from app.services import recall_service
+from app.services.recall_service import RecallService, sm2_schedule, iter_card_blocks, source_lines
+from app.services.search_service import SearchService
+from mongomock_helpers import replay_bulk_write
+
+
+
+
+class TestSM2Schedule(unittest.TestCase):
+    """Column-wise SM-2 matches the per-card algorithm"""
+
+    def test_progression_and_reset(self):
+        reps, intervals, easiness = sm2_schedule(
+            [0, 1, 2, 4], [0, 1, 6, 10], [2.5, 2.5, 2.5, 2.0], [5, 4, 3, 1]
+        )
+        self.assertEqual(reps, [1, 2, 3, 0])
+        self.assertEqual(intervals, [1, 6, 15, 1])  # Interval uses the EF before this review
+        self.assertAlmostEqual(easiness[0], 2.6)
+        self.assertAlmostEqual(easiness[1], 2.5)
+        self.assertAlmostEqual(easiness[2], 2.36)
+        self.assertEqual(easiness[3], 2.0)  # Failed recall keeps EF
+
+    def test_easiness_floor(self):
+        _, _, easiness = sm2_schedule([3], [10], [1.35], [3])
+        self.assertEqual(easiness, [1.3])
+
+
+class TestCardParsing(unittest.TestCase):
+    """Incremental block parsing and chunked decoding"""
+
+    def test_blocks_match_front_back_rules(self):
+        text = "What is ATP?\nEnergy currency\nof the cell\n\nshort\nanswer here\n\nNo back line\n\n\nDefine mitosis\nCell division"
+        self.assertEqual(list(iter_card_blocks(io.StringIO(text))), [
+            ('What is ATP?', 'Energy currency\nof the cell'),
+            ('Define mitosis', 'Cell division'),
+        ])
+
+    def test_source_lines_survive_chunk_boundaries(self):
+        text = "Qu\u00e9 es ATP?\nMol\u00e9cula de energ\u00eda\n" * 50
+        with patch.object(recall_service, 'READ_CHUNK_BYTES', 7):
+            lines = list(source_lines(io.BytesIO(text.encode('utf-8'))))
+        self.assertEqual([line for line, _ in lines], text.split('\n')[:-1])
+        self.assertEqual(lines[-1][1], len(text.encode('utf-8')))
+
+
+class TestRecallService(unittest.TestCase):
+    """Test cases for the due queue, forecast and batch review"""
+
+    @classmethod
+    def setUpClass(cls):
+        mongomock.gridfs.enable_gridfs_integration()
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, Flashcard, CardImportJob):
+            model.drop_collection()
+        self.now = datetime(2026, 3, 10, 12, 0)
+        self.user = User(name='Reviewer', email='recall@example.com',
+                         mobile='5550060000', password_hash='hash').save()
+        self.item = LearningItem(user_id=self.user, title='Biology', source_type='book').save()
+
+    def _card(self, due_in_days, **fields):
+        return Flashcard(
+            user_id=self.user, learning_item_id=self.item, front='What is ATP?', back='Energy currency',
+            next_review_date=self.now + timedelta(days=due_in_days), **fields
+        ).save()
+
+    def test_due_queue_pages_with_cursor(self):
+        due = [self._card(-3), self._card(-1), self._card(-1), self._card(0)]
+        self._card(2)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = RecallService.get_due_cards(self.user.id, limit=3, cursor=cursor, now=self.now)
+            seen.extend(card.id for card in page)
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(set(seen), {card.id for card in due})
+        with self.assertRaises(ValueError):
+            RecallService.get_due_cards(self.user.id, cursor='garbage', now=self.now)
+
+    def test_forecast_folds_overdue_into_today(self):
+        for days in (-5, -1, 0, 1, 1, 3, 30):
+            self._card(days)
+        forecast = RecallService.get_due_forecast(self.user.id, days=7, now=self.now)
+
+        self.assertEqual(len(forecast), 7)
+        self.assertEqual(forecast['2026-03-10'], 3)
+        self.assertEqual(forecast['2026-03-11'], 2)
+        self.assertEqual(forecast['2026-03-13'], 1)
+        self.assertEqual(sum(forecast.values()), 6)
+
+    def test_rejects_bad_quality(self):
+        card = self._card(0)
+        with self.assertRaises(ValueError):
+            RecallService.review_batch(self.user.id, [{'card_id': card.id, 'quality': 7}])
+        with self.assertRaisesRegex(ValueError, 'Invalid learning item id'):
+            RecallService.import_cards(self.user.id, None, iter([]))
+
+    def test_import_dedupes_and_inserts_in_batches(self):
+        writes = replay_bulk_write(self)
+        legacy = [self._card(0), Flashcard(user_id=self.user, learning_item_id=self.item,
+                                           front='What is DNA?', back='Energy currency').save()]
+        Flashcard._get_collection().update_many({}, {'$unset': {'content_hash': 1}})
+        blocks = [f"Question number {i}?\nAnswer number {i}" for i in range(5)]
+        text = "\n\n".join(blocks + [blocks[0].upper(), "What is ATP?\nEnergy  currency"])
+
+        collection = Flashcard._get_collection()
+        original, inserts = collection.insert_many, []
+
+        def counting_insert(docs, **kwargs):
+            inserts.append(len(docs))
+            return original(docs, **kwargs)
+
+        with patch.object(recall_service, 'CARD_INSERT_BATCH', 2), \
+                patch.object(collection, 'insert_many', side_effect=counting_insert), \
+                patch.object(Flashcard, '_get_collection', return_value=collection):
+            created = RecallService.generate_cards_from_text(self.user.id, self.item.id, text)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(Flashcard.objects(user_id=self.user).count(), 7)
+        self.assertEqual(inserts, [2, 2, 1])  # 7 blocks in batches of 2; 2 duplicates dropped
+        self.assertEqual([len(ops) for _, ops in writes], [2])  # Legacy hashes backfilled in one batch
+        self.assertEqual(legacy[1].reload().content_hash, Flashcard.hash_content('What is DNA?', 'Energy currency'))
+
+    def test_imported_cards_reach_typeahead(self):
+        SearchService.universal_search(self.user.id, 'mitoch', typeahead=True)  # Cache the index
+        RecallService.generate_cards_from_text(self.user.id, self.item.id, "Mitochondria?\nPowerhouse")
+
+        results = SearchService.universal_search(self.user.id, 'mitoch', typeahead=True)
+        self.assertEqual(len(results['flashcards']), 1)
+
+    def test_background_import_reports_progress(self):
+        source = "\n\n".join(f"Term number {i}\nDefinition of term {i}" for i in range(30)).encode('utf-8')
+        job = RecallService.start_card_import(self.user.id, self.item.id, io.BytesIO(source), 'notes.md')
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.cards_created, job.duplicates), (30, 0))
+        self.assertEqual(job.to_dict()['progress'], 100.0)
+        self.assertIsNone(job.source.grid_id)
+        self.assertEqual(Flashcard.objects(learning_item_id=self.item).count(), 30)
+
+    def test_batch_review_persists_session(self):
+        writes = replay_bulk_write(self)
+        fresh, mature = self._card(0), self._card(0, repetitions=2, interval=6)
+        stranger = User(name='Other', email='other@example.com', mobile='5550060001',
+                        password_hash='hash').save()
+        foreign = Flashcard(user_id=stranger, learning_item_id=self.item, front='Q?', back='A!').save()
+
+        result = RecallService.review_batch(self.user.id, [
+            {'card_id': fresh.id, 'quality': 1},
+            {'card_id': mature.id, 'quality': 5},
+            {'card_id': foreign.id, 'quality': 5},
+            {'card_id': fresh.id, 'quality': 4},
+        ], now=self.now)
+
+        self.assertEqual(result['reviewed'], 3)
+        self.assertEqual([len(ops) for _, ops in writes], [2])
+        self.assertEqual(result['missing'], [str(foreign.id)])
+        fresh.reload()
+        mature.reload()
+        self.assertEqual((fresh.repetitions, fresh.interval), (1, 1))
+        self.assertEqual((mature.repetitions, mature.interval), (3, 15))
+        self.assertEqual(mature.next_review_date, self.now + timedelta(days=15))
+
+    def test_single_review_writes_only_the_owners_card(self):
+        writes = replay_bulk_write(self)
+        card = self._card(0)
+        stranger = User(name='Other', email='other@example.com', mobile='5550060001',
+                        password_hash='hash').save()
+
+        with self.assertRaises(Flashcard.DoesNotExist):
+            RecallService.process_review(card.id, 5, user_id=stranger.id)
+        self.assertEqual(writes, [])
+        self.assertIsNone(card.reload().last_reviewed_at)
+
+        result = RecallService.process_review(str(card.id), 4, user_id=self.user.id)
+        self.assertEqual(result['interval'], 1)
+        self.assertEqual([len(ops) for _, ops in writes], [1])
+        card.reload()
+        self.assertEqual((card.repetitions, card.interval), (1, 1))
+        self.assertAlmostEqual(card.next_review_date, datetime.fromisoformat(result['next_review']),
+                               delta=timedelta(milliseconds=1))  # BSON keeps milliseconds
+
+
+if __name__ == '__main__':
+    unittest.main()
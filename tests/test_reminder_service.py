@@ -0,0 +1,118 @@
+"""
+Unit tests for the pooled, idempotent daily reminder pipeline
+"""
+import smtplib
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from flask import Flask
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, ReminderDelivery
+from app.services.otp_service import mail
+from app.services.reminder_service import ReminderService
+
+
+class TestReminderService(unittest.TestCase):
+    """Test cases for ReminderService.dispatch_daily_reminders"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+        cls.app = Flask(__name__)
+        cls.app.config.update(MAIL_SUPPRESS_SEND=True, MAIL_DEFAULT_SENDER='reminders@example.com')
+        mail.init_app(cls.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        User.drop_collection()
+        ReminderDelivery.drop_collection()
+        ReminderDelivery.ensure_indexes()
+        self.now = datetime(2026, 3, 10, 9, 0)
+        for i in range(7):
+            User(name=f'Learner {i}', email=f'learner{i}@example.com', mobile=f'55500500{i:02d}',
+                 password_hash='hash', daily_reminders=True).save()
+        User(name='Opted Out', email='quiet@example.com', mobile='5550059999',
+             password_hash='hash', daily_reminders=False).save()
+
+    def _dispatch(self, **kwargs):
+        with self.app.app_context(), mail.record_messages() as outbox:
+            result = ReminderService.dispatch_daily_reminders(now=self.now, **kwargs)
+        return result, outbox
+
+    def test_batches_share_smtp_sessions(self):
+        result, outbox = self._dispatch(workers=2, batch_size=3)
+
+        self.assertEqual(result['sent'], 7)
+        self.assertEqual(result['smtp_sessions'], 3)
+        self.assertEqual(len(outbox), 7)
+        self.assertNotIn('quiet@example.com', [m.recipients[0] for m in outbox])
+        self.assertEqual(ReminderDelivery.objects(status='sent').count(), 7)
+
+    def test_rerun_same_day_is_skipped(self):
+        self._dispatch(batch_size=4)
+        result, outbox = self._dispatch(batch_size=4)
+
+        self.assertEqual((result['sent'], result['skipped']), (0, 7))
+        self.assertEqual(outbox, [])
+
+    def test_failed_sends_release_their_claim(self):
+        original = ReminderService._build_message
+
+        def flaky(user):
+            if user['email'] == 'learner3@example.com':
+                raise RuntimeError('relay rejected')
+            return original(user)
+
+        with patch.object(ReminderService, '_build_message', side_effect=flaky):
+            result, _ = self._dispatch(batch_size=10)
+        self.assertEqual((result['sent'], result['failed']), (6, 1))
+
+        retry, outbox = self._dispatch(batch_size=10)
+        self.assertEqual((retry['sent'], retry['skipped']), (1, 6))
+        self.assertEqual(outbox[0].recipients, ['learner3@example.com'])
+
+    def test_crashed_claims_retried_after_lease(self):
+        # Two claims left 'sending' by workers that died mid-batch
+        crashed = {u.email: u for u in User.objects(email__in=['learner0@example.com', 'learner1@example.com'])}
+        for email, age in (('learner0@example.com', 45), ('learner1@example.com', 5)):
+            ReminderDelivery(key=ReminderService._key(crashed[email].id, self.now.date().isoformat()),
+                             user_id=crashed[email], created_at=datetime.utcnow() - timedelta(minutes=age)).save()
+
+        result, outbox = self._dispatch(batch_size=10)
+
+        self.assertEqual((result['sent'], result['skipped']), (6, 1))
+        self.assertIn('learner0@example.com', [m.recipients[0] for m in outbox])
+        self.assertNotIn('learner1@example.com', [m.recipients[0] for m in outbox])  # Lease still running
+        self.assertEqual(ReminderDelivery.objects(status='sent').count(), 6)
+
+    def test_dropped_session_counts_each_failure_once(self):
+        outbox = []
+
+        class DroppingConnection:
+            """Rejects one recipient, then the server hangs up on QUIT"""
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                raise smtplib.SMTPServerDisconnected('connection lost')
+
+            def send(self, message):
+                if message.recipients == ['learner3@example.com']:
+                    raise smtplib.SMTPRecipientsRefused({})
+                outbox.append(message)
+
+        with patch.object(mail, 'connect', return_value=DroppingConnection()):
+            result, _ = self._dispatch(batch_size=10)
+
+        self.assertEqual((result['sent'], result['failed']), (6, 1))
+        self.assertEqual(len(outbox), 6)
+        self.assertEqual(ReminderDelivery.objects(status='sent').count(), 6)
+        self.assertEqual(ReminderDelivery.objects.count(), 6)  # The refused claim is released
+
+
+if __name__ == '__main__':
+    unittest.main()
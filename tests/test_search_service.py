@@ -0,0 +1,120 @@
+"""
+Unit tests for SearchService
+Covers the in-process index fallback, typeahead prefixes and cursor paging
+"""
+import unittest
+from datetime import datetime
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem, DailyTask, Flashcard, Bookmark, LiveClass
+from app.services.search_service import SearchService
+from app.services.inbox_service import InboxService
+from app.services.search_index import InvertedIndex, search_index_cache
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Test cases for the in-process inverted index"""
+
+    def test_all_terms_must_match(self):
+        index = InvertedIndex({'title': 10})
+        index.add(1, {'title': 'Python for Data Science'})
+        index.add(2, {'title': 'Python Web Development'})
+
+        self.assertEqual([d for _, d in index.search('python data')], [1])
+        self.assertEqual(len(index.search('python')), 2)
+
+    def test_prefix_ranks_below_exact(self):
+        index = InvertedIndex({'title': 10})
+        index.add(1, {'title': 'Pythonic Patterns'})
+        index.add(2, {'title': 'Python Basics'})
+
+        self.assertEqual(index.search('pyth'), [])
+        rows = index.search('python', prefix=True)
+        self.assertEqual([d for _, d in rows], [2, 1])
+
+
+class TestSearchService(unittest.TestCase):
+    """Test cases for SearchService.universal_search"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask, Flashcard, Bookmark, LiveClass):
+            model.drop_collection()
+        search_index_cache.clear()
+
+        self.user = User(
+            name='Search User', email='search@example.com',
+            mobile='5550001111', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='Python Masterclass', source_type='course'
+        ).save()
+        DailyTask(
+            learning_item_id=self.item, user_id=self.user, title='Python decorators',
+            scheduled_date=datetime.utcnow(), estimated_duration_minutes=30
+        ).save()
+        Bookmark(user_id=self.user, title='Python tips', url='https://example.com').save()
+        LiveClass(user_id=self.user, title='Python office hours', meeting_url='https://meet.example.com').save()
+
+    def test_search_covers_all_sources(self):
+        results = SearchService.universal_search(self.user.id, 'python')
+
+        self.assertEqual(len(results['library']), 1)
+        self.assertEqual(len(results['tasks']), 1)
+        self.assertEqual(len(results['bookmarks']), 1)
+        self.assertEqual(len(results['live_classes']), 1)
+        self.assertEqual(results['tasks'][0]['subtitle'], 'pending • 30m')
+
+    def test_typeahead_matches_prefix(self):
+        results = SearchService.universal_search(self.user.id, 'masterc', typeahead=True)
+        self.assertEqual(results['library'][0]['id'], str(self.item.id))
+
+        results = SearchService.universal_search(self.user.id, 'masterc')
+        self.assertEqual(results['library'], [])
+
+    def test_cursor_pages_are_disjoint(self):
+        for i in range(7):
+            Flashcard(user_id=self.user, learning_item_id=self.item,
+                      front=f'Python question {i}', back='answer').save()
+
+        first = SearchService.universal_search(self.user.id, 'python', limit=4, sources=['flashcards'])
+        cursor = first['next_cursors']['flashcards']
+        self.assertIsNotNone(cursor)
+
+        second = SearchService.universal_search(
+            self.user.id, 'python', limit=4, sources=['flashcards'], cursor=cursor
+        )
+        first_ids = {r['id'] for r in first['flashcards']}
+        second_ids = {r['id'] for r in second['flashcards']}
+        self.assertEqual(len(first_ids | second_ids), 7)
+        self.assertFalse(first_ids & second_ids)
+        self.assertIsNone(second['next_cursors']['flashcards'])
+
+    def test_index_invalidated_on_save(self):
+        SearchService.universal_search(self.user.id, 'rust')
+        LearningItem(user_id=self.user, title='Rust in Action', source_type='course').save()
+
+        results = SearchService.universal_search(self.user.id, 'rust')
+        self.assertEqual(len(results['library']), 1)
+
+    def test_index_invalidated_on_delete(self):
+        self.assertEqual(len(SearchService.universal_search(self.user.id, 'masterc', typeahead=True)['library']), 1)
+        InboxService.delete_item(self.item.id, self.user.id)
+
+        results = SearchService.universal_search(self.user.id, 'masterc', typeahead=True)
+        self.assertEqual(results['library'], [])
+
+    def test_cursor_requires_single_source(self):
+        with self.assertRaises(ValueError):
+            SearchService.universal_search(self.user.id, 'python', cursor='abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+"""
+Unit tests for dereference-free serialization (app/serialization.py)
+to_dict() never fetches referenced documents, list endpoints issue the
+same number of queries whatever the number of rows, and lean records
+serialize exactly like the Documents they replace
+"""
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import jwt
+import mongomock
+from flask import Flask
+from mongoengine import connect, disconnect
+
+from app.auth import token_cache, user_cache
+from app.pagination import count_cache
+from app.models import (
+    User, LearningItem, LearningPlan, DailyTask, Commitment, CommitmentViolation,
+    FocusSession, LiveClass, UserSession, Bookmark, Schedule, Notification, Flashcard
+)
+from app.pod_models import SharedContent, PodMessage
+from app.serialization import prefetch, prefetched, lean
+from app.services.recall_service import RecallService
+from app.routes.task_routes import tasks_bp
+from app.routes.learning_routes import learning_bp
+from app.routes.commitment_routes import commitment_bp
+from app.routes.live_class_routes import live_class_bp
+from app.routes.pod_routes import pod_bp
+from app.routes.inbox_routes import inbox_bp
+from app.routes.bookmark_routes import bookmark_bp
+from app.routes.user_routes import user_bp
+from app.routes.schedule_routes import schedule_bp
+from app.routes.trigger_routes import trigger_bp
+from app.routes.recall_routes import recall_bp
+from app.routes.security_routes import security_bp
+
+
+class QueryCounter:
+    """Counts top-level find/aggregate/count_documents calls on mongomock collections"""
+
+    def __init__(self, test):
+        self.calls, depth = [], [0]
+        for name in ('find', 'aggregate', 'count_documents'):
+            def counted(collection, *args, _original=getattr(mongomock.collection.Collection, name), **kwargs):
+                if depth[0] == 0:
+                    self.calls.append(collection.name)
+                depth[0] += 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    depth[0] -= 1
+            patcher = patch.object(mongomock.collection.Collection, name, counted)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+    def reset(self):
+        self.calls.clear()
+
+
+class SerializationTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, LearningPlan, DailyTask, Commitment, CommitmentViolation,
+                      FocusSession, LiveClass, UserSession, SharedContent, PodMessage,
+                      Bookmark, Schedule, Notification, Flashcard):
+            model.drop_collection()
+        token_cache.clear()
+        user_cache.clear()
+        self.now = datetime.utcnow()
+        self.user = User(name='Owner', email='owner@example.com', mobile='5550005555', password_hash='hash').save()
+        self.partner = User(name='Partner', email='partner@example.com', mobile='5550005556',
+                            password_hash='hash').save()
+        self.item = LearningItem(user_id=self.user, title='Algorithms', source_type='course', total_duration=600).save()
+        self.plan = LearningPlan(
+            user_id=self.user, learning_item_id=self.item, target_completion_date=self.now + timedelta(days=30),
+            daily_availability_minutes=60, total_estimated_duration=600
+        ).save()
+        self.commitment = Commitment(
+            user_id=self.user, learning_item_id=self.item, daily_study_minutes=30,
+            target_completion_date=self.now + timedelta(days=30)
+        ).save()
+
+    def seed(self, count):
+        """count rows for every list endpoint under test"""
+        for i in range(count):
+            DailyTask(
+                user_id=self.user, learning_item_id=self.item, learning_plan_id=self.plan,
+                title=f'Task {i}', scheduled_date=self.now, estimated_duration_minutes=30
+            ).save()
+            Commitment(
+                user_id=self.user, learning_item_id=self.item, daily_study_minutes=30,
+                target_completion_date=self.now + timedelta(days=30)
+            ).save()
+            CommitmentViolation(
+                commitment_id=self.commitment, user_id=self.user, violation_type='missed_session',
+                violation_date=self.now
+            ).save()
+            LiveClass(user_id=self.user, title=f'Class {i}', meeting_url='https://meet.example.com/x').save()
+            SharedContent(user_id=self.user, content_type='course', content_id=str(self.item.id),
+                          shared_with=[self.partner]).save()
+            SharedContent(user_id=self.partner, content_type='course', content_id=str(self.item.id),
+                          shared_with=[self.user]).save()
+            PodMessage(sender_id=self.partner, receiver_id=self.user, message=f'hi {i}').save()
+            LearningItem(user_id=self.user, title=f'Item {i}', source_type='course',
+                         status='active' if i % 2 else 'library').save()
+            Bookmark(user_id=self.user, title=f'Doc {i}', url=f'https://example.com/{i}').save()
+            Schedule(user_id=self.user, title=f'Study {i}', start_time=self.now).save()
+            Notification(user_id=self.user, title=f'Nudge {i}', message='Go').save()
+            Flashcard(user_id=self.user, learning_item_id=self.item, front=f'Q{i}', back='A',
+                      next_review_date=self.now - timedelta(days=1)).save()
+            LiveClass(user_id=self.user, title=f'Upcoming {i}', meeting_url='https://meet.example.com/x',
+                      scheduled_at=self.now + timedelta(days=1)).save()
+            LiveClass(user_id=self.user, title=f'Past {i}', meeting_url='https://meet.example.com/x',
+                      joined_at=self.now - timedelta(days=1)).save()
+            UserSession(user_id=self.user, session_id=f's{i}').save()
+
+
+class TestToDict(SerializationTestCase):
+    """Test cases for to_dict() on documents with references"""
+
+    def test_to_dict_never_dereferences(self):
+        self.seed(1)
+        FocusSession(user_id=self.user, learning_item_id=self.item,
+                     daily_task_id=DailyTask.objects.first()).save()
+        UserSession(user_id=self.user, session_id='s1').save()
+        models = (DailyTask, LearningPlan, Commitment, CommitmentViolation, FocusSession, LiveClass,
+                  UserSession, SharedContent, PodMessage)
+        loaded = {model: list(model.objects) for model in models}
+
+        counter = QueryCounter(self)
+        for model, documents in loaded.items():
+            for document in documents:
+                data = document.to_dict()
+                self.assertEqual(data['id'], str(document.id))
+        self.assertEqual(counter.calls, [])
+
+        task = loaded[DailyTask][0].to_dict()
+        self.assertEqual((task['user_id'], task['learning_plan_id']), (str(self.user.id), str(self.plan.id)))
+        self.assertIn(str(self.partner.id), [s['shared_with'][0] for s in map(SharedContent.to_dict, loaded[SharedContent])])
+
+    def test_prefetch_loads_references_in_one_query(self):
+        self.seed(3)
+        shares = list(SharedContent.objects)
+
+        counter = QueryCounter(self)
+        owners = prefetch(shares, 'user_id', User, only=('name',))
+        names = {prefetched(share, 'user_id', owners).name for share in shares}
+
+        self.assertEqual(counter.calls, ['users'])
+        self.assertEqual(names, {'Owner', 'Partner'})
+
+
+class TestLeanViews(SerializationTestCase):
+    """Test cases for lean() records"""
+
+    def test_records_match_document_to_dict(self):
+        self.item.update(set__tags=['cs'], set__metadata={'pages': 300}, set__started_at=self.now)
+        Bookmark(user_id=self.user, title='Docs', url='https://example.com', tags=['ref'],
+                 relevance_score=7, meta_data={'k': 'v'}).save()
+        Schedule(user_id=self.user, title='Study', start_time=self.now).save()
+        Notification(user_id=self.user, title='Nudge', message='Go', notification_type='warning').save()
+        Flashcard(user_id=self.user, learning_item_id=self.item, front='Q', back='A').save()
+        LiveClass(user_id=self.user, title='Live', meeting_url='https://meet.example.com/x',
+                  scheduled_at=self.now).save()
+
+        for model in (LearningItem, Bookmark, Schedule, Notification, Flashcard, LiveClass):
+            with self.subTest(model=model.__name__):
+                records = lean(model.objects)
+                self.assertEqual([r.to_dict() for r in records], [d.to_dict() for d in model.objects])
+                self.assertFalse(hasattr(records[0], '__dict__'))
+
+    def test_projection_is_the_allowlist(self):
+        Flashcard(user_id=self.user, learning_item_id=self.item, front='Q', back='A').save()
+        record = lean(Flashcard.objects)[0]
+
+        self.assertEqual(record.next_review_date, Flashcard.objects.first().next_review_date)
+        self.assertFalse(hasattr(record, 'content_hash'))
+        Schedule(user_id=self.user, title='Study', start_time=self.now, repeat_pattern='daily').save()
+        self.assertEqual(set(lean(Schedule.objects, 'calendar')[0].to_dict()),
+                         {'id', 'title', 'description', 'start_time', 'end_time'})
+        with self.assertRaises(KeyError):
+            lean(Flashcard.objects, 'calendar')
+
+    def test_due_queue_cursor_from_records(self):
+        for i in range(5):
+            Flashcard(user_id=self.user, learning_item_id=self.item, front=f'Q{i}', back='A',
+                      next_review_date=self.now - timedelta(hours=i)).save()
+
+        cards, cursor = RecallService.get_due_cards(self.user.id, limit=3, now=self.now, lean=True)
+        documents, document_cursor = RecallService.get_due_cards(self.user.id, limit=3, now=self.now)
+        self.assertEqual(cursor, document_cursor)
+        self.assertEqual([c.to_dict() for c in cards], [d.to_dict() for d in documents])
+        rest, _ = RecallService.get_due_cards(self.user.id, limit=3, cursor=cursor, now=self.now, lean=True)
+        self.assertEqual(len(rest), 2)
+
+
+class TestListEndpointQueries(SerializationTestCase):
+    """Query counts of list endpoints must not grow with the number of rows"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.app = Flask(__name__)
+        cls.app.config['JWT_SECRET_KEY'] = 'test-secret'
+        for blueprint in (tasks_bp, learning_bp, commitment_bp, live_class_bp, pod_bp, inbox_bp, bookmark_bp,
+                          user_bp, schedule_bp, trigger_bp, recall_bp, security_bp):
+            cls.app.register_blueprint(blueprint)
+
+    def _get(self, client, url):
+        token_cache.clear()
+        user_cache.clear()
+        count_cache.clear()
+        response = client.get(url, headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_query_count_independent_of_rows(self):
+        self.token = jwt.encode({'user_id': str(self.user.id), 'exp': int(time.time()) + 3600},
+                                'test-secret', algorithm='HS256')
+        client = self.app.test_client()
+        day_start = (self.now - timedelta(days=1)).isoformat()
+        day_end = (self.now + timedelta(days=1)).isoformat()
+        endpoints = (
+            '/api/tasks/today',
+            f'/api/learning/plans/{self.plan.id}/tasks',
+            '/api/commitment/list',
+            '/api/commitment/violations',
+            '/api/live-class/classes',
+            '/api/pod/my-shares',
+            '/api/pod/shared-with-me',
+            f'/api/pod/messages/{self.partner.id}',
+            '/api/inbox/items',
+            '/api/inbox/items?limit=5',
+            '/api/inbox/library',
+            '/api/inbox/library?limit=5',
+            '/api/bookmarks',
+            '/api/bookmarks?per_page=5',
+            '/api/user/schedules',
+            f'/api/schedule/events?start={day_start}&end={day_end}',
+            '/api/notifications',
+            '/api/recall/due',
+            '/api/recall/due?limit=5',
+            '/api/live-class/upcoming',
+            '/api/live-class/past',
+            '/api/user/sessions',
+            '/api/security/sessions'
+        )
+        counter = QueryCounter(self)
+
+        def measure():
+            counts = {}
+            for url in endpoints:
+                counter.reset()
+                self._get(client, url)
+                counts[url] = len(counter.calls)
+            return counts
+
+        self.seed(2)
+        few = measure()
+        self.seed(8)
+        many = measure()
+
+        self.assertEqual(many, few)
+        self.assertEqual(len(self._get(client, f'/api/learning/plans/{self.plan.id}/tasks')), 10)
+        self.assertEqual(len(self._get(client, '/api/recall/due')), 10)
+        self.assertEqual(self._get(client, '/api/live-class/past')['count'], 10)
+        shared = self._get(client, '/api/pod/shared-with-me')
+        self.assertEqual({s['owner_name'] for s in shared}, {'Partner'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+"""
+Unit tests for TaskGeneratorService
+Covers batched plan generation, the in-memory dependency chain, the
+two-round-trip completion pipeline and diff-based rescheduling
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect, ValidationError
+import mongomock
+from pymongo import UpdateOne, InsertOne
+from app.models import User, LearningItem, LearningPlan, DailyTask, DailyStat
+from app.services.task_generator_service import TaskGeneratorService
+from app.services.search_service import SearchService
+from mongomock_helpers import replay_bulk_write
+
+
+
+
+class TestTaskGenerator(unittest.TestCase):
+    """Test cases for TaskGeneratorService.generate_learning_plan"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, LearningPlan, DailyTask):
+            model.drop_collection()
+
+        self.user = User(
+            name='Plan User', email='plan@example.com',
+            mobile='5550002222', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='Go Fundamentals', source_type='course', total_duration=600
+        ).save()
+
+    def _generate(self, days=30):
+        return TaskGeneratorService.generate_learning_plan(self.item.id, self.user, {
+            'target_completion_date': datetime.utcnow() + timedelta(days=days),
+            'daily_availability_minutes': 90,
+            'buffer_percentage': 0
+        })
+
+    def test_tasks_written_with_single_insert(self):
+        collection_class = type(DailyTask._get_collection())
+        with patch.object(collection_class, 'insert_one', autospec=True,
+                          side_effect=collection_class.insert_one) as insert_one, \
+             patch.object(collection_class, 'insert_many', autospec=True,
+                          side_effect=collection_class.insert_many) as insert_many:
+            plan = self._generate()
+
+        self.assertEqual(insert_one.call_count, 1)  # The plan itself
+        self.assertEqual(insert_many.call_count, 1)
+        tasks = DailyTask.objects(learning_plan_id=plan)
+        self.assertEqual(tasks.count(), plan.total_tasks)
+        self.assertEqual(sum(t.estimated_duration_minutes for t in tasks), 600)
+        self.assertEqual(LearningPlan.objects.get(id=plan.id).total_tasks, plan.total_tasks)
+
+    def test_dependency_chain_is_sequential(self):
+        plan = self._generate()
+        tasks = list(DailyTask.objects(learning_plan_id=plan).order_by('content_reference.task_number'))
+
+        self.assertEqual(tasks[0].depends_on_task_ids, [])
+        self.assertEqual(tasks[0].task_type, 'introduction')
+        for previous, task in zip(tasks, tasks[1:]):
+            self.assertEqual(task.depends_on_task_ids, [str(previous.id)])
+            self.assertEqual(previous.is_prerequisite_for, [str(task.id)])
+        self.assertEqual(tasks[-1].is_prerequisite_for, [])
+
+    def test_generated_tasks_can_be_resaved(self):
+        plan = self._generate()
+        tasks = TaskGeneratorService._generate_tasks(plan, self.item)
+        tasks[0].status = 'in_progress'
+        tasks[0].save()
+
+        self.assertEqual(DailyTask.objects(id=tasks[0].id).count(), 1)
+        self.assertEqual(DailyTask.objects.get(id=tasks[0].id).status, 'in_progress')
+
+    def test_invalid_task_rejected_before_insert(self):
+        valid = DailyTask(learning_item_id=self.item, user_id=self.user, title='Fine',
+                          scheduled_date=datetime.utcnow(), estimated_duration_minutes=30)
+        invalid = DailyTask(learning_item_id=self.item, user_id=self.user,
+                            scheduled_date=datetime.utcnow(), estimated_duration_minutes=30)
+
+        with self.assertRaises(ValidationError):
+            TaskGeneratorService._insert_tasks([valid, invalid])
+        self.assertEqual(DailyTask.objects.count(), 0)
+
+
+class TestCompleteTask(unittest.TestCase):
+    """Test cases for TaskGeneratorService.complete_task"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, LearningPlan, DailyTask, DailyStat):
+            model.drop_collection()
+        self.now = datetime(2026, 5, 4, 18, 30)
+        self.user = User(
+            name='Done User', email='done@example.com',
+            mobile='5550003333', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='Rust Book', source_type='book', total_duration=200
+        ).save()
+        self.plan = LearningPlan(
+            user_id=self.user, learning_item_id=self.item,
+            target_completion_date=self.now + timedelta(days=10),
+            daily_availability_minutes=60, total_estimated_duration=200, total_tasks=4
+        ).save()
+        self.task = DailyTask(
+            user_id=self.user, learning_item_id=self.item, learning_plan_id=self.plan,
+            title='Chapter 1', scheduled_date=self.now, estimated_duration_minutes=40, xp_reward=25
+        ).save()
+
+    def _complete(self, **kwargs):
+        return TaskGeneratorService.complete_task(self.task.id, now=self.now, **kwargs)
+
+    def test_counters_applied_once(self):
+        self._complete(actual_duration=50)
+        again = self._complete(actual_duration=50)
+
+        self.assertEqual(again.status, 'completed')
+        self.assertEqual(again.actual_duration_minutes, 50)
+        self.assertEqual(LearningPlan.objects.get(id=self.plan.id).completed_tasks, 1)
+        stat = DailyStat.objects.get(user_id=self.user)
+        self.assertEqual((stat.date, stat.task_minutes, stat.tasks_completed), (datetime(2026, 5, 4), 50, 1))
+        item = LearningItem.objects.get(id=self.item.id)
+        self.assertEqual((item.completed_duration, item.progress_percentage), (50, 25.0))
+        self.assertEqual(User.objects.get(id=self.user.id).xp_total, 25)
+
+    def test_focus_completion_skips_task_xp(self):
+        # Focus sessions pay their own finishing bonus instead of xp_reward
+        self.task.mark_complete(30, award_xp=False)
+
+        self.assertEqual(DailyTask.objects.get(id=self.task.id).status, 'completed')
+        self.assertEqual(DailyStat.objects.get(user_id=self.user).tasks_completed, 1)
+        self.assertEqual(User.objects.get(id=self.user.id).xp_total, 0)
+
+    def test_estimate_credited_without_actual_duration(self):
+        self._complete()
+        self.assertEqual(LearningItem.objects.get(id=self.item.id).completed_duration, 40)
+
+    def test_two_round_trips(self):
+        calls, depth = [], [0]
+        for name in ('find', 'find_one_and_update', 'update_one', 'update_many', 'aggregate'):
+            def counted(collection, *args, _name=name, _original=getattr(mongomock.collection.Collection, name), **kwargs):
+                if depth[0] == 0:
+                    calls.append((collection.name, _name))
+                depth[0] += 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    depth[0] -= 1
+            patcher = patch.object(mongomock.collection.Collection, name, counted)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with patch('app.jobs.enqueue') as enqueue:
+            self._complete(actual_duration=30)
+
+        self.assertEqual(calls, [('daily_tasks', 'find_one_and_update'), ('learning_items', 'update_one')])
+        enqueue.assert_called_once()
+
+    def test_other_users_task_not_found(self):
+        other = User(name='Other', email='other@example.com', mobile='5550003334', password_hash='hash').save()
+        with self.assertRaises(ValueError):
+            TaskGeneratorService.complete_task(self.task.id, user_id=other.id)
+        with self.assertRaises(ValueError):
+            TaskGeneratorService.complete_task('not-an-id')
+        self.assertEqual(DailyTask.objects.get(id=self.task.id).status, 'pending')
+
+
+class TestReschedulePlan(unittest.TestCase):
+    """Test cases for the reschedule_plan reflow"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, LearningPlan, DailyTask):
+            model.drop_collection()
+        self.now = datetime(2026, 6, 1, 7, 0)  # A Monday
+        self.user = User(
+            name='Reflow User', email='reflow@example.com',
+            mobile='5550004444', password_hash='hash'
+        ).save()
+        self.item = LearningItem(
+            user_id=self.user, title='SICP', source_type='book', total_duration=900
+        ).save()
+        self.plan = LearningPlan(
+            user_id=self.user, learning_item_id=self.item,
+            target_completion_date=self.now + timedelta(days=30),
+            daily_availability_minutes=90, total_estimated_duration=900, buffer_percentage=0
+        ).save()
+        tasks = TaskGeneratorService._build_tasks(self.plan, self.item, start_date=self.now)
+        TaskGeneratorService._insert_tasks(tasks)
+        self.plan.update(set__total_tasks=len(tasks))
+        self.task_ids = [t.id for t in tasks]
+
+    def _open_docs(self):
+        return list(DailyTask._get_collection().find(
+            {'learning_plan_id': self.plan.id}
+        ).sort('content_reference.task_number', 1))
+
+    def test_unchanged_layout_writes_nothing(self):
+        with patch.object(type(DailyTask._get_collection()), 'bulk_write') as bulk_write:
+            plan = TaskGeneratorService.reschedule_plan(self.plan.id, now=self.now)
+
+        bulk_write.assert_not_called()
+        self.assertEqual(plan.plan_metadata['last_reschedule']['unchanged'], len(self.task_ids))
+        self.assertEqual([d['_id'] for d in self._open_docs()], self.task_ids)
+
+    def test_diff_keeps_ids_and_emits_minimal_ops(self):
+        self.plan.daily_availability_minutes = 60  # 45 + 15 per day: more, shorter tasks
+        layout = TaskGeneratorService._build_tasks(self.plan, self.item, start_date=self.now)
+        ops, summary = TaskGeneratorService._reflow_ops(self._open_docs(), layout)
+
+        self.assertEqual([t.id for t in layout[:len(self.task_ids)]], self.task_ids)
+        self.assertEqual(summary['inserted'], len(layout) - len(self.task_ids))
+        self.assertEqual(summary['updated'] + summary['unchanged'], len(self.task_ids))
+        self.assertEqual(summary['deleted'], 0)
+        self.assertEqual(len(ops), summary['updated'] + summary['inserted'])
+        self.assertEqual(layout[1].depends_on_task_ids, [str(self.task_ids[0])])
+        self.assertEqual(layout[-1].depends_on_task_ids, [str(layout[-2].id)])
+
+        # Only changed fields are set: the first task keeps its slot, the second shrinks
+        updates = {op._filter['_id']: op._doc['$set'] for op in ops if isinstance(op, UpdateOne)}
+        self.assertEqual(list(updates[self.task_ids[0]]), ['content_reference'])
+        self.assertEqual(updates[self.task_ids[1]]['estimated_duration_minutes'], 15)
+        self.assertNotIn('status', updates[self.task_ids[1]])
+
+    def test_shorter_layout_deletes_surplus_tail(self):
+        existing = self._open_docs()
+        self.plan.total_estimated_duration = 450
+        layout = TaskGeneratorService._build_tasks(self.plan, self.item, start_date=self.now)
+        ops, summary = TaskGeneratorService._reflow_ops(existing, layout)
+
+        self.assertEqual(summary['deleted'], len(existing) - len(layout))
+        self.assertFalse(any(isinstance(op, InsertOne) for op in ops))
+        self.assertEqual(ops[-1]._filter, {'_id': {'$in': self.task_ids[len(layout):]}})
+        self.assertEqual(layout[-1].is_prerequisite_for, [])
+
+    def test_reschedule_preserves_task_identity(self):
+        writes = replay_bulk_write(self)
+        DailyTask.objects(id=self.task_ids[0]).update_one(set__status='in_progress')
+        plan = TaskGeneratorService.reschedule_plan(self.plan.id, new_daily_minutes=60, now=self.now)
+
+        docs = self._open_docs()
+        self.assertEqual([d['_id'] for d in docs[:len(self.task_ids)]], self.task_ids)
+        self.assertEqual(docs[0]['status'], 'in_progress')
+        self.assertEqual(plan.total_tasks, len(docs))
+        self.assertEqual(len(writes), 1)
+        summary = plan.plan_metadata['last_reschedule']
+        self.assertEqual(len(writes[0][1]), summary['updated'] + summary['inserted'])
+        self.assertEqual([t['depends_on_task_ids'] for t in docs[1:]], [[str(d['_id'])] for d in docs[:-1]])
+
+    def test_reschedule_refreshes_search_index(self):
+        replay_bulk_write(self)
+        before = SearchService.universal_search(self.user.id, 'sicp', limit=50, sources=['tasks'])['tasks']
+        self.assertEqual(len(before), len(self.task_ids))
+
+        self.plan.update(set__total_estimated_duration=450)
+        self.item.update(set__total_duration=450)
+        TaskGeneratorService.reschedule_plan(self.plan.id, now=self.now)
+
+        after = SearchService.universal_search(self.user.id, 'sicp', limit=50, sources=['tasks'])['tasks']
+        self.assertEqual({r['id'] for r in after}, {str(d['_id']) for d in self._open_docs()})
+        self.assertLess(len(after), len(before))
+
+
+if __name__ == '__main__':
+    unittest.main()
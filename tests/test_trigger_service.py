@@ -0,0 +1,92 @@
+"""
+Unit tests for the batch TriggerService evaluator
+"""
+import unittest
+from datetime import datetime, timedelta
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import User, LearningItem, DailyTask, Notification
+from app.services.trigger_service import TriggerService, EVENING_NUDGE, MORNING_PLAN, OVERLOAD
+
+
+class TestTriggerSweep(unittest.TestCase):
+    """Test cases for TriggerService.evaluate_all"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask, Notification):
+            model.drop_collection()
+        self.users = [
+            User(name=f'User {i}', email=f'trigger{i}@example.com',
+                 mobile=f'555001000{i}', password_hash='hash').save()
+            for i in range(3)
+        ]
+        self.item = LearningItem(
+            user_id=self.users[0], title='Algorithms', source_type='course', total_duration=600
+        ).save()
+        self.evening = datetime.utcnow().replace(hour=21, minute=0, second=0, microsecond=0)
+
+    def _task(self, user, **fields):
+        fields.setdefault('scheduled_date', self.evening)
+        return DailyTask(
+            learning_item_id=self.item, user_id=user, title='Task',
+            estimated_duration_minutes=30, **fields
+        ).save()
+
+    def _titles(self, user):
+        return sorted(n.title for n in Notification.objects(user_id=user))
+
+    def test_evening_nudge_skips_users_who_completed(self):
+        self._task(self.users[0], status='completed', completed_at=self.evening)
+
+        result = TriggerService.evaluate_all(now=self.evening)
+        self.assertEqual(result, {'users': 3, 'triggered': 2, 'created': 2})
+        self.assertEqual(self._titles(self.users[0]), [])
+        self.assertEqual(self._titles(self.users[1]), [EVENING_NUDGE[0]])
+
+    def test_morning_plan_and_overload(self):
+        morning = self.evening.replace(hour=8)
+        for _ in range(TriggerService.OVERLOAD_PENDING_THRESHOLD + 1):
+            self._task(self.users[0], scheduled_date=morning)
+
+        TriggerService.evaluate_all(now=morning, chunk_size=2)
+        self.assertEqual(self._titles(self.users[0]), [OVERLOAD[0]])
+        self.assertEqual(self._titles(self.users[2]), [MORNING_PLAN[0]])
+        overload = Notification.objects.get(user_id=self.users[0])
+        self.assertIn('16 pending tasks', overload.message)
+
+    def test_legacy_users_without_is_active_are_swept(self):
+        User._get_collection().update_one({'_id': self.users[1].id}, {'$unset': {'is_active': ''}})
+        User.objects(id=self.users[2].id).update(set__is_active=False)
+
+        result = TriggerService.evaluate_all(now=self.evening)
+        self.assertEqual(result['users'], 2)
+        self.assertEqual(self._titles(self.users[1]), [EVENING_NUDGE[0]])
+        self.assertEqual(self._titles(self.users[2]), [])
+
+    def test_recent_notifications_are_not_repeated(self):
+        TriggerService.evaluate_all(now=self.evening)
+        again = TriggerService.evaluate_all(now=self.evening)
+
+        self.assertEqual(again['triggered'], 3)
+        self.assertEqual(again['created'], 0)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_evaluate_context_reports_conditions(self):
+        for _ in range(TriggerService.OVERLOAD_PENDING_THRESHOLD + 1):
+            self._task(self.users[1])
+
+        logs = TriggerService.evaluate_context(str(self.users[1].id))
+        self.assertIn(OVERLOAD[4], logs)
+        self.assertEqual(Notification.objects(user_id=self.users[1]).count(), len(logs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for the single-pass weekly review engine
+"""
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+import mongomock
+from app.models import (
+    User, LearningItem, DailyTask, FocusSession, CommitmentViolation, Commitment, WeeklyReviewSnapshot
+)
+from app.services.weekly_review_service import WeeklyReviewService
+
+
+class TestWeeklyReview(unittest.TestCase):
+    """Test cases for WeeklyReviewService"""
+
+    @classmethod
+    def setUpClass(cls):
+        connect('mongoenginetest', mongo_client_class=mongomock.MongoClient)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+
+    def setUp(self):
+        for model in (User, LearningItem, DailyTask, FocusSession, CommitmentViolation,
+                      Commitment, WeeklyReviewSnapshot):
+            model.drop_collection()
+        self.now = datetime(2026, 3, 12, 15, 0)  # Thursday; week starts Monday 2026-03-09
+        self.monday = datetime(2026, 3, 9)
+        self.user = User(name='Reviewer', email='weekly@example.com',
+                         mobile='5550070000', password_hash='hash').save()
+        self.item = LearningItem(user_id=self.user, title='Statistics', source_type='course',
+                                 status='active').save()
+        self.commitment = Commitment(user_id=self.user, learning_item_id=self.item, daily_study_minutes=30,
+                                     target_completion_date=self.now + timedelta(days=30)).save()
+
+    def _task(self, scheduled, completed=None):
+        DailyTask(
+            user_id=self.user, learning_item_id=self.item, title='Chapter', estimated_duration_minutes=30,
+            scheduled_date=scheduled, status='completed' if completed else 'pending', completed_at=completed
+        ).save()
+
+    def _focus(self, started, minutes):
+        FocusSession(user_id=self.user, learning_item_id=self.item, started_at=started,
+                     duration_minutes=minutes, is_active=False).save()
+
+    def _violation(self, when):
+        CommitmentViolation(commitment_id=self.commitment, user_id=self.user,
+                            violation_type='missed_session', violation_date=when).save()
+
+    def _seed(self):
+        # Current week: 3 scheduled, 2 done (both Tuesday), 90 focus minutes, 1 violation
+        self._task(self.monday, self.monday + timedelta(days=1, hours=9))
+        self._task(self.monday + timedelta(days=1), self.monday + timedelta(days=1, hours=20))
+        self._task(self.monday + timedelta(days=2))
+        self._focus(self.monday + timedelta(hours=8), 60)
+        self._focus(self.monday + timedelta(days=2, hours=8), 30)
+        self._violation(self.monday + timedelta(days=2))
+        # Last week: 1 scheduled and done on Sunday night
+        last_sunday = self.monday - timedelta(hours=1)
+        self._task(last_sunday.replace(hour=0), last_sunday)
+        self._focus(last_sunday - timedelta(hours=2), 45)
+
+    def test_current_week_statistics(self):
+        self._seed()
+        review = WeeklyReviewService.generate_weekly_review(self.user, now=self.now)
+        stats = review['statistics']
+
+        self.assertEqual(review['week_start'], '2026-03-09')
+        self.assertEqual((stats['tasks_completed'], stats['tasks_scheduled']), (2, 3))
+        self.assertEqual(stats['completion_rate'], 66.67)
+        self.assertEqual((stats['focus_time_minutes'], stats['focus_sessions']), (90, 2))
+        self.assertEqual(stats['commitment_violations'], 1)
+        self.assertEqual(stats['daily_breakdown'], {'Tuesday': 2})
+        self.assertEqual(stats['active_learning_items'], 1)
+
+        last = WeeklyReviewService.generate_weekly_review(self.user, week_offset=-1, now=self.now)['statistics']
+        self.assertEqual((last['tasks_completed'], last['focus_time_minutes']), (1, 45))
+        self.assertEqual(last['most_productive_day'], 'Sunday')
+
+    def test_finished_weeks_are_frozen(self):
+        self._seed()
+        before = WeeklyReviewService.get_review_history(self.user, weeks=3, now=self.now)
+        self.assertEqual(WeeklyReviewSnapshot.objects(user_id=self.user).count(), 2)
+
+        # Late writes to a frozen week are not picked up; the current week is live
+        self._focus(self.monday - timedelta(days=3), 500)
+        self._focus(self.monday + timedelta(days=3), 30)
+        after = WeeklyReviewService.get_review_history(self.user, weeks=3, now=self.now)
+
+        self.assertEqual(after[1:], before[1:])
+        self.assertEqual(after[0]['focus_time'], before[0]['focus_time'] + 30)
+        self.assertEqual(WeeklyReviewSnapshot.objects(user_id=self.user).count(), 2)
+
+    def test_twelve_week_history_query_count(self):
+        self._seed()
+        calls, depth = [], [0]
+        for name in ('find', 'aggregate', 'count_documents', 'insert_many'):
+            def counted(collection, *args, _original=getattr(mongomock.collection.Collection, name), **kwargs):
+                if depth[0] == 0:
+                    calls.append(collection.name)
+                depth[0] += 1
+                try:
+                    return _original(collection, *args, **kwargs)
+                finally:
+                    depth[0] -= 1
+            patcher = patch.object(mongomock.collection.Collection, name, counted)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        history = WeeklyReviewService.get_review_history(self.user, weeks=12, now=self.now)
+        first = list(calls)
+        calls.clear()
+        WeeklyReviewService.get_review_history(self.user, weeks=12, now=self.now)
+        patch.stopall()
+
+        self.assertEqual(len(history), 12)
+        self.assertEqual(history[0]['week'], 'Week of 2026-03-09')
+        self.assertEqual(len(first), 6)  # vs 60 for the per-week loop
+        # Warm: snapshot read plus the current week only
+        self.assertEqual(sorted(calls), sorted([
+            'weekly_review_snapshots', 'daily_tasks', 'focus_sessions', 'commitment_violations', 'learning_items'
+        ]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,7 @@
+"""
+Celery worker entrypoint: celery -A worker.celery worker --beat --loglevel=info
+"""
+from app import create_app
+
+app = create_app()
+celery = app.extensions['celery']